@@ -35,13 +35,14 @@ import socket
 import math
 import csv
 import json
+import shutil
+import tempfile
 
 try:
-    # Python 3
-    import queue
+    import resource
 except ImportError:
-    # Python 2.7
-    import Queue as queue
+    # Not available on Windows
+    resource = None
 import multiprocessing
 
 import dendropy
@@ -54,6 +55,7 @@ from dendropy.utility import messaging
 from dendropy.utility import timeprocessing
 from dendropy.utility import bitprocessing
 from dendropy.utility import textprocessing
+from dendropy.dataio import nexusprocessing
 
 ##############################################################################
 ## Preamble
@@ -73,6 +75,35 @@ _program_citation = """\
 Sukumaran, J and MT Holder. {prog_name}: {prog_subtitle}. {prog_version}. Available at https://github.com/jeetsukumaran/DendroPy.
 """.format(prog_name=_program_name, prog_subtitle=_program_subtitle, prog_version=_program_version)
 
+##############################################################################
+## Resource Usage
+
+def _peak_memory_usage_description():
+    """
+    Returns a string describing the peak resident set size of this process
+    and of its (terminated and waited-for) child processes, or |None| if
+    this cannot be determined on the current platform.
+    """
+    if resource is None:
+        return None
+    if sys.platform == "darwin":
+        # reported in bytes
+        scale = 1.0 / (1024 * 1024)
+    else:
+        # reported in kilobytes
+        scale = 1.0 / 1024
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    if children_rss:
+        return "{:.1f} MB (main process), {:.1f} MB (largest child process)".format(self_rss, children_rss)
+    else:
+        return "{:.1f} MB".format(self_rss)
+
+def _log_peak_memory_usage(messenger, phase_description):
+    peak_memory_usage = _peak_memory_usage_description()
+    if peak_memory_usage is not None:
+        messenger.info("Peak memory usage after {}: {}".format(phase_description, peak_memory_usage), wrap=False)
+
 ##############################################################################
 ## Primary Analyzing
 
@@ -89,7 +120,51 @@ def _read_into_tree_array(
         error_message_func,
         log_frequency,
         debug_mode,
+        tree_cache=None,
         ):
+    # Only the splits of the source trees are needed, so, where the schema
+    # supports it, trees are parsed into skeletons instead of full structures
+    bitmasks_only = schema in ("nexus/newick", "nexus", "newick")
+    if tree_cache is not None:
+        for source_idx, tree_source in enumerate(tree_sources):
+            if not textprocessing.is_str_type(tree_source):
+                _read_into_tree_array(
+                        tree_array=tree_array,
+                        tree_sources=[tree_source],
+                        schema=schema,
+                        taxon_namespace=taxon_namespace,
+                        rooting=rooting,
+                        tree_offset=tree_offset,
+                        use_tree_weights=use_tree_weights,
+                        preserve_underscores=preserve_underscores,
+                        info_message_func=info_message_func,
+                        error_message_func=error_message_func,
+                        log_frequency=log_frequency,
+                        debug_mode=debug_mode,
+                        )
+                continue
+            num_trees = len(tree_array)
+            is_cached = tree_cache.read_into(
+                    tree_array,
+                    path=tree_source,
+                    schema=schema,
+                    tree_offset=tree_offset,
+                    rooting=rooting,
+                    store_tree_weights=use_tree_weights,
+                    preserve_underscores=preserve_underscores,
+                    bitmasks_only=bitmasks_only,
+                    ignore_unrecognized_keyword_arguments=True,
+                    )
+            if info_message_func is not None:
+                if is_cached:
+                    coda = "restored from tree cache"
+                else:
+                    coda = "parsed and stored in tree cache"
+                info_message_func("'{}': {} trees analyzed ({})".format(
+                    tree_source,
+                    len(tree_array) - num_trees,
+                    coda), wrap=False)
+        return
     if not log_frequency:
         tree_array.read_from_files(
             files=tree_sources,
@@ -98,6 +173,7 @@ def _read_into_tree_array(
             tree_offset=tree_offset,
             store_tree_weights=use_tree_weights,
             preserve_underscores=preserve_underscores,
+            bitmasks_only=bitmasks_only,
             ignore_unrecognized_keyword_arguments=True,
             )
     else:
@@ -119,7 +195,13 @@ def _read_into_tree_array(
                     current_tree_offset=current_tree_offset,
                     coda=coda,
                     ), wrap=False)
-        tree_yielder = dendropy.Tree.yield_from_files(
+        if bitmasks_only:
+            tree_type = dendropy.TreeSkeleton
+            add_tree = tree_array.add_tree_skeleton
+        else:
+            tree_type = dendropy.Tree
+            add_tree = tree_array.add_tree
+        tree_yielder = tree_type.yield_from_files(
                 tree_sources,
                 schema=schema,
                 taxon_namespace=taxon_namespace,
@@ -144,7 +226,7 @@ def _read_into_tree_array(
                     else:
                         info_message_func("Analyzing: '{}'".format(source_name), wrap=False)
                 if current_tree_offset >= tree_offset:
-                    tree_array.add_tree(tree=tree, is_bipartitions_updated=False)
+                    add_tree(tree)
                     _log_progress(source_name, current_tree_offset)
                 else:
                     _log_progress(source_name, current_tree_offset)
@@ -162,6 +244,7 @@ class TreeAnalysisWorker(multiprocessing.Process):
             name,
             work_queue,
             results_queue,
+            results_dir,
             source_schema,
             taxon_labels,
             tree_offset,
@@ -176,10 +259,12 @@ class TreeAnalysisWorker(multiprocessing.Process):
             messenger,
             messenger_lock,
             debug_mode,
+            summary_reservoir_size=None,
             ):
         multiprocessing.Process.__init__(self, name=name)
         self.work_queue = work_queue
         self.results_queue = results_queue
+        self.results_dir = results_dir
         self.source_schema = source_schema
         self.taxon_labels = taxon_labels
         self.taxon_namespace = dendropy.TaxonNamespace(self.taxon_labels)
@@ -193,20 +278,11 @@ class TreeAnalysisWorker(multiprocessing.Process):
         self.use_tree_weights = use_tree_weights
         self.ultrametricity_precision = ultrametricity_precision
         self.taxon_label_age_map = taxon_label_age_map
+        self.summary_reservoir_size = summary_reservoir_size
         self.log_frequency = log_frequency
         self.messenger = messenger
         self.messenger_lock = messenger_lock
         self.kill_received = False
-        self.tree_array = dendropy.TreeArray(
-                taxon_namespace=self.taxon_namespace,
-                is_rooted_trees=self.is_source_trees_rooted,
-                ignore_edge_lengths=self.ignore_edge_lengths,
-                ignore_node_ages=self.ignore_node_ages,
-                use_tree_weights=self.use_tree_weights,
-                ultrametricity_precision=self.ultrametricity_precision,
-                taxon_label_age_map=self.taxon_label_age_map,
-                )
-        self.tree_array.worker_name = self.name
         self.num_tasks_received = 0
         self.num_tasks_completed = 0
         self.debug_mode = debug_mode
@@ -232,13 +308,41 @@ class TreeAnalysisWorker(multiprocessing.Process):
     def send_error(self, msg, wrap=True):
         self.send_message(msg, messaging.ConsoleMessenger.ERROR_MESSAGING_LEVEL, wrap=wrap)
 
+    def new_tree_array(self):
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=self.taxon_namespace,
+                is_rooted_trees=self.is_source_trees_rooted,
+                ignore_edge_lengths=self.ignore_edge_lengths,
+                ignore_node_ages=self.ignore_node_ages,
+                use_tree_weights=self.use_tree_weights,
+                ultrametricity_precision=self.ultrametricity_precision,
+                taxon_label_age_map=self.taxon_label_age_map,
+                summary_reservoir_size=self.summary_reservoir_size,
+                use_columnar_storage=True,
+                )
+        tree_array.worker_name = self.name
+        return tree_array
+
+    def save_results(self, task_index, tree_array):
+        results_path = os.path.join(self.results_dir, "task-{:06d}.columns".format(task_index))
+        dendropy.TreeArrayColumns.from_tree_array(tree_array).write(results_path)
+        return results_path
+
     def run(self):
         while not self.kill_received:
-            try:
-                tree_source = self.work_queue.get_nowait()
-            except queue.Empty:
+            work_item = self.work_queue.get()
+            if work_item is None:
                 break
+            task_index, tree_source = work_item
             self.num_tasks_received += 1
+            tree_array = self.new_tree_array()
+            if isinstance(tree_source, nexusprocessing.TreeSourceChunk):
+                # burn-in already excluded from chunk
+                tree_offset = 0
+                source_stream = tree_source.open()
+            else:
+                tree_offset = self.tree_offset
+                source_stream = tree_source
             # self.send_info("Received task {task_count}: '{task_name}'".format(
             self.send_info("Received task: '{task_name}'".format(
                 task_count=self.num_tasks_received,
@@ -254,12 +358,12 @@ class TreeAnalysisWorker(multiprocessing.Process):
             #     )
             try:
                 _read_into_tree_array(
-                        tree_array=self.tree_array,
-                        tree_sources=[tree_source],
+                        tree_array=tree_array,
+                        tree_sources=[source_stream],
                         schema=self.source_schema,
                         taxon_namespace=self.taxon_namespace,
                         rooting=self.rooting_interpretation,
-                        tree_offset=self.tree_offset,
+                        tree_offset=tree_offset,
                         use_tree_weights=self.use_tree_weights,
                         preserve_underscores=self.preserve_underscores,
                         info_message_func=self.send_info,
@@ -278,10 +382,19 @@ class TreeAnalysisWorker(multiprocessing.Process):
             self.send_info("Completed task: '{task_name}'".format(
                 task_count=self.num_tasks_received,
                 task_name=tree_source), wrap=False)
+            # Results are handed back through a file of flat arrays rather
+            # than pickled through the queue: they are then never copied
+            # through the queue pipe, and can be read and merged without
+            # recreating an object for every tree.
+            try:
+                results_path = self.save_results(task_index, tree_array)
+            except (KeyboardInterrupt, Exception) as e:
+                e.worker_name = self.name
+                self.results_queue.put(e)
+                break
+            self.results_queue.put((task_index, self.name, results_path))
         if self.kill_received:
             self.send_warning("Terminating in response to kill request")
-        else:
-            self.results_queue.put(self.tree_array)
 
 class TreeProcessor(object):
 
@@ -296,6 +409,8 @@ class TreeProcessor(object):
             log_frequency,
             messenger,
             debug_mode,
+            summary_reservoir_size=None,
+            tree_cache=None,
             ):
         self.is_source_trees_rooted = is_source_trees_rooted
         self.rooting_interpretation = dendropy.get_rooting_argument(is_rooted=self.is_source_trees_rooted)
@@ -304,6 +419,8 @@ class TreeProcessor(object):
         self.use_tree_weights = use_tree_weights
         self.ultrametricity_precision = ultrametricity_precision
         self.taxon_label_age_map = taxon_label_age_map
+        self.summary_reservoir_size = summary_reservoir_size
+        self.tree_cache = tree_cache
         self.num_processes = num_processes
         self.log_frequency = log_frequency
         self.messenger = messenger
@@ -364,6 +481,7 @@ class TreeProcessor(object):
                 use_tree_weights=self.use_tree_weights,
                 ultrametricity_precision=self.ultrametricity_precision,
                 taxon_label_age_map=self.taxon_label_age_map,
+                summary_reservoir_size=self.summary_reservoir_size,
                 )
         _read_into_tree_array(
                 tree_array=tree_array,
@@ -378,6 +496,7 @@ class TreeProcessor(object):
                 error_message_func=self.error_message,
                 log_frequency=self.log_frequency,
                 debug_mode=self.debug_mode,
+                tree_cache=self.tree_cache,
                 )
         return tree_array
 
@@ -411,13 +530,32 @@ class TreeProcessor(object):
 
         # load up queue
         self.info_message("Creating work queue")
-        work_queue = multiprocessing.Queue()
+        tasks = []
         for f in tree_sources:
-            work_queue.put(f)
+            chunks = None
+            if textprocessing.is_str_type(f):
+                tree_source_index = nexusprocessing.TreeSourceIndex.from_path(f, schema)
+                if tree_source_index is not None:
+                    chunks = tree_source_index.partition(
+                            num_chunks=self.num_processes,
+                            tree_offset=tree_offset)
+            if chunks and len(chunks) > 1:
+                self.info_message("Splitting '{}' into {} chunks of trees".format(f, len(chunks)))
+                tasks.extend(chunks)
+            else:
+                tasks.append(f)
+        work_queue = multiprocessing.Queue()
+        for task_index, task in enumerate(tasks):
+            work_queue.put((task_index, task))
+        # One sentinel per worker: workers block on the queue until it is
+        # populated, and exit once all tasks have been taken.
+        for idx in range(self.num_processes):
+            work_queue.put(None)
 
         # launch processes
         self.info_message("Launching {} worker processes".format(self.num_processes))
         results_queue = multiprocessing.Queue()
+        results_dir = tempfile.mkdtemp(prefix="sumtrees-")
         messenger_lock = multiprocessing.Lock()
         workers = []
         for idx in range(self.num_processes):
@@ -426,6 +564,7 @@ class TreeProcessor(object):
                     name="Process-{}".format(idx+1),
                     work_queue=work_queue,
                     results_queue=results_queue,
+                    results_dir=results_dir,
                     source_schema=schema,
                     taxon_labels=taxon_labels,
                     tree_offset=tree_offset,
@@ -439,34 +578,79 @@ class TreeProcessor(object):
                     messenger=self.messenger,
                     messenger_lock=messenger_lock,
                     log_frequency=self.log_frequency,
-                    debug_mode=self.debug_mode)
+                    debug_mode=self.debug_mode,
+                    summary_reservoir_size=self.summary_reservoir_size)
             tree_analysis_worker.start()
             workers.append(tree_analysis_worker)
 
-        # collate results
+        # collate results, in the order of the tasks
         result_count = 0
-        master_tree_array = dendropy.TreeArray(
-                taxon_namespace=taxon_namespace,
-                is_rooted_trees=self.is_source_trees_rooted,
-                ignore_edge_lengths=self.ignore_edge_lengths,
-                ignore_node_ages=self.ignore_node_ages,
-                use_tree_weights=self.use_tree_weights,
-                ultrametricity_precision=self.ultrametricity_precision,
-                )
+        pending_results = {}
+        next_task_index = 0
+        # Results are merged pairwise, in a reduction tree: each entry is
+        # the merged results of a run of consecutive tasks, with the number
+        # of merges that produced it, and entries with the same number of
+        # merges are combined as soon as both are available. Every result
+        # is thus merged a logarithmic rather than linear number of times,
+        # and trees are stored in the same sequence as in serial mode.
+        merged_results = []
+        split_bitmasks_owner = None
         try:
-            while result_count < self.num_processes:
+            while result_count < len(tasks):
                 result = results_queue.get()
                 if isinstance(result, Exception) or isinstance(result, KeyboardInterrupt):
                     self.info_message("Exception raised in worker process '{}'".format(result.worker_name))
                     raise result
-                master_tree_array.update(result)
-                self.info_message("Recovered results from worker process '{}'".format(result.worker_name))
+                task_index, worker_name, results_path = result
+                pending_results[task_index] = results_path
                 result_count += 1
-                # self.info_message("Recovered results from {} of {} worker processes".format(result_count, self.num_processes))
+                self.info_message("Recovered results from worker process '{}' ({} of {} tasks completed)".format(
+                    worker_name, result_count, len(tasks)), wrap=False)
+                # Results that arrive early stay on disk until their turn.
+                while next_task_index in pending_results:
+                    results_path = pending_results.pop(next_task_index)
+                    columns = dendropy.TreeArrayColumns.read(results_path,
+                            share_split_bitmasks_with=split_bitmasks_owner)
+                    if split_bitmasks_owner is None:
+                        split_bitmasks_owner = columns
+                    os.remove(results_path)
+                    num_merges = 0
+                    while merged_results and merged_results[-1][0] == num_merges:
+                        previous_columns = merged_results.pop()[1]
+                        previous_columns.update(columns)
+                        columns = previous_columns
+                        num_merges += 1
+                    merged_results.append((num_merges, columns))
+                    next_task_index += 1
         except (Exception, KeyboardInterrupt) as e:
             for worker in workers:
                 worker.terminate()
             raise
+        finally:
+            shutil.rmtree(results_dir, ignore_errors=True)
+        if merged_results:
+            columns = merged_results.pop()[1]
+            while merged_results:
+                previous_columns = merged_results.pop()[1]
+                previous_columns.update(columns)
+                columns = previous_columns
+            master_tree_array = columns.to_tree_array(
+                    taxon_namespace=taxon_namespace,
+                    use_columnar_storage=True,
+                    ultrametricity_precision=self.ultrametricity_precision)
+            del columns, split_bitmasks_owner
+        else:
+            master_tree_array = dendropy.TreeArray(
+                    taxon_namespace=taxon_namespace,
+                    is_rooted_trees=self.is_source_trees_rooted,
+                    ignore_edge_lengths=self.ignore_edge_lengths,
+                    ignore_node_ages=self.ignore_node_ages,
+                    use_tree_weights=self.use_tree_weights,
+                    ultrametricity_precision=self.ultrametricity_precision,
+                    summary_reservoir_size=self.summary_reservoir_size,
+                    )
+        for worker in workers:
+            worker.join()
         self.info_message("All {} worker processes terminated".format(self.num_processes))
         return master_tree_array
 
@@ -701,6 +885,26 @@ def main():
                 " providing the taxon names via this option can avoid"
                 " these issues."
                 ))
+    source_options.add_argument("--tree-cache-dir",
+            metavar="DIRECTORY",
+            default=None,
+            help=(
+                "Cache the analyzed trees of each source file in this"
+                " directory, so that subsequent runs on the same (unmodified)"
+                " files with the same source options (e.g., with different"
+                " burn-ins, clade frequency thresholds or target trees) do not"
+                " need to parse them again. Trees are read in serial mode"
+                " when this option is used."
+                ))
+    source_options.add_argument("--tree-cache-max-size",
+            type=float,
+            metavar="MB",
+            default=1024,
+            help=(
+                "Maximum total size, in megabytes, of the tree cache given by"
+                " '--tree-cache-dir': the least-recently used entries are"
+                " discarded when this is exceeded (default: %(default)s)."
+                ))
     source_options.add_argument("--tip-ages", "--tip-ages-filepath",
             dest="tip_ages_filepath",
             metavar="FILEPATH",
@@ -956,6 +1160,19 @@ def main():
             dest="summarize_node_ages",
             default=None,
             help="Assume that source trees are ultrametic and summarize node ages (distances from tips).")
+    node_summarization_options.add_argument("--summary-reservoir-size",
+            type=int,
+            metavar="#",
+            default=None,
+            help=(
+                "Do not store the edge lengths and node ages of every occurrence of "
+                "every split, but summarize them on the fly, keeping running means, "
+                "variances and ranges, and a random sample of at most this many values "
+                "per split for the calculation of medians, HPDs and quantiles. This "
+                "bounds the memory used when summarizing large numbers of trees. The "
+                "summaries are unaffected unless a split occurs more than this number "
+                "of times. With extended output, only the sampled values are listed."
+                ))
     node_summarization_options.add_argument("-l","--labels",
             dest="node_labels",
             default="support",
@@ -1103,7 +1320,8 @@ def main():
             const="max",
             dest="multiprocess",
             help=(
-                 "Run in parallel mode using as many processors as available, up to the number of sources."
+                 "Run in parallel mode using as many processors as available. "
+                 "Large sources are split into chunks of trees that are analyzed in parallel."
                  ))
     multiprocessing_options.add_argument("-m", "--multiprocessing",
             dest="multiprocess",
@@ -1457,13 +1675,14 @@ def main():
     ## Multiprocessing Setup
 
     num_cpus = multiprocessing.cpu_count()
-    if len(tree_sources) > 1 and args.multiprocess is not None:
+    is_reading_from_stdin = tree_sources[0] is sys.stdin
+    if not is_reading_from_stdin and args.multiprocess is not None:
         if (
                 args.multiprocess.lower() == "max"
                 or args.multiprocess == "#"
                 or args.multiprocess == "*"
             ):
-            num_processes = min(num_cpus, len(tree_sources))
+            num_processes = num_cpus
         # elif args.multiprocess == "@":
         #     num_processes = len(tree_sources)
         else:
@@ -1478,9 +1697,9 @@ def main():
             messenger.error("Maximum number of processes set to {}: cannot run SumTrees with less than 1 process".format(num_processes))
             sys.exit(1)
     else:
-        if args.multiprocess is not None and args.multiprocess > 1:
-            messenger.info("Number of valid sources is less than 2: forcing serial processing")
-        if len(tree_sources) > 1 and num_cpus > 1:
+        if args.multiprocess is not None:
+            messenger.info("Reading trees from standard input: forcing serial processing")
+        elif not is_reading_from_stdin and num_cpus > 1:
             messenger.info(
                     ("Multiple processors ({num_cpus}) available:"
                     " consider using the '-M' or '-m' options to"
@@ -1488,6 +1707,21 @@ def main():
                     ).format(num_cpus=num_cpus))
         num_processes = 1
 
+    if args.tree_cache_dir is not None and not is_reading_from_stdin:
+        if args.tree_cache_max_size is not None and args.tree_cache_max_size > 0:
+            tree_cache_max_size = int(args.tree_cache_max_size * 1024 * 1024)
+        else:
+            tree_cache_max_size = None
+        tree_cache = dendropy.TreeArrayCache(
+                cache_dir=os.path.expanduser(os.path.expandvars(args.tree_cache_dir)),
+                max_size=tree_cache_max_size)
+        messenger.info("Using tree cache: '{}'".format(tree_cache.cache_dir))
+        if num_processes > 1:
+            messenger.info("Reading trees through the tree cache: forcing serial processing")
+            num_processes = 1
+    else:
+        tree_cache = None
+
     ######################################################################
     ## Taxon Discovery
 
@@ -1513,6 +1747,8 @@ def main():
             log_frequency=args.log_frequency if not args.quiet else 0,
             messenger=messenger,
             debug_mode=args.debug_mode,
+            summary_reservoir_size=args.summary_reservoir_size,
+            tree_cache=tree_cache,
             )
     analysis_time_start = datetime.datetime.now()
     # messenger.info("Processing of source trees starting at {}".format(
@@ -1578,6 +1814,7 @@ def main():
     messenger.info("Analysis of source trees completed in: {}".format(timeprocessing.pretty_timedelta(analysis_time_delta),
         wrap=False,
         ))
+    _log_peak_memory_usage(messenger, "analysis of source trees")
 
     ######################################################################
     ## Post-Processing
@@ -1820,6 +2057,7 @@ def main():
         if args.node_labels == "clear":
             for nd in tree:
                 nd.label = None
+    _log_peak_memory_usage(messenger, "summarization of target trees")
 
     main_time_end = datetime.datetime.now()
 
@@ -2186,6 +2424,7 @@ def main():
     #  WRAP UP
 
     messenger.info("Summarization completed")
+    _log_peak_memory_usage(messenger, "writing of results")
     messenger.info_lines(final_run_report)
     messenger.silent = True
 
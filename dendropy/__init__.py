@@ -17,84 +17,155 @@
 ##############################################################################
 
 import sys
+import importlib
 
 ###############################################################################
 ## Populate the 'dendropy' namespace
+##
+## Names are resolved on first access (see ``__getattr__()`` below), so that
+## ``import dendropy`` itself does not import the data model, the state
+## alphabets, or the reader/writer machinery.
 
-from dendropy.dataio.nexusprocessing import get_rooting_argument
-from dendropy.datamodel.taxonmodel import Taxon
-from dendropy.datamodel.taxonmodel import TaxonNamespace
-from dendropy.datamodel.taxonmodel import TaxonNamespacePartition
-from dendropy.datamodel.taxonmodel import TaxonNamespaceMapping
-from dendropy.datamodel.taxonmodel import TaxonSet # Legacy
-from dendropy.datamodel.treemodel import Bipartition
-from dendropy.datamodel.treemodel import Edge
-from dendropy.datamodel.treemodel import Node
-from dendropy.datamodel.treemodel import Tree
-from dendropy.datamodel.treecollectionmodel import TreeList
-from dendropy.datamodel.treecollectionmodel import SplitDistribution
-from dendropy.datamodel.treecollectionmodel import TreeArray
-from dendropy.datamodel.charstatemodel import StateAlphabet
-from dendropy.datamodel.charstatemodel import DNA_STATE_ALPHABET
-from dendropy.datamodel.charstatemodel import RNA_STATE_ALPHABET
-from dendropy.datamodel.charstatemodel import NUCLEOTIDE_STATE_ALPHABET
-from dendropy.datamodel.charstatemodel import PROTEIN_STATE_ALPHABET
-from dendropy.datamodel.charstatemodel import BINARY_STATE_ALPHABET
-from dendropy.datamodel.charstatemodel import RESTRICTION_SITES_STATE_ALPHABET
-from dendropy.datamodel.charstatemodel import INFINITE_SITES_STATE_ALPHABET
-from dendropy.datamodel.charstatemodel import new_standard_state_alphabet
-from dendropy.datamodel.charmatrixmodel import CharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import CharacterMatrix
-from dendropy.datamodel.charmatrixmodel import DnaCharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import DnaCharacterMatrix
-from dendropy.datamodel.charmatrixmodel import NucleotideCharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import NucleotideCharacterMatrix
-from dendropy.datamodel.charmatrixmodel import RnaCharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import RnaCharacterMatrix
-from dendropy.datamodel.charmatrixmodel import ProteinCharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import ProteinCharacterMatrix
-from dendropy.datamodel.charmatrixmodel import RestrictionSitesCharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import RestrictionSitesCharacterMatrix
-from dendropy.datamodel.charmatrixmodel import InfiniteSitesCharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import InfiniteSitesCharacterMatrix
-from dendropy.datamodel.charmatrixmodel import StandardCharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import StandardCharacterMatrix
-from dendropy.datamodel.charmatrixmodel import ContinuousCharacterDataSequence
-from dendropy.datamodel.charmatrixmodel import ContinuousCharacterMatrix
-from dendropy.calculate.phylogeneticdistance import PhylogeneticDistanceMatrix
-from dendropy.datamodel.datasetmodel import DataSet
-from dendropy.utility.error import ImmutableTaxonNamespaceError
-from dendropy.utility.error import DataParseError
-from dendropy.utility.error import UnsupportedSchemaError
-from dendropy.utility.error import UnspecifiedSchemaError
-from dendropy.utility.error import UnspecifiedSourceError
-from dendropy.utility.error import TooManyArgumentsError
-from dendropy.utility.error import InvalidArgumentValueError
-from dendropy.utility.error import MultipleInitializationSourceError
-from dendropy.utility.error import TaxonNamespaceIdentityError
-from dendropy.utility.error import TaxonNamespaceReconstructionError
-from dendropy.utility.error import UltrametricityError
-from dendropy.utility.error import TreeSimTotalExtinctionException
-from dendropy.utility.error import SeedNodeDeletionException
-from dendropy.utility import deprecate
+_LAZY_ATTRIBUTES = {
+    "get_rooting_argument": ("dendropy.dataio.nexusprocessing", "get_rooting_argument"),
+    "Taxon": ("dendropy.datamodel.taxonmodel", "Taxon"),
+    "TaxonNamespace": ("dendropy.datamodel.taxonmodel", "TaxonNamespace"),
+    "TaxonNamespacePartition": ("dendropy.datamodel.taxonmodel", "TaxonNamespacePartition"),
+    "TaxonNamespaceMapping": ("dendropy.datamodel.taxonmodel", "TaxonNamespaceMapping"),
+    "TaxonSet": ("dendropy.datamodel.taxonmodel", "TaxonSet"), # Legacy
+    "Bipartition": ("dendropy.datamodel.treemodel", "Bipartition"),
+    "Edge": ("dendropy.datamodel.treemodel", "Edge"),
+    "Node": ("dendropy.datamodel.treemodel", "Node"),
+    "Tree": ("dendropy.datamodel.treemodel", "Tree"),
+    "TreeSkeleton": ("dendropy.datamodel.treemodel", "TreeSkeleton"),
+    "MrcaIndex": ("dendropy.datamodel.treemodel", "MrcaIndex"),
+    "FlatTree": ("dendropy.datamodel.treemodel", "FlatTree"),
+    "TreeList": ("dendropy.datamodel.treecollectionmodel", "TreeList"),
+    "SplitDistribution": ("dendropy.datamodel.treecollectionmodel", "SplitDistribution"),
+    "TreeArray": ("dendropy.datamodel.treecollectionmodel", "TreeArray"),
+    "TreeArrayCache": ("dendropy.datamodel.treecollectionmodel", "TreeArrayCache"),
+    "TreeArrayColumns": ("dendropy.datamodel.treecollectionmodel", "TreeArrayColumns"),
+    "StateAlphabet": ("dendropy.datamodel.charstatemodel", "StateAlphabet"),
+    "DNA_STATE_ALPHABET": ("dendropy.datamodel.charstatemodel", "DNA_STATE_ALPHABET"),
+    "RNA_STATE_ALPHABET": ("dendropy.datamodel.charstatemodel", "RNA_STATE_ALPHABET"),
+    "NUCLEOTIDE_STATE_ALPHABET": ("dendropy.datamodel.charstatemodel", "NUCLEOTIDE_STATE_ALPHABET"),
+    "PROTEIN_STATE_ALPHABET": ("dendropy.datamodel.charstatemodel", "PROTEIN_STATE_ALPHABET"),
+    "BINARY_STATE_ALPHABET": ("dendropy.datamodel.charstatemodel", "BINARY_STATE_ALPHABET"),
+    "RESTRICTION_SITES_STATE_ALPHABET": ("dendropy.datamodel.charstatemodel", "RESTRICTION_SITES_STATE_ALPHABET"),
+    "INFINITE_SITES_STATE_ALPHABET": ("dendropy.datamodel.charstatemodel", "INFINITE_SITES_STATE_ALPHABET"),
+    "new_standard_state_alphabet": ("dendropy.datamodel.charstatemodel", "new_standard_state_alphabet"),
+    "CharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "CharacterDataSequence"),
+    "CharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "CharacterMatrix"),
+    "DnaCharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "DnaCharacterDataSequence"),
+    "DnaCharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "DnaCharacterMatrix"),
+    "NucleotideCharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "NucleotideCharacterDataSequence"),
+    "NucleotideCharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "NucleotideCharacterMatrix"),
+    "RnaCharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "RnaCharacterDataSequence"),
+    "RnaCharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "RnaCharacterMatrix"),
+    "ProteinCharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "ProteinCharacterDataSequence"),
+    "ProteinCharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "ProteinCharacterMatrix"),
+    "RestrictionSitesCharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "RestrictionSitesCharacterDataSequence"),
+    "RestrictionSitesCharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "RestrictionSitesCharacterMatrix"),
+    "InfiniteSitesCharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "InfiniteSitesCharacterDataSequence"),
+    "InfiniteSitesCharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "InfiniteSitesCharacterMatrix"),
+    "StandardCharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "StandardCharacterDataSequence"),
+    "StandardCharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "StandardCharacterMatrix"),
+    "ContinuousCharacterDataSequence": ("dendropy.datamodel.charmatrixmodel", "ContinuousCharacterDataSequence"),
+    "ContinuousCharacterMatrix": ("dendropy.datamodel.charmatrixmodel", "ContinuousCharacterMatrix"),
+    "PhylogeneticDistanceMatrix": ("dendropy.calculate.phylogeneticdistance", "PhylogeneticDistanceMatrix"),
+    "ArrayPhylogeneticDistanceMatrix": ("dendropy.calculate.phylogeneticdistance", "ArrayPhylogeneticDistanceMatrix"),
+    "DataSet": ("dendropy.datamodel.datasetmodel", "DataSet"),
+    "ImmutableTaxonNamespaceError": ("dendropy.utility.error", "ImmutableTaxonNamespaceError"),
+    "DataParseError": ("dendropy.utility.error", "DataParseError"),
+    "UnsupportedSchemaError": ("dendropy.utility.error", "UnsupportedSchemaError"),
+    "UnspecifiedSchemaError": ("dendropy.utility.error", "UnspecifiedSchemaError"),
+    "UnspecifiedSourceError": ("dendropy.utility.error", "UnspecifiedSourceError"),
+    "TooManyArgumentsError": ("dendropy.utility.error", "TooManyArgumentsError"),
+    "InvalidArgumentValueError": ("dendropy.utility.error", "InvalidArgumentValueError"),
+    "MultipleInitializationSourceError": ("dendropy.utility.error", "MultipleInitializationSourceError"),
+    "TaxonNamespaceIdentityError": ("dendropy.utility.error", "TaxonNamespaceIdentityError"),
+    "TaxonNamespaceReconstructionError": ("dendropy.utility.error", "TaxonNamespaceReconstructionError"),
+    "UltrametricityError": ("dendropy.utility.error", "UltrametricityError"),
+    "TreeSimTotalExtinctionException": ("dendropy.utility.error", "TreeSimTotalExtinctionException"),
+    "SeedNodeDeletionException": ("dendropy.utility.error", "SeedNodeDeletionException"),
+    "deprecate": ("dendropy.utility.deprecate", None),
+    ## Legacy Support
+    "coalescent": ("dendropy.legacy.coalescent", None),
+    "continuous": ("dendropy.legacy.continuous", None),
+    "treecalc": ("dendropy.legacy.treecalc", None),
+    "popgensim": ("dendropy.legacy.popgensim", None),
+    "popgenstat": ("dendropy.legacy.popgenstat", None),
+    "reconcile": ("dendropy.legacy.reconcile", None),
+    "seqmodel": ("dendropy.legacy.seqmodel", None),
+    "seqsim": ("dendropy.legacy.seqsim", None),
+    "treemanip": ("dendropy.legacy.treemanip", None),
+    "treesim": ("dendropy.legacy.treesim", None),
+    "treesplit": ("dendropy.legacy.treesplit", None),
+    "treesum": ("dendropy.legacy.treesum", None),
+}
 
+_SUBPACKAGES = frozenset([
+    "calculate",
+    "dataio",
+    "datamodel",
+    "interop",
+    "legacy",
+    "mathlib",
+    "model",
+    "simulate",
+    "utility",
+])
 
-###############################################################################
-## Legacy Support
-
-from dendropy.legacy import coalescent
-from dendropy.legacy import continuous
-from dendropy.legacy import treecalc
-from dendropy.legacy import popgensim
-from dendropy.legacy import popgenstat
-from dendropy.legacy import reconcile
-from dendropy.legacy import seqmodel
-from dendropy.legacy import seqsim
-from dendropy.legacy import treecalc
-from dendropy.legacy import treemanip
-from dendropy.legacy import treesim
-from dendropy.legacy import treesplit
-from dendropy.legacy import treesum
+# Names exported by ``from dendropy import *``: the on-demand names and
+# subpackages above, and the package metadata and functions defined below.
+__all__ = sorted(set(_LAZY_ATTRIBUTES) | _SUBPACKAGES | set([
+    "PACKAGE_VERSION",
+    "citation_info",
+    "description",
+    "description_text",
+    "homedir",
+    "multi_tree_source_iter",
+    "name",
+    "revision_description",
+    "tree_source_iter",
+    "version_info",
+]))
+
+def __getattr__(name):
+    try:
+        module_name, attr_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        if name not in _SUBPACKAGES:
+            raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+        module_name, attr_name = "{}.{}".format(__name__, name), None
+    value = importlib.import_module(module_name)
+    if attr_name is not None:
+        value = getattr(value, attr_name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _SUBPACKAGES)
+
+if sys.version_info < (3, 7):
+    # Module-level ``__getattr__()`` and ``__dir__()`` (PEP 562) are only
+    # honored from Python 3.7 onward. On Python 3.5 and 3.6, the same effect
+    # is obtained by switching the class of this module object; on Python 2,
+    # where this is not possible, all names are imported up front (classes and
+    # functions before the legacy modules, which depend on them).
+    if sys.version_info >= (3, 5):
+        import types
+        class _LazyModule(types.ModuleType):
+            def __getattr__(self, name):
+                return __getattr__(name)
+            def __dir__(self):
+                return __dir__()
+        sys.modules[__name__].__class__ = _LazyModule
+    else:
+        for _name in sorted(_LAZY_ATTRIBUTES, key=lambda n: _LAZY_ATTRIBUTES[n][1] is None):
+            __getattr__(_name)
+        for _name in sorted(_SUBPACKAGES):
+            __getattr__(_name)
 
 ###############################################################################
 ## PACKAGE METADATA
@@ -21,8 +21,16 @@ Taxon-to-taxon phylogenetic distances.
 """
 
 import math
+import array
 import collections
 import csv
+import mmap
+import multiprocessing
+import operator
+import random
+import struct
+import sys
+import tempfile
 from dendropy.calculate import statistics
 from dendropy.utility import GLOBAL_RNG
 from dendropy.utility import container
@@ -257,7 +265,7 @@ class PhylogeneticDistanceMatrix(object):
         #     self._mrca[t1] = {}
         self._tree_length = 0.0
         self._num_edges = 0
-        for node in tree.postorder_node_iter():
+        for node in tree.postorder_nodes():
             try:
                 self._tree_length += node.edge.length
             except TypeError: # None for edge length
@@ -629,7 +637,8 @@ class PhylogeneticDistanceMatrix(object):
             is_normalize_by_tree_size=False,
             is_skip_single_taxon_assemblages=False,
             null_model_type="taxa.label",
-            rng=None):
+            rng=None,
+            num_processes=1):
         """
         Returns the standardized effect size value for the MPD statistic under
         a null model under various community compositions.
@@ -664,6 +673,14 @@ class PhylogeneticDistanceMatrix(object):
         is_weighted_edge_distances: bool
             If ``True`` then edge lengths will be considered for distances.
             Otherwise, just the number of edges.
+        rng : ``random.Random`` instance or |None|
+            Source of randomness for the null model. A seed is drawn from
+            this for each randomization replicate, so that the results are
+            reproducible for a given (seeded) ``rng`` regardless of the number
+            of processes used.
+        num_processes : int
+            Number of processes across which the randomization replicates
+            are to be distributed.
 
         Returns
         -------
@@ -700,6 +717,7 @@ class PhylogeneticDistanceMatrix(object):
         if assemblage_memberships is None:
             assemblage_memberships = [ set(self._mapped_taxa) ]
         comparison_regimes = []
+        assemblages = []
         for idx, assemblage_membership in enumerate(assemblage_memberships):
             if len(assemblage_membership) == 1:
                 if is_skip_single_taxon_assemblages:
@@ -709,14 +727,17 @@ class PhylogeneticDistanceMatrix(object):
             filter_fn = lambda taxon: taxon in assemblage_membership
             comparison_regime = list(self.distinct_taxon_pair_iter(filter_fn=filter_fn))
             comparison_regimes.append(comparison_regime)
+            assemblages.append(list(self.taxon_iter(filter_fn=filter_fn)))
         results = self._calculate_standardized_effect_size(
                 statisticf_name="_calculate_mean_pairwise_distance",
                 is_weighted_edge_distances=is_weighted_edge_distances,
                 is_normalize_by_tree_size=is_normalize_by_tree_size,
                 comparison_regimes=comparison_regimes,
+                assemblages=assemblages,
                 null_model_type=null_model_type,
                 num_randomization_replicates=num_randomization_replicates,
-                rng=rng)
+                rng=rng,
+                num_processes=num_processes)
         return results
 
     def standardized_effect_size_mean_nearest_taxon_distance(self,
@@ -726,7 +747,8 @@ class PhylogeneticDistanceMatrix(object):
             is_normalize_by_tree_size=False,
             is_skip_single_taxon_assemblages=False,
             null_model_type="taxa.label",
-            rng=None):
+            rng=None,
+            num_processes=1):
         """
         Returns the standardized effect size value for the MNTD statistic under
         a null model under various community compositions.
@@ -761,6 +783,14 @@ class PhylogeneticDistanceMatrix(object):
         is_weighted_edge_distances: bool
             If ``True`` then edge lengths will be considered for distances.
             Otherwise, just the number of edges.
+        rng : ``random.Random`` instance or |None|
+            Source of randomness for the null model. A seed is drawn from
+            this for each randomization replicate, so that the results are
+            reproducible for a given (seeded) ``rng`` regardless of the number
+            of processes used.
+        num_processes : int
+            Number of processes across which the randomization replicates
+            are to be distributed.
 
         Returns
         -------
@@ -797,6 +827,7 @@ class PhylogeneticDistanceMatrix(object):
         if assemblage_memberships is None:
             assemblage_memberships = [ set(self._mapped_taxa) ]
         comparison_regimes = []
+        assemblages = []
         for idx, assemblage_membership in enumerate(assemblage_memberships):
             if len(assemblage_membership) == 1:
                 if is_skip_single_taxon_assemblages:
@@ -806,14 +837,17 @@ class PhylogeneticDistanceMatrix(object):
             filter_fn = lambda taxon: taxon in assemblage_membership
             comparison_regime = self._get_taxon_to_all_other_taxa_comparisons(filter_fn=filter_fn)
             comparison_regimes.append(comparison_regime)
+            assemblages.append(list(self.taxon_iter(filter_fn=filter_fn)))
         results = self._calculate_standardized_effect_size(
                 statisticf_name="_calculate_mean_nearest_taxon_distance",
                 comparison_regimes=comparison_regimes,
+                assemblages=assemblages,
                 is_weighted_edge_distances=is_weighted_edge_distances,
                 is_normalize_by_tree_size=is_normalize_by_tree_size,
                 null_model_type=null_model_type,
                 num_randomization_replicates=num_randomization_replicates,
-                rng=rng)
+                rng=rng,
+                num_processes=num_processes)
         return results
 
     def shuffle_taxa(self,
@@ -1293,14 +1327,87 @@ class PhylogeneticDistanceMatrix(object):
         else:
             raise error.NullAssemblageException("No taxa in assemblage")
 
+    def _get_null_model_distance_rows(self,
+            is_weighted_edge_distances,
+            diagonal_value):
+        taxa = list(self.taxon_iter())
+        dmatrix, normalization_factor = self._get_distance_matrix_and_normalization_factor(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=False)
+        taxon_row_index = {}
+        distance_rows = []
+        for row_idx, taxon1 in enumerate(taxa):
+            taxon_row_index[taxon1] = row_idx
+            row = array.array("d", [dmatrix[taxon1][taxon2] if taxon1 is not taxon2 else 0.0 for taxon2 in taxa])
+            row[row_idx] = diagonal_value
+            distance_rows.append(row)
+        return taxon_row_index, distance_rows
+
+    def _calculate_null_model_statistic_values(self,
+            statisticf_name,
+            assemblages,
+            is_weighted_edge_distances,
+            is_normalize_by_tree_size,
+            replicate_seeds,
+            num_processes=1):
+        # Calculates the statistic for all assemblages under each
+        # randomization replicate of the "taxa.label" null model. Instead of
+        # shuffling the (dictionary-based) matrix itself, each replicate is a
+        # random permutation of the matrix row indexes, and the rows and
+        # columns of each assemblage are gathered from a copy of the matrix in
+        # plain rows. Each replicate draws its permutation from its own seed,
+        # so the results do not depend on how the replicates are divided
+        # between processes.
+        if statisticf_name == "_calculate_mean_pairwise_distance":
+            null_model_statistic = "mpd"
+            diagonal_value = 0.0
+        elif statisticf_name == "_calculate_mean_nearest_taxon_distance":
+            null_model_statistic = "mntd"
+            diagonal_value = float("inf")
+        else:
+            raise ValueError(statisticf_name)
+        dmatrix, normalization_factor = self._get_distance_matrix_and_normalization_factor(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=is_normalize_by_tree_size)
+        taxon_row_index, distance_rows = self._get_null_model_distance_rows(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                diagonal_value=diagonal_value)
+        assemblage_row_indexes = [[taxon_row_index[taxon] for taxon in assemblage] for assemblage in assemblages]
+        if num_processes is None or num_processes <= 1 or len(replicate_seeds) < 2:
+            return _calculate_null_model_statistic_values((
+                    null_model_statistic,
+                    distance_rows,
+                    assemblage_row_indexes,
+                    normalization_factor,
+                    replicate_seeds))
+        num_processes = min(num_processes, len(replicate_seeds))
+        shard_size = int(math.ceil(float(len(replicate_seeds)) / num_processes))
+        tasks = [(null_model_statistic,
+                distance_rows,
+                assemblage_row_indexes,
+                normalization_factor,
+                replicate_seeds[idx:idx+shard_size]) for idx in range(0, len(replicate_seeds), shard_size)]
+        null_model_stat_values = dict((idx, []) for idx in range(len(assemblages)))
+        pool = multiprocessing.Pool(processes=len(tasks))
+        try:
+            for shard_stat_values in pool.map(_calculate_null_model_statistic_values, tasks):
+                for idx in null_model_stat_values:
+                    null_model_stat_values[idx].extend(shard_stat_values[idx])
+        finally:
+            pool.terminate()
+            pool.join()
+        return null_model_stat_values
+
     def _calculate_standardized_effect_size(self,
             statisticf_name,
             comparison_regimes,
             is_weighted_edge_distances,
             is_normalize_by_tree_size,
+            assemblages=None,
             null_model_type="taxa.label",
             num_randomization_replicates=1000,
-            rng=None):
+            rng=None,
+            num_processes=1):
         result_type = collections.namedtuple("PhylogeneticCommunityStandardizedEffectSizeStatisticCalculationResult",
                 ["obs", "null_model_mean", "null_model_sd", "z", "rank", "p",])
         statisticf_kwargs={
@@ -1308,28 +1415,19 @@ class PhylogeneticDistanceMatrix(object):
             "is_normalize_by_tree_size": is_normalize_by_tree_size
         }
         observed_stat_values = {}
-        null_model_stat_values = {}
-        null_model_matrix = self.clone()
-        assert null_model_matrix == self
-        if is_weighted_edge_distances:
-            is_shuffle_phylogenetic_distances = True
-            is_shuffle_phylogenetic_path_steps = False
-        else:
-            is_shuffle_phylogenetic_distances = False
-            is_shuffle_phylogenetic_path_steps = True
-        for rep_idx in range(num_randomization_replicates):
-            null_model_matrix.shuffle_taxa(
-                    is_shuffle_phylogenetic_distances=is_shuffle_phylogenetic_distances,
-                    is_shuffle_phylogenetic_path_steps=is_shuffle_phylogenetic_distances,
-                    is_shuffle_mrca=False,
-                    rng=rng)
-            for comparison_regime_idx, comparison_regime in enumerate(comparison_regimes):
-                statisticf_kwargs["comparison_regime"] = comparison_regime
-                if rep_idx == 0:
-                    observed_stat_values[comparison_regime_idx] = getattr(self, statisticf_name)(**statisticf_kwargs)
-                    null_model_stat_values[comparison_regime_idx] = []
-                stat_value = getattr(null_model_matrix, statisticf_name)(**statisticf_kwargs)
-                null_model_stat_values[comparison_regime_idx].append(stat_value)
+        for comparison_regime_idx, comparison_regime in enumerate(comparison_regimes):
+            statisticf_kwargs["comparison_regime"] = comparison_regime
+            observed_stat_values[comparison_regime_idx] = getattr(self, statisticf_name)(**statisticf_kwargs)
+        if rng is None:
+            rng = GLOBAL_RNG
+        replicate_seeds = [rng.getrandbits(32) for rep_idx in range(num_randomization_replicates)]
+        null_model_stat_values = self._calculate_null_model_statistic_values(
+                statisticf_name=statisticf_name,
+                assemblages=assemblages,
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=is_normalize_by_tree_size,
+                replicate_seeds=replicate_seeds,
+                num_processes=num_processes)
         results = []
         for comparison_regime_idx, comparison_regime in enumerate(comparison_regimes):
             obs_value = observed_stat_values[comparison_regime_idx]
@@ -1355,7 +1453,632 @@ class PhylogeneticDistanceMatrix(object):
             results.append(result)
         return results
 
+class _MappedArray(object):
+    """
+    Fixed-length array of numbers of a single :mod:`array` type, stored in a
+    memory map. Supports the indexing, slicing and slice assignment (of
+    sequences of the same length) used by |ArrayPhylogeneticDistanceMatrix|.
+    Used where :class:`memoryview` cannot be cast to a typed view of the map
+    (i.e., before Python 3.3).
+    """
+
+    def __init__(self, typecode, storage_map, length):
+        self.typecode = typecode
+        self.itemsize = array.array(typecode).itemsize
+        self._storage_map = storage_map
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def _get_slice_bounds(self, index):
+        start, stop, step = index.indices(self._length)
+        if step != 1:
+            raise ValueError("Extended slices are not supported")
+        return start, max(start, stop)
+
+    def _get_offset(self, index):
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError("array index out of range")
+        return index * self.itemsize
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop = self._get_slice_bounds(index)
+            values = array.array(self.typecode)
+            values.fromstring(self._storage_map[start * self.itemsize:stop * self.itemsize])
+            return values
+        return struct.unpack_from(self.typecode, self._storage_map, self._get_offset(index))[0]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            start, stop = self._get_slice_bounds(index)
+            if not isinstance(value, array.array) or value.typecode != self.typecode:
+                value = array.array(self.typecode, value)
+            if len(value) != stop - start:
+                raise ValueError("Cannot resize a memory-mapped array")
+            self._storage_map[start * self.itemsize:stop * self.itemsize] = value.tostring()
+        else:
+            struct.pack_into(self.typecode, self._storage_map, self._get_offset(index), value)
+
+class _ArrayDistanceMatrixTaxonView(object):
+    """
+    Read-only view of an array-backed distance matrix, supporting the
+    ``matrix[taxon1][taxon2]`` lookups of the dictionaries of
+    |PhylogeneticDistanceMatrix|.
+    """
+
+    def __init__(self, values, taxon_row_index, num_rows):
+        self._values = values
+        self._taxon_row_index = taxon_row_index
+        self._num_rows = num_rows
+
+    def __getitem__(self, taxon):
+        return _ArrayDistanceMatrixRowView(
+                self._values,
+                self._taxon_row_index[taxon] * self._num_rows,
+                self._taxon_row_index)
+
+    def __contains__(self, taxon):
+        return taxon in self._taxon_row_index
+
+    def __iter__(self):
+        return iter(self._taxon_row_index)
+
+    def __len__(self):
+        return len(self._taxon_row_index)
+
+class _ArrayDistanceMatrixRowView(object):
+
+    def __init__(self, values, offset, taxon_row_index):
+        self._values = values
+        self._offset = offset
+        self._taxon_row_index = taxon_row_index
+
+    def __getitem__(self, taxon):
+        return self._values[self._offset + self._taxon_row_index[taxon]]
+
+    def __contains__(self, taxon):
+        return taxon in self._taxon_row_index
+
+    def __iter__(self):
+        return iter(self._taxon_row_index)
+
+    def __len__(self):
+        return len(self._taxon_row_index)
+
+class ArrayPhylogeneticDistanceMatrix(PhylogeneticDistanceMatrix):
+    """
+    A |PhylogeneticDistanceMatrix| that stores the patristic distances and
+    path step counts between taxa in flat :class:`array.array` (or
+    memory-mapped) $n \\times n$ matrices, with rows and columns indexed by
+    taxon, rather than in nested dictionaries with per-pair objects. This
+    requires a small fraction of the memory, making it feasible to
+    calculate the distances for trees with tens of thousands of tips.
+
+    The matrices are filled by a single traversal of the tree, in which the
+    distances between the leaves of each pair of subtrees are written as
+    (contiguous) blocks. MRCAs are not stored, but are found on demand using
+    an Euler tour of the tree and a sparse table of the minimum-depth node in
+    each range of the tour, which is built on the first call to
+    :meth:`ArrayPhylogeneticDistanceMatrix.mrca()`.
+
+    The methods for querying and summarizing the distances are the same as
+    those of |PhylogeneticDistanceMatrix|.
+    """
+
+    @classmethod
+    def from_tree(cls,
+            tree,
+            is_single_precision=False,
+            is_memory_mapped=False,
+            memory_map_dir=None):
+        """
+        Creates and returns a |ArrayPhylogeneticDistanceMatrix| based on the
+        given tree.
+
+        Parameters
+        ----------
+        tree : a |Tree| instance
+            The |Tree| from which to get the phylogenetic distances.
+        is_single_precision : bool
+            If |True|, then distances will be stored as single-precision
+            (32-bit) floating point values, halving the memory required.
+        is_memory_mapped : bool
+            If |True|, then the matrices will be stored in (anonymous,
+            temporary) files that are memory-mapped, so that matrices larger
+            than the available memory can be handled.
+        memory_map_dir : str
+            Directory in which to create the files for memory-mapped
+            storage. If not given, then the default directory for temporary
+            files is used.
+
+        Returns
+        -------
+        pdm : A |ArrayPhylogeneticDistanceMatrix| instance
+        """
+        pdm = cls(is_single_precision=is_single_precision,
+                is_memory_mapped=is_memory_mapped,
+                memory_map_dir=memory_map_dir)
+        pdm.compile_from_tree(tree=tree)
+        return pdm
+
+    def __init__(self,
+            is_single_precision=False,
+            is_memory_mapped=False,
+            memory_map_dir=None):
+        """
+        Parameters
+        ----------
+        is_single_precision : bool
+            If |True|, then distances will be stored as single-precision
+            (32-bit) floating point values.
+        is_memory_mapped : bool
+            If |True|, then the matrices will be stored in memory-mapped
+            temporary files.
+        memory_map_dir : str
+            Directory in which to create the files for memory-mapped
+            storage.
+        """
+        self.is_single_precision = is_single_precision
+        self.is_memory_mapped = is_memory_mapped
+        self.memory_map_dir = memory_map_dir
+        PhylogeneticDistanceMatrix.__init__(self)
+
+    def clear(self):
+        PhylogeneticDistanceMatrix.clear(self)
+        self._row_taxa = []
+        self._num_rows = 0
+        self._taxon_row_index = {}
+        self._distance_values = None
+        self._path_step_values = None
+        self._mapped_storage = []
+        self._euler_tour_nodes = []
+        self._euler_tour_depths = None
+        self._taxon_euler_tour_index = {}
+        self._euler_tour_sparse_table = None
+
+    def _new_matrix_storage(self, typecode, num_rows):
+        num_values = num_rows * num_rows
+        if not self.is_memory_mapped or num_values == 0:
+            return array.array(typecode, [0]) * num_values
+        num_bytes = num_values * array.array(typecode).itemsize
+        storage_file = tempfile.TemporaryFile(dir=self.memory_map_dir)
+        storage_file.truncate(num_bytes)
+        storage_map = mmap.mmap(storage_file.fileno(), num_bytes)
+        # keep references, so that the map and file stay open
+        self._mapped_storage.append((storage_file, storage_map))
+        if sys.version_info < (3, 3):
+            return _MappedArray(typecode, storage_map, num_values)
+        return memoryview(storage_map).cast(typecode)
+
+    def compile_from_tree(self, tree):
+        """
+        Calculates the distances. Note that the path length (in number of
+        steps) between taxa that span the root will be off by one if
+        the tree is unrooted.
+        """
+        self.clear()
+        self.taxon_namespace = tree.taxon_namespace
+        self._tree_length = 0.0
+        self._num_edges = 0
+
+        # Traverse the tree, recording its Euler tour and the postorder
+        # sequence of nodes, and assigning rows to the leaves in the order in
+        # which they are visited, so that the leaves of each subtree occupy a
+        # contiguous range of rows.
+        euler_tour_nodes = self._euler_tour_nodes
+        euler_tour_depths = []
+        postorder_nodes = []
+        node_row_ranges = {}
+        leaf_depths = []
+        stack = [(tree.seed_node, 0)]
+        euler_tour_nodes.append(tree.seed_node)
+        euler_tour_depths.append(0)
+        node_row_ranges[tree.seed_node] = [0, None, 0]
+        while stack:
+            node, child_idx = stack[-1]
+            if child_idx < len(node._child_nodes):
+                stack[-1] = (node, child_idx + 1)
+                child = node._child_nodes[child_idx]
+                stack.append((child, 0))
+                euler_tour_nodes.append(child)
+                euler_tour_depths.append(len(stack) - 1)
+                node_row_ranges[child] = [len(self._row_taxa), None, len(stack) - 1]
+                if not child._child_nodes:
+                    assert child.taxon is not None
+                    self._taxon_euler_tour_index[child.taxon] = len(euler_tour_nodes) - 1
+                    self._row_taxa.append(child.taxon)
+                    leaf_depths.append(len(stack) - 1)
+            else:
+                stack.pop()
+                node_row_ranges[node][1] = len(self._row_taxa)
+                postorder_nodes.append(node)
+                if stack:
+                    euler_tour_nodes.append(stack[-1][0])
+                    euler_tour_depths.append(len(stack) - 1)
+        self._euler_tour_depths = array.array("i", euler_tour_depths)
+        if not tree.seed_node._child_nodes:
+            # single-node tree: no pairs of taxa
+            assert tree.seed_node.taxon is not None
+            self._taxon_euler_tour_index[tree.seed_node.taxon] = 0
+            self._row_taxa.append(tree.seed_node.taxon)
+            leaf_depths.append(0)
+        num_rows = len(self._row_taxa)
+        self._num_rows = num_rows
+        for row_idx, taxon in enumerate(self._row_taxa):
+            self._taxon_row_index[taxon] = row_idx
+        self._mapped_taxa = set(self._row_taxa)
+
+        # Fill in the matrices, visiting nodes in postorder. For each leaf,
+        # ``leaf_distances`` holds the path length from the leaf to the root
+        # of the subtree being processed (summed in the same order as
+        # |PhylogeneticDistanceMatrix|, so that values are identical). The
+        # distances between the leaves in the subtrees of each pair of children
+        # of the node are written as contiguous blocks of the rows of the
+        # matrices.
+        if self.is_single_precision:
+            distance_typecode = "f"
+        else:
+            distance_typecode = "d"
+        distance_values = self._new_matrix_storage(distance_typecode, num_rows)
+        path_step_values = self._new_matrix_storage("i", num_rows)
+        leaf_distances = [0.0] * num_rows
+        for node in postorder_nodes:
+            edge_length = node.edge.length
+            if edge_length is not None:
+                self._tree_length += edge_length
+            self._num_edges += 1
+            children = node._child_nodes
+            if not children:
+                continue
+            node_row_start, node_row_end, node_depth = node_row_ranges[node]
+            child_ranges = []
+            for child in children:
+                row_start, row_end = node_row_ranges[child][:2]
+                child_edge_length = child.edge.length
+                if child_edge_length is None:
+                    child_edge_length = 0.0
+                child_ranges.append((row_start, row_end, child_edge_length))
+            for child_idx, (row_start, row_end, child_edge_length) in enumerate(child_ranges):
+                for row_idx in range(row_start, row_end):
+                    offset = row_idx * num_rows
+                    leaf_distance = leaf_distances[row_idx]
+                    extended_leaf_distance = leaf_distance + child_edge_length
+                    for other_idx, (other_row_start, other_row_end, other_edge_length) in enumerate(child_ranges):
+                        if other_idx < child_idx:
+                            # already extended to this node
+                            distance_values[offset + other_row_start:offset + other_row_end] = array.array(distance_typecode,
+                                    [(d + leaf_distance) + child_edge_length for d in leaf_distances[other_row_start:other_row_end]])
+                        elif other_idx > child_idx:
+                            distance_values[offset + other_row_start:offset + other_row_end] = array.array(distance_typecode,
+                                    [(extended_leaf_distance + d) + other_edge_length for d in leaf_distances[other_row_start:other_row_end]])
+                    step_base = leaf_depths[row_idx] - 2 * node_depth
+                    if node_row_start < row_start:
+                        path_step_values[offset + node_row_start:offset + row_start] = array.array("i",
+                                [step_base + d for d in leaf_depths[node_row_start:row_start]])
+                    if row_end < node_row_end:
+                        path_step_values[offset + row_end:offset + node_row_end] = array.array("i",
+                                [step_base + d for d in leaf_depths[row_end:node_row_end]])
+                leaf_distances[row_start:row_end] = [d + child_edge_length for d in leaf_distances[row_start:row_end]]
+        self._distance_values = distance_values
+        self._path_step_values = path_step_values
+        self._update_matrix_views()
+
+    def compile_from_dict(self, distances, taxon_namespace):
+        self.clear()
+        self.taxon_namespace = taxon_namespace
+        for t1 in distances:
+            for taxon in [t1] + list(distances[t1]):
+                if taxon not in self._taxon_row_index:
+                    self._taxon_row_index[taxon] = len(self._row_taxa)
+                    self._row_taxa.append(taxon)
+        num_rows = len(self._row_taxa)
+        self._num_rows = num_rows
+        self._mapped_taxa = set(self._row_taxa)
+        if self.is_single_precision:
+            distance_values = self._new_matrix_storage("f", num_rows)
+        else:
+            distance_values = self._new_matrix_storage("d", num_rows)
+        for t1 in distances:
+            row_idx1 = self._taxon_row_index[t1]
+            for t2 in distances[t1]:
+                row_idx2 = self._taxon_row_index[t2]
+                distance_values[row_idx1 * num_rows + row_idx2] = distances[t1][t2]
+                distance_values[row_idx2 * num_rows + row_idx1] = distances[t1][t2]
+        self._distance_values = distance_values
+        self._update_matrix_views()
+
+    def _update_matrix_views(self):
+        # Support the dictionary-style lookups of the distances used by
+        # the methods inherited from PhylogeneticDistanceMatrix.
+        self._taxon_phylogenetic_distances = _ArrayDistanceMatrixTaxonView(
+                self._distance_values,
+                self._taxon_row_index,
+                self._num_rows)
+        if self._path_step_values is not None:
+            self._taxon_phylogenetic_path_steps = _ArrayDistanceMatrixTaxonView(
+                    self._path_step_values,
+                    self._taxon_row_index,
+                    self._num_rows)
+
+    def __eq__(self, o):
+        if self.taxon_namespace is not o.taxon_namespace:
+            return False
+        if (self._mapped_taxa != o._mapped_taxa
+                or self._tree_length != o._tree_length
+                or self._num_edges != o._num_edges):
+            return False
+        for t1 in self._row_taxa:
+            for t2 in self._row_taxa:
+                if self._taxon_phylogenetic_distances[t1][t2] != o._taxon_phylogenetic_distances[t1][t2]:
+                    return False
+                if self._path_step_values is not None and self.path_edge_count(t1, t2) != o.path_edge_count(t1, t2):
+                    return False
+                if self._euler_tour_nodes and self.mrca(t1, t2) is not o.mrca(t1, t2):
+                    return False
+        return True
+
+    def __hash__(self):
+        return id(self)
+
+    def clone(self):
+        """
+        Returns a copy of this matrix. The (immutable) underlying storage of
+        the distances is shared with the copy, so this is cheap.
+        """
+        o = self.__class__(
+                is_single_precision=self.is_single_precision,
+                is_memory_mapped=self.is_memory_mapped,
+                memory_map_dir=self.memory_map_dir)
+        o.taxon_namespace = self.taxon_namespace
+        o._mapped_taxa = set(self._mapped_taxa)
+        o._tree_length = self._tree_length
+        o._num_edges = self._num_edges
+        o._row_taxa = list(self._row_taxa)
+        o._num_rows = self._num_rows
+        o._taxon_row_index = dict(self._taxon_row_index)
+        o._distance_values = self._distance_values
+        o._path_step_values = self._path_step_values
+        o._mapped_storage = self._mapped_storage
+        o._euler_tour_nodes = self._euler_tour_nodes
+        o._euler_tour_depths = self._euler_tour_depths
+        o._taxon_euler_tour_index = dict(self._taxon_euler_tour_index)
+        o._euler_tour_sparse_table = self._euler_tour_sparse_table
+        o._update_matrix_views()
+        return o
+
+    def _build_euler_tour_sparse_table(self):
+        # Level ``k`` of the table gives, for each position ``i`` of the
+        # Euler tour, the position of the shallowest node in the ``2**k``
+        # positions starting at ``i``.
+        depths = self._euler_tour_depths
+        num_positions = len(depths)
+        sparse_table = [array.array("i", range(num_positions))]
+        span = 1
+        while 2 * span <= num_positions:
+            prev_level = sparse_table[-1]
+            level = array.array("i", prev_level[:num_positions - 2 * span + 1])
+            for idx in range(len(level)):
+                other = prev_level[idx + span]
+                if depths[other] < depths[level[idx]]:
+                    level[idx] = other
+            sparse_table.append(level)
+            span *= 2
+        self._euler_tour_sparse_table = sparse_table
+
+    def mrca(self, taxon1, taxon2):
+        """
+        Returns MRCA of two taxon objects.
+        """
+        if self._euler_tour_sparse_table is None:
+            self._build_euler_tour_sparse_table()
+        idx1 = self._taxon_euler_tour_index[taxon1]
+        idx2 = self._taxon_euler_tour_index[taxon2]
+        if idx1 > idx2:
+            idx1, idx2 = idx2, idx1
+        level = (idx2 - idx1 + 1).bit_length() - 1
+        pos1 = self._euler_tour_sparse_table[level][idx1]
+        pos2 = self._euler_tour_sparse_table[level][idx2 - (1 << level) + 1]
+        if self._euler_tour_depths[pos2] < self._euler_tour_depths[pos1]:
+            pos1 = pos2
+        return self._euler_tour_nodes[pos1]
+
+    def patristic_distance(self, taxon1, taxon2, is_normalize_by_tree_size=False):
+        """
+        Returns patristic distance between two taxon objects.
+        """
+        if taxon1 is taxon2:
+            return 0.0
+        d = self._distance_values[self._taxon_row_index[taxon1] * self._num_rows + self._taxon_row_index[taxon2]]
+        if is_normalize_by_tree_size:
+            return d / self._tree_length
+        else:
+            return d
+
+    def path_edge_count(self, taxon1, taxon2, is_normalize_by_tree_size=False):
+        """
+        Returns the number of edges between two taxon objects.
+        """
+        if taxon1 is taxon2:
+            return 0
+        if self._path_step_values is None:
+            raise KeyError(taxon1)
+        d = self._path_step_values[self._taxon_row_index[taxon1] * self._num_rows + self._taxon_row_index[taxon2]]
+        if is_normalize_by_tree_size:
+            return float(d) / self._num_edges
+        else:
+            return d
+
+    def _get_matrix_values_and_normalization_factor(self,
+            is_weighted_edge_distances,
+            is_normalize_by_tree_size):
+        if is_weighted_edge_distances:
+            values = self._distance_values
+            if is_normalize_by_tree_size:
+                normalization_factor = self._tree_length
+            else:
+                normalization_factor = 1.0
+        else:
+            values = self._path_step_values
+            if is_normalize_by_tree_size:
+                normalization_factor = float(self._num_edges)
+            else:
+                normalization_factor = 1.0
+        return values, normalization_factor
+
+    def distances(self,
+            is_weighted_edge_distances=True,
+            is_normalize_by_tree_size=False):
+        """
+        Returns list of patristic distances.
+        """
+        values, normalization_factor = self._get_matrix_values_and_normalization_factor(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=is_normalize_by_tree_size,
+                )
+        num_rows = self._num_rows
+        results = []
+        for row_idx in range(num_rows):
+            results.extend([d/normalization_factor for d in values[row_idx * num_rows + row_idx + 1:(row_idx + 1) * num_rows]])
+        return results
+
+    def max_pairwise_distance_taxa(self,
+            is_weighted_edge_distances=True):
+        values, normalization_factor = self._get_matrix_values_and_normalization_factor(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=False)
+        num_rows = self._num_rows
+        max_dist = None
+        max_dist_rows = None
+        for row_idx in range(num_rows - 1):
+            row_values = values[row_idx * num_rows + row_idx + 1:(row_idx + 1) * num_rows]
+            row_max_dist = max(row_values)
+            if max_dist is None or row_max_dist > max_dist:
+                max_dist = row_max_dist
+                max_dist_rows = (row_idx, row_idx + 1 + list(row_values).index(row_max_dist))
+        if max_dist_rows is None:
+            return None
+        row_taxa = {}
+        for taxon, row_idx in self._taxon_row_index.items():
+            row_taxa[row_idx] = taxon
+        return (row_taxa[max_dist_rows[0]], row_taxa[max_dist_rows[1]])
+
+    def taxon_iter(self, filter_fn=None):
+        """
+        Iterates over taxa in matrix. Note that this could be a subset of the taxa in
+        the associated taxon namespace.
+        """
+        for t1 in self._row_taxa:
+            if not filter_fn or filter_fn(t1):
+                yield t1
+
+    def distinct_taxon_pair_iter(self, filter_fn=None):
+        """
+        Iterates over all distinct pairs of taxa in matrix.
+        """
+        if filter_fn:
+            taxa = [t for t in self._row_taxa if filter_fn(t)]
+        else:
+            taxa = self._row_taxa
+        for idx1, t1 in enumerate(taxa):
+            for t2 in taxa[idx1+1:]:
+                yield t1, t2
+
+    def shuffle_taxa(self,
+            is_shuffle_phylogenetic_distances=True,
+            is_shuffle_phylogenetic_path_steps=True,
+            is_shuffle_mrca=True,
+            rng=None):
+        """
+        Randomly shuffles taxa in-situ. Only the mapping of taxa to the rows
+        of the matrices is changed, so this takes time linear in the number
+        of taxa. Note that the patristic distances and path steps share the
+        same mapping, and thus are always shuffled together.
+        """
+        if rng is None:
+            rng = GLOBAL_RNG
+        reordered_taxa = list(self._row_taxa)
+        rng.shuffle(reordered_taxa)
+        current_to_shuffled_taxon_map = dict(zip(self._row_taxa, reordered_taxa))
+        if is_shuffle_phylogenetic_distances or is_shuffle_phylogenetic_path_steps:
+            taxon_row_index = {}
+            for t1, x1 in current_to_shuffled_taxon_map.items():
+                taxon_row_index[x1] = self._taxon_row_index[t1]
+            self._taxon_row_index = taxon_row_index
+            self._update_matrix_views()
+        if is_shuffle_mrca:
+            taxon_euler_tour_index = {}
+            for t1, x1 in current_to_shuffled_taxon_map.items():
+                taxon_euler_tour_index[x1] = self._taxon_euler_tour_index[t1]
+            self._taxon_euler_tour_index = taxon_euler_tour_index
+        return current_to_shuffled_taxon_map
+
+    def _get_null_model_distance_rows(self,
+            is_weighted_edge_distances,
+            diagonal_value):
+        values, normalization_factor = self._get_matrix_values_and_normalization_factor(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=False)
+        num_rows = self._num_rows
+        distance_rows = []
+        for row_idx in range(num_rows):
+            row = array.array("d", values[row_idx * num_rows:(row_idx + 1) * num_rows])
+            row[row_idx] = diagonal_value
+            distance_rows.append(row)
+        return dict(self._taxon_row_index), distance_rows
+
+    def _calculate_mean_pairwise_distance(self,
+            comparison_regime,
+            is_weighted_edge_distances,
+            is_normalize_by_tree_size):
+        values, normalization_factor = self._get_matrix_values_and_normalization_factor(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=is_normalize_by_tree_size,)
+        taxon_row_index = self._taxon_row_index
+        num_rows = self._num_rows
+        distances = [values[taxon_row_index[taxon1] * num_rows + taxon_row_index[taxon2]]
+                for taxon1, taxon2 in comparison_regime]
+        if distances:
+            return (sum(distances) / normalization_factor) / (len(distances) * 1.0)
+        else:
+            raise error.NullAssemblageException("No taxa in assemblage")
+
+    def _calculate_mean_nearest_taxon_distance(self,
+            comparison_regime,
+            is_weighted_edge_distances,
+            is_normalize_by_tree_size):
+        values, normalization_factor = self._get_matrix_values_and_normalization_factor(
+                is_weighted_edge_distances=is_weighted_edge_distances,
+                is_normalize_by_tree_size=is_normalize_by_tree_size,)
+        taxon_row_index = self._taxon_row_index
+        num_rows = self._num_rows
+        distances = []
+        for taxon1 in comparison_regime:
+            offset = taxon_row_index[taxon1] * num_rows
+            distances.append(min([values[offset + taxon_row_index[taxon2]] for taxon2 in comparison_regime[taxon1]]))
+        if distances:
+            return (sum(distances) / normalization_factor) / (len(distances) * 1.0)
+        else:
+            raise error.NullAssemblageException("No taxa in assemblage")
+
 class NodeDistanceMatrix(object):
+    """
+    Distances and most-recent common ancestors of all pairs of nodes of a
+    tree.
+
+    Rather than storing every pair, this records the distance (and number of
+    edges) from the seed node to each node, and answers MRCA queries from the
+    MRCA index of the tree (see :meth:`Tree.mrca_index()`); the distance
+    between two nodes is then calculated from their distances to the seed
+    node and that of their MRCA. Each query thus takes constant time, and
+    the memory used is O(n log n) rather than O(n^2) for a tree of n nodes.
+    """
 
     @classmethod
     def from_tree(cls, tree):
@@ -1369,90 +2092,41 @@ class NodeDistanceMatrix(object):
     def clear(self):
         self._tree_length = None
         self._num_edges = None
-        self._node_phylogenetic_distances = {}
-        self._node_phylogenetic_path_steps = {}
-        self._mrca = {}
+        self._node_root_distances = {}
+        self._node_root_path_steps = {}
+        self._mrca_index = None
 
     def compile_from_tree(self, tree):
         self.clear()
         self._tree_length = 0.0
         self._num_edges = 0
-        for node1 in tree.postorder_node_iter():
-            try:
-                self._tree_length += node1.edge.length
-            except TypeError: # None for edge length
-                pass
+        self._mrca_index = tree.mrca_index()
+        node_root_distances = self._node_root_distances
+        node_root_path_steps = self._node_root_path_steps
+        for node in tree.preorder_nodes():
+            edge_length = node.edge.length
+            if edge_length is not None:
+                self._tree_length += edge_length
             self._num_edges += 1
-            if node1 not in self._node_phylogenetic_distances:
-                self._node_phylogenetic_distances[node1] = {node1: 0.0}
-                self._node_phylogenetic_path_steps[node1] = {node1: 0}
-                self._mrca[node1] = {node1: node1}
-            children = node1.child_nodes()
-            for ch_idx, ch1 in enumerate(children):
-                ch1_elen = ch1.edge.length if ch1.edge.length is not None else 0.0
-                for ch1_subtree_node in self._node_phylogenetic_distances[ch1].keys():
-                    if ch1_subtree_node not in self._node_phylogenetic_distances[node1]:
-                        d = self._node_phylogenetic_distances[ch1][ch1_subtree_node] + ch1_elen
-                        d2 = self._node_phylogenetic_path_steps[ch1][ch1_subtree_node] + 1
-                        self._node_phylogenetic_distances[node1][ch1_subtree_node] = d
-                        self._node_phylogenetic_distances[ch1_subtree_node][node1] = d
-                        self._node_phylogenetic_path_steps[node1][ch1_subtree_node] = d2
-                        self._node_phylogenetic_path_steps[ch1_subtree_node][node1] = d2
-                self._node_phylogenetic_distances[node1][ch1] = ch1_elen
-                self._node_phylogenetic_distances[ch1][node1] = ch1_elen
-                self._node_phylogenetic_path_steps[node1][ch1] = 1
-                self._node_phylogenetic_path_steps[ch1][node1] = 1
-                for ch2 in children[ch_idx+1:]:
-                    self._mrca[ch1][ch2] = node1
-                    self._mrca[ch2][ch1] = node1
-                    ch2_elen = ch2.edge.length if ch2.edge.length is not None else 0.0
-                    d = ch1_elen + ch2_elen
-                    self._node_phylogenetic_distances[ch1][ch2] = d
-                    self._node_phylogenetic_distances[ch2][ch1] = d
-                    self._node_phylogenetic_path_steps[ch1][ch2] = 2
-                    self._node_phylogenetic_path_steps[ch2][ch1] = 2
-            # Below is ugly, ugly, ugly. Basic idea is to link nodes of each
-            # the subtrees of each of the child nodes of node1. Assumes
-            # that any pairwise comparison of nodes descending from node1
-            # (as given by nodes in a pairwise comparison with node1) not
-            # already made have their MRCA at node1.
-            for snd1 in self._node_phylogenetic_distances[node1]:
-                for snd2 in self._node_phylogenetic_distances[node1]:
-                    if snd1 is snd2:
-                        continue
-                    if snd1 not in self._node_phylogenetic_distances:
-                        self._node_phylogenetic_distances[snd1] = {}
-                        self._node_phylogenetic_path_steps[snd1] = {}
-                    if snd2 not in self._node_phylogenetic_distances:
-                        self._node_phylogenetic_distances[snd2] = {}
-                        self._node_phylogenetic_path_steps[snd2] = {}
-                    if snd2 not in self._node_phylogenetic_distances[snd1]:
-                        self._node_phylogenetic_distances[snd1][snd2] = self._node_phylogenetic_distances[node1][snd1] + self._node_phylogenetic_distances[node1][snd2]
-                        self._node_phylogenetic_path_steps[snd1][snd2] = self._node_phylogenetic_path_steps[node1][snd1] + self._node_phylogenetic_path_steps[node1][snd2]
-                    if snd1 not in self._node_phylogenetic_distances[snd2]:
-                        self._node_phylogenetic_distances[snd2][snd1] = self._node_phylogenetic_distances[node1][snd1] + self._node_phylogenetic_distances[node1][snd2]
-                        self._node_phylogenetic_path_steps[snd2][snd1] = self._node_phylogenetic_path_steps[node1][snd1] + self._node_phylogenetic_path_steps[node1][snd2]
-                    if snd1 not in self._mrca:
-                        self._mrca[snd1] = {}
-                    if snd2 not in self._mrca:
-                        self._mrca[snd2] = {}
-                    if snd2 not in self._mrca[snd1]:
-                        self._mrca[snd1][snd2] = node1
-                        self._mrca[snd2][snd1] = node1
+            parent_node = node._parent_node
+            if parent_node is None or node is tree.seed_node:
+                node_root_distances[node] = 0.0
+                node_root_path_steps[node] = 0
+            else:
+                node_root_distances[node] = node_root_distances[parent_node] + (edge_length if edge_length is not None else 0.0)
+                node_root_path_steps[node] = node_root_path_steps[parent_node] + 1
 
     def __eq__(self, o):
-        if self.node_namespace is not o.node_namespace:
-            return False
         return (True
-                and (self._node_phylogenetic_distances == o._node_phylogenetic_distances)
-                and (self._node_phylogenetic_path_steps == o._node_phylogenetic_path_steps)
-                and (self._mrca == o._mrca)
+                and (self._mrca_index is o._mrca_index)
+                and (self._node_root_distances == o._node_root_distances)
+                and (self._node_root_path_steps == o._node_root_path_steps)
                 and (self._tree_length == o._tree_length)
                 and (self._num_edges == o._num_edges)
                 )
 
     def __iter__(self):
-        for node in self._node_phylogenetic_distances:
+        for node in self._node_root_distances:
             yield node
 
     def __hash__(self):
@@ -1468,22 +2142,19 @@ class NodeDistanceMatrix(object):
         o = self.__class__()
         o._tree_length = self._tree_length
         o._num_edges = self._num_edges
-        for src, dest in (
-                (self._node_phylogenetic_distances, o._node_phylogenetic_distances,),
-                (self._node_phylogenetic_path_steps, o._node_phylogenetic_path_steps,),
-                (self._mrca, o._mrca,),
-                ):
-            for t1 in src:
-                dest[t1] = {}
-                for t2 in src[t1]:
-                    dest[t1][t2] = src[t1][t2]
+        o._node_root_distances = dict(self._node_root_distances)
+        o._node_root_path_steps = dict(self._node_root_path_steps)
+        # the index is not modified once built, and so can be shared
+        o._mrca_index = self._mrca_index
         return o
 
     def mrca(self, node1, node2):
         """
         Returns MRCA of two node objects.
         """
-        return self._mrca[node1][node2]
+        if node1 not in self._node_root_distances or node2 not in self._node_root_distances:
+            raise KeyError(node1 if node1 not in self._node_root_distances else node2)
+        return self._mrca_index.mrca(node1, node2)
 
     def distance(self,
             node1,
@@ -1505,7 +2176,9 @@ class NodeDistanceMatrix(object):
         """
         if node1 is node2:
             return 0.0
-        d = self._node_phylogenetic_distances[node1][node2]
+        node_root_distances = self._node_root_distances
+        mrca_node = self.mrca(node1, node2)
+        d = node_root_distances[node1] + node_root_distances[node2] - 2 * node_root_distances[mrca_node]
         if is_normalize_by_tree_size:
             return d / self._tree_length
         else:
@@ -1517,10 +2190,40 @@ class NodeDistanceMatrix(object):
         """
         if node1 is node2:
             return 0
-        d = self._node_phylogenetic_path_steps[node1][node2]
+        node_root_path_steps = self._node_root_path_steps
+        mrca_node = self.mrca(node1, node2)
+        d = node_root_path_steps[node1] + node_root_path_steps[node2] - 2 * node_root_path_steps[mrca_node]
         if is_normalize_by_tree_size:
             return float(d) / self._num_edges
         else:
             return d
 
-
+def _calculate_null_model_statistic_values(task):
+    # Calculates the MPD or MNTD of each assemblage (given as lists of row
+    # indexes into ``distance_rows``) under each of the replicates given by
+    # ``replicate_seeds``; may be run in a worker process. The diagonals of
+    # ``distance_rows`` are expected to be 0 for MPD and infinity for MNTD.
+    null_model_statistic, distance_rows, assemblage_row_indexes, normalization_factor, replicate_seeds = task
+    null_model_stat_values = dict((idx, []) for idx in range(len(assemblage_row_indexes)))
+    row_indexes = list(range(len(distance_rows)))
+    for replicate_seed in replicate_seeds:
+        permuted_row_indexes = list(row_indexes)
+        random.Random(replicate_seed).shuffle(permuted_row_indexes)
+        for assemblage_idx, assemblage in enumerate(assemblage_row_indexes):
+            sampled_row_indexes = [permuted_row_indexes[row_idx] for row_idx in assemblage]
+            num_taxa = len(sampled_row_indexes)
+            if num_taxa < 2:
+                raise error.NullAssemblageException("No taxa in assemblage")
+            sample_columns = operator.itemgetter(*sampled_row_indexes)
+            if null_model_statistic == "mpd":
+                total = 0.0
+                for row_idx in sampled_row_indexes:
+                    total += sum(sample_columns(distance_rows[row_idx]))
+                stat_value = (total / normalization_factor) / (num_taxa * (num_taxa - 1))
+            else:
+                total = 0.0
+                for row_idx in sampled_row_indexes:
+                    total += min(sample_columns(distance_rows[row_idx]))
+                stat_value = (total / normalization_factor) / num_taxa
+            null_model_stat_values[assemblage_idx].append(stat_value)
+    return null_model_stat_values
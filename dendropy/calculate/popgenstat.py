@@ -24,25 +24,101 @@ import math
 import dendropy
 from dendropy.calculate import probability
 from dendropy.calculate import combinatorics
+from dendropy.utility import bitprocessing
 
 ###############################################################################
 ## internal functions: generally taking lower-level data, such as sequences etc.
 ###############################################################################
 
-def _count_differences(char_sequences, state_alphabet, ignore_uncertain=True):
+class _PackedSequences(object):
     """
-    Returns pair of values: total number of pairwise differences observed between
-    all sequences, and mean number of pairwise differences pair base.
+    A compact view of a list of sequences for counting differences between
+    sequences. The states of each sequence are mapped to integer codes, and
+    the sites of each sequence are stored as (arbitrary-precision) integer
+    bit vectors, one for each code in the sequence, with bit ``i`` set if
+    the sequence has the code at site ``i``. Sites with states to be ignored
+    are not in any of these. The number of differences between two sequences
+    is then given by a few bitwise operations over all sites at once.
+
+    Two states are considered to be the same if ``state_key_fn`` returns the
+    same value (compared by equality) for them, and a site is ignored for a
+    sequence if ``is_ignored_state_fn`` returns |True| for its state.
     """
-    sum_diff = 0.0
-    mean_diff = 0.0
-    sq_diff = 0.0
-    comps = 0
 
-    #Check that all sequences are the same length
-    if len(set([len(seq) for seq in char_sequences])) != 1:
-        raise Exception("sequences of unequal length")
+    def __init__(self, char_sequences, state_key_fn, is_ignored_state_fn):
+        if len(set([len(seq) for seq in char_sequences])) != 1:
+            raise Exception("sequences of unequal length")
+        self.num_sites = len(char_sequences[0])
+        state_codes = {}
+        key_codes = {}
+        self.sequence_code_bits = []
+        self.sequence_site_bits = []
+        for sequence in char_sequences:
+            codes = bytearray(self.num_sites)
+            for site_idx, state in enumerate(sequence):
+                try:
+                    code = state_codes[id(state)]
+                except KeyError:
+                    if is_ignored_state_fn(state):
+                        code = 0
+                    else:
+                        code = key_codes.setdefault(state_key_fn(state), len(key_codes) + 1)
+                        if code > 255:
+                            raise ValueError("Too many distinct states")
+                    state_codes[id(state)] = code
+                codes[self.num_sites - site_idx - 1] = code
+            code_bits = {}
+            site_bits = 0
+            for code in set(codes):
+                if code == 0:
+                    continue
+                table = bytearray(b"0" * 256)
+                table[code] = ord("1")
+                bits = int(codes.translate(table).decode("ascii"), 2)
+                code_bits[code] = bits
+                site_bits |= bits
+            self.sequence_code_bits.append(code_bits)
+            self.sequence_site_bits.append(site_bits)
+
+    def __len__(self):
+        return len(self.sequence_site_bits)
+
+    def subset(self, indexes):
+        """
+        Returns a view of the sequences at ``indexes``.
+        """
+        packed_sequences = self.__class__.__new__(self.__class__)
+        packed_sequences.num_sites = self.num_sites
+        packed_sequences.sequence_code_bits = [self.sequence_code_bits[idx] for idx in indexes]
+        packed_sequences.sequence_site_bits = [self.sequence_site_bits[idx] for idx in indexes]
+        return packed_sequences
+
+    def different_site_bits(self, idx1, idx2):
+        """
+        Returns the bit vector of the sites at which neither sequence is
+        ignored and the states differ.
+        """
+        code_bits1 = self.sequence_code_bits[idx1]
+        code_bits2 = self.sequence_code_bits[idx2]
+        shared_site_bits = self.sequence_site_bits[idx1] & self.sequence_site_bits[idx2]
+        for code in code_bits1:
+            if code in code_bits2:
+                shared_site_bits &= ~(code_bits1[code] & code_bits2[code])
+        return shared_site_bits
+
+    def count_differences(self, idx1, idx2):
+        """
+        Returns a pair of values: the number of sites at which the states of
+        the two sequences differ, and the number of sites at which neither
+        sequence is ignored.
+        """
+        num_counted = bitprocessing.num_set_bits(self.sequence_site_bits[idx1] & self.sequence_site_bits[idx2])
+        return bitprocessing.num_set_bits(self.different_site_bits(idx1, idx2)), num_counted
 
+def _pack_sequences(char_sequences, state_alphabet, ignore_uncertain=True):
+    # States are compared by the identity of their fundamental indexes
+    # (i.e., by state), ignoring states with the same fundamental indexes as
+    # the gap or missing data states if ``ignore_uncertain`` is |True|.
     if ignore_uncertain:
         attr = "fundamental_indexes_with_gaps_as_missing"
         _states_to_ignore = [state_alphabet.gap_state, state_alphabet.no_data_state]
@@ -50,25 +126,29 @@ def _count_differences(char_sequences, state_alphabet, ignore_uncertain=True):
     else:
         attr = "fundamental_indexes"
         states_to_ignore = set()
+    return _PackedSequences(
+            char_sequences,
+            state_key_fn=lambda char: id(getattr(char, attr)),
+            is_ignored_state_fn=lambda char: getattr(char, attr) in states_to_ignore)
 
-    reduced_char_sequences = []
-    for sequence in char_sequences:
-        seq = [getattr(char, attr) for char in sequence]
-        reduced_char_sequences.append(seq)
+def _count_differences(char_sequences, state_alphabet, ignore_uncertain=True, packed_sequences=None):
+    """
+    Returns pair of values: total number of pairwise differences observed between
+    all sequences, and mean number of pairwise differences pair base.
+    """
+    sum_diff = 0.0
+    mean_diff = 0.0
+    sq_diff = 0.0
+    comps = 0
+
+    if packed_sequences is None:
+        packed_sequences = _pack_sequences(char_sequences, state_alphabet, ignore_uncertain)
 
-    for vidx, i in enumerate(reduced_char_sequences[:-1]):
-        for j in reduced_char_sequences[vidx+1:]:
-            diff = 0
-            counted = 0
+    num_sequences = len(packed_sequences)
+    for idx1 in range(num_sequences - 1):
+        for idx2 in range(idx1 + 1, num_sequences):
+            diff, counted = packed_sequences.count_differences(idx1, idx2)
             comps += 1
-            for cidx, c in enumerate(i):
-                c1 = c
-                c2 = j[cidx]
-                if c1 in states_to_ignore or c2 in states_to_ignore:
-                    continue
-                counted += 1
-                if c1 is not c2:
-                    diff += 1
             sum_diff += float(diff)
             # If counted < 0, this means that there is sites between these sequences
             # in which both are not ignored: i.e., one or the other has a gap
@@ -88,7 +168,7 @@ def _nucleotide_diversity(char_sequences, state_alphabet, ignore_uncertain=True)
     """
     return _count_differences(char_sequences, state_alphabet, ignore_uncertain)[1]
 
-def _average_number_of_pairwise_differences(char_sequences, state_alphabet, ignore_uncertain=True):
+def _average_number_of_pairwise_differences(char_sequences, state_alphabet, ignore_uncertain=True, packed_sequences=None):
     """
     Returns $k$ (Tajima 1983; Wakely 1996), calculated for a set of sequences:
 
@@ -98,32 +178,21 @@ def _average_number_of_pairwise_differences(char_sequences, state_alphabet, igno
     $i$th and $j$th sequence, and $n$ is the number of DNA sequences
     sampled.
     """
-    sum_diff, mean_diff, sq_diff = _count_differences(char_sequences, state_alphabet, ignore_uncertain)
+    sum_diff, mean_diff, sq_diff = _count_differences(char_sequences, state_alphabet, ignore_uncertain, packed_sequences)
     return sum_diff / combinatorics.choose(len(char_sequences), 2)
 
-def _num_segregating_sites(char_sequences, state_alphabet, ignore_uncertain=True):
+def _num_segregating_sites(char_sequences, state_alphabet, ignore_uncertain=True, packed_sequences=None):
     """
     Returns the raw number of segregating sites (polymorphic sites).
     """
-    s = 0
-    if ignore_uncertain:
-        attr = "fundamental_indexes_with_gaps_as_missing"
-        _states_to_ignore = [state_alphabet.gap_state, state_alphabet.no_data_state]
-        states_to_ignore= set([getattr(char, attr) for char in _states_to_ignore])
-    else:
-        attr = "fundamental_indexes"
-        states_to_ignore = set()
-    for i, c1 in enumerate(char_sequences[0]):
-        for v in char_sequences[1:]:
-            c2 = v[i]
-            f1 = getattr(c1, attr)
-            f2 = getattr(c2, attr)
-            if f1 in states_to_ignore or f2 in states_to_ignore:
-                continue
-            if f1 is not f2:
-                s += 1
-                break
-    return s
+    # A site is segregating if the state of the first sequence is not ignored
+    # and differs from that of any other sequence in which it is not ignored.
+    if packed_sequences is None:
+        packed_sequences = _pack_sequences(char_sequences, state_alphabet, ignore_uncertain)
+    segregating_site_bits = 0
+    for idx in range(1, len(packed_sequences)):
+        segregating_site_bits |= packed_sequences.different_site_bits(0, idx)
+    return bitprocessing.num_set_bits(segregating_site_bits)
 
 def _tajimas_d(num_sequences, avg_num_pairwise_differences, num_segregating_sites):
 
@@ -188,11 +257,17 @@ def tajimas_d(char_matrix, ignore_uncertain=True):
     """
     sequences = char_matrix.sequences()
     num_sequences = len(sequences)
-    avg_num_pairwise_differences = _average_number_of_pairwise_differences(sequences, char_matrix.default_state_alphabet, ignore_uncertain=ignore_uncertain)
+    packed_sequences = _pack_sequences(sequences, char_matrix.default_state_alphabet, ignore_uncertain)
+    avg_num_pairwise_differences = _average_number_of_pairwise_differences(
+            sequences,
+            char_matrix.default_state_alphabet,
+            ignore_uncertain=ignore_uncertain,
+            packed_sequences=packed_sequences)
     num_segregating_sites = _num_segregating_sites(
             sequences,
             char_matrix.default_state_alphabet,
-            ignore_uncertain=ignore_uncertain)
+            ignore_uncertain=ignore_uncertain,
+            packed_sequences=packed_sequences)
     return _tajimas_d(num_sequences, avg_num_pairwise_differences, num_segregating_sites)
 
 def wattersons_theta(char_matrix, ignore_uncertain=True):
@@ -228,6 +303,7 @@ class PopulationPairSummaryStatistics(object):
         self.wattersons_theta = 0.0
         self.wakeleys_psi = 0.0
         self.tajimas_d = 0.0
+        self._between_population_diffs = None
         if self.ignore_uncertain:
             self.state_attr = "fundamental_indexes_with_gaps_as_missing"
             self.states_to_ignore = set([self.state_alphabet.gap_state, self.state_alphabet.no_data_state])
@@ -241,8 +317,12 @@ class PopulationPairSummaryStatistics(object):
         Returns a summary of a set of sequences that can be partitioned into
         the list of lists of taxa given by ``taxon_groups``.
         """
-        diffs_x, mean_diffs_x, sq_diff_x = _count_differences(self.pop1_seqs, self.state_alphabet, self.ignore_uncertain)
-        diffs_y, mean_diffs_y, sq_diff_y = _count_differences(self.pop2_seqs, self.state_alphabet, self.ignore_uncertain)
+        self._between_population_diffs = None
+        packed_seqs = _pack_sequences(self.combined_seqs, self.state_alphabet, self.ignore_uncertain)
+        pop1_indexes = range(len(self.pop1_seqs))
+        pop2_indexes = range(len(self.pop1_seqs), len(self.combined_seqs))
+        diffs_x, mean_diffs_x, sq_diff_x = _count_differences(self.pop1_seqs, self.state_alphabet, self.ignore_uncertain, packed_seqs.subset(pop1_indexes))
+        diffs_y, mean_diffs_y, sq_diff_y = _count_differences(self.pop2_seqs, self.state_alphabet, self.ignore_uncertain, packed_seqs.subset(pop2_indexes))
         d_x = diffs_x / combinatorics.choose(len(self.pop1_seqs), 2)
         d_y = diffs_y / combinatorics.choose(len(self.pop2_seqs), 2)
         d_xy = self._average_number_of_pairwise_differences_between_populations()
@@ -255,7 +335,7 @@ class PopulationPairSummaryStatistics(object):
         a = float(n * (n-1))
         ax = float(n_x * (n_x - 1))
         ay = float(n_y * (n_y - 1))
-        k = _average_number_of_pairwise_differences(self.combined_seqs, self.state_alphabet, self.ignore_uncertain)
+        k = _average_number_of_pairwise_differences(self.combined_seqs, self.state_alphabet, self.ignore_uncertain, packed_seqs)
         n = len(self.combined_seqs)
 
         # Hickerson 2006: pi #
@@ -274,7 +354,8 @@ class PopulationPairSummaryStatistics(object):
         self.num_segregating_sites = _num_segregating_sites(
                 self.combined_seqs,
                 self.state_alphabet,
-                self.ignore_uncertain)
+                self.ignore_uncertain,
+                packed_seqs)
 
         # Hickerson 2006: theta #
         a1 = sum([1.0/i for i in range(1, n)])
@@ -286,6 +367,28 @@ class PopulationPairSummaryStatistics(object):
         # Tajima's D #
         self.tajimas_d = _tajimas_d(n, self.average_number_of_pairwise_differences, self.num_segregating_sites)
 
+    def _pairwise_differences_between_populations(self):
+        """
+        Returns a list of the number of differences between each sequence of
+        the first population and each sequence of the second population.
+        """
+        if self._between_population_diffs is not None:
+            return self._between_population_diffs
+        # Here, states are compared by their fundamental indexes, and the gap
+        # and missing data states themselves are ignored.
+        state_attr = self.state_attr
+        states_to_ignore = self.states_to_ignore
+        packed_seqs = _PackedSequences(
+                self.combined_seqs,
+                state_key_fn=lambda char: getattr(char, state_attr),
+                is_ignored_state_fn=lambda char: char in states_to_ignore)
+        num_pop1_seqs = len(self.pop1_seqs)
+        self._between_population_diffs = []
+        for idx1 in range(num_pop1_seqs):
+            for idx2 in range(num_pop1_seqs, len(self.combined_seqs)):
+                self._between_population_diffs.append(packed_seqs.count_differences(idx1, idx2)[0])
+        return self._between_population_diffs
+
     def _average_number_of_pairwise_differences_between_populations(self):
         """
         Implements Eq (3) of:
@@ -294,18 +397,7 @@ class PopulationPairSummaryStatistics(object):
         variance of pairwise differences. Theoretical Population Biology 49:
         369-386.
         """
-        diffs = 0
-        for sx in self.pop1_seqs:
-            for sy in self.pop2_seqs:
-                for cidx, c in enumerate(sx):
-                    c1 = c
-                    c2 = sy[cidx]
-                    if c1 in self.states_to_ignore or c2 in self.states_to_ignore:
-                        continue
-                    f1 = getattr(c1, self.state_attr)
-                    f2 = getattr(c2, self.state_attr)
-                    if f1 != f2:
-                        diffs += 1
+        diffs = sum(self._pairwise_differences_between_populations())
         dxy = float(1)/(len(self.pop1_seqs) * len(self.pop2_seqs)) * float(diffs)
         return dxy
 
@@ -318,19 +410,8 @@ class PopulationPairSummaryStatistics(object):
         369-386.
         """
         ss_diffs = 0
-        for sx in self.pop1_seqs:
-            for sy in self.pop2_seqs:
-                diffs = 0
-                for cidx, c in enumerate(sx):
-                    c1 = c
-                    c2 = sy[cidx]
-                    if c1 in self.states_to_ignore or c2 in self.states_to_ignore:
-                        continue
-                    f1 = getattr(c1, self.state_attr)
-                    f2 = getattr(c2, self.state_attr)
-                    if f1 != f2:
-                        diffs += 1
-                ss_diffs += (float(diffs - mean_diff) ** 2)
+        for diffs in self._pairwise_differences_between_populations():
+            ss_diffs += (float(diffs - mean_diff) ** 2)
         return float(ss_diffs)/(len(self.pop1_seqs)*len(self.pop2_seqs))
 
 def derived_state_matrix(
@@ -407,21 +488,51 @@ def unfolded_site_frequency_spectrum(
     is None, then the first sequence in char_sequences is taken to be the ancestral
     sequence.
     """
-    dsm = derived_state_matrix(
-            char_matrix=char_matrix,
-            ancestral_sequence=ancestral_sequence,
-            derived_state_alphabet=None,
-            ignore_uncertain=ignore_uncertain,
-            )
-    sites = zip(*dsm.sequences()) # transpose
+    # Instead of building the derived state matrix, the derived sites of
+    # each sequence are found as the sites at which it differs from the
+    # ancestral sequence (see ``derived_state_matrix()``), and the number of
+    # derived sequences at each site is tallied in a bit-sliced counter, in
+    # which bit ``i`` of ``counter_bits[k]`` is bit ``k`` of the count for
+    # site ``i``.
+    sequences = char_matrix.sequences()
+    if ancestral_sequence is None and sequences:
+        ancestral_sequence = sequences[0]
     freqs = {}
     if pad:
         for i in range(len(char_matrix)+1):
             freqs[i] = 0
-    for s in sites:
-        p = sum(1 for i in s if i.symbol == "1")
-        if p not in freqs:
-            freqs[p] = 1
-        else:
-            freqs[p] += 1
+    if not sequences:
+        return freqs
+    if ignore_uncertain:
+        attr = "fundamental_indexes_with_gaps_as_missing"
+        states_to_ignore = set([char_matrix.default_state_alphabet.gap_state, char_matrix.default_state_alphabet.no_data_state])
+    else:
+        attr = "fundamental_indexes"
+        states_to_ignore = set()
+    packed_sequences = _PackedSequences(
+            [ancestral_sequence] + sequences,
+            state_key_fn=lambda char: getattr(char, attr),
+            is_ignored_state_fn=lambda char: char in states_to_ignore)
+    counter_bits = []
+    for idx in range(1, len(packed_sequences)):
+        carry = packed_sequences.different_site_bits(0, idx)
+        for k in range(len(counter_bits)):
+            if not carry:
+                break
+            counter_bits[k], carry = counter_bits[k] ^ carry, counter_bits[k] & carry
+        if carry:
+            counter_bits.append(carry)
+    all_site_bits = (1 << packed_sequences.num_sites) - 1
+    for p in range(len(sequences)+1):
+        if p >> len(counter_bits):
+            break
+        site_bits = all_site_bits
+        for k, bits in enumerate(counter_bits):
+            if (p >> k) & 1:
+                site_bits &= bits
+            else:
+                site_bits &= ~bits
+        num_sites = bitprocessing.num_set_bits(site_bits)
+        if num_sites or p in freqs:
+            freqs[p] = num_sites
     return freqs
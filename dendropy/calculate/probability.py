@@ -274,6 +274,81 @@ def geometric_rv(p, rng=None):
     G = int(math.ceil(math.log(U) / math.log(1.0 - p)))
     return G
 
+def regularized_lower_incomplete_gamma(a, x):
+    """
+    Returns the regularized lower incomplete gamma function, P(a, x), using
+    its series expansion for x < a + 1 and its continued fraction (evaluated
+    by the modified Lentz method) otherwise, as given in: Press, W. H., et
+    al. 1992. Numerical Recipes in C, 2nd ed., Section 6.2.
+    """
+    if x <= 0.0:
+        return 0.0
+    log_prefactor = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1.0:
+        term = 1.0 / a
+        total = term
+        n = a
+        for i in range(1000):
+            n += 1.0
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-16:
+                break
+        return min(1.0, total * math.exp(log_prefactor))
+    tiny = 1e-300
+    b = x + 1.0 - a
+    c = 1.0 / tiny
+    d = 1.0 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2.0
+        d = an * d + b
+        if abs(d) < tiny:
+            d = tiny
+        c = b + an / c
+        if abs(c) < tiny:
+            c = tiny
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-16:
+            break
+    return max(0.0, 1.0 - math.exp(log_prefactor) * h)
+
+def gamma_cdf(x, shape, scale=1.0):
+    """
+    Returns the cumulative probability of ``x`` under a gamma distribution
+    with shape parameter ``shape`` and scale parameter ``scale``.
+    """
+    return regularized_lower_incomplete_gamma(shape, float(x) / scale)
+
+def gamma_quantile(p, shape, scale=1.0):
+    """
+    Returns the value below which the proportion ``p`` of the probability
+    mass of a gamma distribution with shape parameter ``shape`` and scale
+    parameter ``scale`` lies (i.e., the inverse of :func:`gamma_cdf()`), found
+    by bisection.
+    """
+    if p <= 0.0:
+        return 0.0
+    if p >= 1.0:
+        return float("inf")
+    lower = 0.0
+    upper = shape + 1.0
+    while regularized_lower_incomplete_gamma(shape, upper) < p:
+        lower = upper
+        upper *= 2.0
+    for i in range(200):
+        mid = (lower + upper) / 2.0
+        if mid <= lower or mid >= upper:
+            break
+        if regularized_lower_incomplete_gamma(shape, mid) < p:
+            lower = mid
+        else:
+            upper = mid
+    return (lower + upper) / 2.0 * scale
+
 def hypergeometric_pmf(x, m, n, k):
     """
     Given a population consisting of ``m`` items of class M and ``n`` items of class N,
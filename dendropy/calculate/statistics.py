@@ -22,9 +22,16 @@ Functions to calculate some general statistics.
 
 import math
 from dendropy.calculate import probability
+from dendropy.utility import GLOBAL_RNG
 from operator import itemgetter
 
 def _mean_and_variance_pop_n(values):
+    if isinstance(values, StreamingSummary):
+        # use the statistics accumulated over all values, not just those
+        # in the reservoir
+        if values.count == 0:
+            raise IndexError("values in mean_and_variance cannot be empty")
+        return values.mean, max(0.0, values.sum_of_squared_deviations) / values.count, values.count
     n = 0
     s = 0.0
     ss = 0.0
@@ -510,3 +517,171 @@ def summarize(values):
     except (ValueError, OverflowError):
         summary['quant_5_95'] = None
     return summary
+
+class StreamingSummary(object):
+    """
+    Accumulates a sample of values one at a time, without necessarily
+    storing them all, for summarizing as by :func:`summarize()`.
+
+    The mean and variance are accumulated using Welford's algorithm, and
+    the minimum and maximum values tracked, while the values themselves are
+    kept in a reservoir sample of at most ``reservoir_size`` values (Vitter's
+    "Algorithm R"), from which the median, HPD and quantiles are calculated.
+    As long as no more than ``reservoir_size`` values have been added, the
+    reservoir holds all of them and :meth:`summarize()` returns exactly the
+    same results as :func:`summarize()` would for the sample. Accumulators
+    can be merged using :meth:`update()`, e.g., to combine results from
+    different processes.
+
+    Values of |None| are ignored.
+
+    Iterating over an accumulator (or taking its length) gives the values in
+    the reservoir, so functions of a list of values apply to the sample in
+    the reservoir; :func:`mean_and_sample_variance()` and
+    :func:`mean_and_population_variance()` use the mean and variance of all
+    the values added.
+    """
+
+    def __init__(self, reservoir_size=10000, rng=None):
+        """
+        Parameters
+        ----------
+        reservoir_size : int
+            Maximum number of values to store for the calculation of the
+            median, HPD and quantiles.
+        rng : random number generator
+            Used to sample values for the reservoir once more than
+            ``reservoir_size`` values have been added. If not given,
+            'GLOBAL_RNG' will be used.
+        """
+        if reservoir_size < 1:
+            raise ValueError("Reservoir size must be positive: {}".format(reservoir_size))
+        self.reservoir_size = reservoir_size
+        self.rng = rng
+        self.count = 0
+        self.mean = 0.0
+        self.sum_of_squared_deviations = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.reservoir = []
+
+    def __len__(self):
+        """
+        Returns the number of values in the reservoir (i.e., the number of
+        values iterated over), which is less than the number of values added,
+        ``self.count``, once more than ``reservoir_size`` values have been
+        added.
+        """
+        return len(self.reservoir)
+
+    def __iter__(self):
+        """
+        Iterates over the values in the reservoir.
+        """
+        return iter(self.reservoir)
+
+    def _get_rng(self):
+        if self.rng is None:
+            return GLOBAL_RNG
+        return self.rng
+
+    def add(self, value):
+        """
+        Adds ``value`` to the sample.
+        """
+        if value is None:
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / float(self.count)
+        self.sum_of_squared_deviations += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if len(self.reservoir) < self.reservoir_size:
+            self.reservoir.append(value)
+        else:
+            idx = self._get_rng().randint(0, self.count - 1)
+            if idx < self.reservoir_size:
+                self.reservoir[idx] = value
+    append = add
+
+    def extend(self, values):
+        """
+        Adds all values in ``values`` to the sample.
+        """
+        for value in values:
+            self.add(value)
+
+    def update(self, other):
+        """
+        Merges the sample accumulated by ``other``, another
+        |StreamingSummary| instance, into this one.
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.mean = other.mean
+            self.sum_of_squared_deviations = other.sum_of_squared_deviations
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / float(count)
+            self.sum_of_squared_deviations += other.sum_of_squared_deviations \
+                    + delta * delta * self.count * other.count / float(count)
+        if self.minimum is None or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if self.maximum is None or other.maximum > self.maximum:
+            self.maximum = other.maximum
+        if len(self.reservoir) + len(other.reservoir) <= self.reservoir_size:
+            self.reservoir.extend(other.reservoir)
+        else:
+            self.reservoir = self._merge_reservoirs(
+                    self.reservoir,
+                    self.count,
+                    other.reservoir,
+                    other.count)
+        self.count += other.count
+
+    def _merge_reservoirs(self, reservoir1, count1, reservoir2, count2):
+        # The number of values to take from each reservoir is that of a
+        # sample without replacement of the values added to either, and the
+        # values themselves are then sampled from the respective reservoirs.
+        rng = self._get_rng()
+        pool1 = list(reservoir1)
+        pool2 = list(reservoir2)
+        rng.shuffle(pool1)
+        rng.shuffle(pool2)
+        remaining1 = float(count1)
+        remaining2 = float(count2)
+        merged = []
+        while len(merged) < self.reservoir_size and (pool1 or pool2):
+            if pool1 and (not pool2 or rng.random() * (remaining1 + remaining2) < remaining1):
+                merged.append(pool1.pop())
+                remaining1 -= 1
+            else:
+                merged.append(pool2.pop())
+                remaining2 -= 1
+        return merged
+
+    def summarize(self):
+        """
+        Returns a dictionary summarizing the sample, with the same keys as
+        :func:`summarize()`.
+        """
+        if self.count == 0:
+            raise ValueError("No values in data")
+        summary = summarize(self.reservoir)
+        if self.count == len(self.reservoir):
+            return summary
+        summary['range'] = (self.minimum, self.maximum)
+        summary['mean'] = self.mean
+        summary['var'] = max(0.0, self.sum_of_squared_deviations) / (self.count - 1)
+        try:
+            summary['sd'] = summary['var'] ** 0.5
+        except ValueError:
+            summary['sd'] = 0.0
+        except OverflowError:
+            summary['sd'] = None
+        return summary
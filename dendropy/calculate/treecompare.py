@@ -21,13 +21,16 @@ Statistics, metrics, measurements, and values calculated *between* *two* trees.
 """
 
 import math
+import array
+import operator
 import collections
+import multiprocessing
 from dendropy.utility import error
 
 ###############################################################################
 ## Public Functions
 
-def symmetric_difference(tree1, tree2, is_bipartitions_updated=False):
+def symmetric_difference(tree1, tree2, is_bipartitions_updated=False, algorithm="bipartitions"):
     """
     Returns *unweighted* Robinson-Foulds distance between two trees.
 
@@ -52,6 +55,12 @@ def symmetric_difference(tree1, tree2, is_bipartitions_updated=False):
         before comparison. If |True| then the bipartitions will only be
         calculated for a |Tree| object if they have not been calculated
         before, either explicitly or implicitly.
+    algorithm : str
+        If "bipartitions" [default], then the bipartitions of the two trees
+        are encoded and compared. If "day", then the distance is calculated
+        in linear time directly from the tree structures, without encoding
+        bipartitions, using the algorithm of Day (1985) (see
+        :func:`false_positives_and_negatives()`).
 
     Returns
     -------
@@ -83,14 +92,15 @@ def symmetric_difference(tree1, tree2, is_bipartitions_updated=False):
     t = false_positives_and_negatives(
             tree1,
             tree2,
-            is_bipartitions_updated=is_bipartitions_updated)
+            is_bipartitions_updated=is_bipartitions_updated,
+            algorithm=algorithm)
     return t[0] + t[1]
 
-def unweighted_robinson_foulds_distance(tree1, tree2, is_bipartitions_updated=False):
+def unweighted_robinson_foulds_distance(tree1, tree2, is_bipartitions_updated=False, algorithm="bipartitions"):
     """
     Alias for ``symmetric_difference()``.
     """
-    return symmetric_difference(tree1, tree2, is_bipartitions_updated)
+    return symmetric_difference(tree1, tree2, is_bipartitions_updated, algorithm)
 
 def weighted_robinson_foulds_distance(
         tree1,
@@ -162,7 +172,8 @@ def weighted_robinson_foulds_distance(
 def false_positives_and_negatives(
         reference_tree,
         comparison_tree,
-        is_bipartitions_updated=False):
+        is_bipartitions_updated=False,
+        algorithm="bipartitions"):
     """
     Counts and returns number of false positive bipar (bipartitions found in
     ``comparison_tree`` but not in ``reference_tree``) and false negative
@@ -190,6 +201,19 @@ def false_positives_and_negatives(
         before comparison. If |False| (default) then the bipartitions
         will only be calculated for a |Tree| object if they have not been
         calculated before, either explicitly or implicitly.
+    algorithm : str
+        If "bipartitions" [default], then the bipartitions of the two trees
+        are encoded and compared. If "day", then the clusters of the two
+        trees are compared in linear time directly on the tree structures,
+        using the cluster table of Day (1985), without encoding bipartitions
+        or modifying the trees (in particular, unifurcations are not
+        suppressed); ``is_bipartitions_updated`` is then ignored. The
+        results are identical. Trees with different leaf sets, leaves
+        without taxa or with the same taxon, or different rooting states
+        are always compared by their bipartitions.
+
+        Day, W. H. E. 1985. Optimal algorithms for comparing trees with
+        labeled leaves. Journal of Classification 2: 7-28.
 
     Returns
     -------
@@ -220,6 +244,12 @@ def false_positives_and_negatives(
     """
     if reference_tree.taxon_namespace is not comparison_tree.taxon_namespace:
         raise error.TaxonNamespaceIdentityError(reference_tree, comparison_tree)
+    if algorithm == "day":
+        t = _day_false_positives_and_negatives(reference_tree, comparison_tree)
+        if t is not None:
+            return t
+    elif algorithm != "bipartitions":
+        raise ValueError("Unrecognized algorithm: '{}' (must be 'bipartitions' or 'day')".format(algorithm))
     if not is_bipartitions_updated:
         reference_tree.encode_bipartitions()
         comparison_tree.encode_bipartitions()
@@ -353,21 +383,163 @@ def find_missing_bipartitions(reference_tree, comparison_tree, is_bipartitions_u
             missing.append(bipartition)
     return missing
 
+##############################################################################
+### Distance Matrices
+
+def distance_matrix(
+        trees,
+        metric="symmetric_difference",
+        edge_weight_attr="length",
+        is_bipartitions_updated=False,
+        num_processes=1,
+        block_size=None,
+        dest=None,
+        delimiter=","):
+    """
+    Returns the matrix of the distances between all pairs of trees in
+    ``trees``.
+
+    The bipartitions of each tree are encoded only once, as a set of split
+    bitmasks (and, for the weighted distances, a map of split bitmasks to
+    edge lengths), and the distances are then calculated over these
+    encodings, so this is much faster than calling, e.g.,
+    :func:`symmetric_difference()` on every pair of trees. For the
+    unweighted Robinson-Foulds distance, the distances are only calculated
+    once for every pair of distinct topologies. Rows of the matrix are
+    calculated in blocks, which may be distributed across processes.
+
+    Trees need to share the same |TaxonNamespace| reference. The
+    bipartition bitmasks of the trees must be correct for the current tree
+    structures (by calling :meth:`Tree.encode_bipartitions()` method) or the
+    ``is_bipartitions_updated`` argument must be |False| to force
+    recalculation of bipartitions.
+
+    Parameters
+    ----------
+    trees : iterable of |Tree| objects
+        The trees to be compared, e.g., a |TreeList|.
+    metric : str
+        The distance to calculate: "symmetric_difference" (or, equivalently,
+        "unweighted_robinson_foulds"; see :func:`symmetric_difference()`),
+        "weighted_robinson_foulds" (see
+        :func:`weighted_robinson_foulds_distance()`) or "euclidean" (see
+        :func:`euclidean_distance()`).
+    edge_weight_attr : string
+        Name of attribute on edges of trees to be used as the weight for the
+        weighted distances. As with :func:`weighted_robinson_foulds_distance()`
+        and :func:`euclidean_distance()`, a ValueError is raised if this is
+        |None| for any edge other than the root edge (which is given a weight
+        of 0).
+    is_bipartitions_updated : bool
+        If |False| [default], then the bipartitions of the trees will be
+        updated before comparison. If |True|, then the bipartitions will
+        only be calculated for a |Tree| object if they have not been
+        calculated before.
+    num_processes : int
+        Number of processes across which to distribute the calculation of
+        blocks of rows of the matrix.
+    block_size : int
+        Number of rows of the matrix to be calculated in each block (by
+        default, the rows are divided evenly between processes).
+    dest : file-like object
+        If given, then, instead of being returned, each row of the matrix
+        is written to this stream (opened for writing text), as a line of
+        values separated by ``delimiter``, as soon as the block that it
+        belongs to has been calculated. Only a block of rows is held in
+        memory at a time, so this can be used for numbers of trees for
+        which the whole matrix would not fit in memory.
+    delimiter : str
+        Separator of the values of the rows written to ``dest``.
+
+    Returns
+    -------
+    m : list[array.array]
+        A list of rows, with the ``j``-th element of the ``i``-th row being
+        the distance between the ``i``-th and ``j``-th trees. Elements are
+        integers for the unweighted Robinson-Foulds distance, and floating
+        point values otherwise. |None| is returned if ``dest`` is given.
+
+    Examples
+    --------
+
+    ::
+
+        import dendropy
+        from dendropy.calculate import treecompare
+        trees = dendropy.TreeList.get_from_path(
+                "pythonidae.random.bd0301.tre",
+                "nexus")
+        rf_matrix = treecompare.distance_matrix(trees, num_processes=4)
+        print(rf_matrix[0][1])
+        with open("wrf.csv", "w") as dest:
+            treecompare.distance_matrix(trees,
+                    metric="weighted_robinson_foulds",
+                    dest=dest)
+
+    """
+    tree_splits, tree_edge_lengths = _get_tree_splits_and_edge_lengths(
+            trees=trees,
+            metric=metric,
+            edge_weight_attr=edge_weight_attr,
+            is_bipartitions_updated=is_bipartitions_updated)
+    return _distance_matrix(
+            tree_splits=tree_splits,
+            tree_edge_lengths=tree_edge_lengths,
+            metric=metric,
+            num_processes=num_processes,
+            block_size=block_size,
+            dest=dest,
+            delimiter=delimiter)
+
+def iter_distance_matrix_rows(
+        trees,
+        metric="symmetric_difference",
+        edge_weight_attr="length",
+        is_bipartitions_updated=False,
+        num_processes=1,
+        block_size=None):
+    """
+    As :func:`distance_matrix()`, but yields the rows of the distance matrix,
+    in order, as they are calculated, with only a block of rows held in
+    memory at a time.
+
+    Returns
+    -------
+    r : iterator over array.array
+        Rows of the distance matrix.
+    """
+    tree_splits, tree_edge_lengths = _get_tree_splits_and_edge_lengths(
+            trees=trees,
+            metric=metric,
+            edge_weight_attr=edge_weight_attr,
+            is_bipartitions_updated=is_bipartitions_updated)
+    return _iter_distance_matrix_rows(
+            tree_splits=tree_splits,
+            tree_edge_lengths=tree_edge_lengths,
+            metric=metric,
+            num_processes=num_processes,
+            block_size=block_size,
+            is_upper_triangle=False)
+
 ##############################################################################
 ### TreeshapeKernel
 
 class TreeShapeKernel(object):
 
-    _TreeShapeKernelNodeCache = collections.namedtuple("_TreeShapeKernelNodeCache",
-            ["production", "index", "edge_lengths", "sum_of_square_edge_lengths"])
-
     def __init__(self,
                 sigma=1,
                 gauss_factor=1,
-                decay_factor=0.1):
+                decay_factor=0.1,
+                max_cache_size=1000):
         """
         Calculator for tree shape kernel tricking.
 
+        The values needed for the kernel trick are pre-computed for each tree
+        and cached (see :meth:`update_cache()`). At most ``max_cache_size``
+        trees are held in the cache, with the least-recently used ones
+        discarded beyond that; if ``max_cache_size`` is |None|, the cache is
+        unbounded.
+
         References
         ----------
 
@@ -396,38 +568,35 @@ class TreeShapeKernel(object):
         self.decay_factor = decay_factor
 
         # cache management
-        self._tree_cache = {}
+        self.max_cache_size = max_cache_size
+        self._tree_cache = collections.OrderedDict()
 
     def update_cache(self, tree):
         """
         Pre-computes values needed for the kernel trick with this tree and
         caches them.
         """
-        current_tree_cache = {}
         for nd in tree.leaf_node_iter():
-            current_tree_cache[nd] = TreeShapeKernel._TreeShapeKernelNodeCache(
-                    production=0,
-                    index=0,
-                    edge_lengths=None,
-                    sum_of_square_edge_lengths=0)
             nd.production = 0
-        for nd_idx, nd in enumerate(tree.postorder_internal_node_iter()):
-            nterms = 0
-            edge_lengths = []
-            for ch in nd.child_node_iter():
-                if current_tree_cache[ch].production == 0:
-                    nterms += 1
-                edge_lengths.append(ch.edge.length)
-            production = nterms + 1
-            index = nd_idx
-            sum_of_square_edge_lengths = sum([elen**2 for elen in edge_lengths])
-            current_tree_cache[nd] = TreeShapeKernel._TreeShapeKernelNodeCache(
-                    production=production,
-                    index=index,
-                    edge_lengths=edge_lengths,
-                    sum_of_square_edge_lengths=sum_of_square_edge_lengths)
-        self._tree_cache[tree] = current_tree_cache
-        return current_tree_cache
+        tree_cache = _encode_tree_shape_kernel_tree(tree)
+        self._tree_cache.pop(tree, None)
+        self._tree_cache[tree] = tree_cache
+        if self.max_cache_size is not None:
+            while len(self._tree_cache) > max(self.max_cache_size, 1):
+                self._tree_cache.popitem(last=False)
+        return tree_cache
+
+    def _get_tree_cache(self, tree, is_cache_updated):
+        if is_cache_updated:
+            try:
+                tree_cache = self._tree_cache.pop(tree)
+            except KeyError:
+                pass
+            else:
+                # re-inserted as the most-recently used
+                self._tree_cache[tree] = tree_cache
+                return tree_cache
+        return self.update_cache(tree)
 
     def __call__(self,
             tree1,
@@ -483,52 +652,88 @@ class TreeShapeKernel(object):
         11th Conference of the European Chapter of the Association
         for Computational Linguistics.
         """
-        internal_nodes2 = list(tree2.postorder_internal_node_iter())
-        k = 0
-        if not is_tree1_cache_updated:
-            tree1_cache = self.update_cache(tree1)
-        else:
-            try:
-                tree1_cache = self._tree_cache[tree1]
-            except KeyError:
-                tree1_cache = self.update_cache(tree1)
-        if not is_tree2_cache_updated:
-            tree2_cache = self.update_cache(tree2)
+        tree1_cache = self._get_tree_cache(tree1, is_tree1_cache_updated)
+        tree2_cache = self._get_tree_cache(tree2, is_tree2_cache_updated)
+        return _calculate_tree_shape_kernel(
+                tree1_cache,
+                tree2_cache,
+                self.sigma,
+                self.gauss_factor,
+                self.decay_factor)
+
+    def gram_matrix(self,
+            trees,
+            num_processes=1,
+            is_cache_updated=False):
+        """
+        Returns the matrix of the kernel values of all pairs of trees in
+        ``trees``.
+
+        The values needed for the kernel trick are pre-computed once for each
+        tree, with the internal nodes of each tree bucketed by production,
+        so that only pairs of nodes with matching productions are visited.
+        Only the upper triangle of the matrix is calculated, and rows of the
+        matrix can be distributed across processes.
+
+        The matrix is symmetrized: the elements of the upper triangle (and
+        the diagonal) are calculated with the trees in the same order as
+        by calling this object, i.e., the ``j``-th element of the ``i``-th
+        row, for ``i <= j``, is identical to ``self(trees[i], trees[j])``,
+        while the ``i``-th element of the ``j``-th row is a copy of it
+        (rather than ``self(trees[j], trees[i])``, which can differ from it
+        in the last bits of precision).
+
+        Parameters
+        ----------
+        trees : iterable of |Tree| objects
+            The trees to be compared, e.g., a |TreeList|.
+        num_processes : int
+            Number of processes across which to distribute the calculation of
+            the rows of the matrix.
+        is_cache_updated : bool
+            If |False| [default], then the cached values of all the trees are
+            re-calculated. Otherwise, the cached values of trees that have
+            been seen before are used.
+
+        Returns
+        -------
+        m : list[list[float]]
+            A list of rows, with the ``j``-th element of the ``i``-th row being
+            the kernel value of the ``i``-th and ``j``-th trees (calculated
+            with the trees in this order if ``i <= j``, and in the reverse
+            order otherwise).
+        """
+        tree_caches = [[self._get_tree_cache(tree, is_cache_updated)] for tree in trees]
+        return [[values[0] for values in row] for row in self._calculate_gram_matrix(tree_caches, num_processes)]
+
+    def _calculate_gram_matrix(self, tree_caches, num_processes):
+        # ``tree_caches`` is a list of lists of the cached values of trees,
+        # with the kernel value of a pair of entries calculated for each
+        # pair of trees at the same positions in the two lists.
+        num_trees = len(tree_caches)
+        kernel_args = (self.sigma, self.gauss_factor, self.decay_factor)
+        rows = [None] * num_trees
+        if num_processes is None or num_processes <= 1 or num_trees < 2:
+            for row_idx in range(num_trees):
+                rows[row_idx] = _calculate_tree_shape_kernel_row(kernel_args, tree_caches, row_idx)
         else:
+            # the tree values are sent to each worker process only once
+            pool = multiprocessing.Pool(
+                    processes=min(num_processes, num_trees),
+                    initializer=_set_tree_shape_kernel_caches,
+                    initargs=(kernel_args, tree_caches))
             try:
-                tree2_cache = self._tree_cache[tree2]
-            except KeyError:
-                tree2_cache = self.update_cache(tree2)
-        dp_matrix = {}
-        for ni, tree1_node in enumerate(tree1.postorder_internal_node_iter()):
-            tree1_cache_node = tree1_cache[tree1_node]
-            for tree2_node in internal_nodes2:
-                tree2_cache_node = tree2_cache[tree2_node]
-                if tree1_cache_node.production != tree2_cache_node.production:
-                    continue
-                res = self.decay_factor * math.exp( -1. / self.gauss_factor
-                    * (tree1_cache_node.sum_of_square_edge_lengths + tree2_cache_node.sum_of_square_edge_lengths - 2*sum([(tree1_cache_node.edge_lengths[i]*tree2_cache_node.edge_lengths[i]) for i in range(len(tree1_cache_node.edge_lengths))])))
-                ## TODO:
-                ##  - (check and) handles cases where unequal number of children
-                ##  - how to handle rotation mismatch problems? or do we assume
-                ##    trees have equal rotations
-                # for node_idx in range(2):
-                #     c1 = tree1_node.clades[node_idx]
-                #     c2 = tree2_node.clades[node_idx]
-                for c1, c2 in zip(tree1_node.child_node_iter(), tree2_node.child_node_iter()):
-                    if tree1_cache[c1].production != tree2_cache[c2].production:
-                        continue
-                    if tree1_cache[c1].production == 0:
-                        # branches are terminal
-                        res *= self.sigma + self.decay_factor
-                    else:
-                        try:
-                            res *= self.sigma + dp_matrix[(tree1_cache[c1].index, tree2_cache[c2].index)]
-                        except KeyError:
-                            res *= self.sigma
-                dp_matrix[(tree1_cache[tree1_node].index, tree2_cache[tree2_node].index)] = res
-                k += res
-        return k
+                chunk_size = max(1, num_trees // (4 * num_processes))
+                for row_idx, row in enumerate(pool.imap(_calculate_tree_shape_kernel_worker_row, range(num_trees), chunk_size)):
+                    rows[row_idx] = row
+            finally:
+                pool.terminate()
+                pool.join()
+        # the calculated rows start at the diagonal
+        matrix = []
+        for row_idx in range(num_trees):
+            matrix.append([rows[col_idx][row_idx - col_idx] for col_idx in range(row_idx)] + rows[row_idx])
+        return matrix
 
 ##############################################################################
 ### AssemblageInducedTree
@@ -538,7 +743,11 @@ class AssemblageInducedTreeManager(object):
     def __init__(self, *args, **kwargs):
         self.is_exchangeable_assemblage_classifications = kwargs.pop("is_exchangeable_assemblage_classifications", True)
         self._num_assemblage_classifications = kwargs.pop("num_assemblages", None)
-        self._tree_assemblage_induced_trees_map = {}
+        # At most ``max_cache_size`` trees have their induced trees held, with
+        # the least-recently used ones discarded beyond that; if |None|, the
+        # map is unbounded.
+        self.max_cache_size = kwargs.pop("max_cache_size", None)
+        self._tree_assemblage_induced_trees_map = collections.OrderedDict()
 
     def generate_induced_trees(self, tree, assemblage_leaf_sets):
         if assemblage_leaf_sets is None:
@@ -559,17 +768,40 @@ class AssemblageInducedTreeManager(object):
                                is_apply_filter_to_leaf_nodes=True,
                                is_apply_filter_to_internal_nodes=False)
             induced_trees.append(induced_tree)
+        self._tree_assemblage_induced_trees_map.pop(tree, None)
         self._tree_assemblage_induced_trees_map[tree] = induced_trees
+        if self.max_cache_size is not None:
+            while len(self._tree_assemblage_induced_trees_map) > max(self.max_cache_size, 1):
+                self._tree_assemblage_induced_trees_map.popitem(last=False)
         return induced_trees
 
+    def _get_induced_trees(self, tree, assemblage_leaf_sets, is_cache_updated):
+        if is_cache_updated:
+            try:
+                induced_trees = self._tree_assemblage_induced_trees_map.pop(tree)
+            except KeyError:
+                pass
+            else:
+                # re-inserted as the most-recently used
+                self._tree_assemblage_induced_trees_map[tree] = induced_trees
+                return induced_trees
+        return self.generate_induced_trees(tree=tree,
+                assemblage_leaf_sets=assemblage_leaf_sets)
+
 ##############################################################################
 ### AssemblageInducedTreeShapeKernel
 
 class AssemblageInducedTreeShapeKernel(TreeShapeKernel, AssemblageInducedTreeManager):
 
     def __init__(self, *args, **kwargs):
+        manager_kwargs = {}
+        for kw in ("is_exchangeable_assemblage_classifications", "num_assemblages"):
+            if kw in kwargs:
+                manager_kwargs[kw] = kwargs.pop(kw)
         TreeShapeKernel.__init__(self, *args, **kwargs)
-        AssemblageInducedTreeManager.__init__(self, *args, **kwargs)
+        AssemblageInducedTreeManager.__init__(self,
+                max_cache_size=self.max_cache_size,
+                **manager_kwargs)
         self._cache_induced_tree_scores = {}
 
     def update_assemblage_induced_tree_cache(self,
@@ -578,6 +810,7 @@ class AssemblageInducedTreeShapeKernel(TreeShapeKernel, AssemblageInducedTreeMan
         self.update_cache(tree=tree)
         induced_trees = self.generate_induced_trees(tree=tree,
                 assemblage_leaf_sets=assemblage_leaf_sets)
+        return induced_trees
         # self._cache_induced_tree_scores[tree] = []
         # for induced_tree1 in induced_trees:
         #     self.update_cache(tree=induced_tree1)
@@ -611,18 +844,14 @@ class AssemblageInducedTreeShapeKernel(TreeShapeKernel, AssemblageInducedTreeMan
                 is_tree1_cache_updated=is_tree1_cache_updated,
                 is_tree2_cache_updated=is_tree2_cache_updated,
                 )
-        if not is_tree1_cache_updated or tree1 not in self._tree_assemblage_induced_trees_map:
-            self.update_assemblage_induced_tree_cache(
-                    tree=tree1,
-                    assemblage_leaf_sets=tree1_assemblage_leaf_sets)
-        if not is_tree2_cache_updated or tree2 not in self._tree_assemblage_induced_trees_map:
-            self.update_assemblage_induced_tree_cache(
-                    tree=tree2,
-                    assemblage_leaf_sets=tree2_assemblage_leaf_sets)
+        induced_trees1 = self._get_induced_trees(tree1,
+                tree1_assemblage_leaf_sets,
+                is_tree1_cache_updated)
+        induced_trees2 = self._get_induced_trees(tree2,
+                tree2_assemblage_leaf_sets,
+                is_tree2_cache_updated)
         ## ++ main tree score
         score_vector.append(main_trees_score)
-        induced_trees1 = self._tree_assemblage_induced_trees_map[tree1]
-        induced_trees2 = self._tree_assemblage_induced_trees_map[tree1]
         assert len(induced_trees1) == len(induced_trees2) == self._num_assemblage_classifications
         if not self.is_exchangeable_assemblage_classifications:
             for induced_tree1, induced_tree2 in zip(induced_trees1, induced_trees2):
@@ -636,6 +865,56 @@ class AssemblageInducedTreeShapeKernel(TreeShapeKernel, AssemblageInducedTreeMan
                 score_vector.append(s)
         return score_vector
 
+    def gram_matrix(self,
+            trees,
+            assemblage_leaf_sets,
+            num_processes=1,
+            is_cache_updated=False):
+        """
+        Returns the matrix of the score vectors (as returned by calling this
+        object on a pair of trees) of all pairs of trees in ``trees``.
+
+        See :meth:`TreeShapeKernel.gram_matrix()`: the values needed for the
+        kernel trick are pre-computed once for each tree and each of its
+        assemblage-induced trees, only the upper triangle of the matrix is
+        calculated (so that the matrix is symmetrized), and rows of the matrix
+        can be distributed across processes.
+
+        Parameters
+        ----------
+        trees : iterable of |Tree| objects
+            The trees to be compared, e.g., a |TreeList|.
+        assemblage_leaf_sets : iterable
+            The assemblage leaf sets of each of the trees in ``trees``, in the
+            same order.
+        num_processes : int
+            Number of processes across which to distribute the calculation of
+            the rows of the matrix.
+        is_cache_updated : bool
+            If |False| [default], then the cached values and induced trees of
+            all the trees are re-calculated. Otherwise, those of trees that
+            have been seen before are used.
+
+        Returns
+        -------
+        m : list[list[list[float]]]
+            A list of rows, with the ``j``-th element of the ``i``-th row being
+            the score vector of the ``i``-th and ``j``-th trees (calculated
+            with the trees in this order if ``i <= j``, and in the reverse
+            order otherwise).
+        """
+        tree_caches = []
+        for tree, tree_assemblage_leaf_sets in zip(trees, assemblage_leaf_sets):
+            tree_cache = self._get_tree_cache(tree, is_cache_updated)
+            induced_trees = self._get_induced_trees(tree,
+                    tree_assemblage_leaf_sets,
+                    is_cache_updated)
+            tree_caches.append([tree_cache])
+            if not self.is_exchangeable_assemblage_classifications:
+                for induced_tree in induced_trees:
+                    tree_caches[-1].append(self._get_tree_cache(induced_tree, True))
+        return self._calculate_gram_matrix(tree_caches, num_processes)
+
 ###############################################################################
 ## Legacy
 
@@ -764,6 +1043,423 @@ def _get_length_diffs(
     else:
         return length_diffs
 
+def _day_false_positives_and_negatives(reference_tree, comparison_tree):
+    # Counts the clusters in the reference tree but not in the comparison
+    # tree, and vice versa, using the cluster table of Day (1985). Unrooted
+    # trees are traversed as if rooted at a leaf common to both trees, so
+    # that their clusters are the sides of their bipartitions that do not
+    # include that leaf (which is how split bitmasks are normalized).
+    # Trivial clusters (those of single leaves and of all the leaves) are
+    # shared by both trees and so are not counted. Returns |None| if the
+    # trees cannot be compared in this way.
+    is_rooted = bool(reference_tree.is_rooted)
+    if bool(comparison_tree.is_rooted) != is_rooted:
+        return None
+    if reference_tree.seed_node is None or comparison_tree.seed_node is None:
+        return None
+    leaves1 = reference_tree.leaf_nodes()
+    leaves2 = comparison_tree.leaf_nodes()
+    if len(leaves1) != len(leaves2):
+        return None
+    taxon_leaves1 = dict((id(nd.taxon), nd) for nd in leaves1 if nd.taxon is not None)
+    taxon_leaves2 = dict((id(nd.taxon), nd) for nd in leaves2 if nd.taxon is not None)
+    if len(taxon_leaves1) != len(leaves1) or len(taxon_leaves2) != len(leaves2):
+        return None
+    for taxon_id in taxon_leaves1:
+        if taxon_id not in taxon_leaves2:
+            return None
+    if is_rooted:
+        start_node1 = reference_tree.seed_node
+        start_node2 = comparison_tree.seed_node
+    else:
+        start_node1 = leaves1[0]
+        start_node2 = taxon_leaves2[id(leaves1[0].taxon)]
+
+    # Leaves are numbered in the postorder of the reference tree, so that
+    # each of its clusters is an interval, [left, right], of leaf numbers.
+    # A non-trivial cluster is stored in row ``right`` of the table if it
+    # is the leftmost child of its parent, and in row ``left`` otherwise,
+    # so that no two clusters are stored in the same row.
+    leaf_ranks = {}
+    left_at_right = {}
+    right_at_left = {}
+    for left, child_clusters in _iter_day_child_clusters(start_node1, leaf_ranks):
+        for child_left, child_right, child_size in child_clusters:
+            if child_size < 2:
+                continue
+            if child_left == left:
+                left_at_right[child_right] = child_left
+            else:
+                right_at_left[child_left] = child_right
+    num_clusters1 = len(left_at_right) + len(right_at_left)
+
+    num_clusters2 = 0
+    num_shared_clusters = 0
+    for left, child_clusters in _iter_day_child_clusters(start_node2, leaf_ranks):
+        for child_left, child_right, child_size in child_clusters:
+            if child_size < 2:
+                continue
+            num_clusters2 += 1
+            if child_right - child_left + 1 == child_size and (
+                    left_at_right.get(child_right) == child_left
+                    or right_at_left.get(child_left) == child_right):
+                num_shared_clusters += 1
+    return num_clusters1 - num_shared_clusters, num_clusters2 - num_shared_clusters
+
+def _iter_day_child_clusters(start_node, leaf_ranks):
+    # Traverses the tree in postorder as if it were rooted at
+    # ``start_node`` and, for every node with two or more children (not
+    # counting unifurcations), yields the smallest leaf number in its
+    # cluster and the (smallest leaf number, largest leaf number, number of
+    # leaves) of the clusters of each of its children. Leaves not in
+    # ``leaf_ranks`` are numbered in the order in which they are visited.
+    # The cluster of the start node itself, i.e. that of all the leaves, is
+    # not reported.
+    node_clusters = {}
+    stack = [(start_node, None, False)]
+    while stack:
+        node, prev_node, is_visited = stack.pop()
+        if not is_visited:
+            stack.append((node, prev_node, True))
+            for child in node._child_nodes:
+                if child is not prev_node:
+                    stack.append((child, node, False))
+            if node._parent_node is not None and node._parent_node is not prev_node:
+                stack.append((node._parent_node, node, False))
+            continue
+        if not node._child_nodes and node is not start_node:
+            taxon_id = id(node.taxon)
+            rank = leaf_ranks.get(taxon_id)
+            if rank is None:
+                rank = len(leaf_ranks)
+                leaf_ranks[taxon_id] = rank
+            node_clusters[id(node)] = (rank, rank, 1)
+            continue
+        child_clusters = []
+        for child in node._child_nodes:
+            if child is not prev_node:
+                cluster = node_clusters.pop(id(child))
+                if cluster is not None:
+                    child_clusters.append(cluster)
+        if node._parent_node is not None and node._parent_node is not prev_node:
+            cluster = node_clusters.pop(id(node._parent_node))
+            if cluster is not None:
+                child_clusters.append(cluster)
+        if not child_clusters:
+            # e.g., the unifurcating seed node of an unrooted tree, reached
+            # through its only child
+            node_clusters[id(node)] = None
+        elif len(child_clusters) == 1:
+            node_clusters[id(node)] = child_clusters[0]
+        else:
+            left = min(c[0] for c in child_clusters)
+            if node is not start_node:
+                node_clusters[id(node)] = (
+                        left,
+                        max(c[1] for c in child_clusters),
+                        sum(c[2] for c in child_clusters))
+            yield left, child_clusters
+
+_DISTANCE_MATRIX_METRICS = {
+    "symmetric_difference": "symmetric_difference",
+    "unweighted_robinson_foulds": "symmetric_difference",
+    "weighted_robinson_foulds": "weighted_robinson_foulds",
+    "euclidean": "euclidean",
+}
+
+def _get_distance_matrix_metric(metric):
+    try:
+        return _DISTANCE_MATRIX_METRICS[metric]
+    except KeyError:
+        raise ValueError("Unrecognized distance metric: '{}' (must be one of: {})".format(
+            metric, ", ".join("'{}'".format(m) for m in sorted(_DISTANCE_MATRIX_METRICS))))
+
+def _get_tree_splits_and_edge_lengths(trees, metric, edge_weight_attr, is_bipartitions_updated):
+    is_weighted = _get_distance_matrix_metric(metric) != "symmetric_difference"
+    tree_splits = []
+    tree_edge_lengths = []
+    first_tree = None
+    for tree in trees:
+        if first_tree is None:
+            first_tree = tree
+        elif tree.taxon_namespace is not first_tree.taxon_namespace:
+            raise error.TaxonNamespaceIdentityError(first_tree, tree)
+        if not is_bipartitions_updated or tree.bipartition_encoding is None:
+            tree.encode_bipartitions()
+        splits = []
+        edge_lengths = []
+        for bipartition in tree.bipartition_encoding:
+            splits.append(bipartition.split_bitmask)
+            if is_weighted:
+                edge = tree.bipartition_edge_map[bipartition]
+                elen = getattr(edge, edge_weight_attr)
+                if elen is None and edge.tail_node is not None:
+                    raise ValueError("Edge length attribute is 'None': Tree: %s ('%s'), Split: %s" % (id(tree), tree.label, bipartition.leafset_as_newick_string(tree.taxon_namespace)))
+                edge_lengths.append(elen)
+        tree_splits.append(splits)
+        tree_edge_lengths.append(edge_lengths if is_weighted else None)
+    return tree_splits, tree_edge_lengths
+
+def _encode_distance_matrix_trees(tree_splits, tree_edge_lengths, metric):
+    # For the unweighted distance, each tree is represented by the index of
+    # its topology (set of split bitmasks) in a list of distinct topologies;
+    # otherwise, by a map of split bitmasks to edge lengths.
+    if metric == "symmetric_difference":
+        topology_indexes = {}
+        topologies = []
+        tree_topology_indexes = []
+        for splits in tree_splits:
+            topology = frozenset(splits)
+            try:
+                tree_topology_indexes.append(topology_indexes[topology])
+            except KeyError:
+                topology_indexes[topology] = len(topologies)
+                tree_topology_indexes.append(len(topologies))
+                topologies.append(topology)
+        return (topologies, tree_topology_indexes)
+    encodings = []
+    for splits, edge_lengths in zip(tree_splits, tree_edge_lengths):
+        if edge_lengths is None:
+            raise ValueError("Edge lengths are required to calculate the '{}' distance".format(metric))
+        encodings.append(dict((split, float(elen) if elen is not None else 0.0) for split, elen in zip(splits, edge_lengths)))
+    return encodings
+
+def _distance_matrix(
+        tree_splits,
+        tree_edge_lengths,
+        metric,
+        num_processes,
+        block_size,
+        dest,
+        delimiter):
+    if dest is not None:
+        for row in _iter_distance_matrix_rows(
+                tree_splits=tree_splits,
+                tree_edge_lengths=tree_edge_lengths,
+                metric=metric,
+                num_processes=num_processes,
+                block_size=block_size,
+                is_upper_triangle=False):
+            dest.write(delimiter.join(repr(v) for v in row))
+            dest.write("\n")
+        return None
+    # only the upper triangle is calculated; the matrix is symmetrical
+    rows = []
+    for row_idx, row in enumerate(_iter_distance_matrix_rows(
+            tree_splits=tree_splits,
+            tree_edge_lengths=tree_edge_lengths,
+            metric=metric,
+            num_processes=num_processes,
+            block_size=block_size,
+            is_upper_triangle=True)):
+        full_row = array.array(row.typecode, [0]) * row_idx
+        full_row.extend(row)
+        for col_idx in range(row_idx):
+            full_row[col_idx] = rows[col_idx][row_idx]
+        rows.append(full_row)
+    return rows
+
+def _iter_distance_matrix_rows(
+        tree_splits,
+        tree_edge_lengths,
+        metric,
+        num_processes,
+        block_size,
+        is_upper_triangle):
+    metric = _get_distance_matrix_metric(metric)
+    num_trees = len(tree_splits)
+    if num_trees == 0:
+        return
+    encodings = _encode_distance_matrix_trees(tree_splits, tree_edge_lengths, metric)
+    if num_processes is None or num_processes < 1:
+        num_processes = 1
+    if block_size is None:
+        block_size = int(math.ceil(float(num_trees) / num_processes))
+    block_size = max(1, block_size)
+    tasks = [(row_start, min(row_start + block_size, num_trees), is_upper_triangle) for row_start in range(0, num_trees, block_size)]
+    if num_processes <= 1 or len(tasks) < 2:
+        for row_start, row_end, is_upper_triangle in tasks:
+            for row in _calculate_distance_matrix_block(metric, encodings, row_start, row_end, is_upper_triangle):
+                yield row
+        return
+    # the tree encodings are sent to each worker process only once
+    pool = multiprocessing.Pool(
+            processes=min(num_processes, len(tasks)),
+            initializer=_set_distance_matrix_encodings,
+            initargs=(metric, encodings))
+    try:
+        for rows in pool.imap(_calculate_distance_matrix_rows, tasks):
+            for row in rows:
+                yield row
+    finally:
+        pool.terminate()
+        pool.join()
+
+_distance_matrix_metric = None
+_distance_matrix_encodings = None
+
+def _set_distance_matrix_encodings(metric, encodings):
+    global _distance_matrix_metric
+    global _distance_matrix_encodings
+    _distance_matrix_metric = metric
+    _distance_matrix_encodings = encodings
+
+def _calculate_distance_matrix_rows(task):
+    # Run in a worker process, with the tree encodings set up by
+    # :func:`_set_distance_matrix_encodings()` when the process started.
+    row_start, row_end, is_upper_triangle = task
+    return _calculate_distance_matrix_block(
+            _distance_matrix_metric,
+            _distance_matrix_encodings,
+            row_start,
+            row_end,
+            is_upper_triangle)
+
+def _calculate_distance_matrix_block(metric, encodings, row_start, row_end, is_upper_triangle):
+    # Calculates the rows from ``row_start`` up to (but not including)
+    # ``row_end`` of the distance matrix of the trees given by ``encodings``
+    # (see :func:`_encode_distance_matrix_trees()`), either in full or from
+    # the diagonal onwards.
+    rows = []
+    if metric == "symmetric_difference":
+        topologies, tree_topology_indexes = encodings
+        topology_distances = {}
+        for row_idx in range(row_start, row_end):
+            col_start = row_idx if is_upper_triangle else 0
+            topology_idx = tree_topology_indexes[row_idx]
+            try:
+                distances = topology_distances[topology_idx]
+            except KeyError:
+                topology = topologies[topology_idx]
+                distances = [len(topology ^ other) for other in topologies]
+                topology_distances[topology_idx] = distances
+            col_topology_indexes = tree_topology_indexes[col_start:]
+            row = array.array("i")
+            if len(col_topology_indexes) == 1:
+                row.append(distances[col_topology_indexes[0]])
+            else:
+                row.extend(operator.itemgetter(*col_topology_indexes)(distances))
+            rows.append(row)
+        return rows
+    is_euclidean = metric == "euclidean"
+    for row_idx in range(row_start, row_end):
+        col_start = row_idx if is_upper_triangle else 0
+        edge_lengths1 = encodings[row_idx]
+        row = array.array("d")
+        for col_idx in range(col_start, len(encodings)):
+            edge_lengths2 = encodings[col_idx]
+            get_edge_length2 = edge_lengths2.get
+            d = 0.0
+            if is_euclidean:
+                for split, elen1 in edge_lengths1.items():
+                    d += (elen1 - get_edge_length2(split, 0.0)) ** 2
+                for split, elen2 in edge_lengths2.items():
+                    if split not in edge_lengths1:
+                        d += elen2 ** 2
+                row.append(math.sqrt(d))
+            else:
+                for split, elen1 in edge_lengths1.items():
+                    d += abs(elen1 - get_edge_length2(split, 0.0))
+                for split, elen2 in edge_lengths2.items():
+                    if split not in edge_lengths1:
+                        d += abs(elen2)
+                row.append(d)
+        rows.append(row)
+    return rows
+
+def _encode_tree_shape_kernel_tree(tree):
+    # Returns the values needed for the tree shape kernel trick for the
+    # internal nodes of ``tree``, in postorder: their productions (one more
+    # than the number of leaf children), the lengths of their child edges
+    # and the sums of the squares of these, and the (production, index) of
+    # their children (with leaves having an index of 0). Node indexes are
+    # also bucketed by production.
+    node_indexes = {}
+    productions = []
+    edge_lengths = []
+    sum_of_square_edge_lengths = []
+    children = []
+    production_nodes = {}
+    for nd_idx, nd in enumerate(tree.postorder_internal_node_iter()):
+        nterms = 0
+        nd_edge_lengths = []
+        nd_children = []
+        for ch in nd.child_node_iter():
+            if ch._child_nodes:
+                ch_idx = node_indexes.pop(id(ch))
+                nd_children.append((productions[ch_idx], ch_idx))
+            else:
+                nterms += 1
+                nd_children.append((0, 0))
+            nd_edge_lengths.append(ch.edge.length)
+        production = nterms + 1
+        node_indexes[id(nd)] = nd_idx
+        productions.append(production)
+        edge_lengths.append(nd_edge_lengths)
+        sum_of_square_edge_lengths.append(sum([elen**2 for elen in nd_edge_lengths]))
+        children.append(nd_children)
+        production_nodes.setdefault(production, []).append(nd_idx)
+    return productions, edge_lengths, sum_of_square_edge_lengths, children, production_nodes
+
+def _calculate_tree_shape_kernel(tree1_cache, tree2_cache, sigma, gauss_factor, decay_factor):
+    # Dynamic program of the tree shape kernel over the pairs of internal
+    # nodes of two trees with matching productions, given the values
+    # returned by :func:`_encode_tree_shape_kernel_tree()` for each.
+    productions1, edge_lengths1, sum_of_square_edge_lengths1, children1, _ = tree1_cache
+    _, edge_lengths2, sum_of_square_edge_lengths2, children2, production_nodes2 = tree2_cache
+    num_nodes2 = len(edge_lengths2)
+    dp_matrix = {}
+    k = 0
+    for idx1, production in enumerate(productions1):
+        nd_edge_lengths1 = edge_lengths1[idx1]
+        nd_sum_of_square_edge_lengths1 = sum_of_square_edge_lengths1[idx1]
+        nd_children1 = children1[idx1]
+        for idx2 in production_nodes2.get(production, ()):
+            nd_edge_lengths2 = edge_lengths2[idx2]
+            res = decay_factor * math.exp( -1. / gauss_factor
+                * (nd_sum_of_square_edge_lengths1 + sum_of_square_edge_lengths2[idx2] - 2*sum([(nd_edge_lengths1[i]*nd_edge_lengths2[i]) for i in range(len(nd_edge_lengths1))])))
+            for (c1_production, c1_idx), (c2_production, c2_idx) in zip(nd_children1, children2[idx2]):
+                if c1_production != c2_production:
+                    continue
+                if c1_production == 0:
+                    # branches are terminal
+                    res *= sigma + decay_factor
+                else:
+                    try:
+                        res *= sigma + dp_matrix[c1_idx * num_nodes2 + c2_idx]
+                    except KeyError:
+                        res *= sigma
+            dp_matrix[idx1 * num_nodes2 + idx2] = res
+            k += res
+    return k
+
+_tree_shape_kernel_args = None
+_tree_shape_kernel_caches = None
+
+def _set_tree_shape_kernel_caches(kernel_args, tree_caches):
+    global _tree_shape_kernel_args
+    global _tree_shape_kernel_caches
+    _tree_shape_kernel_args = kernel_args
+    _tree_shape_kernel_caches = tree_caches
+
+def _calculate_tree_shape_kernel_worker_row(row_idx):
+    # Run in a worker process, with the tree values set up by
+    # :func:`_set_tree_shape_kernel_caches()` when the process started.
+    return _calculate_tree_shape_kernel_row(
+            _tree_shape_kernel_args,
+            _tree_shape_kernel_caches,
+            row_idx)
+
+def _calculate_tree_shape_kernel_row(kernel_args, tree_caches, row_idx):
+    # Calculates the ``row_idx``-th row of the Gram matrix from the
+    # diagonal onwards; each element is the list of the kernel values of
+    # the corresponding entries of the two lists of tree values.
+    row_caches = tree_caches[row_idx]
+    row = []
+    for col_caches in tree_caches[row_idx:]:
+        row.append([_calculate_tree_shape_kernel(c1, c2, *kernel_args) for c1, c2 in zip(row_caches, col_caches)])
+    return row
+
 def _bipartition_difference(
         tree1,
         tree2,
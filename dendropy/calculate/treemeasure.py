@@ -63,7 +63,7 @@ def B1(tree):
     """
     b1 = 0.0
     nd_mi = {}
-    for nd in tree.postorder_node_iter():
+    for nd in tree.postorder_nodes():
         if nd._parent_node is None:
             continue
         child_nodes = nd._child_nodes
@@ -97,7 +97,7 @@ def colless_tree_imbalance(tree, normalize="max"):
     colless = 0.0
     num_leaves = 0
     subtree_leaves = {}
-    for nd in tree.postorder_node_iter():
+    for nd in tree.postorder_nodes():
         if nd.is_leaf():
             subtree_leaves[nd] = 1
             num_leaves += 1
@@ -151,7 +151,7 @@ def pybus_harvey_gamma(tree, prec=0.00001):
     n = 0
     if tree.seed_node.age is None:
         tree.calc_node_ages(ultrametricity_precision=prec)
-    for node in tree.postorder_node_iter():
+    for node in tree.postorder_nodes():
         if len(node.child_nodes()) == 2:
             speciation_ages.append(node.age)
         else:
@@ -188,7 +188,7 @@ def N_bar(tree):
     """
     leaf_count = 0
     nbar = 0
-    for leaf_node in tree.leaf_node_iter():
+    for leaf_node in tree.leaf_nodes():
         leaf_count += 1
         for parent in leaf_node.ancestor_iter(inclusive=False):
             nbar += 1
@@ -214,7 +214,7 @@ def sackin_index(tree, normalize=True):
     """
     leaf_count = 0
     num_anc = 0
-    for leaf_node in tree.leaf_node_iter():
+    for leaf_node in tree.leaf_nodes():
         leaf_count += 1
         for parent in leaf_node.ancestor_iter(inclusive=False):
             num_anc += 1
@@ -238,7 +238,7 @@ def treeness(tree):
     """
     internal = 0.0
     external = 0.0
-    for nd in tree.postorder_node_iter():
+    for nd in tree.postorder_nodes():
         if not nd._parent_node:
             continue
         if nd.is_leaf():
@@ -25,6 +25,12 @@ import collections
 import dendropy
 from dendropy.datamodel import taxonmodel
 from dendropy.calculate.statistics import mean_and_sample_variance
+from dendropy.calculate.statistics import StreamingSummary
+
+def _mean(values):
+    if isinstance(values, StreamingSummary):
+        return values.mean
+    return float(sum(values))/len(values)
 
 ##############################################################################
 ## TreeSummarizer
@@ -234,14 +240,16 @@ class TreeSummarizer(object):
         same node on the input trees (in ``split_distribution``, a
         `SplitDistribution` object) being summarized.
         ``summarization_fn`` should take an iterable of floats, and return a float. If |None|, it
-        defaults to calculating the mean (``lambda x: float(sum(x))/len(x)``).
+        defaults to calculating the mean (``lambda x: float(sum(x))/len(x)``, or,
+        for :class:`~dendropy.calculate.statistics.StreamingSummary` values, the
+        mean of all the values accumulated).
         If ``set_edge_lengths`` is |True|, then edge lengths will be set to so that the actual node ages
         correspond to the ``age`` attribute value.
         If ``collapse_negative_edges`` is True, then edge lengths with negative values will be set to 0.
         If ``allow_negative_edges`` is True, then no error will be raised if edges have negative lengths.
         """
         if summarization_fn is None:
-            summarization_fn = lambda x: float(sum(x))/len(x)
+            summarization_fn = _mean
         if is_bipartitions_updated:
             tree.encode_splits()
         #'height',
@@ -281,10 +289,12 @@ class TreeSummarizer(object):
         ``split_distribution``, a `SplitDistribution` object) being
         summarized.
         ``summarization_fn`` should take an iterable of floats, and return a float. If |None|, it
-        defaults to calculating the mean (``lambda x: float(sum(x))/len(x)``).
+        defaults to calculating the mean (``lambda x: float(sum(x))/len(x)``, or,
+        for :class:`~dendropy.calculate.statistics.StreamingSummary` values, the
+        mean of all the values accumulated).
         """
         if summarization_fn is None:
-            summarization_fn = lambda x: float(sum(x))/len(x)
+            summarization_fn = _mean
         if not is_bipartitions_updated:
             tree.encode_bipartitions()
         for edge in tree.postorder_edge_iter():
@@ -17,19 +17,7 @@
 ##############################################################################
 
 import collections
-from dendropy.dataio import newickreader
-from dendropy.dataio import newickwriter
-from dendropy.dataio import newickyielder
-from dendropy.dataio import fastareader
-from dendropy.dataio import fastawriter
-from dendropy.dataio import nexusreader
-from dendropy.dataio import nexuswriter
-from dendropy.dataio import nexusyielder
-from dendropy.dataio import nexmlreader
-from dendropy.dataio import nexmlwriter
-from dendropy.dataio import nexmlyielder
-from dendropy.dataio import phylipreader
-from dendropy.dataio import phylipwriter
+import importlib
 from dendropy.utility import container
 
 _IOServices = collections.namedtuple(
@@ -37,22 +25,40 @@ _IOServices = collections.namedtuple(
         ["reader", "writer", "tree_yielder"]
         )
 
+## Built-in services are given as "<module>.<class>" references, relative to
+## this package, so that their modules are only imported when the
+## corresponding schema is first requested; services added through
+## ``register_service()`` and friends are given directly as classes.
 _IO_SERVICE_REGISTRY = container.CaseInsensitiveDict()
-_IO_SERVICE_REGISTRY["newick"] = _IOServices(newickreader.NewickReader, newickwriter.NewickWriter, newickyielder.NewickTreeDataYielder)
-_IO_SERVICE_REGISTRY["nexus"] = _IOServices(nexusreader.NexusReader, nexuswriter.NexusWriter, nexusyielder.NexusTreeDataYielder)
-_IO_SERVICE_REGISTRY["nexus/newick"] = _IOServices(None, None, nexusyielder.NexusNewickTreeDataYielder)
-_IO_SERVICE_REGISTRY["nexml"] = _IOServices(nexmlreader.NexmlReader, nexmlwriter.NexmlWriter, nexmlyielder.NexmlTreeDataYielder)
-_IO_SERVICE_REGISTRY["fasta"] = _IOServices(fastareader.FastaReader, fastawriter.FastaWriter, None)
-_IO_SERVICE_REGISTRY["dnafasta"] = _IOServices(fastareader.DnaFastaReader, fastawriter.FastaWriter, None)
-_IO_SERVICE_REGISTRY["rnafasta"] = _IOServices(fastareader.RnaFastaReader, fastawriter.FastaWriter, None)
-_IO_SERVICE_REGISTRY["proteinfasta"] = _IOServices(fastareader.ProteinFastaReader, fastawriter.FastaWriter, None)
-_IO_SERVICE_REGISTRY["phylip"] = _IOServices(phylipreader.PhylipReader, phylipwriter.PhylipWriter, None)
+_IO_SERVICE_REGISTRY["newick"] = _IOServices("newickreader.NewickReader", "newickwriter.NewickWriter", "newickyielder.NewickTreeDataYielder")
+_IO_SERVICE_REGISTRY["nexus"] = _IOServices("nexusreader.NexusReader", "nexuswriter.NexusWriter", "nexusyielder.NexusTreeDataYielder")
+_IO_SERVICE_REGISTRY["nexus/newick"] = _IOServices(None, None, "nexusyielder.NexusNewickTreeDataYielder")
+_IO_SERVICE_REGISTRY["nexml"] = _IOServices("nexmlreader.NexmlReader", "nexmlwriter.NexmlWriter", "nexmlyielder.NexmlTreeDataYielder")
+_IO_SERVICE_REGISTRY["fasta"] = _IOServices("fastareader.FastaReader", "fastawriter.FastaWriter", None)
+_IO_SERVICE_REGISTRY["dnafasta"] = _IOServices("fastareader.DnaFastaReader", "fastawriter.FastaWriter", None)
+_IO_SERVICE_REGISTRY["rnafasta"] = _IOServices("fastareader.RnaFastaReader", "fastawriter.FastaWriter", None)
+_IO_SERVICE_REGISTRY["proteinfasta"] = _IOServices("fastareader.ProteinFastaReader", "fastawriter.FastaWriter", None)
+_IO_SERVICE_REGISTRY["phylip"] = _IOServices("phylipreader.PhylipReader", "phylipwriter.PhylipWriter", None)
+
+def _get_service_type(schema, service):
+    """
+    Returns the class providing ``service`` ("reader", "writer", or
+    "tree_yielder") for ``schema``, importing its module if needed. Raises
+    ``KeyError`` if ``schema`` is not registered or does not provide
+    ``service``.
+    """
+    service_type = getattr(_IO_SERVICE_REGISTRY[schema], service)
+    if service_type is None:
+        raise KeyError(schema)
+    if isinstance(service_type, str):
+        module_name, class_name = service_type.rsplit(".", 1)
+        module = importlib.import_module("{}.{}".format(__name__, module_name))
+        service_type = getattr(module, class_name)
+    return service_type
 
 def get_reader(schema, **kwargs):
     try:
-        reader_type =_IO_SERVICE_REGISTRY[schema].reader
-        if reader_type is None:
-            raise KeyError
+        reader_type = _get_service_type(schema, "reader")
         reader = reader_type(**kwargs)
         return reader
     except KeyError:
@@ -62,9 +68,7 @@ def get_writer(
         schema,
         **kwargs):
     try:
-        writer_type =_IO_SERVICE_REGISTRY[schema].writer
-        if writer_type is None:
-            raise KeyError
+        writer_type = _get_service_type(schema, "writer")
         writer = writer_type(**kwargs)
         return writer
     except KeyError:
@@ -77,9 +81,7 @@ def get_tree_yielder(
         tree_type,
         **kwargs):
     try:
-        yielder_type =_IO_SERVICE_REGISTRY[schema].tree_yielder
-        if yielder_type is None:
-            raise KeyError
+        yielder_type = _get_service_type(schema, "tree_yielder")
         yielder = yielder_type(
                 files=files,
                 taxon_namespace=taxon_namespace,
@@ -20,13 +20,88 @@
 Implementation of FASTA-format data reader.
 """
 
+import re
+import array
 from dendropy.dataio import ioservice
 from dendropy.utility.error import DataParseError
 from dendropy.utility import deprecate
+from dendropy.utility import textprocessing
+
+class _FastaSymbolTranslator(object):
+    """
+    Translates the text of sequences into the indexes of the corresponding
+    states of a state alphabet.
+
+    For alphabets of fewer than 255 states, the text is translated in a single
+    pass through a lookup table of ASCII symbols, removing whitespace at the
+    same time. Otherwise, or if the text has characters that are not
+    recognized, each character is looked up individually.
+    """
+
+    WHITESPACE = b" \t\n\r\x0b\x0c"
+    # Value of unrecognized symbols in the lookup table.
+    UNRECOGNIZED_INDEX = 0xFF
+
+    def __init__(self, state_alphabet):
+        self.index_states = list(state_alphabet.states)
+        self.symbol_state_map = state_alphabet.full_symbol_state_map
+        if len(self.index_states) < self.UNRECOGNIZED_INDEX:
+            self.typecode = "B"
+            table = bytearray([self.UNRECOGNIZED_INDEX]) * 256
+            for symbol, state in self.symbol_state_map.items():
+                if (textprocessing.is_str_type(symbol)
+                        and len(symbol) == 1
+                        and ord(symbol) < 128
+                        and not symbol.isspace()):
+                    table[ord(symbol)] = state.index
+            self.table = bytes(table)
+        else:
+            self.typecode = "H"
+            self.table = None
+
+    def translate(self, text):
+        """
+        Returns an ``array`` of the indexes of the states of the symbols in
+        ``text``, ignoring whitespace. Raises a KeyError with the offset of the
+        first unrecognized symbol in ``text`` if there is one.
+        """
+        if self.table is not None:
+            try:
+                if not isinstance(text, bytes):
+                    encoded = text.encode("ascii")
+                else:
+                    encoded = text
+            except UnicodeError:
+                encoded = None
+            if encoded is not None:
+                state_indexes = encoded.translate(self.table, self.WHITESPACE)
+                if b"\xff" not in state_indexes:
+                    return array.array(self.typecode, state_indexes)
+        state_indexes = array.array(self.typecode)
+        symbol_state_map = self.symbol_state_map
+        for offset, c in enumerate(text):
+            if c.isspace():
+                continue
+            try:
+                state_indexes.append(symbol_state_map[c].index)
+            except KeyError:
+                raise KeyError(offset)
+        return state_indexes
 
 class FastaReader(ioservice.DataReader):
     "Encapsulates loading and parsing of a FASTA format file."
 
+    # Number of characters read from the source at a time.
+    chunk_size = 1 << 20
+
+    # A sequence name line, with any leading whitespace (i.e., any characters
+    # that ``strip()`` removes, which, for text, includes non-ASCII
+    # whitespace).
+    header_pattern = re.compile(r"^[^\S\n]*>([^\n]*)$", re.M | re.U)
+    # The same, for (Python 2) byte strings, of which ``strip()`` only removes
+    # ASCII whitespace.
+    bytes_header_pattern = re.compile(br"^[^\S\n]*>([^\n]*)$", re.M)
+
     def __init__(self, **kwargs):
         """
         Keyword Arguments
@@ -71,41 +146,109 @@ class FastaReader(ioservice.DataReader):
                     self.data_type,
                     label=None,
                     taxon_namespace=taxon_namespace)
-        symbol_state_map = char_matrix.default_state_alphabet.full_symbol_state_map
+        state_alphabet = char_matrix.default_state_alphabet
+        index_states = state_alphabet.states
+        translator = _FastaSymbolTranslator(state_alphabet)
         curr_vec = None
-        curr_taxon = None
-        for line_index, line in enumerate(stream):
-            s = line.strip()
-            if not s:
-                continue
-            if s.startswith('>'):
-                name = s[1:].strip()
-                curr_taxon = taxon_namespace.require_taxon(label=name)
-                if curr_taxon in char_matrix:
-                    raise DataParseError(message="FASTA error: Repeated sequence name ('{}') found".format(name), line_num=line_index + 1, stream=stream)
-                if curr_vec is not None and len(curr_vec) == 0:
-                    raise DataParseError(message="FASTA error: Expected sequence, but found another sequence name ('{}')".format(name), line_num=line_index + 1, stream=stream)
-                curr_vec = char_matrix[curr_taxon]
-            elif curr_vec is None:
-                raise DataParseError(message="FASTA error: Expecting a lines starting with > before sequences", line_num=line_index + 1, stream=stream)
+        for name, line_index, text in self._iter_raw_records(stream):
+            curr_taxon = taxon_namespace.require_taxon(label=name)
+            if curr_taxon in char_matrix:
+                raise DataParseError(message="FASTA error: Repeated sequence name ('{}') found".format(name), line_num=line_index + 1, stream=stream)
+            if curr_vec is not None and len(curr_vec) == 0:
+                raise DataParseError(message="FASTA error: Expected sequence, but found another sequence name ('{}')".format(name), line_num=line_index + 1, stream=stream)
+            curr_vec = char_matrix[curr_taxon]
+            state_indexes = self._translate_sequence_text(translator, text, line_index, stream)
+            if getattr(curr_vec, "state_alphabet", None) is state_alphabet:
+                curr_vec.extend_state_indexes(state_indexes)
             else:
-                states = []
-                for col_ind, c in enumerate(s):
-                    c = c.strip()
-                    if not c:
-                        continue
-                    try:
-                        state = symbol_state_map[c]
-                    except KeyError:
-                        raise DataParseError(message="Unrecognized sequence symbol '{}'".format(c), line_num=line_index + 1, col_num=col_ind + 1, stream=stream)
-                    states.append(state)
-                curr_vec.extend(states)
+                curr_vec.extend([index_states[idx] for idx in state_indexes])
         product = self.Product(
                 taxon_namespaces=None,
                 tree_lists=None,
                 char_matrices=[char_matrix])
         return product
 
+    def _iter_sequence_records(self, stream, state_alphabet):
+        """
+        Iterates over the sequences in ``stream``, yielding for each a tuple of
+        its name, an ``array`` of the indexes of its states in
+        ``state_alphabet``, and the (0-based) index of its name line.
+        """
+        translator = _FastaSymbolTranslator(state_alphabet)
+        state_indexes = None
+        for name, line_index, text in self._iter_raw_records(stream):
+            if state_indexes is not None and len(state_indexes) == 0:
+                raise DataParseError(message="FASTA error: Expected sequence, but found another sequence name ('{}')".format(name), line_num=line_index + 1, stream=stream)
+            state_indexes = self._translate_sequence_text(translator, text, line_index, stream)
+            yield name, state_indexes, line_index
+
+    def _translate_sequence_text(self, translator, text, line_index, stream):
+        """
+        Returns an ``array`` of the indexes of the states of the symbols in
+        ``text``, the text of the sequence with its name on line
+        ``line_index`` (0-based).
+        """
+        try:
+            return translator.translate(text)
+        except KeyError as e:
+            offset = e.args[0]
+            line_start = text.rfind("\n", 0, offset) + 1
+            raise DataParseError(message="Unrecognized sequence symbol '{}'".format(text[offset]),
+                    line_num=line_index + text.count("\n", 0, offset) + 1,
+                    col_num=len(text[line_start:offset].lstrip()) + 1,
+                    stream=stream)
+
+    def _iter_raw_records(self, stream):
+        """
+        Iterates over the sequences in ``stream``, reading it in blocks of
+        ``chunk_size`` characters, and yielding for each sequence a tuple of
+        its name, the (0-based) index of its name line, and the text of the
+        sequence (starting from the end of the name line).
+        """
+        name = None
+        name_line_index = None
+        parts = []
+        line_index = 0
+        pending = ""
+        while pending is not None:
+            chunk = stream.read(self.chunk_size)
+            if chunk:
+                text = pending + chunk
+                end = text.rfind("\n") + 1
+                if end == 0:
+                    pending = text
+                    continue
+                pending = text[end:]
+                text = text[:end]
+            else:
+                text = pending
+                pending = None
+            if isinstance(text, bytes):
+                header_pattern = self.bytes_header_pattern
+            else:
+                header_pattern = self.header_pattern
+            pos = 0
+            for match in header_pattern.finditer(text):
+                self._add_sequence_text(text[pos:match.start()], name, parts, line_index, stream)
+                line_index += text.count("\n", pos, match.start())
+                if name is not None:
+                    yield name, name_line_index, "".join(parts)
+                name = match.group(1).strip()
+                name_line_index = line_index
+                parts = []
+                pos = match.end()
+            self._add_sequence_text(text[pos:], name, parts, line_index, stream)
+            line_index += text.count("\n", pos)
+        if name is not None:
+            yield name, name_line_index, "".join(parts)
+
+    def _add_sequence_text(self, text, name, parts, line_index, stream):
+        if name is not None:
+            parts.append(text)
+        elif text and not text.isspace():
+            offset = len(text) - len(text.lstrip())
+            raise DataParseError(message="FASTA error: Expecting a lines starting with > before sequences", line_num=line_index + text.count("\n", 0, offset) + 1, stream=stream)
+
 
 class DnaFastaReader(FastaReader):
 
@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Implementation of FASTA-schema sequence iterator.
+"""
+
+from dendropy.dataio import ioservice
+from dendropy.dataio import fastareader
+
+class FastaSequenceDataYielder(ioservice.DataYielder):
+
+    def __init__(self,
+            files=None,
+            state_alphabet=None):
+        """
+        Iterates over the sequences of FASTA-formatted sources one at a time,
+        yielding for each a tuple of its name and an ``array`` of the indexes
+        of its states in ``state_alphabet``, without building a character
+        matrix.
+
+        Parameters
+        ----------
+        files : iterable of sources
+            Iterable of sources, which can either be strings specifying file
+            paths or file-like objects open for reading. If a source element is
+            a string then it is assumed to be a path to a file. Otherwise, the
+            source is assumed to be a file-like object.
+        state_alphabet : |StateAlphabet| instance
+            The state alphabet of the sequences.
+        """
+        ioservice.DataYielder.__init__(self, files=files)
+        if state_alphabet is None:
+            raise TypeError("'state_alphabet' must be specified")
+        self.state_alphabet = state_alphabet
+        self.fasta_reader = fastareader.FastaReader()
+
+    ###########################################################################
+    ## Implementation of DataYielder interface
+
+    def _yield_items_from_stream(self, stream):
+        for name, state_indexes, line_index in self.fasta_reader._iter_sequence_records(
+                stream=stream,
+                state_alphabet=self.state_alphabet):
+            yield name, state_indexes
@@ -181,6 +181,19 @@ class NewickReader(ioservice.DataReader):
         terminating_semicolon_required : boolean, default: |True|
             If |True| [default], then a tree statement that does not end in a
             semi-colon is an error. If |False|, then no error will be raised.
+        buffered_tokenizer : boolean, default: |False|
+            If |True|, then the data source will be read and tokenized in
+            large blocks rather than one character at a time. This is
+            considerably faster for large data sources, but results in the
+            source stream being read ahead of the current parse position.
+        bitmasks_only : boolean, default: |False|
+            If |True|, then, instead of a full tree structure, each tree
+            statement will be parsed into a |TreeSkeleton| object, which
+            records only the leafset bitmask, edge length and number of
+            children of each node. Node and tree comments, annotations and
+            labels are discarded, and ``finish_node_fn`` is not called. The
+            ``tree_factory`` used must return |TreeSkeleton| objects (e.g.,
+            as with :meth:`TreeSkeleton.yield_from_files()`).
         ignore_unrecognized_keyword_arguments : boolean, default: |False|
             If |True|, then unsupported or unrecognized keyword arguments will
             not result in an error. Default is |False|: unsupported keyword
@@ -254,6 +267,8 @@ class NewickReader(ioservice.DataReader):
         self.suppress_leaf_node_taxa = kwargs.pop("suppress_external_node_taxa", False) # legacy (will be deprecated)
         self.suppress_leaf_node_taxa = kwargs.pop("suppress_leaf_node_taxa", self.suppress_leaf_node_taxa)
         self.terminating_semicolon_required = kwargs.pop("terminating_semicolon_required", True)
+        self.buffered_tokenizer = kwargs.pop("buffered_tokenizer", False)
+        self.bitmasks_only = kwargs.pop("bitmasks_only", False)
         self.check_for_unused_keyword_arguments(kwargs)
 
         # per-tree book-keeping
@@ -285,7 +300,8 @@ class NewickReader(ioservice.DataReader):
             data in ``stream``.
         """
         nexus_tokenizer = nexusprocessing.NexusTokenizer(stream,
-                preserve_unquoted_underscores=self.preserve_unquoted_underscores)
+                preserve_unquoted_underscores=self.preserve_unquoted_underscores,
+                buffered=self.buffered_tokenizer)
         while True:
             tree = self._parse_tree_statement(
                     nexus_tokenizer=nexus_tokenizer,
@@ -366,12 +382,19 @@ class NewickReader(ioservice.DataReader):
         self._process_tree_comments(tree, tree_comments, nexus_tokenizer)
         self._tree_statement_complete = False
         self._seen_taxa = set()
-        self._parse_tree_node_description(
-                nexus_tokenizer=nexus_tokenizer,
-                tree=tree,
-                current_node=tree.seed_node,
-                taxon_symbol_map_fn=taxon_symbol_map_fn,
-                is_internal_node=None)
+        if self.bitmasks_only:
+            self._parse_tree_skeleton_node_description(
+                    nexus_tokenizer=nexus_tokenizer,
+                    tree_skeleton=tree,
+                    taxon_symbol_map_fn=taxon_symbol_map_fn,
+                    is_internal_node=None)
+        else:
+            self._parse_tree_node_description(
+                    nexus_tokenizer=nexus_tokenizer,
+                    tree=tree,
+                    current_node=tree.seed_node,
+                    taxon_symbol_map_fn=taxon_symbol_map_fn,
+                    is_internal_node=None)
         current_token = nexus_tokenizer.current_token
         if not self._tree_statement_complete:
             raise NewickReader.NewickReaderIncompleteTreeStatementError(
@@ -435,6 +458,8 @@ class NewickReader(ioservice.DataReader):
                     exc.__context__ = None # Python 3.0, 3.1, 3.2
                     exc.__cause__ = None # Python 3.3, 3.4
                     raise exc
+            elif self.bitmasks_only:
+                pass
             elif self.extract_comment_metadata and comment.startswith("&"):
                 annotations = nexusprocessing.parse_comment_metadata_to_annotations(
                     comment=comment)
@@ -668,6 +693,148 @@ class NewickReader(ioservice.DataReader):
         self._finish_node(current_node)
         return current_node
 
+    def _parse_tree_skeleton_node_description(
+            self,
+            nexus_tokenizer,
+            tree_skeleton,
+            taxon_symbol_map_fn,
+            is_internal_node=None):
+        """
+        As :meth:`NewickReader._parse_tree_node_description()`, but, instead
+        of populating a |Node|, adds the node (after all its children) to
+        ``tree_skeleton``, and returns its leafset bitmask. Comments are
+        discarded.
+        """
+        nexus_tokenizer.clear_captured_comments()
+        leafset_bitmask = 0
+        num_child_nodes = 0
+        if nexus_tokenizer.current_token == "(":
+            nexus_tokenizer.require_next_token()
+            node_created = False
+            while True:
+                if nexus_tokenizer.current_token == ",":
+                    if not node_created:
+                        # blank node
+                        nexus_tokenizer.clear_captured_comments()
+                        tree_skeleton.add_node(0)
+                        num_child_nodes += 1
+                    nexus_tokenizer.require_next_token()
+                    while nexus_tokenizer.current_token == ",":
+                        # another blank node
+                        nexus_tokenizer.clear_captured_comments()
+                        tree_skeleton.add_node(0)
+                        num_child_nodes += 1
+                        nexus_tokenizer.require_next_token()
+                    if not node_created and nexus_tokenizer.current_token == ")":
+                        # end of node
+                        nexus_tokenizer.clear_captured_comments()
+                        tree_skeleton.add_node(0)
+                        num_child_nodes += 1
+                        node_created = True
+                elif nexus_tokenizer.current_token == ")":
+                    # end of child nodes
+                    self._parenthesis_nesting_level -= 1
+                    nexus_tokenizer.require_next_token()
+                    break
+                else:
+                    if nexus_tokenizer.current_token == "(":
+                        self._parenthesis_nesting_level += 1
+                        is_new_internal_node = True
+                    else:
+                        is_new_internal_node = False
+                    leafset_bitmask |= self._parse_tree_skeleton_node_description(
+                            nexus_tokenizer=nexus_tokenizer,
+                            tree_skeleton=tree_skeleton,
+                            taxon_symbol_map_fn=taxon_symbol_map_fn,
+                            is_internal_node=is_new_internal_node,
+                            )
+                    num_child_nodes += 1
+                    node_created = True
+        label_parsed = False
+        self._tree_statement_complete = False
+        if is_internal_node is None and num_child_nodes:
+            is_internal_node = True
+        edge_length = None
+        while True:
+            nexus_tokenizer.clear_captured_comments()
+            if nexus_tokenizer.current_token == ":":
+                nexus_tokenizer.require_next_token()
+                if not self.suppress_edge_lengths:
+                    try:
+                        edge_length = self.edge_length_type(nexus_tokenizer.current_token)
+                    except ValueError:
+                        raise NewickReader.NewickReaderMalformedStatementError(
+                                message="Invalid edge length: '{}'".format(nexus_tokenizer.current_token),
+                                line_num=nexus_tokenizer.token_line_num,
+                                col_num=nexus_tokenizer.token_column_num,
+                                stream=nexus_tokenizer.src)
+                try:
+                    nexus_tokenizer.require_next_token()
+                except tokenizer.Tokenizer.UnexpectedEndOfStreamError as e:
+                    if self.terminating_semicolon_required:
+                        message = e.message + ". (Perhaps the terminating semicolon for the tree statement is missing? If so, add a semicolon to the tree statement or specify 'terminating_semicolon_required=False' to allow for missing semicolons)"
+                        raise tokenizer.Tokenizer.UnexpectedEndOfStreamError(
+                                message=message,
+                                line_num=e.line_num,
+                                col_num=e.col_num,
+                                stream=e.stream)
+                    else:
+                        self._tree_statement_complete = True
+                        break
+            elif nexus_tokenizer.current_token == ")" or nexus_tokenizer.current_token == ",":
+                # end of this node
+                tree_skeleton.add_node(leafset_bitmask, edge_length, num_child_nodes)
+                return leafset_bitmask
+            elif nexus_tokenizer.current_token == ";":
+                # end of tree statement
+                self._tree_statement_complete = True
+                nexus_tokenizer.next_token()
+                break
+            elif nexus_tokenizer.current_token == "(":
+                self._parenthesis_nesting_level += 1
+                raise NewickReader.NewickReaderMalformedStatementError(
+                        message="Malformed tree statement",
+                        line_num=nexus_tokenizer.token_line_num,
+                        col_num=nexus_tokenizer.token_column_num,
+                        stream=nexus_tokenizer.src)
+            else:
+                if label_parsed:
+                    raise NewickReader.NewickReaderMalformedStatementError(
+                            message="Expecting ':', ')', ',' or ';' after reading label but found '{}'".format(nexus_tokenizer.current_token),
+                            line_num=nexus_tokenizer.token_line_num,
+                            col_num=nexus_tokenizer.token_column_num,
+                            stream=nexus_tokenizer.src)
+                label = nexus_tokenizer.current_token
+                if not ( (is_internal_node and self.suppress_internal_node_taxa)
+                        or ((not is_internal_node) and self.suppress_leaf_node_taxa) ):
+                    node_taxon = taxon_symbol_map_fn(label)
+                    if node_taxon in self._seen_taxa:
+                        raise NewickReader.NewickReaderDuplicateTaxonError(
+                                message=node_taxon.label,
+                                line_num=nexus_tokenizer.token_line_num,
+                                col_num=nexus_tokenizer.token_column_num,
+                                stream=nexus_tokenizer.src)
+                    self._seen_taxa.add(node_taxon)
+                    if not num_child_nodes:
+                        leafset_bitmask = tree_skeleton.taxon_namespace.taxon_bitmask(node_taxon)
+                label_parsed = True
+                try:
+                    nexus_tokenizer.require_next_token()
+                except tokenizer.Tokenizer.UnexpectedEndOfStreamError:
+                    if self.terminating_semicolon_required:
+                        raise
+                    else:
+                        break
+        ## if we are here, we have reached the end of the tree
+        if self._parenthesis_nesting_level != 0:
+            raise NewickReader.NewickReaderMalformedStatementError(
+                    message="Unbalanced parentheses at tree statement termination: balance index = {}".format(self._parenthesis_nesting_level),
+                    line_num=nexus_tokenizer.token_line_num,
+                    col_num=nexus_tokenizer.token_column_num,
+                    stream=nexus_tokenizer.src)
+        tree_skeleton.add_node(leafset_bitmask, edge_length, num_child_nodes)
+        return leafset_bitmask
+
     def _finish_node(self, node):
         if self.finish_node_fn is not None:
             self.finish_node_fn(node)
@@ -59,7 +59,8 @@ class NewickTreeDataYielder(ioservice.TreeDataYielder):
 
     def _yield_items_from_stream(self, stream):
         nexus_tokenizer = nexusprocessing.NexusTokenizer(stream,
-                preserve_unquoted_underscores=self.newick_reader.preserve_unquoted_underscores)
+                preserve_unquoted_underscores=self.newick_reader.preserve_unquoted_underscores,
+                buffered=self.newick_reader.buffered_tokenizer)
         taxon_symbol_mapper = nexusprocessing.NexusTaxonSymbolMapper(
                 taxon_namespace=self.attached_taxon_namespace,
                 enable_lookup_by_taxon_number=True,
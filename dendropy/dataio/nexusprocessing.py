@@ -25,6 +25,7 @@ import io
 import itertools
 import numbers
 import decimal
+import mmap
 from dendropy.dataio.tokenizer import Tokenizer
 from dendropy.utility import textprocessing
 from dendropy.utility import container
@@ -36,7 +37,8 @@ from dendropy.datamodel import basemodel
 class NexusTokenizer(Tokenizer):
 
     def __init__(self, src,
-            preserve_unquoted_underscores=False):
+            preserve_unquoted_underscores=False,
+            buffered=False):
         Tokenizer.__init__(self,
             src=src,
             uncaptured_delimiters=list(" \t\n\r"),
@@ -47,7 +49,8 @@ class NexusTokenizer(Tokenizer):
             comment_begin="[",
             comment_end="]",
             capture_comments=True,
-            preserve_unquoted_underscores=preserve_unquoted_underscores)
+            preserve_unquoted_underscores=preserve_unquoted_underscores,
+            buffered=buffered)
         # self.preserve_unquoted_underscores = preserve_unquoted_underscores
 
     # def __next__(self):
@@ -84,6 +87,7 @@ class NexusTokenizer(Tokenizer):
                 self.uncaptured_delimiters.append("\n")
             if "\r" not in self.uncaptured_delimiters:
                 self.uncaptured_delimiters.append("\r")
+        self.reset_delimiters()
 
     def set_hyphens_as_captured_delimiters(self, hyphens_as_captured_delimiters):
         if hyphens_as_captured_delimiters:
@@ -94,6 +98,7 @@ class NexusTokenizer(Tokenizer):
                 self.captured_delimiters.remove("-")
             except ValueError:
                 pass
+        self.reset_delimiters()
 
     def require_next_token_ucase(self):
         t = self.require_next_token()
@@ -533,3 +538,280 @@ def get_rooting_argument(**kwargs):
         return "force-unrooted"
     else:
         return "default-unrooted"
+
+##############################################################################
+## Tree Source Partitioning
+
+class TreeSourceChunk(object):
+    """
+    A contiguous run of tree statements from a NEXUS or Newick file, together
+    with whatever leading text (e.g., the TAXA block and TRANSLATE statement
+    of a NEXUS file) is needed to parse them independently of the rest of the
+    file.
+    """
+
+    def __init__(self,
+            path,
+            preamble_end,
+            start,
+            end,
+            suffix,
+            first_tree_index,
+            num_trees):
+        self.path = path
+        self.preamble_end = preamble_end
+        self.start = start
+        self.end = end
+        self.suffix = suffix
+        self.first_tree_index = first_tree_index
+        self.num_trees = num_trees
+
+    def __str__(self):
+        return "{} (trees {} to {})".format(
+                self.path,
+                self.first_tree_index + 1,
+                self.first_tree_index + self.num_trees)
+
+    def read(self):
+        """
+        Returns the text of this chunk as a string that can be parsed as a
+        complete NEXUS or Newick data source.
+        """
+        with open(self.path, "rb") as src:
+            data = src.read(self.preamble_end)
+            src.seek(self.start)
+            data = data + src.read(self.end - self.start) + self.suffix
+        return textprocessing.bytes_to_text(data)
+
+    def open(self):
+        """
+        Returns a file-like object wrapping the text of this chunk.
+        """
+        stream = textprocessing.StringIO(self.read())
+        stream.name = str(self)
+        return stream
+
+class TreeSourceIndex(object):
+    """
+    Locates the tree statements in a NEXUS or Newick file so that the file
+    can be split into chunks that are parsed separately (e.g., by different
+    processes).
+
+    Only the statement boundaries are established: nothing is tokenized or
+    parsed. A NEXUS file can be indexed only if it has a single TREES block
+    in which all the tree statements are consecutive. Use
+    :meth:`TreeSourceIndex.from_path()` to construct an instance.
+    """
+
+    _STATEMENT_BOUNDARY_PATTERN = re.compile(br"'[^']*'|\[[^\[\]]*\]|[;\[']")
+    _NESTED_COMMENT_PATTERN = re.compile(br"[\[\]]")
+    _STATEMENT_KEYWORDS_PATTERN = re.compile(br"(?:\s|\[[^\[\]]*\]|#nexus\b)*(\w*)(?:\s|\[[^\[\]]*\])*(\w*)", re.IGNORECASE)
+    _EMPTY_STATEMENT_PATTERN = re.compile(br"(?:\s|\[[^\[\]]*\])*(?:;|\Z)")
+    _NEXUS_HEADER_PATTERN = re.compile(br"(?:\s|\[[^\[\]]*\])*#nexus", re.IGNORECASE)
+
+    @classmethod
+    def from_path(cls, path, schema):
+        """
+        Indexes the tree statements of the file given by ``path``.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+        schema : str
+            One of "nexus", "newick", or "nexus/newick".
+
+        Returns
+        -------
+        i : |TreeSourceIndex| or |None|
+            The index, or |None| if the schema is not supported or the
+            layout of the file does not allow it to be split on tree statement
+            boundaries (in which case the file should be read as a whole).
+        """
+        if schema not in ("nexus", "newick", "nexus/newick"):
+            return None
+        with open(path, "rb") as src:
+            try:
+                buf = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, EnvironmentError):
+                # empty file, or not a regular file
+                return None
+            try:
+                if schema == "nexus/newick":
+                    is_nexus = cls._NEXUS_HEADER_PATTERN.match(buf) is not None
+                else:
+                    is_nexus = schema == "nexus"
+                statement_ends = cls._find_statement_ends(buf)
+                if statement_ends is None:
+                    return None
+                if is_nexus:
+                    return cls._index_nexus_statements(path, buf, statement_ends)
+                else:
+                    return cls._index_newick_statements(path, buf, statement_ends)
+            finally:
+                buf.close()
+
+    @classmethod
+    def _find_statement_ends(cls, buf):
+        # Returns the offsets just past each ';' that is not quoted or
+        # commented out, or |None| if the file ends in an unterminated quote
+        # or comment or has trailing text after its last statement.
+        statement_ends = []
+        search_boundary = cls._STATEMENT_BOUNDARY_PATTERN.search
+        search_comment = cls._NESTED_COMMENT_PATTERN.search
+        pos = 0
+        while True:
+            m = search_boundary(buf, pos)
+            if m is None:
+                break
+            token = m.group(0)
+            pos = m.end()
+            if token == b";":
+                statement_ends.append(pos)
+            elif token == b"[":
+                # nested comment
+                comment_depth = 1
+                while comment_depth > 0:
+                    m = search_comment(buf, pos)
+                    if m is None:
+                        return None
+                    pos = m.end()
+                    if m.group(0) == b"[":
+                        comment_depth += 1
+                    else:
+                        comment_depth -= 1
+            elif token == b"'":
+                # unterminated quote
+                return None
+        if statement_ends:
+            last_end = statement_ends[-1]
+        else:
+            last_end = 0
+        if not cls._is_empty_statement(buf, last_end, len(buf)):
+            return None
+        return statement_ends
+
+    @classmethod
+    def _is_empty_statement(cls, buf, start, end):
+        # True if there is nothing but whitespace and comments (and,
+        # possibly, the terminating ';') between ``start`` and ``end``.
+        m = cls._EMPTY_STATEMENT_PATTERN.match(buf, start)
+        return m is not None and m.end() == end
+
+    @classmethod
+    def _index_newick_statements(cls, path, buf, statement_ends):
+        tree_starts = []
+        trees_end = 0
+        start = 0
+        for end in statement_ends:
+            if not cls._is_empty_statement(buf, start, end):
+                tree_starts.append(start)
+                trees_end = end
+            start = end
+        return cls(path=path,
+                preamble_end=0,
+                tree_starts=tree_starts,
+                trees_end=trees_end,
+                suffix=b"")
+
+    @classmethod
+    def _index_nexus_statements(cls, path, buf, statement_ends):
+        trees_block_idx = None
+        tree_statement_idxs = []
+        start = 0
+        for statement_idx, end in enumerate(statement_ends):
+            m = cls._STATEMENT_KEYWORDS_PATTERN.match(buf, start)
+            keyword = m.group(1).lower()
+            if keyword == b"begin":
+                if m.group(2).lower() == b"trees":
+                    if trees_block_idx is not None:
+                        # multiple tree blocks
+                        return None
+                    trees_block_idx = statement_idx
+            elif keyword == b"tree" or keyword == b"utree":
+                if tree_statement_idxs and tree_statement_idxs[-1] != statement_idx - 1:
+                    # other statements interleaved with trees
+                    return None
+                tree_statement_idxs.append(statement_idx)
+            elif keyword == b"end" or keyword == b"endblock":
+                if trees_block_idx is not None and not tree_statement_idxs:
+                    # trees block closed before any tree statements
+                    return None
+            start = end
+        if trees_block_idx is None or not tree_statement_idxs:
+            return None
+        if tree_statement_idxs[0] < trees_block_idx:
+            return None
+        first_tree_idx = tree_statement_idxs[0]
+        if first_tree_idx == 0:
+            return None
+        tree_starts = [statement_ends[idx-1] for idx in tree_statement_idxs]
+        return cls(path=path,
+                preamble_end=tree_starts[0],
+                tree_starts=tree_starts,
+                trees_end=statement_ends[tree_statement_idxs[-1]],
+                suffix=b"\nEND;\n")
+
+    def __init__(self,
+            path,
+            preamble_end,
+            tree_starts,
+            trees_end,
+            suffix):
+        self.path = path
+        self.preamble_end = preamble_end
+        self.tree_starts = tree_starts
+        self.trees_end = trees_end
+        self.suffix = suffix
+
+    def __len__(self):
+        return len(self.tree_starts)
+
+    def chunk(self, start_index, stop_index):
+        """
+        Returns a |TreeSourceChunk| spanning the trees from ``start_index`` up
+        to, but not including, ``stop_index``.
+        """
+        if stop_index < len(self.tree_starts):
+            end = self.tree_starts[stop_index]
+        else:
+            end = self.trees_end
+        return TreeSourceChunk(
+                path=self.path,
+                preamble_end=self.preamble_end,
+                start=self.tree_starts[start_index],
+                end=end,
+                suffix=self.suffix,
+                first_tree_index=start_index,
+                num_trees=stop_index - start_index)
+
+    def partition(self, num_chunks, tree_offset=0):
+        """
+        Splits the trees into (at most) ``num_chunks`` chunks of consecutive
+        trees of (near-)equal size.
+
+        Parameters
+        ----------
+        num_chunks : int
+            Maximum number of chunks to return.
+        tree_offset : int
+            0-based index of the first tree to be included. Trees before this
+            (e.g., the burn-in) are not included in any chunk.
+
+        Returns
+        -------
+        c : list of |TreeSourceChunk| objects
+            The chunks, in the order of the trees in the file. This will be
+            empty if there are no trees at or beyond ``tree_offset``.
+        """
+        num_trees = len(self.tree_starts) - tree_offset
+        if num_trees <= 0:
+            return []
+        num_chunks = max(1, min(num_chunks, num_trees))
+        chunks = []
+        start_index = tree_offset
+        for chunk_idx in range(num_chunks):
+            stop_index = tree_offset + (num_trees * (chunk_idx + 1)) // num_chunks
+            chunks.append(self.chunk(start_index, stop_index))
+            start_index = stop_index
+        return chunks
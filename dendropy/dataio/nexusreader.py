@@ -256,6 +256,15 @@ class NexusReader(ioservice.DataReader):
         terminating_semicolon_required : boolean, default: |True|
             If |True| [default], then a tree statement that does not end in a
             semi-colon is an error. If |False|, then no error will be raised.
+        buffered_tokenizer : boolean, default: |False|
+            If |True|, then the data source will be read and tokenized in
+            large blocks rather than one character at a time. This is
+            considerably faster for large data sources, but results in the
+            source stream being read ahead of the current parse position.
+        bitmasks_only : boolean, default: |False|
+            If |True|, then tree statements will be parsed into
+            |TreeSkeleton| objects instead of full tree structures (see
+            :class:`NewickReader`).
         unconstrained_taxa_accumulation_mode : bool
             If |True|, then no error is raised even if the number of taxon
             names defined exceeds the number of declared taxa (as specified by
@@ -309,6 +318,7 @@ class NexusReader(ioservice.DataReader):
         self.preserve_underscores = kwargs.get('preserve_underscores', False)
         self.case_sensitive_taxon_labels = kwargs.get('case_sensitive_taxon_labels', False)
         self.extract_comment_metadata = kwargs.get('extract_comment_metadata', True)
+        self.buffered_tokenizer = kwargs.get('buffered_tokenizer', False)
 
         # As above, but the NEXUS format default is different from the NEWICK
         # default, so this rather convoluted approach
@@ -544,7 +554,8 @@ class NexusReader(ioservice.DataReader):
         "Main file parsing driver."
         if self._nexus_tokenizer is None:
             self.create_tokenizer(stream,
-                preserve_unquoted_underscores=self.preserve_underscores)
+                preserve_unquoted_underscores=self.preserve_underscores,
+                buffered=self.buffered_tokenizer)
         else:
             self._nexus_tokenizer.set_stream(stream)
         token = self._nexus_tokenizer.next_token()
@@ -994,8 +1005,9 @@ class NexusReader(ioservice.DataReader):
         self._nexus_tokenizer.next_token()
         tree = self._build_tree_from_newick_tree_string(tree_factory, taxon_symbol_mapper)
         tree.label = tree_name
-        nexusprocessing.process_comments_for_item(tree, pre_tree_comments, self.extract_comment_metadata)
-        nexusprocessing.process_comments_for_item(tree, tree_comments, self.extract_comment_metadata)
+        if not self.newick_reader.bitmasks_only:
+            nexusprocessing.process_comments_for_item(tree, pre_tree_comments, self.extract_comment_metadata)
+            nexusprocessing.process_comments_for_item(tree, tree_comments, self.extract_comment_metadata)
         # if self.extract_comment_metadata:
         #     annotations = nexustokenizer.parse_comment_metadata(tree_comments)
         #     for annote in annotations:
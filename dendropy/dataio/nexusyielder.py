@@ -70,7 +70,8 @@ class NexusTreeDataYielder(
     def _yield_items_from_stream(self, stream):
         if self._nexus_tokenizer is None:
             self.create_tokenizer(stream,
-                preserve_unquoted_underscores=self.preserve_underscores)
+                preserve_unquoted_underscores=self.preserve_underscores,
+                buffered=self.buffered_tokenizer)
         else:
             self._nexus_tokenizer.set_stream(stream)
         token = self._nexus_tokenizer.next_token()
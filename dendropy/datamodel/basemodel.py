@@ -30,7 +30,6 @@ if not (sys.version_info.major >= 3 and sys.version_info.minor >= 4):
 from dendropy.utility import container
 from dendropy.utility import bibtex
 from dendropy.utility import textprocessing
-from dendropy.utility import urlio
 from dendropy.utility import error
 from dendropy.utility import deprecate
 
@@ -269,6 +268,7 @@ class Deserializable(object):
             New instance of object, constructed and populated from data given
             in source.
         """
+        from dendropy.utility import urlio
         text = urlio.read_url(src, strip_markup=strip_markup)
         ssrc = StringIO(text)
         try:
@@ -469,6 +469,7 @@ class MultiReadable(object):
                 - |CharacterMatrix|: number of sequences
                 - |DataSet|: ``tuple`` (number of taxon namespaces, number of tree lists, number of matrices)
         """
+        from dendropy.utility import urlio
         src_str = urlio.read_url(src)
         s = StringIO(src_str)
         return self._parse_and_add_from_stream(stream=s, schema=schema, **kwargs)
@@ -23,6 +23,10 @@ Character and character-sequence data structures.
 import warnings
 import copy
 import collections
+import array
+import bisect
+import itertools
+import weakref
 from dendropy.utility.textprocessing import StringIO
 from dendropy.utility import textprocessing
 from dendropy.utility import error
@@ -401,6 +405,29 @@ class CharacterDataSequence(
         """
         self._character_annotations[idx] = annotations
 
+    def _pad(self, value, count, append=True):
+        """
+        Adds ``count`` copies of ``value`` to the end of ``self`` if ``append``
+        is |True|, or to the front otherwise.
+        """
+        if append:
+            self._character_values.extend([value] * count)
+            self._character_types.extend([None] * count)
+            self._character_annotations.extend([None] * count)
+        else:
+            self._character_values[0:0] = [value] * count
+            self._character_types[0:0] = [None] * count
+            self._character_annotations[0:0] = [None] * count
+
+    def _retain(self, indexes):
+        """
+        Discards all elements of ``self`` other than those at the (valid,
+        sorted and unique) indexes given by ``indexes``.
+        """
+        self._character_values = [self._character_values[idx] for idx in indexes]
+        self._character_types = [self._character_types[idx] for idx in indexes]
+        self._character_annotations = [self._character_annotations[idx] for idx in indexes]
+
 ###############################################################################
 ## Subset of Character (Columns)
 
@@ -515,12 +542,17 @@ class CharacterMatrix(
                 taxon_namespace.label = label
             return taxon_namespace
         label = kwargs.pop("label", None)
+        is_state_index_coded = kwargs.pop("is_state_index_coded", False)
+        def char_matrix_factory(data_type, **matrix_kwargs):
+            if is_state_index_coded and issubclass(get_char_matrix_type(data_type), FixedAlphabetCharacterMatrix):
+                matrix_kwargs["is_state_index_coded"] = True
+            return new_char_matrix(data_type, **matrix_kwargs)
         kwargs["data_type"] = cls.data_type
         reader = dataio.get_reader(schema, **kwargs)
         char_matrices = reader.read_char_matrices(
                 stream=stream,
                 taxon_namespace_factory=tns_factory,
-                char_matrix_factory=new_char_matrix,
+                char_matrix_factory=char_matrix_factory,
                 state_alphabet_factory=charstatemodel.StateAlphabet,
                 global_annotations_target=None)
         if len(char_matrices) == 0:
@@ -615,7 +647,8 @@ class CharacterMatrix(
         """
         taxon_namespace = char_matrices[0].taxon_namespace
         nseqs = len(char_matrices[0])
-        concatenated_chars = cls(taxon_namespace=taxon_namespace)
+        concatenated_chars = cls(taxon_namespace=taxon_namespace,
+                **char_matrices[0]._matrix_storage_kwargs())
         pos_start = 0
         for cidx, cm in enumerate(char_matrices):
             if cm.taxon_namespace is not taxon_namespace:
@@ -809,7 +842,8 @@ class CharacterMatrix(
 
     def __copy__(self):
         other = self.__class__(label=self.label,
-            taxon_namespace=self.taxon_namespace)
+            taxon_namespace=self.taxon_namespace,
+            **self._matrix_storage_kwargs())
         for taxon in self._taxon_sequence_map:
             # other._taxon_sequence_map[taxon] = self.__class__.character_sequence_type(self._taxon_sequence_map[taxon])
             other._taxon_sequence_map[taxon] = self._taxon_sequence_map[taxon]
@@ -818,6 +852,13 @@ class CharacterMatrix(
         other.deep_copy_annotations_from(self, memo)
         return other
 
+    def _matrix_storage_kwargs(self):
+        """
+        Keyword arguments to pass to the constructor of a new matrix so that it
+        stores its sequences in the same way as ``self``.
+        """
+        return {}
+
     def taxon_namespace_scoped_copy(self, memo=None):
         if memo is None:
             memo = {}
@@ -991,10 +1032,17 @@ class CharacterMatrix(
             raise ValueError("Character values vector for taxon {} already exists".format(repr(taxon)))
         if taxon not in self.taxon_namespace:
             raise ValueError("Taxon {} is not in object taxon namespace".format(repr(taxon)))
-        cv = self.__class__.character_sequence_type(values)
+        cv = self._new_character_sequence(values)
         self._taxon_sequence_map[taxon] = cv
         return cv
 
+    def _new_character_sequence(self, values=None):
+        """
+        Returns a new (unassociated) `CharacterDataSequence` of the type
+        managed by ``self``, populated with values in ``values``.
+        """
+        return self.__class__.character_sequence_type(values)
+
     def __getitem__(self, key):
         """
         Retrieves sequence for ``key``, which can be a index or a label of a
@@ -1054,7 +1102,7 @@ class CharacterMatrix(
         if taxon not in self.taxon_namespace:
             raise ValueError(repr(key))
         if not isinstance(values, self.__class__.character_sequence_type):
-            values = self.__class__.character_sequence_type(values)
+            values = self._new_character_sequence(values)
         self._taxon_sequence_map[taxon] = values
 
     def __contains__(self, key):
@@ -1276,11 +1324,8 @@ class CharacterMatrix(
             size = self.max_sequence_size
         for k in self:
             v = self[k]
-            while len(v) < size:
-                if append:
-                    v.append(value)
-                else:
-                    v.insert(0, value)
+            if len(v) < size:
+                v._pad(value, size - len(v), append=append)
         return size
 
     def fill_taxa(self):
@@ -1290,7 +1335,7 @@ class CharacterMatrix(
         """
         for taxon in self.taxon_namespace:
             if taxon not in self:
-                self[taxon] = CharacterDataSequence()
+                self.new_sequence(taxon)
 
     def pack(self, value=None, size=None, append=True):
         """
@@ -1340,7 +1385,7 @@ class CharacterMatrix(
             raise error.TaxonNamespaceIdentityError(self, other_matrix)
         for taxon in other_matrix._taxon_sequence_map:
             if taxon not in self._taxon_sequence_map:
-                self._taxon_sequence_map[taxon] = self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+                self._taxon_sequence_map[taxon] = self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
 
     def replace_sequences(self, other_matrix):
         """
@@ -1365,7 +1410,7 @@ class CharacterMatrix(
             raise error.TaxonNamespaceIdentityError(self, other_matrix)
         for taxon in other_matrix._taxon_sequence_map:
             if taxon in self._taxon_sequence_map:
-                self._taxon_sequence_map[taxon] = self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+                self._taxon_sequence_map[taxon] = self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
 
     def update_sequences(self, other_matrix):
         """
@@ -1391,7 +1436,7 @@ class CharacterMatrix(
         if other_matrix.taxon_namespace is not self.taxon_namespace:
             raise error.TaxonNamespaceIdentityError(self, other_matrix)
         for taxon in other_matrix._taxon_sequence_map:
-            self._taxon_sequence_map[taxon] = self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+            self._taxon_sequence_map[taxon] = self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
 
     def extend_sequences(self, other_matrix):
         """
@@ -1449,7 +1494,7 @@ class CharacterMatrix(
             if taxon in self._taxon_sequence_map:
                 self._taxon_sequence_map[taxon].extend(other_matrix._taxon_sequence_map[taxon])
             else:
-                self._taxon_sequence_map[taxon]= self.__class__.character_sequence_type(other_matrix._taxon_sequence_map[taxon])
+                self._taxon_sequence_map[taxon]= self._new_character_sequence(other_matrix._taxon_sequence_map[taxon])
 
     def remove_sequences(self, taxa):
         """
@@ -1607,10 +1652,9 @@ class CharacterMatrix(
         # handling of corner cases
         clone.character_subsets = container.OrderedCaselessDict()
         # clone.clone_from(self)
+        indices = sorted(set(idx for idx in indices if idx >= 0))
         for vec in clone.values():
-            for cell_idx in range(len(vec)-1, -1, -1):
-                if cell_idx not in indices:
-                    del(vec[cell_idx])
+            vec._retain(indices[:bisect.bisect_left(indices, len(vec))])
         return clone
 
     ###########################################################################
@@ -1839,8 +1883,23 @@ class DiscreteCharacterMatrix(CharacterMatrix):
 
         """
         taxon_to_state_indices = {}
+        coding_state_sets = {}
         for t in self:
             cdv = self[t]
+            if isinstance(cdv, FixedAlphabetCharacterDataSequence) and cdv.is_state_index_coded:
+                # look up the fundamental state indexes once for each state of
+                # the alphabet rather than for every character
+                coding = cdv._character_values.coding
+                try:
+                    index_state_sets = coding_state_sets[coding]
+                except KeyError:
+                    index_state_sets = coding.fundamental_indexes(gaps_as_missing=gaps_as_missing)
+                    coding_state_sets[coding] = index_state_sets
+                state_indexes = cdv.state_indexes
+                if char_indices is not None:
+                    state_indexes = [state_indexes[char_index] for char_index in char_indices]
+                taxon_to_state_indices[t] = [set(index_state_sets[idx]) for idx in state_indexes]
+                continue
             if char_indices is None:
                 ci = range(len(cdv))
             else:
@@ -1857,19 +1916,517 @@ class DiscreteCharacterMatrix(CharacterMatrix):
 
 ### Fixed Alphabet Characters ##################################################
 
+class _StateIndexCoding(object):
+    """
+    Maps the states of a state alphabet to and from the integer codes under
+    which they are stored by state-index-coded sequences: the index of each
+    state in the alphabet, with the largest value of the code type reserved
+    for |None|.
+    """
+
+    def __init__(self, state_alphabet):
+        self.states = state_alphabet.states
+        if len(self.states) < 0xFF:
+            self.typecode = "B"
+            self.missing_index = 0xFF
+        elif len(self.states) < 0xFFFF:
+            self.typecode = "H"
+            self.missing_index = 0xFFFF
+        else:
+            raise ValueError("Too many states in state alphabet to be coded by index: {}".format(len(self.states)))
+        self.index_states = list(self.states) + [None] * (self.missing_index + 1 - len(self.states))
+        self.state_indexes = dict((state, idx) for idx, state in enumerate(self.states))
+        self.state_indexes[None] = self.missing_index
+
+    def encode_state(self, state):
+        try:
+            return self.state_indexes[state]
+        except KeyError:
+            raise ValueError("State {} is not in the state alphabet of the sequence".format(repr(state)))
+
+    def encode(self, states):
+        state_indexes = self.state_indexes
+        try:
+            return array.array(self.typecode, [state_indexes[state] for state in states])
+        except KeyError as e:
+            raise ValueError("State {} is not in the state alphabet of the sequence".format(repr(e.args[0])))
+
+    def fundamental_indexes(self, gaps_as_missing=True):
+        """
+        Returns a list of the fundamental state indexes of the state with each
+        code.
+        """
+        if gaps_as_missing:
+            return [state.fundamental_indexes_with_gaps_as_missing if state is not None else None
+                    for state in self.index_states]
+        else:
+            return [state.fundamental_indexes if state is not None else None
+                    for state in self.index_states]
+
+_STATE_INDEX_CODINGS = weakref.WeakKeyDictionary()
+
+def _get_state_index_coding(state_alphabet):
+    coding = _STATE_INDEX_CODINGS.get(state_alphabet, None)
+    if coding is None or coding.states is not state_alphabet.states:
+        coding = _StateIndexCoding(state_alphabet)
+        _STATE_INDEX_CODINGS[state_alphabet] = coding
+    return coding
+
+class _StateIndexList(object):
+    """
+    List-like container of states stored as an array of their codes under a
+    `_StateIndexCoding`, with the states looked up as they are accessed.
+    """
+
+    def __init__(self, coding, state_indexes=None):
+        self.coding = coding
+        if state_indexes is None:
+            state_indexes = array.array(coding.typecode)
+        self.state_indexes = state_indexes
+
+    def __deepcopy__(self, memo=None):
+        return self.__class__(self.coding, self.state_indexes[:])
+
+    def __len__(self):
+        return len(self.state_indexes)
+
+    def __iter__(self):
+        index_states = self.coding.index_states
+        for idx in self.state_indexes:
+            yield index_states[idx]
+
+    def __getitem__(self, idx):
+        index_states = self.coding.index_states
+        if isinstance(idx, slice):
+            return [index_states[i] for i in self.state_indexes[idx]]
+        return index_states[self.state_indexes[idx]]
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            self.state_indexes[idx] = self.coding.encode(value)
+        else:
+            self.state_indexes[idx] = self.coding.encode_state(value)
+
+    def __delitem__(self, idx):
+        del self.state_indexes[idx]
+
+    def append(self, value):
+        self.state_indexes.append(self.coding.encode_state(value))
+
+    def insert(self, idx, value):
+        self.state_indexes.insert(idx, self.coding.encode_state(value))
+
+    def extend(self, values):
+        if isinstance(values, _StateIndexList) and values.coding.states is self.coding.states:
+            self.state_indexes.extend(values.state_indexes)
+        else:
+            self.state_indexes.extend(self.coding.encode(values))
+
+    def pad(self, value, count, append=True):
+        padding = array.array(self.coding.typecode, [self.coding.encode_state(value)]) * count
+        if append:
+            self.state_indexes.extend(padding)
+        else:
+            self.state_indexes[0:0] = padding
+
+    def take(self, indexes):
+        """
+        Returns a new container of the elements at ``indexes``.
+        """
+        if indexes and indexes[-1] - indexes[0] + 1 == len(indexes):
+            state_indexes = self.state_indexes[indexes[0]:indexes[-1]+1]
+        else:
+            src = self.state_indexes
+            state_indexes = array.array(self.coding.typecode, [src[idx] for idx in indexes])
+        return self.__class__(self.coding, state_indexes)
+
+class _SparseCellList(object):
+    """
+    List-like container of values that are mostly |None|, only storing those
+    that are not.
+    """
+
+    def __init__(self, values=None):
+        self._cells = {}
+        self._length = 0
+        if values is not None:
+            self.extend(values)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        cells = self._cells
+        if not cells:
+            return itertools.repeat(None, self._length)
+        return (cells.get(idx, None) for idx in range(self._length))
+
+    def _normalize_index(self, idx):
+        if idx < 0:
+            idx += self._length
+        if idx < 0 or idx >= self._length:
+            raise IndexError("list index out of range")
+        return idx
+
+    def _shift(self, start, offset):
+        if self._cells:
+            self._cells = dict(((idx + offset if idx >= start else idx), value) for idx, value in self._cells.items())
+
+    def _reset(self, values):
+        self._cells = dict((idx, value) for idx, value in enumerate(values) if value is not None)
+        self._length = len(values)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            cells = self._cells
+            return [cells.get(i, None) for i in range(*idx.indices(self._length))]
+        return self._cells.get(self._normalize_index(idx), None)
+
+    def __setitem__(self, idx, value):
+        if isinstance(idx, slice):
+            values = list(self)
+            values[idx] = value
+            self._reset(values)
+            return
+        idx = self._normalize_index(idx)
+        if value is None:
+            self._cells.pop(idx, None)
+        else:
+            self._cells[idx] = value
+
+    def __delitem__(self, idx):
+        if isinstance(idx, slice):
+            values = list(self)
+            del values[idx]
+            self._reset(values)
+            return
+        idx = self._normalize_index(idx)
+        self._cells.pop(idx, None)
+        self._shift(idx + 1, -1)
+        self._length -= 1
+
+    def append(self, value):
+        self._length += 1
+        if value is not None:
+            self._cells[self._length - 1] = value
+
+    def insert(self, idx, value):
+        if idx < 0:
+            idx = max(idx + self._length, 0)
+        idx = min(idx, self._length)
+        self._shift(idx, 1)
+        self._length += 1
+        if value is not None:
+            self._cells[idx] = value
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def pad(self, value, count, append=True):
+        if append:
+            start = self._length
+        else:
+            start = 0
+            self._shift(0, count)
+        self._length += count
+        if value is not None:
+            for idx in range(start, start + count):
+                self._cells[idx] = value
+
+    def take(self, indexes):
+        """
+        Returns a new container of the elements at ``indexes``.
+        """
+        other = self.__class__()
+        other._length = len(indexes)
+        cells = self._cells
+        if cells:
+            for new_idx, idx in enumerate(indexes):
+                if idx in cells:
+                    other._cells[new_idx] = cells[idx]
+        return other
+
 class FixedAlphabetCharacterDataSequence(CharacterDataSequence):
-    pass
+    """
+    A sequence of states of a fixed state alphabet.
+
+    If ``state_alphabet`` is given, then, instead of a reference to a
+    |StateIdentity| object for every character, the sequence is stored as a
+    compact array of the indexes of the states in ``state_alphabet`` (one byte
+    per character for alphabets of fewer than 255 states), available through
+    ``state_indexes``, with the |StateIdentity| objects being looked up as
+    characters are accessed. Character types and metadata annotations are then
+    only stored for characters that have them. Such a sequence otherwise
+    supports the same operations as one storing |StateIdentity| objects
+    directly, except that only states of ``state_alphabet`` (or |None|) can be
+    stored, and ``values()`` returns a new list rather than the list in which
+    the values are stored.
+    """
+
+    state_alphabet = None
+
+    def __init__(self,
+            character_values=None,
+            character_types=None,
+            character_annotations=None,
+            state_alphabet=None):
+        CharacterDataSequence.__init__(self)
+        if state_alphabet is not None:
+            self._set_state_index_coding(state_alphabet)
+        if character_values:
+            self.extend(
+                    character_values=character_values,
+                    character_types=character_types,
+                    character_annotations=character_annotations)
+
+    def _set_state_index_coding(self, state_alphabet):
+        """
+        Converts the storage of ``self`` to arrays of indexes of the states of
+        ``state_alphabet`` or, if ``state_alphabet`` is |None|, to lists of
+        |StateIdentity| objects.
+        """
+        if state_alphabet is self.state_alphabet:
+            return
+        if state_alphabet is None:
+            self._character_values = list(self._character_values)
+            self._character_types = list(self._character_types)
+            self._character_annotations = list(self._character_annotations)
+        else:
+            coding = _get_state_index_coding(state_alphabet)
+            self._character_values = _StateIndexList(coding, coding.encode(self._character_values))
+            self._character_types = _SparseCellList(self._character_types)
+            self._character_annotations = _SparseCellList(self._character_annotations)
+        self.state_alphabet = state_alphabet
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if self.state_alphabet is not None:
+            # The state alphabet (which cannot be unpickled) and the coding
+            # are re-derived on unpickling from the data type of the matrix
+            # type it belongs to, and only the state indexes are pickled.
+            for data_type, matrix_type in data_type_matrix_map.items():
+                if getattr(matrix_type, "datatype_alphabet", None) is self.state_alphabet:
+                    state["state_alphabet"] = data_type
+                    state["_character_values"] = self._character_values.state_indexes
+                    break
+        return state
+
+    def __setstate__(self, state):
+        data_type = state.get("state_alphabet", None)
+        if isinstance(data_type, str):
+            state_alphabet = get_char_matrix_type(data_type).datatype_alphabet
+            state["state_alphabet"] = state_alphabet
+            state["_character_values"] = _StateIndexList(
+                    _get_state_index_coding(state_alphabet),
+                    state["_character_values"])
+        self.__dict__.update(state)
+
+    def _get_is_state_index_coded(self):
+        """
+        |True| if ``self`` is stored as an array of state indexes.
+        """
+        return self.state_alphabet is not None
+    is_state_index_coded = property(_get_is_state_index_coded)
+
+    def _get_state_indexes(self):
+        """
+        If ``self`` is stored as state indexes, the ``array`` of indexes of the
+        states of the sequence in ``state_alphabet`` (with the largest value of
+        the array type denoting |None|); otherwise |None|.
+        """
+        if self.state_alphabet is None:
+            return None
+        return self._character_values.state_indexes
+    state_indexes = property(_get_state_indexes)
+
+    def values(self):
+        """
+        Returns list of values of this vector.
+
+        Returns
+        -------
+        v : list
+            List of values making up this vector.
+        """
+        if self.state_alphabet is None:
+            return self._character_values
+        return list(self._character_values)
+
+    def extend(self, character_values, character_types=None, character_annotations=None):
+        """
+        Extends ``self`` with values.
+
+        Parameters
+        ----------
+        character_values : iterable of objects
+            Values to be stored.
+        character_types : iterable of |CharacterType| objects
+            Descriptions of character values.
+        character_annotations : iterable |AnnotationSet| objects
+            Metadata annotations associated with characters.
+        """
+        if self.state_alphabet is None:
+            return CharacterDataSequence.extend(self,
+                    character_values=character_values,
+                    character_types=character_types,
+                    character_annotations=character_annotations)
+        if isinstance(character_values, FixedAlphabetCharacterDataSequence):
+            character_values = character_values._character_values
+        nchar = len(self._character_values)
+        self._character_values.extend(character_values)
+        nchar = len(self._character_values) - nchar
+        for cells, cell_values in (
+                (self._character_types, character_types),
+                (self._character_annotations, character_annotations)):
+            if cell_values is None:
+                cells.pad(None, nchar)
+            else:
+                assert len(cell_values) == nchar
+                cells.extend(cell_values)
+
+    def extend_state_indexes(self, state_indexes):
+        """
+        Extends ``self`` with the states of ``state_alphabet`` with the indexes
+        given by ``state_indexes`` (e.g., an ``array``, ``bytes`` or
+        ``bytearray`` object), without looking up the states. Only supported
+        by sequences stored as state indexes.
+
+        Parameters
+        ----------
+        state_indexes : iterable of integers
+            Indexes of states to be stored.
+        """
+        if self.state_alphabet is None:
+            raise TypeError("Sequence is not stored as state indexes")
+        dest = self._character_values.state_indexes
+        nchar = len(dest)
+        if isinstance(state_indexes, array.array) and state_indexes.typecode == dest.typecode:
+            dest.extend(state_indexes)
+        else:
+            dest.extend(array.array(dest.typecode, state_indexes))
+        nchar = len(dest) - nchar
+        self._character_types.pad(None, nchar)
+        self._character_annotations.pad(None, nchar)
+
+    def _pad(self, value, count, append=True):
+        if self.state_alphabet is None:
+            return CharacterDataSequence._pad(self, value, count, append=append)
+        self._character_values.pad(value, count, append=append)
+        self._character_types.pad(None, count, append=append)
+        self._character_annotations.pad(None, count, append=append)
+
+    def _retain(self, indexes):
+        if self.state_alphabet is None:
+            return CharacterDataSequence._retain(self, indexes)
+        self._character_values = self._character_values.take(indexes)
+        self._character_types = self._character_types.take(indexes)
+        self._character_annotations = self._character_annotations.take(indexes)
 
 class FixedAlphabetCharacterMatrix(DiscreteCharacterMatrix):
+    """
+    Specializes |CharacterMatrix| for data with a fixed state alphabet.
+
+    If constructed (or read, e.g. by ``get()``) with
+    ``is_state_index_coded=True``, then new sequences are created as
+    `FixedAlphabetCharacterDataSequence` objects storing the indexes of their
+    states in the alphabet of the matrix, one byte per character, instead of
+    references to |StateIdentity| objects, which takes a fraction of the
+    memory for large matrices. Setting ``is_state_index_coded`` on an existing
+    matrix converts all its sequences accordingly.
+    """
 
     character_sequence_type = FixedAlphabetCharacterDataSequence
     data_type = "fixed"
     datatype_alphabet = None
+    _is_state_index_coded = False
 
     def __init__(self, *args, **kwargs):
+        is_state_index_coded = kwargs.pop("is_state_index_coded", None)
+        if is_state_index_coded is not None:
+            self._is_state_index_coded = bool(is_state_index_coded)
         DiscreteCharacterMatrix.__init__(self, *args, **kwargs)
         self.state_alphabets.append(self.__class__.datatype_alphabet)
         self._default_state_alphabet = self.__class__.datatype_alphabet
+        if is_state_index_coded is not None:
+            self.is_state_index_coded = is_state_index_coded
+
+    @classmethod
+    def yield_state_indexes_from_files(cls, files, schema):
+        """
+        Iterates over sequences from files, returning them one-by-one as
+        ``array`` objects of the indexes of their states in the alphabet of
+        this type of matrix, instead of building a matrix of all of them in
+        memory at once. Only the "fasta" format is supported.
+
+        Parameters
+        ----------
+        files : iterable of file paths or file-like objects.
+            Iterable of sources, which can either be strings specifying file
+            paths or file-like objects open for reading. If a source element is
+            a string (``isinstance(i,str) == True``), then it is assumed to be
+            a path to a file. Otherwise, the source is assumed to be a file-like
+            object.
+        schema : string
+            The name of the data format (only "fasta" is supported).
+
+        Yields
+        ------
+        s : tuple
+            The name of each sequence, and an ``array`` of the indexes of
+            its states in ``datatype_alphabet``.
+
+        Examples
+        --------
+
+        ::
+
+            sa = dendropy.DnaCharacterMatrix.datatype_alphabet
+            for name, state_indexes in dendropy.DnaCharacterMatrix.yield_state_indexes_from_files(
+                    files=["aln1.fasta", "aln2.fasta"],
+                    schema="fasta"):
+                states = [sa[idx] for idx in state_indexes]
+
+        """
+        if schema != "fasta":
+            raise error.UnsupportedSchemaError("Sequences can only be yielded from 'fasta' sources, not '{}'".format(schema))
+        from dendropy.dataio import fastayielder
+        return fastayielder.FastaSequenceDataYielder(
+                files=files,
+                state_alphabet=cls.datatype_alphabet)
+
+    def _get_is_state_index_coded(self):
+        """
+        |True| if the sequences of ``self`` are stored as arrays of state
+        indexes. Setting this converts the existing sequences of ``self``.
+        """
+        return self._is_state_index_coded
+    def _set_is_state_index_coded(self, value):
+        value = bool(value)
+        if value:
+            state_alphabet = self.__class__.datatype_alphabet
+        else:
+            state_alphabet = None
+        for seq in self._taxon_sequence_map.values():
+            seq._set_state_index_coding(state_alphabet)
+        self._is_state_index_coded = value
+    is_state_index_coded = property(_get_is_state_index_coded, _set_is_state_index_coded)
+
+    def _matrix_storage_kwargs(self):
+        if self._is_state_index_coded:
+            return {"is_state_index_coded": True}
+        return {}
+
+    def _new_character_sequence(self, values=None):
+        if self._is_state_index_coded:
+            return self.__class__.character_sequence_type(values,
+                    state_alphabet=self.__class__.datatype_alphabet)
+        return self.__class__.character_sequence_type(values)
+
+    def __setitem__(self, key, values):
+        if self._is_state_index_coded and isinstance(values, self.__class__.character_sequence_type):
+            values._set_state_index_coding(self.__class__.datatype_alphabet)
+        DiscreteCharacterMatrix.__setitem__(self, key, values)
 
     def coerce_values(self, values):
         if self.datatype_alphabet is None:
@@ -544,6 +544,9 @@ class TaxonNamespace(
         self._taxon_bitmask_map = {}
         # self._split_bitmask_taxon_map = {}
         self._current_accession_count = 0
+        self._label_taxa_map = {}
+        self._lower_cased_label_taxa_map = None
+        self._label_index_change_count = Taxon._indexed_label_change_count
         if len(args) > 1:
             raise TypeError("TaxonNamespace() takes at most 1 non-keyword argument ({} given)".format(len(args)))
         elif len(args) == 1:
@@ -707,28 +710,52 @@ class TaxonNamespace(
             `first_match_only==False`, a list of one or more |Taxon|
             instances with a ``label`` attribute matching the ``label`` argument.
         """
-        taxa = []
+        if self._label_index_change_count != Taxon._indexed_label_change_count:
+            self._reindex_taxon_labels()
         if is_case_sensitive is True or (is_case_sensitive is None and self.is_case_sensitive):
-            for taxon in self._taxa:
-                if label == taxon.label:
-                    if first_match_only:
-                        return taxon
-                    else:
-                        taxa.append(taxon)
+            taxa = self._label_taxa_map.get(label)
         else:
             label = str(label).lower()
-            for taxon in self._taxa:
-                if label == taxon.lower_cased_label:
-                    if first_match_only:
-                        return taxon
-                    else:
-                        taxa.append(taxon)
-        if len(taxa) == 0:
+            if self._lower_cased_label_taxa_map is None:
+                self._lower_cased_label_taxa_map = {}
+                for taxon in self._taxa:
+                    self._index_lower_cased_taxon_label(taxon)
+            taxa = self._lower_cased_label_taxa_map.get(label)
+        if not taxa:
             if error_if_not_found:
                 raise LookupError(label)
             else:
                 return None
-        return taxa
+        if first_match_only:
+            return taxa[0]
+        return list(taxa)
+
+    def _index_taxon_label(self, taxon):
+        taxon._is_label_indexed = True
+        self._label_taxa_map.setdefault(taxon.label, []).append(taxon)
+        if self._lower_cased_label_taxa_map is not None:
+            self._index_lower_cased_taxon_label(taxon)
+
+    def _index_lower_cased_taxon_label(self, taxon):
+        lower_cased_label = taxon.lower_cased_label
+        if lower_cased_label is not None:
+            self._lower_cased_label_taxa_map.setdefault(lower_cased_label, []).append(taxon)
+
+    def _reindex_taxon_labels(self):
+        """
+        Rebuilds the indexes mapping labels (and, when first needed,
+        lower-cased labels) to the lists of |Taxon| objects with these
+        labels, in the order of the |Taxon| objects in the collection. This
+        is needed after the label of a |Taxon| object that has been added to
+        a namespace has been changed or after the collection has been
+        reordered; otherwise the indexes are updated as |Taxon| objects are
+        added or removed.
+        """
+        self._label_taxa_map = {}
+        self._lower_cased_label_taxa_map = None
+        self._label_index_change_count = Taxon._indexed_label_change_count
+        for taxon in self._taxa:
+            self._index_taxon_label(taxon)
 
     ### Adding Taxa
 
@@ -770,6 +797,10 @@ class TaxonNamespace(
         self._accession_index_taxon_map[self._current_accession_count] = taxon
         self._taxon_accession_index_map[taxon] = self._current_accession_count
         self._current_accession_count += 1
+        if self._label_index_change_count == Taxon._indexed_label_change_count:
+            self._index_taxon_label(taxon)
+        else:
+            taxon._is_label_indexed = True
 
     def append(self, taxon):
         """
@@ -876,6 +907,16 @@ class TaxonNamespace(
         # assert taxon not in self._taxa
         while taxon in self._taxa:
             self._taxa.remove(taxon)
+        if self._label_index_change_count == Taxon._indexed_label_change_count:
+            label_taxa_maps = [(self._label_taxa_map, taxon.label)]
+            if self._lower_cased_label_taxa_map is not None:
+                label_taxa_maps.append((self._lower_cased_label_taxa_map, taxon.lower_cased_label))
+            for label_taxa_map, label in label_taxa_maps:
+                taxa = label_taxa_map.get(label)
+                if taxa is not None and taxon in taxa:
+                    taxa.remove(taxon)
+                    if not taxa:
+                        del label_taxa_map[label]
         idx = self._taxon_accession_index_map.pop(taxon, None)
         if idx is not None:
             self._accession_index_taxon_map.pop(idx, None)
@@ -993,6 +1034,9 @@ class TaxonNamespace(
         self._taxon_accession_index_map.clear()
         self._taxon_bitmask_map.clear()
         # self._split_bitmask_taxon_map.clear()
+        self._label_taxa_map = {}
+        self._lower_cased_label_taxa_map = None
+        self._label_index_change_count = Taxon._indexed_label_change_count
 
     ### Look-up and Retrieval of Taxa
 
@@ -1254,12 +1298,14 @@ class TaxonNamespace(
         if key is None:
             key = lambda x: x.label
         self._taxa.sort(key=key, reverse=reverse)
+        self._reindex_taxon_labels()
 
     def reverse(self):
         """
         Reverses order of |Taxon| objects in collection.
         """
         self._taxa.reverse()
+        self._reindex_taxon_labels()
 
     ### Summarization of Collection
 
@@ -1637,6 +1683,12 @@ class Taxon(
     A taxon associated with a sequence or a node on a tree.
     """
 
+    # Incremented whenever the label of a |Taxon| object that has been added
+    # to a |TaxonNamespace| changes, so that namespaces know to rebuild their
+    # label indexes.
+    _indexed_label_change_count = 0
+    _is_label_indexed = False
+
     def __init__(self, label=None):
         """
         Parameters
@@ -1667,6 +1719,8 @@ class Taxon(
     def _set_label(self, v):
         self._label = v
         self._lower_cased_label = None
+        if self._is_label_indexed:
+            Taxon._indexed_label_change_count += 1
     label = property(_get_label, _set_label)
 
     def _get_lower_cased_label(self):
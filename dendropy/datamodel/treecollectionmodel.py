@@ -22,19 +22,31 @@ trees.
 """
 
 import collections
+import array
 import math
 import copy
+import os
 import sys
+import json
+import hashlib
+import tempfile
+import functools
+import itertools
+import zipfile
+import multiprocessing
 from dendropy.utility import container
 from dendropy.utility import error
 from dendropy.utility import bitprocessing
 from dendropy.utility import deprecate
 from dendropy.utility import constants
+from dendropy.utility import textprocessing
 from dendropy.calculate import statistics
+from dendropy.calculate import treecompare
 from dendropy.datamodel import basemodel
 from dendropy.datamodel import taxonmodel
 from dendropy.datamodel import treemodel
 from dendropy import dataio
+from dendropy.dataio import nexusprocessing
 
 ##############################################################################
 ### TreeList
@@ -1046,7 +1058,9 @@ class TreeList(
                 ultrametricity_precision=kwargs_dict.pop("ultrametricity_precision", constants.DEFAULT_ULTRAMETRICITY_PRECISION),
                 is_force_max_age=kwargs_dict.pop("is_force_max_age", None),
                 taxon_label_age_map=kwargs_dict.pop("taxon_label_age_map", None),
-                is_bipartitions_updated=kwargs_dict.pop("is_bipartitions_updated", False)
+                is_bipartitions_updated=kwargs_dict.pop("is_bipartitions_updated", False),
+                use_columnar_storage=kwargs_dict.pop("use_columnar_storage", False),
+                summary_reservoir_size=kwargs_dict.pop("summary_reservoir_size", None),
                 )
         return ta
 
@@ -1223,6 +1237,17 @@ class TreeList(
 class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
     """
     Collects information regarding splits over multiple trees.
+
+    By default, the edge length and node age of every occurrence of each
+    split is stored, in the lists of ``split_edge_lengths`` and
+    ``split_node_ages``. If ``summary_reservoir_size`` is given, then these
+    values are instead accumulated on the fly by
+    :class:`~dendropy.calculate.statistics.StreamingSummary` objects, which
+    keep running means, variances and ranges, and a reservoir sample of at
+    most ``summary_reservoir_size`` values for the calculation of medians,
+    HPDs and quantiles. The summaries are the same as with stored values as
+    long as no split occurs more than ``summary_reservoir_size`` times, but
+    memory does not grow with the number of trees beyond that.
     """
 
     SUMMARY_STATS_FIELDNAMES = ('mean', 'median', 'sd', 'hpd95', 'quant_5_95', 'range')
@@ -1234,7 +1259,8 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             use_tree_weights=True,
             ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
             is_force_max_age=False,
-            taxon_label_age_map=None):
+            taxon_label_age_map=None,
+            summary_reservoir_size=None):
 
         # Taxon Namespace
         taxonmodel.TaxonNamespaceAssociated.__init__(self,
@@ -1245,14 +1271,21 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
         self.ignore_node_ages = ignore_node_ages
         self.use_tree_weights = use_tree_weights
         self.ultrametricity_precision = ultrametricity_precision
+        self.summary_reservoir_size = summary_reservoir_size
 
         # storage/function
         self.total_trees_counted = 0
         self.sum_of_tree_weights = 0.0
         self.tree_rooting_types_counted = set()
         self.split_counts = collections.defaultdict(float)
-        self.split_edge_lengths = collections.defaultdict(list)
-        self.split_node_ages = collections.defaultdict(list)
+        if self.summary_reservoir_size is None:
+            self.split_edge_lengths = collections.defaultdict(list)
+            self.split_node_ages = collections.defaultdict(list)
+        else:
+            summary_factory = functools.partial(statistics.StreamingSummary,
+                    reservoir_size=self.summary_reservoir_size)
+            self.split_edge_lengths = collections.defaultdict(summary_factory)
+            self.split_node_ages = collections.defaultdict(summary_factory)
         self.is_force_max_age = is_force_max_age
         self.is_force_min_age = False
         self.taxon_label_age_map = taxon_label_age_map
@@ -1348,7 +1381,62 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             A list of node age values from ``tree``.
         """
         assert tree.taxon_namespace is self.taxon_namespace
-        self.total_trees_counted += 1
+        splits, edge_lengths, node_ages, weight_to_use = self._get_tree_split_data(
+                tree=tree,
+                is_bipartitions_updated=is_bipartitions_updated,
+                default_edge_length_value=default_edge_length_value)
+        self._count_split_data(
+                splits=splits,
+                edge_lengths=edge_lengths,
+                node_ages=node_ages,
+                weight=weight_to_use,
+                is_rooted=tree.is_rooted)
+        return splits, edge_lengths, node_ages
+
+    def count_splits_on_tree_skeleton(self,
+            tree_skeleton,
+            default_edge_length_value=None):
+        """
+        As :meth:`SplitDistribution.count_splits_on_tree()`, but for a
+        |TreeSkeleton| (as, e.g., yielded by
+        :meth:`TreeSkeleton.yield_from_files()`) instead of a |Tree|. The
+        splits, edge lengths and node ages counted are identical to those
+        that would be counted for the corresponding |Tree|.
+
+        Parameters
+        ----------
+        tree_skeleton : a |TreeSkeleton| object.
+            The tree skeleton on which to count the splits.
+
+        Returns
+        --------
+        s : iterable of splits
+            A list of split bitmasks from ``tree_skeleton``.
+        e :
+            A list of edge length values from ``tree_skeleton``.
+        a :
+            A list of node age values from ``tree_skeleton``.
+        """
+        assert tree_skeleton.taxon_namespace is self.taxon_namespace
+        splits, edge_lengths, node_ages, weight_to_use = self._get_tree_skeleton_split_data(
+                tree_skeleton=tree_skeleton,
+                default_edge_length_value=default_edge_length_value)
+        self._count_split_data(
+                splits=splits,
+                edge_lengths=edge_lengths,
+                node_ages=node_ages,
+                weight=weight_to_use,
+                is_rooted=tree_skeleton.is_rooted)
+        return splits, edge_lengths, node_ages
+
+    def _get_tree_split_data(self,
+            tree,
+            is_bipartitions_updated,
+            default_edge_length_value):
+        """
+        Returns the splits of ``tree``, with their edge lengths and node ages
+        (as appropriate) and the weight of the tree, without counting them.
+        """
         if not self.ignore_node_ages:
             if self.taxon_label_age_map:
                 set_node_age_fn = self._set_node_age
@@ -1364,11 +1452,6 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             weight_to_use = float(tree.weight)
         else:
             weight_to_use = 1.0
-        self.sum_of_tree_weights += weight_to_use
-        if tree.is_rooted:
-            self.tree_rooting_types_counted.add(True)
-        else:
-            self.tree_rooting_types_counted.add(False)
         if not is_bipartitions_updated:
             tree.encode_bipartitions()
         splits = []
@@ -1382,28 +1465,78 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             edge = tree.bipartition_edge_map[bipartition]
 
             splits.append(split)
-            self.split_counts[split] += weight_to_use
             if not self.ignore_edge_lengths:
-                sel = self.split_edge_lengths.setdefault(split,[])
                 if edge.length is None:
                     elen = default_edge_length_value
                 else:
                     elen = edge.length
-                sel.append(elen)
                 edge_lengths.append(elen)
-            else:
-                sel = None
             if not self.ignore_node_ages:
-                sna = self.split_node_ages.setdefault(split, [])
                 if edge.head_node is not None:
                     nage = edge.head_node.age
                 else:
                     nage = None
-                sna.append(nage)
                 node_ages.append(nage)
-            else:
-                sna = None
-        return splits, edge_lengths, node_ages
+        return splits, edge_lengths, node_ages, weight_to_use
+
+    def _get_tree_skeleton_split_data(self,
+            tree_skeleton,
+            default_edge_length_value):
+        """
+        As :meth:`SplitDistribution._get_tree_split_data()`, but for a
+        |TreeSkeleton|.
+        """
+        if not self.ignore_node_ages:
+            all_node_ages = tree_skeleton.calc_node_ages(
+                    ultrametricity_precision=self.ultrametricity_precision,
+                    is_force_max_age=self.is_force_max_age,
+                    is_force_min_age=self.is_force_min_age,
+                    taxon_label_age_map=self.taxon_label_age_map,
+                    )
+        if tree_skeleton.weight is not None and self.use_tree_weights:
+            weight_to_use = float(tree_skeleton.weight)
+        else:
+            weight_to_use = 1.0
+        splits, all_edge_lengths, node_indexes = tree_skeleton.encode_bipartitions()
+        edge_lengths = []
+        node_ages = []
+        if not self.ignore_edge_lengths:
+            for elen in all_edge_lengths:
+                if elen is None:
+                    elen = default_edge_length_value
+                edge_lengths.append(elen)
+        if not self.ignore_node_ages:
+            node_ages = [all_node_ages[nd_idx] for nd_idx in node_indexes]
+        return splits, edge_lengths, node_ages, weight_to_use
+
+    def _count_split_data(self,
+            splits,
+            edge_lengths,
+            node_ages,
+            weight,
+            is_rooted):
+        """
+        Adds the splits of a single tree, with their edge lengths and node
+        ages (as returned by :meth:`SplitDistribution._get_tree_split_data()`)
+        to the totals.
+        """
+        self.total_trees_counted += 1
+        self.sum_of_tree_weights += weight
+        if is_rooted:
+            self.tree_rooting_types_counted.add(True)
+        else:
+            self.tree_rooting_types_counted.add(False)
+        split_counts = self.split_counts
+        for split in splits:
+            split_counts[split] += weight
+        if not self.ignore_edge_lengths:
+            split_edge_lengths = self.split_edge_lengths
+            for split, elen in zip(splits, edge_lengths):
+                split_edge_lengths[split].append(elen)
+        if not self.ignore_node_ages:
+            split_node_ages = self.split_node_ages
+            for split, nage in zip(splits, node_ages):
+                split_node_ages[split].append(nage)
 
     def splits_considered(self):
         """
@@ -1451,6 +1584,11 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             return float(self.sum_of_tree_weights)
 
     def update(self, split_dist):
+        if self.summary_reservoir_size is None and split_dist.summary_reservoir_size is not None:
+            # the values of ``split_dist`` cannot be added to lists without
+            # losing the count, mean and variance of all the values
+            # summarized, as only a sample of these is kept
+            raise ValueError("Cannot update split distribution storing split edge lengths and node ages from one summarizing them")
         self.total_trees_counted += split_dist.total_trees_counted
         self.sum_of_tree_weights += split_dist.sum_of_tree_weights
         self._split_edge_length_summaries = None
@@ -1459,8 +1597,16 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
         self.tree_rooting_types_counted.update(split_dist.tree_rooting_types_counted)
         for split in split_dist.split_counts:
             self.split_counts[split] += split_dist.split_counts[split]
-            self.split_edge_lengths[split] += split_dist.split_edge_lengths[split]
-            self.split_node_ages[split] += split_dist.split_node_ages[split]
+        for split_values, other_split_values in (
+                (self.split_edge_lengths, split_dist.split_edge_lengths),
+                (self.split_node_ages, split_dist.split_node_ages)):
+            for split in other_split_values:
+                values = split_values[split]
+                other_values = other_split_values[split]
+                if isinstance(other_values, statistics.StreamingSummary):
+                    values.update(other_values)
+                else:
+                    values.extend(other_values)
 
     ###########################################################################
     ### Basic Information Access
@@ -1563,7 +1709,7 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             if not elens:
                 continue
             try:
-                self._split_edge_length_summaries[split] = statistics.summarize(elens)
+                self._split_edge_length_summaries[split] = self._summarize_values(elens)
             except ValueError:
                 pass
         return self._split_edge_length_summaries
@@ -1574,11 +1720,16 @@ class SplitDistribution(taxonmodel.TaxonNamespaceAssociated):
             if not ages:
                 continue
             try:
-                self._split_node_age_summaries[split] = statistics.summarize(ages)
+                self._split_node_age_summaries[split] = self._summarize_values(ages)
             except ValueError:
                 pass
         return self._split_node_age_summaries
 
+    def _summarize_values(self, values):
+        if isinstance(values, statistics.StreamingSummary):
+            return values.summarize()
+        return statistics.summarize(values)
+
     def _set_node_age(self, nd):
         if nd.taxon is None or nd._child_nodes:
             return None
@@ -1953,35 +2104,90 @@ class SplitDistributionSummarizer(object):
         if kwargs:
             TypeError("Unrecognized or unsupported arguments: {}".format(kwargs))
 
-    def _decorate(self,
-            target,
-            fieldname,
-            value,
-            set_attribute,
-            set_annotation,
-            ):
-        attr_name = getattr(self, "{}_attr_name".format(fieldname))
-        annotation_name = getattr(self, "{}_annotation_name".format(fieldname))
-        if set_attribute:
-            setattr(target, attr_name, value)
-            if set_annotation:
-                target.annotations.drop(name=annotation_name)
-                if getattr(self, "is_{}_annotation_dynamic".format(fieldname)):
-                    target.annotations.add_bound_attribute(
-                        attr_name=attr_name,
-                        annotation_name=annotation_name,
-                        )
-                else:
-                    target.annotations.add_new(
-                            name=annotation_name,
-                            value=value,
-                            )
-        elif set_annotation:
-            target.annotations.drop(name=annotation_name)
-            target.annotations.add_new(
+    def _compile_decorations(self, fields):
+        """
+        Resolves the attribute names, annotation names and annotation templates
+        of ``fields``, a list of ``(fieldname, set_attribute, set_annotation)``
+        tuples, once, so that decorating each target is reduced to
+        assignments. Returns a tuple, ``(attr_names, annotation_specs,
+        annotation_names)``: ``attr_names`` gives the attribute to set for each
+        field (or |None|), ``annotation_specs`` lists the annotations to add,
+        in order, as ``(field_index, template, bound_attr_name)`` tuples, and
+        ``annotation_names`` is the set of names of the annotations that will be
+        replaced.
+        """
+        attr_names = []
+        annotation_specs = []
+        for field_index, (fieldname, set_attribute, set_annotation) in enumerate(fields):
+            attr_name = getattr(self, "{}_attr_name".format(fieldname))
+            attr_names.append(attr_name if set_attribute else None)
+            if not set_annotation:
+                continue
+            annotation_name = getattr(self, "{}_annotation_name".format(fieldname))
+            if set_attribute and getattr(self, "is_{}_annotation_dynamic".format(fieldname)):
+                bound_attr_name = attr_name
+            else:
+                bound_attr_name = None
+            template = basemodel.Annotation(
                     name=annotation_name,
-                    value=value,
+                    value=None,
+                    name_prefix="dendropy",
+                    namespace="http://packages.python.org/DendroPy/",
+                    is_attribute=bound_attr_name is not None,
                     )
+            # each field replaces any annotation of the same name, including
+            # one added for an earlier field
+            annotation_specs = [s for s in annotation_specs if s[1]["name"] != annotation_name]
+            annotation_specs.append( (field_index, template.__dict__, bound_attr_name) )
+        annotation_names = set(s[1]["name"] for s in annotation_specs)
+        return attr_names, annotation_specs, annotation_names
+
+    def _decorate_targets(self, targets, fields, columns):
+        """
+        Sets the values in ``columns`` (one list of values per field in
+        ``fields``, aligned with ``targets``) as attributes and/or annotations
+        of ``targets``.
+        """
+        attr_names, annotation_specs, annotation_names = self._compile_decorations(fields)
+        attr_columns = [(attr_name, column) for attr_name, column in zip(attr_names, columns) if attr_name is not None]
+        for target_index, target in enumerate(targets):
+            for attr_name, column in attr_columns:
+                setattr(target, attr_name, column[target_index])
+            if not annotation_specs:
+                continue
+            annotations = target.annotations
+            if annotations:
+                for a in [a for a in annotations if a.name in annotation_names]:
+                    annotations.remove(a)
+            new_annotations = []
+            for field_index, template, bound_attr_name in annotation_specs:
+                a = basemodel.Annotation.__new__(basemodel.Annotation)
+                a.__dict__.update(template)
+                if bound_attr_name is None:
+                    a._value = columns[field_index][target_index]
+                else:
+                    a._value = (target, bound_attr_name)
+                new_annotations.append(a)
+            annotations.update(new_annotations)
+
+    def _summary_columns(self, split_bitmasks, summaries):
+        """
+        Returns a list of the values of each of the summary statistics for the
+        splits given by ``split_bitmasks``, as found in ``summaries``.
+        """
+        columns = []
+        for stats_fieldname in self.summary_stats_fieldnames:
+            no_data_value = self.no_data_values.get(stats_fieldname, 0.0)
+            column = []
+            for split_bitmask in split_bitmasks:
+                try:
+                    split_summary = summaries[split_bitmask]
+                except KeyError:
+                    column.append(no_data_value)
+                else:
+                    column.append(split_summary.get(stats_fieldname, no_data_value))
+            columns.append(column)
+        return columns
 
     def summarize_splits_on_tree(self,
             split_distribution,
@@ -1999,90 +2205,64 @@ class SplitDistributionSummarizer(object):
         edge_length_summaries = split_distribution.split_edge_length_summaries
         split_freqs = split_distribution.split_frequencies
         assert len(self.node_age_summaries_fieldnames) == len(self.summary_stats_fieldnames)
-        for node in tree:
-            split_bitmask = node.edge.bipartition.split_bitmask
-            split_support = split_freqs.get(split_bitmask, 0.0)
-            if self.support_as_percentages:
-                split_support = split_support * 100
-            self._decorate(
-                target=node,
-                fieldname="support",
-                value=split_support,
-                set_attribute=self.add_support_as_node_attribute,
-                set_annotation=self.add_support_as_node_annotation,
-                )
-            if self.set_support_as_node_label:
+
+        # The summaries of the splits on the tree are resolved into columns of
+        # values, one per field and aligned with the nodes of the tree, which
+        # are then set on all the nodes and edges in one pass.
+        nodes = tree.preorder_nodes()
+        split_bitmasks = [node.edge.bipartition.split_bitmask for node in nodes]
+        split_supports = [split_freqs.get(split_bitmask, 0.0) for split_bitmask in split_bitmasks]
+        if self.support_as_percentages:
+            split_supports = [split_support * 100 for split_support in split_supports]
+        node_fields = [("support", self.add_support_as_node_attribute, self.add_support_as_node_annotation)]
+        node_columns = [split_supports]
+        if (self.add_node_age_summaries_as_node_attributes or self.add_node_age_summaries_as_node_annotations) and node_age_summaries:
+            for fieldname in self.node_age_summaries_fieldnames:
+                node_fields.append( (fieldname, self.add_node_age_summaries_as_node_attributes, self.add_node_age_summaries_as_node_annotations) )
+            node_columns.extend(self._summary_columns(split_bitmasks, node_age_summaries))
+        self._decorate_targets(nodes, node_fields, node_columns)
+        if (self.add_edge_length_summaries_as_edge_attributes or self.add_edge_length_summaries_as_edge_annotations) and edge_length_summaries:
+            edge_fields = []
+            for fieldname in self.edge_length_summaries_fieldnames:
+                edge_fields.append( (fieldname, self.add_edge_length_summaries_as_edge_attributes, self.add_edge_length_summaries_as_edge_annotations) )
+            self._decorate_targets(
+                    [node.edge for node in nodes],
+                    edge_fields,
+                    self._summary_columns(split_bitmasks, edge_length_summaries))
+        if self.set_support_as_node_label:
+            for node, split_support in zip(nodes, split_supports):
                 node.label = support_label_fn(split_support)
-            if (self.add_node_age_summaries_as_node_attributes or self.add_node_age_summaries_as_node_annotations) and node_age_summaries:
-                for fieldname, stats_fieldname in zip(self.node_age_summaries_fieldnames, self.summary_stats_fieldnames):
-                    no_data_value = self.no_data_values.get(stats_fieldname, 0.0)
-                    if not node_age_summaries or split_bitmask not in node_age_summaries:
-                        value = no_data_value
-                    else:
-                        value = node_age_summaries[split_bitmask].get(stats_fieldname, no_data_value)
-                    self._decorate(
-                        target=node,
-                        fieldname=fieldname,
-                        value=value,
-                        set_attribute=self.add_node_age_summaries_as_node_attributes,
-                        set_annotation=self.add_node_age_summaries_as_node_annotations,
-                        )
-            if (self.add_edge_length_summaries_as_edge_attributes or self.add_edge_length_summaries_as_edge_annotations) and edge_length_summaries:
-                for fieldname, stats_fieldname in zip(self.edge_length_summaries_fieldnames, self.summary_stats_fieldnames):
-                    no_data_value = self.no_data_values.get(stats_fieldname, 0.0)
-                    if not edge_length_summaries or split_bitmask not in edge_length_summaries:
-                        value = no_data_value
-                    else:
-                        value = edge_length_summaries[split_bitmask].get(stats_fieldname, no_data_value)
-                    self._decorate(
-                        target=node.edge,
-                        fieldname=fieldname,
-                        value=value,
-                        set_attribute=self.add_edge_length_summaries_as_edge_attributes,
-                        set_annotation=self.add_edge_length_summaries_as_edge_annotations,
-                        )
-            if self.set_edge_lengths is None:
-                pass
-            elif self.set_edge_lengths == "keep":
-                pass
-            elif self.set_edge_lengths == "support":
+
+        if self.set_edge_lengths is None or self.set_edge_lengths == "keep":
+            pass
+        elif self.set_edge_lengths == "support":
+            for node, split_support in zip(nodes, split_supports):
                 node.edge.length = split_support
-            elif self.set_edge_lengths == "clear":
-                edge.length = None
-            elif self.set_edge_lengths in ("mean-age", "median-age"):
-                if not node_age_summaries:
-                    raise ValueError("Node ages not available")
-                if self.set_edge_lengths == "mean-age":
-                    try:
-                        node.age = node_age_summaries[split_bitmask]["mean"]
-                    except KeyError:
-                        node.age = self.no_data_values.get("mean", 0.0)
-                elif self.set_edge_lengths == "median-age":
-                    try:
-                        node.age = node_age_summaries[split_bitmask]["median"]
-                    except KeyError:
-                        node.age = self.no_data_values.get("median", 0.0)
-                else:
-                    raise ValueError(self.set_edge_lengths)
-            elif self.set_edge_lengths in ("mean-length", "median-length"):
-                if not edge_length_summaries:
-                    raise ValueError("Edge lengths not available")
-                if self.set_edge_lengths == "mean-length":
-                    try:
-                        node.edge.length = edge_length_summaries[split_bitmask]["mean"]
-                    except KeyError:
-                        node.edge.length = self.no_data_values.get("mean", 0.0)
-                elif self.set_edge_lengths == "median-length":
-                    try:
-                        node.edge.length = edge_length_summaries[split_bitmask]["median"]
-                    except KeyError:
-                        node.edge.length = self.no_data_values.get("median", 0.0)
-                else:
-                    raise ValueError(self.set_edge_lengths)
-                if self.minimum_edge_length is not None and edge.length < self.minimum_edge_length:
-                    edge.length = self.minimum_edge_length
-            else:
-                raise ValueError(self.set_edge_lengths)
+        elif self.set_edge_lengths == "clear":
+            for node in nodes:
+                node.edge.length = None
+        elif self.set_edge_lengths in ("mean-age", "median-age"):
+            if not node_age_summaries:
+                raise ValueError("Node ages not available")
+            stats_fieldname = self.set_edge_lengths.split("-")[0]
+            no_data_value = self.no_data_values.get(stats_fieldname, 0.0)
+            for node, split_bitmask in zip(nodes, split_bitmasks):
+                try:
+                    node.age = node_age_summaries[split_bitmask][stats_fieldname]
+                except KeyError:
+                    node.age = no_data_value
+        elif self.set_edge_lengths in ("mean-length", "median-length"):
+            if not edge_length_summaries:
+                raise ValueError("Edge lengths not available")
+            stats_fieldname = self.set_edge_lengths.split("-")[0]
+            no_data_value = self.no_data_values.get(stats_fieldname, 0.0)
+            for node, split_bitmask in zip(nodes, split_bitmasks):
+                try:
+                    node.edge.length = edge_length_summaries[split_bitmask][stats_fieldname]
+                except KeyError:
+                    node.edge.length = no_data_value
+        else:
+            raise ValueError(self.set_edge_lengths)
         if self.set_edge_lengths in ("mean-age", "median-age"):
             tree.set_edge_lengths_from_node_ages(
                     minimum_edge_length=self.minimum_edge_length,
@@ -2095,6 +2275,163 @@ class SplitDistributionSummarizer(object):
                     node.edge.length = self.minimum_edge_length
         return tree
 
+###############################################################################
+### Packed Tree Storage
+
+_NAN = float("nan")
+
+class PackedTupleSequence(object):
+    """
+    A list-like sequence of tuples that is stored compactly, as a single flat
+    :class:`array.array` of (encoded) values and an array of the offsets of
+    the tuples in it. Used by |TreeArray| for columnar storage of per-tree
+    data. Elements are reconstructed as tuples on access.
+    """
+
+    typecode = None
+
+    def __init__(self, tuples=None):
+        self._values = array.array(self.typecode)
+        self._offsets = array.array("l", [0])
+        if tuples is not None:
+            self.extend(tuples)
+
+    def _encode(self, value):
+        return value
+
+    def _decode(self, value):
+        return value
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("{} index out of range".format(self.__class__.__name__))
+        decode = self._decode
+        return tuple([decode(v) for v in self._values[self._offsets[index]:self._offsets[index+1]]])
+
+    def __iter__(self):
+        decode = self._decode
+        for values in self.iter_encoded():
+            yield tuple([decode(v) for v in values])
+
+    def iter_encoded(self):
+        """
+        Iterates over the elements of this sequence as arrays of encoded
+        values.
+        """
+        values = self._values
+        start = 0
+        for end in self._offsets[1:]:
+            yield values[start:end]
+            start = end
+
+    def __eq__(self, other):
+        if len(self) != len(other):
+            return False
+        for t1, t2 in zip(self, other):
+            if t1 != t2:
+                return False
+        return True
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __contains__(self, item):
+        item = tuple(item)
+        for t in self:
+            if t == item:
+                return True
+        return False
+
+    def append(self, values):
+        encode = self._encode
+        self._values.extend([encode(v) for v in values])
+        self._offsets.append(len(self._values))
+
+    def insert(self, index, values):
+        num_elements = len(self)
+        if index < 0:
+            index = max(0, index + num_elements)
+        elif index > num_elements:
+            index = num_elements
+        encode = self._encode
+        encoded = array.array(self.typecode, [encode(v) for v in values])
+        start = self._offsets[index]
+        self._values[start:start] = encoded
+        n = len(encoded)
+        self._offsets[index+1:] = array.array("l", [offset + n for offset in self._offsets[index:]])
+
+    def extend(self, tuples):
+        for values in tuples:
+            self.append(values)
+
+class SplitBitmaskTupleSequence(PackedTupleSequence):
+    """
+    A :class:`PackedTupleSequence` of tuples of split bitmasks. Distinct split
+    bitmasks are stored once, in ``self.split_bitmasks``, and each tuple is
+    stored as a sequence of (32-bit) indexes into this table, regardless of
+    the number of taxa.
+    """
+
+    typecode = "i"
+
+    def __init__(self, tuples=None):
+        self.split_bitmasks = []
+        self.split_bitmask_ids = {}
+        PackedTupleSequence.__init__(self, tuples=tuples)
+
+    def _encode(self, split_bitmask):
+        try:
+            return self.split_bitmask_ids[split_bitmask]
+        except KeyError:
+            split_bitmask_id = len(self.split_bitmasks)
+            self.split_bitmask_ids[split_bitmask] = split_bitmask_id
+            self.split_bitmasks.append(split_bitmask)
+            return split_bitmask_id
+
+    def _decode(self, split_bitmask_id):
+        return self.split_bitmasks[split_bitmask_id]
+
+    def intern(self, split_bitmask):
+        """
+        Returns the stored instance of ``split_bitmask``, adding it to the
+        table of distinct split bitmasks if needed.
+        """
+        return self.split_bitmasks[self._encode(split_bitmask)]
+
+    def extend(self, tuples):
+        if isinstance(tuples, SplitBitmaskTupleSequence):
+            id_map = [self._encode(split_bitmask) for split_bitmask in tuples.split_bitmasks]
+            values_offset = len(self._values)
+            self._values.extend([id_map[v] for v in tuples._values])
+            self._offsets.extend([offset + values_offset for offset in tuples._offsets[1:]])
+        else:
+            PackedTupleSequence.extend(self, tuples)
+
+class EdgeLengthTupleSequence(PackedTupleSequence):
+    """
+    A :class:`PackedTupleSequence` of tuples of edge lengths, stored as
+    double-precision floating point values; |None| is stored as NaN.
+    """
+
+    typecode = "d"
+
+    def _encode(self, value):
+        if value is None:
+            return _NAN
+        return value
+
+    def _decode(self, value):
+        if value != value:
+            return None
+        return value
+
 ###############################################################################
 ### TreeArray
 
@@ -2112,6 +2449,20 @@ class TreeArray(
     discarded. A full |Tree| instance can be reconstructed as needed
     from the structural information stored by this class, at the cost of
     computation time.
+
+    If ``use_columnar_storage`` is |True|, then, instead of storing a tuple
+    of split bitmasks and a tuple of edge lengths for each tree, the
+    distinct split bitmasks are stored once and the trees are packed as
+    sequences of (32-bit) split indexes and (double-precision) edge lengths
+    in flat arrays (see :class:`SplitBitmaskTupleSequence` and
+    :class:`EdgeLengthTupleSequence`). This substantially reduces the memory
+    required for large collections of trees (e.g., posterior samples of
+    hundreds of thousands of trees). Note that edge lengths are then
+    always returned as floating point values.
+
+    The contents of the collection can be saved to a compact binary archive
+    using :meth:`TreeArray.save()`, and restored using
+    :meth:`TreeArray.load()`, without re-parsing the source trees.
     """
 
     class IncompatibleTreeArrayUpdate(Exception):
@@ -2139,6 +2490,8 @@ class TreeArray(
             is_force_max_age=None,
             taxon_label_age_map=None,
             is_bipartitions_updated=False,
+            use_columnar_storage=False,
+            summary_reservoir_size=None,
             ):
         taxon_namespace = trees.taxon_namespace
         ta = cls(
@@ -2150,6 +2503,8 @@ class TreeArray(
             ultrametricity_precision=ultrametricity_precision,
             is_force_max_age=is_force_max_age,
             taxon_label_age_map=taxon_label_age_map,
+            use_columnar_storage=use_columnar_storage,
+            summary_reservoir_size=summary_reservoir_size,
             )
         ta.add_trees(
                 trees=trees,
@@ -2168,6 +2523,8 @@ class TreeArray(
             ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
             is_force_max_age=None,
             taxon_label_age_map=None,
+            use_columnar_storage=False,
+            summary_reservoir_size=None,
             ):
         """
         Parameters
@@ -2188,6 +2545,15 @@ class TreeArray(
             |False|, then node ages will be stored.
         use_tree_weights : bool
             If |False|, then tree weights will not be used to weight splits.
+        use_columnar_storage : bool
+            If |True|, then split bitmasks, edge lengths and weights of
+            trees will be packed into arrays rather than stored as tuples
+            (see above).
+        summary_reservoir_size : int
+            If given, then the edge lengths and node ages of splits will
+            not be stored, but summarized on the fly, keeping a sample of
+            at most this number of values per split (see
+            |SplitDistribution|).
         """
         taxonmodel.TaxonNamespaceAssociated.__init__(self,
                 taxon_namespace=taxon_namespace)
@@ -2202,10 +2568,16 @@ class TreeArray(
         self.taxon_label_age_map = taxon_label_age_map
 
         # Storage
-        self._tree_split_bitmasks = []
-        self._tree_edge_lengths = []
+        self.use_columnar_storage = use_columnar_storage
+        if self.use_columnar_storage:
+            self._tree_split_bitmasks = SplitBitmaskTupleSequence()
+            self._tree_edge_lengths = EdgeLengthTupleSequence()
+            self._tree_weights = array.array("d")
+        else:
+            self._tree_split_bitmasks = []
+            self._tree_edge_lengths = []
+            self._tree_weights = []
         self._tree_leafset_bitmasks = []
-        self._tree_weights = []
         self._split_distribution = SplitDistribution(
                 taxon_namespace=self.taxon_namespace,
                 ignore_edge_lengths=self.ignore_edge_lengths,
@@ -2213,6 +2585,7 @@ class TreeArray(
                 ultrametricity_precision=ultrametricity_precision,
                 is_force_max_age=is_force_max_age,
                 taxon_label_age_map=self.taxon_label_age_map,
+                summary_reservoir_size=summary_reservoir_size,
                 )
 
     ##############################################################################
@@ -2244,6 +2617,8 @@ class TreeArray(
     ## Updating from Another TreeArray
 
     def update(self, other):
+        if self._split_distribution.summary_reservoir_size is None and other._split_distribution.summary_reservoir_size is not None:
+            raise TreeArray.IncompatibleTreeArrayUpdate("Updating from incompatible TreeArray: split edge lengths and node ages are summarized by the TreeArray to be added, but stored by this one")
         if len(self) > 0:
             # self.validate_rooting(other._is_rooted_trees)
             if self._is_rooted_trees is not other._is_rooted_trees:
@@ -2305,6 +2680,82 @@ class TreeArray(
                 tree=tree,
                 is_bipartitions_updated=is_bipartitions_updated,
                 default_edge_length_value=self.default_edge_length_value)
+        return self._add_tree_splits(
+                splits=splits,
+                edge_lengths=edge_lengths,
+                weight=tree.weight,
+                tree_leafset_bitmask=tree.seed_node.edge.bipartition.leafset_bitmask,
+                index=index)
+
+    def add_tree_skeleton(self, tree_skeleton, index=None):
+        """
+        Adds the structure represented by a |TreeSkeleton| instance to the
+        collection. The result is identical to that of adding the
+        corresponding |Tree| using :meth:`TreeArray.add_tree()`.
+
+        Parameters
+        ----------
+        tree_skeleton : |TreeSkeleton|
+            A |TreeSkeleton| instance. This must have the same rooting state
+            as all the other trees accessioned into this collection as well as
+            that of ``self.is_rooted_trees``.
+        index : integer
+            Insert before index.
+
+        Returns
+        -------
+        index : int
+            The index of the accession.
+        s : iterable of splits
+            A list of split bitmasks from ``tree_skeleton``.
+        e :
+            A list of edge length values from ``tree_skeleton``.
+        """
+        if self.taxon_namespace is not tree_skeleton.taxon_namespace:
+            raise error.TaxonNamespaceIdentityError(self, tree_skeleton)
+        self.validate_rooting(tree_skeleton.is_rooted)
+        splits, edge_lengths, node_ages = self._split_distribution.count_splits_on_tree_skeleton(
+                tree_skeleton=tree_skeleton,
+                default_edge_length_value=self.default_edge_length_value)
+        return self._add_tree_splits(
+                splits=splits,
+                edge_lengths=edge_lengths,
+                weight=tree_skeleton.weight,
+                tree_leafset_bitmask=tree_skeleton.leafset_bitmasks[-1],
+                index=index)
+
+    def _add_split_data(self,
+            splits,
+            edge_lengths,
+            node_ages,
+            weight,
+            is_rooted,
+            tree_leafset_bitmask):
+        """
+        Adds a tree given by its splits, edge lengths and node ages (as
+        extracted by :meth:`SplitDistribution._get_tree_split_data()`, e.g.,
+        restored by |TreeArrayCache|) to the collection.
+        """
+        self.validate_rooting(is_rooted)
+        self._split_distribution._count_split_data(
+                splits=splits,
+                edge_lengths=edge_lengths,
+                node_ages=node_ages,
+                weight=weight,
+                is_rooted=is_rooted)
+        return self._add_tree_splits(
+                splits=splits,
+                edge_lengths=edge_lengths,
+                weight=weight,
+                tree_leafset_bitmask=tree_leafset_bitmask,
+                index=None)
+
+    def _add_tree_splits(self,
+            splits,
+            edge_lengths,
+            weight,
+            tree_leafset_bitmask,
+            index):
 
         # pre-process splits
         splits = tuple(splits)
@@ -2318,22 +2769,23 @@ class TreeArray(
             edge_lengths = tuple(edge_lengths)
 
         # pre-process weights
-        if tree.weight is not None and self.use_tree_weights:
-            weight_to_use = float(tree.weight)
+        if weight is not None and self.use_tree_weights:
+            weight_to_use = float(weight)
         else:
             weight_to_use = 1.0
 
         # accession info
+        if self.use_columnar_storage:
+            tree_leafset_bitmask = self._tree_split_bitmasks.intern(tree_leafset_bitmask)
         if index is None:
             index = len(self._tree_split_bitmasks)
             self._tree_split_bitmasks.append(splits)
-            self._tree_leafset_bitmasks.append(tree.seed_node.edge.bipartition.leafset_bitmask)
+            self._tree_leafset_bitmasks.append(tree_leafset_bitmask)
             self._tree_edge_lengths.append(edge_lengths)
             self._tree_weights.append(weight_to_use)
         else:
             self._tree_split_bitmasks.insert(index, splits)
-            self._tree_leafset_bitmasks.insert(index,
-                    tree.seed_node.edge.bipartition.leafset_bitmask)
+            self._tree_leafset_bitmasks.insert(index, tree_leafset_bitmask)
             self._tree_edge_lengths.insert(index, edge_lengths)
             self._tree_weights.insert(index, weight_to_use)
         return index, splits, edge_lengths, weight_to_use
@@ -2380,6 +2832,20 @@ class TreeArray(
             objects opened for reading).
         schema : string
             The data format of the source. E.g., "nexus", "newick", "nexml".
+        num_processes : int
+            If greater than 1, then each NEXUS or Newick file given by path
+            will be split into chunks of consecutive trees that are parsed by
+            up to this number of worker processes and then merged, in order,
+            into this collection. Taxa are pre-loaded from the first tree of
+            each file (and the TAXA block, if any). Files that cannot be split
+            (e.g., file objects, other schemas, or NEXUS files with multiple
+            TREES blocks) are read serially.
+        bitmasks_only : bool
+            If |True|, then trees will be parsed into |TreeSkeleton| objects
+            (see :meth:`TreeSkeleton.yield_from_files()`) instead of full
+            |Tree| objects, which is considerably faster and uses less
+            memory. Only the "newick" and "nexus" schemas are supported in
+            this mode.
         \*\*kwargs : keyword arguments
             These will be passed directly to the underlying schema-specific
             reader implementation.
@@ -2388,11 +2854,52 @@ class TreeArray(
             if kwargs["taxon_namespace"] is not self.taxon_namespace:
                 raise ValueError("TaxonNamespace object passed as keyword argument is not the same as self's TaxonNamespace reference")
             kwargs.pop("taxon_namespace")
+        num_processes = kwargs.pop("num_processes", None)
         target_tree_offset = kwargs.pop("tree_offset", 0)
-        tree_yielder = self.tree_type.yield_from_files(
+        if num_processes is not None and num_processes > 1 and "collection_offset" not in kwargs:
+            for src in files:
+                tree_source_index = None
+                if textprocessing.is_str_type(src):
+                    tree_source_index = nexusprocessing.TreeSourceIndex.from_path(src, schema)
+                if tree_source_index is not None:
+                    chunks = tree_source_index.partition(
+                            num_chunks=num_processes,
+                            tree_offset=target_tree_offset)
+                else:
+                    chunks = None
+                if chunks and len(chunks) > 1:
+                    self._read_tree_source_chunks(
+                            tree_source_index=tree_source_index,
+                            chunks=chunks,
+                            schema=schema,
+                            num_processes=num_processes,
+                            **kwargs)
+                else:
+                    self._read_from_files(
+                            files=[src],
+                            schema=schema,
+                            tree_offset=target_tree_offset,
+                            **kwargs)
+        else:
+            self._read_from_files(
+                    files=files,
+                    schema=schema,
+                    tree_offset=target_tree_offset,
+                    **kwargs)
+
+    def _read_from_files(self,
+            files,
+            schema,
+            tree_offset,
+            **kwargs):
+        target_tree_offset = tree_offset
+        if kwargs.get("bitmasks_only", False):
+            add_tree = self.add_tree_skeleton
+        else:
+            add_tree = self.add_tree
+        tree_yielder = self._yield_trees_from_files(
                 files=files,
                 schema=schema,
-                taxon_namespace=self.taxon_namespace,
                 **kwargs)
         current_source_index = None
         current_tree_offset = None
@@ -2402,9 +2909,76 @@ class TreeArray(
                 current_source_index = current_yielder_index
                 current_tree_offset = 0
             if current_tree_offset >= target_tree_offset:
-                self.add_tree(tree=tree, is_bipartitions_updated=False)
+                add_tree(tree)
             current_tree_offset += 1
 
+    def _yield_trees_from_files(self, files, schema, **kwargs):
+        if kwargs.pop("bitmasks_only", False):
+            tree_type = treemodel.TreeSkeleton
+        else:
+            tree_type = self.tree_type
+        return tree_type.yield_from_files(
+                files=files,
+                schema=schema,
+                taxon_namespace=self.taxon_namespace,
+                **kwargs)
+
+    def _read_tree_source_chunks(self,
+            tree_source_index,
+            chunks,
+            schema,
+            num_processes,
+            **kwargs):
+        # Taxa are defined in the parent process, based on the first tree of
+        # the source, so that all workers share the same taxon indexing (and
+        # hence split bitmasks).
+        for tree in self._yield_trees_from_files(
+                files=[tree_source_index.chunk(0, 1).open()],
+                schema=schema,
+                **kwargs):
+            pass
+        taxon_labels = [taxon.label for taxon in self.taxon_namespace]
+        tree_array_kwargs = {
+            "is_rooted_trees": self._is_rooted_trees,
+            "ignore_edge_lengths": self.ignore_edge_lengths,
+            "ignore_node_ages": self.ignore_node_ages,
+            "use_tree_weights": self.use_tree_weights,
+            "ultrametricity_precision": self._split_distribution.ultrametricity_precision,
+            "is_force_max_age": self._split_distribution.is_force_max_age,
+            "taxon_label_age_map": self.taxon_label_age_map,
+            "use_columnar_storage": self.use_columnar_storage,
+            "summary_reservoir_size": self._split_distribution.summary_reservoir_size,
+            }
+        tasks = [(
+                chunk,
+                schema,
+                taxon_labels,
+                self.taxon_namespace.is_case_sensitive,
+                self.tree_type,
+                self.default_edge_length_value,
+                tree_array_kwargs,
+                kwargs) for chunk in chunks]
+        num_chunks_merged = 0
+        pool = multiprocessing.Pool(processes=min(num_processes, len(chunks)))
+        try:
+            for partial_tree_array in pool.imap(_read_tree_array_chunk, tasks):
+                if partial_tree_array is None:
+                    # chunk has taxa not seen in the first tree: this and
+                    # all subsequent chunks are read in this process
+                    break
+                self.validate_rooting(partial_tree_array._is_rooted_trees)
+                self.update(partial_tree_array)
+                num_chunks_merged += 1
+        finally:
+            pool.terminate()
+            pool.join()
+        for chunk in chunks[num_chunks_merged:]:
+            self._read_from_files(
+                    files=[chunk.open()],
+                    schema=schema,
+                    tree_offset=0,
+                    **kwargs)
+
     def _parse_and_add_from_stream(self,
             stream,
             schema,
@@ -2481,6 +3055,166 @@ class TreeArray(
         """
         return basemodel.MultiReadable._read_from(self, **kwargs)
 
+    ##############################################################################
+    ## Saving and Loading
+
+    _ARCHIVE_FORMAT_VERSION = 1
+
+    def save(self, path):
+        """
+        Saves the contents of this collection (the split bitmasks, edge
+        lengths and weights of the trees, as well as the split node ages, if
+        tracked) to a compact binary archive (a ZIP archive of packed arrays
+        and JSON-formatted metadata), from which the collection can be
+        restored using :meth:`TreeArray.load()`.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to which to save.
+        """
+        if self._split_distribution.summary_reservoir_size is not None:
+            raise ValueError("Cannot save TreeArray: split node ages are summarized on the fly rather than stored")
+        taxa = list(self.taxon_namespace)
+        for taxon_idx, taxon in enumerate(taxa):
+            if self.taxon_namespace.accession_index(taxon) != taxon_idx:
+                raise ValueError("Cannot save TreeArray: the taxa of the TaxonNamespace do not correspond to their accession indexes")
+        if self.use_columnar_storage:
+            tree_split_bitmasks = self._tree_split_bitmasks
+            tree_edge_lengths = self._tree_edge_lengths
+        else:
+            tree_split_bitmasks = SplitBitmaskTupleSequence(self._tree_split_bitmasks)
+            tree_edge_lengths = EdgeLengthTupleSequence(self._tree_edge_lengths)
+        # per-tree sizes rather than offsets, so that all integers fit in 32 bits
+        tree_sizes = array.array("i", [ (end - start) for start, end in zip(tree_split_bitmasks._offsets[:-1], tree_split_bitmasks._offsets[1:]) ])
+        tree_leafset_bitmask_ids = array.array("i", [tree_split_bitmasks._encode(b) for b in self._tree_leafset_bitmasks])
+        split_node_ages = EdgeLengthTupleSequence()
+        split_node_age_split_ids = array.array("i")
+        for split_bitmask, node_ages in self._split_distribution.split_node_ages.items():
+            split_node_age_split_ids.append(tree_split_bitmasks._encode(split_bitmask))
+            split_node_ages.append(node_ages)
+        split_node_age_sizes = array.array("i", [ (end - start) for start, end in zip(split_node_ages._offsets[:-1], split_node_ages._offsets[1:]) ])
+        metadata = {
+            "format_version": self._ARCHIVE_FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "taxon_labels": [taxon.label for taxon in taxa],
+            "is_case_sensitive": self.taxon_namespace.is_case_sensitive,
+            "is_rooted_trees": self._is_rooted_trees,
+            "ignore_edge_lengths": self.ignore_edge_lengths,
+            "ignore_node_ages": self.ignore_node_ages,
+            "use_tree_weights": self.use_tree_weights,
+            "ultrametricity_precision": self._split_distribution.ultrametricity_precision,
+            "is_force_max_age": self._split_distribution.is_force_max_age,
+            "taxon_label_age_map": self.taxon_label_age_map,
+            "default_edge_length_value": self.default_edge_length_value,
+            "split_bitmasks": ["{:x}".format(b) for b in tree_split_bitmasks.split_bitmasks],
+            }
+        members = {
+            "tree_split_bitmask_ids": tree_split_bitmasks._values,
+            "tree_sizes": tree_sizes,
+            "tree_leafset_bitmask_ids": tree_leafset_bitmask_ids,
+            "tree_edge_lengths": tree_edge_lengths._values,
+            "tree_weights": array.array("d", self._tree_weights),
+            "split_node_age_split_ids": split_node_age_split_ids,
+            "split_node_age_sizes": split_node_age_sizes,
+            "split_node_ages": split_node_ages._values,
+            }
+        archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        try:
+            archive.writestr("metadata.json", json.dumps(metadata))
+            for name, values in members.items():
+                archive.writestr(name, _array_to_bytes(values))
+        finally:
+            archive.close()
+
+    def load(cls, path, taxon_namespace=None, use_columnar_storage=True):
+        """
+        Restores a collection saved using :meth:`TreeArray.save()`.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to load.
+        taxon_namespace : |TaxonNamespace|
+            If given, then this namespace will be used. Its taxa must have
+            the same labels, in the same order, as those of the namespace of
+            the saved collection. Otherwise, a new |TaxonNamespace| will be
+            created.
+        use_columnar_storage : bool
+            Storage mode of the collection returned (see |TreeArray|).
+
+        Returns
+        -------
+        tree_array : |TreeArray|
+            The restored collection.
+        """
+        archive = zipfile.ZipFile(path, "r")
+        try:
+            metadata = json.loads(textprocessing.bytes_to_text(archive.read("metadata.json")))
+            if metadata["format_version"] > cls._ARCHIVE_FORMAT_VERSION:
+                raise ValueError("Unsupported TreeArray archive format version: {}".format(metadata["format_version"]))
+            is_byteswap = metadata["byteorder"] != sys.byteorder
+            def _read_array(name, typecode):
+                return _array_from_bytes(typecode, archive.read(name), is_byteswap)
+            tree_split_bitmask_ids = _read_array("tree_split_bitmask_ids", "i")
+            tree_sizes = _read_array("tree_sizes", "i")
+            tree_leafset_bitmask_ids = _read_array("tree_leafset_bitmask_ids", "i")
+            tree_edge_lengths = _read_array("tree_edge_lengths", "d")
+            tree_weights = _read_array("tree_weights", "d")
+            split_node_age_split_ids = _read_array("split_node_age_split_ids", "i")
+            split_node_age_sizes = _read_array("split_node_age_sizes", "i")
+            split_node_ages = _read_array("split_node_ages", "d")
+        finally:
+            archive.close()
+        if taxon_namespace is None:
+            taxon_namespace = taxonmodel.TaxonNamespace(
+                    metadata["taxon_labels"],
+                    is_case_sensitive=metadata["is_case_sensitive"])
+        elif [taxon.label for taxon in taxon_namespace] != metadata["taxon_labels"]:
+            raise ValueError("Taxa of TaxonNamespace do not match those of the saved TreeArray")
+        tree_array = cls(
+                taxon_namespace=taxon_namespace,
+                is_rooted_trees=metadata["is_rooted_trees"],
+                ignore_edge_lengths=metadata["ignore_edge_lengths"],
+                ignore_node_ages=metadata["ignore_node_ages"],
+                use_tree_weights=metadata["use_tree_weights"],
+                ultrametricity_precision=metadata["ultrametricity_precision"],
+                is_force_max_age=metadata["is_force_max_age"],
+                taxon_label_age_map=metadata["taxon_label_age_map"],
+                use_columnar_storage=use_columnar_storage,
+                )
+        tree_array.default_edge_length_value = metadata["default_edge_length_value"]
+        split_bitmask_table = [int(b, 16) for b in metadata["split_bitmasks"]]
+        split_distribution = tree_array._split_distribution
+        decode_edge_length = EdgeLengthTupleSequence()._decode
+        start = 0
+        for tree_size, tree_leafset_bitmask_id, weight in zip(tree_sizes, tree_leafset_bitmask_ids, tree_weights):
+            end = start + tree_size
+            splits = [split_bitmask_table[split_id] for split_id in tree_split_bitmask_ids[start:end]]
+            edge_lengths = [decode_edge_length(elen) for elen in tree_edge_lengths[start:end]]
+            start = end
+            # as counted by :meth:`SplitDistribution.count_splits_on_tree()`
+            split_distribution.total_trees_counted += 1
+            split_distribution.sum_of_tree_weights += weight
+            split_distribution.tree_rooting_types_counted.add(bool(tree_array._is_rooted_trees))
+            for split, elen in zip(splits, edge_lengths):
+                split_distribution.split_counts[split] += weight
+                if not tree_array.ignore_edge_lengths:
+                    split_distribution.split_edge_lengths[split].append(elen)
+            tree_array._add_tree_splits(
+                    splits=splits,
+                    edge_lengths=edge_lengths,
+                    weight=weight,
+                    tree_leafset_bitmask=split_bitmask_table[tree_leafset_bitmask_id],
+                    index=None)
+        start = 0
+        for split_id, num_ages in zip(split_node_age_split_ids, split_node_age_sizes):
+            end = start + num_ages
+            split_distribution.split_node_ages[split_bitmask_table[split_id]] = [decode_edge_length(age) for age in split_node_ages[start:end]]
+            start = end
+        return tree_array
+    load = classmethod(load)
+
     ##############################################################################
     ## Container (List) Interface
 
@@ -2589,6 +3323,7 @@ class TreeArray(
                 ignore_node_ages=self.ignore_node_ages,
                 use_tree_weights=self.use_tree_weights,
                 ultrametricity_precision=self._split_distribution.ultrametricity_precision,
+                use_columnar_storage=self.use_columnar_storage,
                 )
         ta.default_edge_length_value = self.default_edge_length_value
         ta.tree_type = self.tree_type
@@ -2695,26 +3430,9 @@ class TreeArray(
             and the second being the index of the highest score. The element order
             corresponds to the trees accessioned in the collection.
         """
-        assert len(self._tree_leafset_bitmasks) == len(self._tree_split_bitmasks)
-        scores = []
-        max_score = None
-        max_score_tree_idx = None
-        split_frequencies = self._split_distribution.split_frequencies
-        for tree_idx, (tree_leafset_bitmask, split_bitmasks) in enumerate(zip(self._tree_leafset_bitmasks, self._tree_split_bitmasks)):
-            log_product_of_split_support = 0.0
-            for split_bitmask in split_bitmasks:
-                if (include_external_splits
-                        or split_bitmask == tree_leafset_bitmask # count root edge (following BEAST)
-                        or not treemodel.Bipartition.is_trivial_bitmask(split_bitmask, tree_leafset_bitmask)
-                        ):
-                    split_support = split_frequencies.get(split_bitmask, 0.0)
-                    if split_support:
-                        log_product_of_split_support += math.log(split_support)
-            if max_score is None or max_score < log_product_of_split_support:
-                max_score = log_product_of_split_support
-                max_score_tree_idx = tree_idx
-            scores.append(log_product_of_split_support)
-        return scores, max_score_tree_idx
+        return self._calculate_split_support_scores(
+                include_external_splits=include_external_splits,
+                split_support_score_fn=_log_split_support)
 
     def maximum_product_of_split_support_tree(self,
             include_external_splits=False,
@@ -2775,24 +3493,61 @@ class TreeArray(
             and the second being the index of the highest score. The element order
             corresponds to the trees accessioned in the collection.
         """
+        return self._calculate_split_support_scores(
+                include_external_splits=include_external_splits,
+                split_support_score_fn=None)
+
+    def _calculate_split_support_scores(self,
+            include_external_splits,
+            split_support_score_fn):
+        # The score of each tree is the sum of the scores of its splits (the
+        # split support, transformed by ``split_support_score_fn``, if given,
+        # or 0.0 for splits that are excluded); each distinct split is only
+        # scored once for each distinct tree leafset.
         assert len(self._tree_leafset_bitmasks) == len(self._tree_split_bitmasks)
+        if self.use_columnar_storage:
+            tree_split_keys = self._tree_split_bitmasks.iter_encoded()
+            split_bitmask_table = self._tree_split_bitmasks.split_bitmasks
+        else:
+            tree_split_keys = self._tree_split_bitmasks
+            split_bitmask_table = None
         scores = []
         max_score = None
         max_score_tree_idx = None
         split_frequencies = self._split_distribution.split_frequencies
-        for tree_idx, (tree_leafset_bitmask, split_bitmasks) in enumerate(zip(self._tree_leafset_bitmasks, self._tree_split_bitmasks)):
-            sum_of_support = 0.0
-            for split_bitmask in split_bitmasks:
+        tree_leafset_split_scores = {}
+        for tree_idx, (tree_leafset_bitmask, split_keys) in enumerate(zip(self._tree_leafset_bitmasks, tree_split_keys)):
+            try:
+                split_scores = tree_leafset_split_scores[tree_leafset_bitmask]
+            except KeyError:
+                split_scores = {}
+                tree_leafset_split_scores[tree_leafset_bitmask] = split_scores
+            score = 0.0
+            for split_key in split_keys:
+                try:
+                    score += split_scores[split_key]
+                    continue
+                except KeyError:
+                    pass
+                if split_bitmask_table is None:
+                    split_bitmask = split_key
+                else:
+                    split_bitmask = split_bitmask_table[split_key]
                 if (include_external_splits
                         or split_bitmask == tree_leafset_bitmask # count root edge (following BEAST)
                         or not treemodel.Bipartition.is_trivial_bitmask(split_bitmask, tree_leafset_bitmask)
                         ):
-                    split_support = split_frequencies.get(split_bitmask, 0.0)
-                    sum_of_support += split_support
-            if max_score is None or max_score < sum_of_support:
-                max_score = sum_of_support
+                    split_score = split_frequencies.get(split_bitmask, 0.0)
+                    if split_support_score_fn is not None:
+                        split_score = split_support_score_fn(split_score)
+                else:
+                    split_score = 0.0
+                split_scores[split_key] = split_score
+                score += split_score
+            if max_score is None or max_score < score:
+                max_score = score
                 max_score_tree_idx = tree_idx
-            scores.append(sum_of_support)
+            scores.append(score)
         return scores, max_score_tree_idx
 
     def maximum_sum_of_split_support_tree(self,
@@ -2879,6 +3634,57 @@ class TreeArray(
         # return self._split_distribution.consensus_tree(*args, **kwargs)
         return tree
 
+    def distance_matrix(self,
+            metric="symmetric_difference",
+            num_processes=1,
+            block_size=None,
+            dest=None,
+            delimiter=","):
+        """
+        Returns the matrix of the distances between all pairs of trees in
+        the collection, calculated from the split bitmasks (and edge
+        lengths) already stored. See
+        :func:`dendropy.calculate.treecompare.distance_matrix()` for details.
+
+        Parameters
+        ----------
+        metric : str
+            "symmetric_difference" (or "unweighted_robinson_foulds"),
+            "weighted_robinson_foulds" or "euclidean". The weighted distances
+            require edge lengths to be stored (i.e., ``ignore_edge_lengths``
+            must be |False|).
+        num_processes : int
+            Number of processes across which to distribute the calculation
+            of blocks of rows of the matrix.
+        block_size : int
+            Number of rows of the matrix to be calculated in each block.
+        dest : file-like object
+            If given, then each row of the matrix is written to this stream
+            as a line of values separated by ``delimiter`` instead of the
+            matrix being returned.
+        delimiter : str
+            Separator of the values of the rows written to ``dest``.
+
+        Returns
+        -------
+        m : list[array.array]
+            A list of rows, with the ``j``-th element of the ``i``-th row
+            being the distance between the ``i``-th and ``j``-th trees, or
+            |None| if ``dest`` is given.
+        """
+        if self.ignore_edge_lengths:
+            tree_edge_lengths = [None] * len(self._tree_split_bitmasks)
+        else:
+            tree_edge_lengths = self._tree_edge_lengths
+        return treecompare._distance_matrix(
+                tree_splits=self._tree_split_bitmasks,
+                tree_edge_lengths=tree_edge_lengths,
+                metric=metric,
+                num_processes=num_processes,
+                block_size=block_size,
+                dest=dest,
+                delimiter=delimiter)
+
     ##############################################################################
     ## Mapping of Split Support
 
@@ -2927,19 +3733,48 @@ class TreeArray(
     ##############################################################################
     ## Topology Frequencies
 
+    def _count_split_bitmask_sets(self):
+        """
+        Returns a tuple of two dictionaries, with keys being the distinct sets
+        of split bitmasks of the trees in the collection, and values being,
+        respectively, the total weight of the trees represented by each set, and
+        the leafset bitmask of (the first of) those trees.
+        """
+        split_bitmask_set_count_map = collections.Counter()
+        split_bitmask_set_leafset_map = {}
+        assert len(self._tree_split_bitmasks) == len(self._tree_weights)
+        if self.use_columnar_storage:
+            # count sets of split indexes, and only translate the distinct
+            # sets into sets of split bitmasks
+            split_id_set_count_map = collections.Counter()
+            split_id_set_leafset_map = {}
+            for split_ids, weight, tree_leafset_bitmask in zip(self._tree_split_bitmasks.iter_encoded(), self._tree_weights, self._tree_leafset_bitmasks):
+                split_id_set = frozenset(split_ids)
+                split_id_set_count_map[split_id_set] += (1.0 * weight)
+                if split_id_set not in split_id_set_leafset_map:
+                    split_id_set_leafset_map[split_id_set] = tree_leafset_bitmask
+            split_bitmask_table = self._tree_split_bitmasks.split_bitmasks
+            for split_id_set in split_id_set_count_map:
+                split_bitmask_set = frozenset([split_bitmask_table[split_id] for split_id in split_id_set])
+                split_bitmask_set_count_map[split_bitmask_set] = split_id_set_count_map[split_id_set]
+                split_bitmask_set_leafset_map[split_bitmask_set] = split_id_set_leafset_map[split_id_set]
+        else:
+            for split_bitmask_set, weight, tree_leafset_bitmask in zip(self._tree_split_bitmasks, self._tree_weights, self._tree_leafset_bitmasks):
+                split_bitmask_set = frozenset(split_bitmask_set)
+                split_bitmask_set_count_map[split_bitmask_set] += (1.0 * weight)
+                if split_bitmask_set not in split_bitmask_set_leafset_map:
+                    split_bitmask_set_leafset_map[split_bitmask_set] = tree_leafset_bitmask
+        return split_bitmask_set_count_map, split_bitmask_set_leafset_map
+
     def split_bitmask_set_frequencies(self):
         """
         Returns a dictionary with keys being sets of split bitmasks and values
         being the frequency of occurrence of trees represented by those split
         bitmask sets in the collection.
         """
-        split_bitmask_set_count_map = collections.Counter()
-        assert len(self._tree_split_bitmasks) == len(self._tree_weights)
-        for split_bitmask_set, weight in zip(self._tree_split_bitmasks, self._tree_weights):
-            split_bitmask_set_count_map[frozenset(split_bitmask_set)] += (1.0 * weight)
+        split_bitmask_set_count_map, split_bitmask_set_leafset_map = self._count_split_bitmask_sets()
         split_bitmask_set_freqs = {}
         normalization_weight = self._split_distribution.calc_normalization_weight()
-        # print("===> {}".format(normalization_weight))
         for split_bitmask_set in split_bitmask_set_count_map:
             split_bitmask_set_freqs[split_bitmask_set] = split_bitmask_set_count_map[split_bitmask_set] / normalization_weight
         return split_bitmask_set_freqs
@@ -2951,26 +3786,30 @@ class TreeArray(
         values the frequency of occurrence of trees represented by that
         encoding in the collection.
         """
-        # split_bitmask_set_freqs = self.split_bitmask_set_frequencies()
-        # bipartition_encoding_freqs = {}
-        # for split_bitmask_set, freq in split_bitmask_set_freqs.items():
-        #     bipartition_encoding = []
-        #     inferred_leafset = max(split_bitmask_set)
-        #     for split_bitmask in split_bitmask_set:
-        #         bipartition = treemodel.Bipartition(
-        #                 bitmask=split_bitmask,
-        #                 tree_leafset_bitmask=inferred_leafset,
-        #                 is_rooted=self._is_rooted_trees,
-        #                 is_mutable=False,
-        #                 compile_bipartition=True,
-        #                 )
-        #         bipartition_encoding.append(bipartition)
-        #     bipartition_encoding_freqs[frozenset(bipartition_encoding)] = freq
-        # return bipartition_encoding_freqs
+        # The bipartitions are built directly from the distinct sets of split
+        # bitmasks (and the leafset bitmask of the trees), without
+        # reconstructing the trees.
+        split_bitmask_set_count_map, split_bitmask_set_leafset_map = self._count_split_bitmask_sets()
+        normalization_weight = self._split_distribution.calc_normalization_weight()
+        bipartitions = {}
         bipartition_encoding_freqs = {}
-        topologies = self.topologies()
-        for tree in topologies:
-            bipartition_encoding_freqs[ frozenset(tree.encode_bipartitions()) ] = tree.frequency
+        for split_bitmask_set in split_bitmask_set_count_map:
+            tree_leafset_bitmask = split_bitmask_set_leafset_map[split_bitmask_set]
+            bipartition_encoding = []
+            for split_bitmask in split_bitmask_set:
+                try:
+                    bipartition = bipartitions[split_bitmask, tree_leafset_bitmask]
+                except KeyError:
+                    bipartition = treemodel.Bipartition(
+                            bitmask=split_bitmask,
+                            tree_leafset_bitmask=tree_leafset_bitmask,
+                            is_rooted=self._is_rooted_trees,
+                            is_mutable=False,
+                            compile_bipartition=True,
+                            )
+                    bipartitions[split_bitmask, tree_leafset_bitmask] = bipartition
+                bipartition_encoding.append(bipartition)
+            bipartition_encoding_freqs[frozenset(bipartition_encoding)] = split_bitmask_set_count_map[split_bitmask_set] / normalization_weight
         return bipartition_encoding_freqs
 
     def topologies(self,
@@ -3029,5 +3868,725 @@ class TreeArray(
             topologies.sort(key=lambda t: getattr(t, frequency_attr_name), reverse=sort_descending)
         return topologies
 
+###############################################################################
+### TreeArrayColumns
+
+class TreeArrayColumns(object):
+    """
+    The contents of a |TreeArray| as flat arrays: the split bitmasks (as
+    indexes into a table of distinct split bitmasks), edge lengths and
+    weights of its trees, and the split counts and split edge lengths and
+    node ages (or their running summaries, if ``summary_reservoir_size`` is
+    given) of its |SplitDistribution|.
+
+    Unlike a |TreeArray|, this can be written to and read from a file
+    without pickling, and merged with another without creating any objects
+    for individual trees or values: the split counts and values are stored
+    as runs of values for a split, and the runs of the same split from
+    different sources are only combined (in order) when the contents are
+    restored as a |TreeArray| using :meth:`TreeArrayColumns.to_tree_array()`.
+    This is used to combine |TreeArray| instances built in parallel, e.g., by
+    SumTrees, which merges the results of its worker processes pairwise, in
+    a reduction tree.
+
+    Example::
+
+        columns = dendropy.TreeArrayColumns.from_tree_array(tree_array1)
+        columns.update(dendropy.TreeArrayColumns.from_tree_array(tree_array2))
+        tree_array = columns.to_tree_array(taxon_namespace=tree_array1.taxon_namespace)
+
+    """
+
+    # Arrays of (double-precision) values. Each has a companion array of
+    # flags marking the values that were |None| (stored as NaN) or integers
+    # (e.g., a default edge length of 0), so that these are restored as such.
+    VALUE_ARRAY_NAMES = (
+        "tree_edge_lengths",
+        "split_edge_lengths",
+        "split_edge_length_stats",
+        "split_node_ages",
+        "split_node_age_stats",
+        )
+    _FLOAT_VALUE = 0
+    _INTEGER_VALUE = 1
+    _NONE_VALUE = 2
+
+    # Arrays of indexes into the table of split bitmasks.
+    SPLIT_BITMASK_ID_ARRAY_NAMES = (
+        "tree_split_bitmask_ids",
+        "tree_leafset_bitmask_ids",
+        "split_count_ids",
+        "split_edge_length_ids",
+        "split_node_age_ids",
+        )
+
+    # Name and typecode of each array, in the order in which they are
+    # written to a file. The "split_..._ids" arrays give the split of each
+    # run of values, and the "split_..._sizes" arrays the number of values in
+    # each run.
+    ARRAY_TYPECODES = (
+        ("tree_split_bitmask_ids", "i"),
+        ("tree_sizes", "i"),
+        ("tree_leafset_bitmask_ids", "i"),
+        ("tree_weights", "d"),
+        ("split_count_ids", "i"),
+        ("split_counts", "d"),
+        ("split_edge_length_ids", "i"),
+        ("split_edge_length_sizes", "i"),
+        ("split_node_age_ids", "i"),
+        ("split_node_age_sizes", "i"),
+        ) + tuple((name, "d") for name in VALUE_ARRAY_NAMES) \
+          + tuple((name + "_flags", "b") for name in VALUE_ARRAY_NAMES)
+
+    # Attribute of |SplitDistribution| and prefix of the names of the arrays
+    # of each of its collections of split values.
+    SPLIT_VALUES_PREFIXES = (
+        ("split_edge_lengths", "split_edge_length"),
+        ("split_node_ages", "split_node_age"),
+        )
+
+    # Number of values stored (in the "..._stats" arrays) for each run of
+    # split values if these are summarized: count, mean, sum of squared
+    # deviations, minimum and maximum.
+    NUM_SUMMARY_STATS = 5
+
+    def from_tree_array(cls, tree_array):
+        """
+        Returns the contents of ``tree_array`` as a new |TreeArrayColumns|
+        instance.
+        """
+        split_distribution = tree_array._split_distribution
+        columns = cls(
+                is_rooted_trees=tree_array._is_rooted_trees,
+                ignore_edge_lengths=tree_array.ignore_edge_lengths,
+                ignore_node_ages=tree_array.ignore_node_ages,
+                use_tree_weights=tree_array.use_tree_weights,
+                summary_reservoir_size=split_distribution.summary_reservoir_size)
+        if tree_array.use_columnar_storage:
+            tree_split_bitmasks = tree_array._tree_split_bitmasks
+            tree_edge_lengths = tree_array._tree_edge_lengths._values
+            columns.tree_edge_lengths = array.array("d", tree_edge_lengths)
+            columns.tree_edge_lengths_flags = array.array("b", [(cls._NONE_VALUE if v != v else cls._FLOAT_VALUE) for v in tree_edge_lengths])
+        else:
+            tree_split_bitmasks = SplitBitmaskTupleSequence(tree_array._tree_split_bitmasks)
+            for edge_lengths in tree_array._tree_edge_lengths:
+                columns._extend_values("tree_edge_lengths", edge_lengths)
+        columns.split_bitmasks = list(tree_split_bitmasks.split_bitmasks)
+        columns.split_bitmask_ids = dict(tree_split_bitmasks.split_bitmask_ids)
+        columns.tree_split_bitmask_ids = array.array("i", tree_split_bitmasks._values)
+        columns.tree_sizes = array.array("i", [ (end - start) for start, end in zip(tree_split_bitmasks._offsets[:-1], tree_split_bitmasks._offsets[1:]) ])
+        columns.tree_leafset_bitmask_ids = array.array("i", [columns._encode(b) for b in tree_array._tree_leafset_bitmasks])
+        columns.tree_weights = array.array("d", tree_array._tree_weights)
+        columns.total_trees_counted = split_distribution.total_trees_counted
+        columns.sum_of_tree_weights = split_distribution.sum_of_tree_weights
+        columns.tree_rooting_types_counted = set(split_distribution.tree_rooting_types_counted)
+        columns.split_count_ids = array.array("i", [columns._encode(b) for b in split_distribution.split_counts])
+        columns.split_counts = array.array("d", split_distribution.split_counts.values())
+        for attr_name, prefix in cls.SPLIT_VALUES_PREFIXES:
+            split_bitmasks = []
+            all_split_values = []
+            all_stats = []
+            for split_bitmask, split_values in getattr(split_distribution, attr_name).items():
+                split_bitmasks.append(split_bitmask)
+                if columns.summary_reservoir_size is not None:
+                    all_stats.extend([
+                        float(split_values.count),
+                        split_values.mean,
+                        split_values.sum_of_squared_deviations,
+                        split_values.minimum,
+                        split_values.maximum])
+                    split_values = split_values.reservoir
+                all_split_values.append(split_values)
+            getattr(columns, prefix + "_ids").extend([columns._encode(b) for b in split_bitmasks])
+            getattr(columns, prefix + "_sizes").extend([len(split_values) for split_values in all_split_values])
+            columns._extend_values(prefix + "s", list(itertools.chain.from_iterable(all_split_values)))
+            columns._extend_values(prefix + "_stats", all_stats)
+        return columns
+    from_tree_array = classmethod(from_tree_array)
+
+    def read(cls, path, share_split_bitmasks_with=None):
+        """
+        Reads a |TreeArrayColumns| instance from the file at ``path``, as
+        written by :meth:`TreeArrayColumns.write()`.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to read.
+        share_split_bitmasks_with : |TreeArrayColumns|
+            If given, then the instance returned will share the table of
+            split bitmasks of this instance (adding its own split bitmasks to
+            it as needed), so that either can be merged into the other by
+            :meth:`TreeArrayColumns.update()` without renumbering the splits.
+        """
+        with open(path, "rb") as src:
+            metadata = json.loads(textprocessing.bytes_to_text(src.readline()))
+            columns = cls(
+                    is_rooted_trees=metadata["is_rooted_trees"],
+                    ignore_edge_lengths=metadata["ignore_edge_lengths"],
+                    ignore_node_ages=metadata["ignore_node_ages"],
+                    use_tree_weights=metadata["use_tree_weights"],
+                    summary_reservoir_size=metadata["summary_reservoir_size"])
+            columns.total_trees_counted = metadata["total_trees_counted"]
+            columns.sum_of_tree_weights = metadata["sum_of_tree_weights"]
+            columns.tree_rooting_types_counted = set(metadata["tree_rooting_types_counted"])
+            for name, typecode in cls.ARRAY_TYPECODES:
+                values = array.array(typecode)
+                values.fromfile(src, metadata["array_sizes"][name])
+                setattr(columns, name, values)
+        split_bitmasks = [int(b, 16) for b in metadata["split_bitmasks"]]
+        if share_split_bitmasks_with is None:
+            columns.split_bitmasks = split_bitmasks
+            columns.split_bitmask_ids = dict((b, idx) for idx, b in enumerate(split_bitmasks))
+        else:
+            columns.split_bitmasks = share_split_bitmasks_with.split_bitmasks
+            columns.split_bitmask_ids = share_split_bitmasks_with.split_bitmask_ids
+            columns._renumber_splits([columns._encode(b) for b in split_bitmasks])
+        return columns
+    read = classmethod(read)
+
+    def __init__(self,
+            is_rooted_trees=None,
+            ignore_edge_lengths=False,
+            ignore_node_ages=True,
+            use_tree_weights=True,
+            summary_reservoir_size=None):
+        """
+        Creates an empty collection; use
+        :meth:`TreeArrayColumns.from_tree_array()` or
+        :meth:`TreeArrayColumns.read()` to populate one.
+        """
+        self.is_rooted_trees = is_rooted_trees
+        self.ignore_edge_lengths = ignore_edge_lengths
+        self.ignore_node_ages = ignore_node_ages
+        self.use_tree_weights = use_tree_weights
+        self.summary_reservoir_size = summary_reservoir_size
+        self.total_trees_counted = 0
+        self.sum_of_tree_weights = 0.0
+        self.tree_rooting_types_counted = set()
+        self.split_bitmasks = []
+        self.split_bitmask_ids = {}
+        for name, typecode in self.ARRAY_TYPECODES:
+            setattr(self, name, array.array(typecode))
+
+    def __len__(self):
+        return len(self.tree_sizes)
 
+    def _encode(self, split_bitmask):
+        try:
+            return self.split_bitmask_ids[split_bitmask]
+        except KeyError:
+            split_bitmask_id = len(self.split_bitmasks)
+            self.split_bitmask_ids[split_bitmask] = split_bitmask_id
+            self.split_bitmasks.append(split_bitmask)
+            return split_bitmask_id
+
+    def _renumber_splits(self, id_map):
+        # Replaces every split bitmask index ``i`` by ``id_map[i]``.
+        if id_map == list(range(len(id_map))):
+            return
+        for name in self.SPLIT_BITMASK_ID_ARRAY_NAMES:
+            setattr(self, name, array.array("i", map(id_map.__getitem__, getattr(self, name))))
+
+    def _extend_values(self, name, values):
+        value_types = set(map(type, values))
+        if not value_types or value_types == set([float]):
+            getattr(self, name).extend(values)
+            getattr(self, name + "_flags").extend(array.array("b", [self._FLOAT_VALUE]) * len(values))
+        else:
+            getattr(self, name).extend([(_NAN if v is None else v) for v in values])
+            getattr(self, name + "_flags").extend([
+                (self._NONE_VALUE if v is None else (self._INTEGER_VALUE if isinstance(v, int) else self._FLOAT_VALUE))
+                for v in values])
+
+    def _get_values(self, name):
+        values = getattr(self, name).tolist()
+        flags = getattr(self, name + "_flags")
+        if flags.count(self._FLOAT_VALUE) < len(flags):
+            for idx, flag in enumerate(flags):
+                if flag == self._INTEGER_VALUE:
+                    values[idx] = int(values[idx])
+                elif flag == self._NONE_VALUE:
+                    values[idx] = None
+        return values
+
+    def _new_summary(self, stats, reservoir):
+        summary = statistics.StreamingSummary(reservoir_size=self.summary_reservoir_size)
+        summary.count = int(stats[0])
+        summary.mean = stats[1]
+        summary.sum_of_squared_deviations = stats[2]
+        summary.minimum = stats[3]
+        summary.maximum = stats[4]
+        summary.reservoir = reservoir
+        return summary
+
+    def write(self, path):
+        """
+        Writes this collection to the file at ``path``, as a line of
+        JSON-formatted metadata followed by the arrays in their native binary
+        representation (so the file can only be read on a machine with the
+        same byte order and type sizes, e.g., by another process).
+        """
+        metadata = {
+            "is_rooted_trees": self.is_rooted_trees,
+            "ignore_edge_lengths": self.ignore_edge_lengths,
+            "ignore_node_ages": self.ignore_node_ages,
+            "use_tree_weights": self.use_tree_weights,
+            "summary_reservoir_size": self.summary_reservoir_size,
+            "total_trees_counted": self.total_trees_counted,
+            "sum_of_tree_weights": self.sum_of_tree_weights,
+            "tree_rooting_types_counted": sorted(self.tree_rooting_types_counted),
+            "split_bitmasks": ["{:x}".format(b) for b in self.split_bitmasks],
+            "array_sizes": dict((name, len(getattr(self, name))) for name, typecode in self.ARRAY_TYPECODES),
+            }
+        with open(path, "wb") as dest:
+            dest.write((json.dumps(metadata) + "\n").encode("utf-8"))
+            for name, typecode in self.ARRAY_TYPECODES:
+                getattr(self, name).tofile(dest)
+
+    def update(self, other):
+        """
+        Adds the contents of ``other``, another |TreeArrayColumns| instance,
+        after those of this one, as :meth:`TreeArray.update()` does.
+        """
+        if len(self) > 0:
+            if self.is_rooted_trees is not other.is_rooted_trees:
+                raise TreeArray.IncompatibleRootingTreeArrayUpdate("Updating from incompatible TreeArrayColumns: 'is_rooted_trees' should be '{}', but is instead '{}'".format(other.is_rooted_trees, self.is_rooted_trees))
+            if self.ignore_edge_lengths is not other.ignore_edge_lengths:
+                raise TreeArray.IncompatibleEdgeLengthsTreeArrayUpdate("Updating from incompatible TreeArrayColumns: 'ignore_edge_lengths' should be '{}', but is instead '{}'".format(other.ignore_edge_lengths, self.ignore_edge_lengths))
+            if self.ignore_node_ages is not other.ignore_node_ages:
+                raise TreeArray.IncompatibleNodeAgesTreeArrayUpdate("Updating from incompatible TreeArrayColumns: 'ignore_node_ages' should be '{}', but is instead '{}'".format(other.ignore_node_ages, self.ignore_node_ages))
+            if self.use_tree_weights is not other.use_tree_weights:
+                raise TreeArray.IncompatibleTreeWeightsTreeArrayUpdate("Updating from incompatible TreeArrayColumns: 'use_tree_weights' should be '{}', but is instead '{}'".format(other.use_tree_weights, self.use_tree_weights))
+        else:
+            self.is_rooted_trees = other.is_rooted_trees
+            self.ignore_edge_lengths = other.ignore_edge_lengths
+            self.ignore_node_ages = other.ignore_node_ages
+            self.use_tree_weights = other.use_tree_weights
+        if (self.summary_reservoir_size is None) != (other.summary_reservoir_size is None):
+            raise TreeArray.IncompatibleTreeArrayUpdate("Updating from incompatible TreeArrayColumns: split edge lengths and node ages must either be stored or be summarized by both")
+        if other.split_bitmask_ids is self.split_bitmask_ids:
+            id_map = None
+        else:
+            id_map = [self._encode(b) for b in other.split_bitmasks]
+        for name, typecode in self.ARRAY_TYPECODES:
+            values = getattr(other, name)
+            if id_map is not None and name in self.SPLIT_BITMASK_ID_ARRAY_NAMES:
+                values = array.array("i", map(id_map.__getitem__, values))
+            getattr(self, name).extend(values)
+        self.total_trees_counted += other.total_trees_counted
+        self.sum_of_tree_weights += other.sum_of_tree_weights
+        self.tree_rooting_types_counted.update(other.tree_rooting_types_counted)
+
+    def to_tree_array(self, taxon_namespace, use_columnar_storage=False, **kwargs):
+        """
+        Returns a new |TreeArray| with the contents of this collection.
 
+        Parameters
+        ----------
+        taxon_namespace : |TaxonNamespace|
+            The taxon namespace of the new |TreeArray|, which must define the
+            same taxa, in the same order, as those of the |TreeArray|
+            instance(s) from which this collection was created.
+        use_columnar_storage : bool
+            Storage mode of the collection returned (see |TreeArray|).
+        \*\*kwargs : keyword arguments, optional
+            Other arguments passed to the |TreeArray| constructor (e.g.,
+            ``ultrametricity_precision``).
+        """
+        tree_array = TreeArray(
+                taxon_namespace=taxon_namespace,
+                is_rooted_trees=self.is_rooted_trees,
+                ignore_edge_lengths=self.ignore_edge_lengths,
+                ignore_node_ages=self.ignore_node_ages,
+                use_tree_weights=self.use_tree_weights,
+                use_columnar_storage=use_columnar_storage,
+                summary_reservoir_size=self.summary_reservoir_size,
+                **kwargs)
+        split_bitmasks = self.split_bitmasks
+        tree_offsets = array.array("l", [0])
+        offset = 0
+        for size in self.tree_sizes:
+            offset += size
+            tree_offsets.append(offset)
+        if use_columnar_storage:
+            tree_split_bitmasks = tree_array._tree_split_bitmasks
+            tree_split_bitmasks.split_bitmasks = list(split_bitmasks)
+            tree_split_bitmasks.split_bitmask_ids = dict(self.split_bitmask_ids)
+            tree_split_bitmasks._values = array.array("i", self.tree_split_bitmask_ids)
+            tree_split_bitmasks._offsets = tree_offsets
+            tree_edge_lengths = tree_array._tree_edge_lengths
+            tree_edge_lengths._values = array.array("d", self.tree_edge_lengths)
+            tree_edge_lengths._offsets = array.array("l", tree_offsets)
+            tree_array._tree_weights = array.array("d", self.tree_weights)
+        else:
+            all_split_bitmasks = list(map(split_bitmasks.__getitem__, self.tree_split_bitmask_ids))
+            all_edge_lengths = self._get_values("tree_edge_lengths")
+            tree_split_bitmasks = tree_array._tree_split_bitmasks
+            tree_edge_lengths = tree_array._tree_edge_lengths
+            for start, end in zip(tree_offsets[:-1], tree_offsets[1:]):
+                tree_split_bitmasks.append(tuple(all_split_bitmasks[start:end]))
+                tree_edge_lengths.append(tuple(all_edge_lengths[start:end]))
+            tree_array._tree_weights = self.tree_weights.tolist()
+        tree_array._tree_leafset_bitmasks = [split_bitmasks[split_id] for split_id in self.tree_leafset_bitmask_ids]
+        split_distribution = tree_array._split_distribution
+        split_distribution.total_trees_counted = self.total_trees_counted
+        split_distribution.sum_of_tree_weights = self.sum_of_tree_weights
+        split_distribution.tree_rooting_types_counted = set(self.tree_rooting_types_counted)
+        split_counts = split_distribution.split_counts
+        for split_id, count in zip(self.split_count_ids, self.split_counts):
+            split_counts[split_bitmasks[split_id]] += count
+        num_stats = self.NUM_SUMMARY_STATS
+        for attr_name, prefix in self.SPLIT_VALUES_PREFIXES:
+            split_values = getattr(split_distribution, attr_name)
+            all_values = self._get_values(prefix + "s")
+            if self.summary_reservoir_size is not None:
+                all_stats = self._get_values(prefix + "_stats")
+            start = 0
+            for run_idx, (split_id, size) in enumerate(zip(getattr(self, prefix + "_ids"), getattr(self, prefix + "_sizes"))):
+                end = start + size
+                if self.summary_reservoir_size is None:
+                    split_values[split_bitmasks[split_id]].extend(all_values[start:end])
+                else:
+                    split_values[split_bitmasks[split_id]].update(self._new_summary(
+                        all_stats[run_idx * num_stats:(run_idx + 1) * num_stats],
+                        all_values[start:end]))
+                start = end
+        return tree_array
+
+###############################################################################
+### TreeArrayCache
+
+class TreeArrayCache(object):
+    """
+    A persistent, on-disk cache of the trees of tree files as analyzed by
+    |TreeArray|: the split bitmasks, edge lengths, node ages and weights of
+    all the trees of a file, so that the file need not be parsed again when
+    it is read with the same options, e.g. to summarize it again with a
+    different burn-in.
+
+    Entries are keyed by the path, size and modification time of the file,
+    the schema and other parsing options, the labels of the taxa already in
+    the taxon namespace of the |TreeArray|, and those options of the
+    |TreeArray| that affect the values stored (e.g., whether edge lengths
+    and node ages are tracked). If a maximum size is given, then the
+    least-recently used entries are discarded whenever the total size of the
+    cache exceeds it.
+
+    Example::
+
+        cache = dendropy.TreeArrayCache("treecache", max_size=2**30)
+        tree_array = dendropy.TreeArray(ignore_node_ages=False)
+        cache.read_into(tree_array,
+                path="run1.trees",
+                schema="nexus",
+                tree_offset=200)
+
+    """
+
+    _FORMAT_VERSION = 1
+    _ENTRY_FILENAME_SUFFIX = ".treecache"
+
+    def __init__(self, cache_dir, max_size=None):
+        """
+        Parameters
+        ----------
+        cache_dir : str
+            Directory in which the cache entries are stored. It will be created
+            if it does not already exist.
+        max_size : int
+            Maximum total size (in bytes) of the cache entries. If |None|
+            [default], then the size of the cache is not limited.
+        """
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.max_size = max_size
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def read_into(self, tree_array, path, schema, tree_offset=0, **kwargs):
+        """
+        Adds the trees of the file at ``path``, starting from the tree at
+        offset ``tree_offset``, to ``tree_array``, exactly as
+        :meth:`TreeArray.read_from_files()` would. If the cache holds an
+        entry for the file, then the trees are restored from it. Otherwise,
+        all the trees of the file are parsed and stored in a new entry.
+
+        Parameters
+        ----------
+        tree_array : |TreeArray|
+            The collection to which to add the trees.
+        path : str
+            Path of the tree file.
+        schema : str
+            The data format of the file. E.g., "nexus", "newick".
+        tree_offset : int
+            0-based index of the first tree of the file to be added (i.e.,
+            the burn-in).
+        \*\*kwargs : keyword arguments
+            Passed to the schema-specific reader (see
+            :meth:`TreeArray.read_from_files()`).
+
+        Returns
+        -------
+        is_cached : bool
+            |True| if the trees were restored from the cache, or |False| if
+            the file was parsed.
+        """
+        entry_path = os.path.join(self.cache_dir,
+                self._entry_key(tree_array, path, schema, kwargs) + self._ENTRY_FILENAME_SUFFIX)
+        entry = None
+        if os.path.exists(entry_path):
+            try:
+                entry = self._read_entry(entry_path)
+            except (zipfile.BadZipfile, KeyError, ValueError, IOError, OSError):
+                # incomplete or corrupt entry: parse the file again
+                entry = None
+            else:
+                # last use is tracked by the modification time
+                os.utime(entry_path, None)
+        is_cached = entry is not None
+        if entry is None:
+            entry = self._parse_entry(tree_array, path, schema, kwargs)
+            self._write_entry(entry_path, entry)
+            self._discard_least_recently_used(entry_path_to_keep=entry_path)
+        self._add_entry_trees(tree_array, entry, tree_offset)
+        return is_cached
+
+    def _entry_key(self, tree_array, path, schema, kwargs):
+        stat = os.stat(path)
+        split_distribution = tree_array._split_distribution
+        key_data = [
+            self._FORMAT_VERSION,
+            os.path.abspath(path),
+            stat.st_size,
+            repr(stat.st_mtime),
+            schema,
+            kwargs,
+            [taxon.label for taxon in tree_array.taxon_namespace],
+            tree_array.taxon_namespace.is_case_sensitive,
+            tree_array.ignore_edge_lengths,
+            tree_array.ignore_node_ages,
+            tree_array.use_tree_weights,
+            tree_array.default_edge_length_value,
+            tree_array.taxon_label_age_map,
+            split_distribution.ultrametricity_precision,
+            split_distribution.is_force_max_age,
+            split_distribution.is_force_min_age,
+            ]
+        key_text = json.dumps(key_data, sort_keys=True, default=repr)
+        return hashlib.sha1(key_text.encode("utf-8")).hexdigest()
+
+    def _parse_entry(self, tree_array, path, schema, kwargs):
+        split_distribution = tree_array._split_distribution
+        # missing edge lengths are stored as such, and only replaced by the
+        # default value when restored, so that its type is preserved
+        default_edge_length_value = None
+        encode_value = EdgeLengthTupleSequence()._encode
+        split_bitmask_ids = {}
+        split_bitmasks = []
+        def _get_split_bitmask_id(split_bitmask):
+            try:
+                return split_bitmask_ids[split_bitmask]
+            except KeyError:
+                split_bitmask_ids[split_bitmask] = len(split_bitmasks)
+                split_bitmasks.append(split_bitmask)
+                return split_bitmask_ids[split_bitmask]
+        entry = {
+            "tree_split_bitmask_ids": array.array("i"),
+            "tree_sizes": array.array("i"),
+            "tree_leafset_bitmask_ids": array.array("i"),
+            "tree_edge_lengths": array.array("d"),
+            "tree_node_ages": array.array("d"),
+            "tree_weights": array.array("d"),
+            "tree_rootings": array.array("b"),
+            }
+        kwargs = dict(kwargs)
+        bitmasks_only = kwargs.get("bitmasks_only", False)
+        for tree in tree_array._yield_trees_from_files(files=[path], schema=schema, **kwargs):
+            if bitmasks_only:
+                splits, edge_lengths, node_ages, weight = split_distribution._get_tree_skeleton_split_data(
+                        tree_skeleton=tree,
+                        default_edge_length_value=default_edge_length_value)
+                tree_leafset_bitmask = tree.leafset_bitmasks[-1]
+            else:
+                splits, edge_lengths, node_ages, weight = split_distribution._get_tree_split_data(
+                        tree=tree,
+                        is_bipartitions_updated=False,
+                        default_edge_length_value=default_edge_length_value)
+                tree_leafset_bitmask = tree.seed_node.edge.bipartition.leafset_bitmask
+            entry["tree_split_bitmask_ids"].extend(_get_split_bitmask_id(split) for split in splits)
+            entry["tree_sizes"].append(len(splits))
+            entry["tree_leafset_bitmask_ids"].append(_get_split_bitmask_id(tree_leafset_bitmask))
+            entry["tree_edge_lengths"].extend(encode_value(elen) for elen in edge_lengths)
+            entry["tree_node_ages"].extend(encode_value(nage) for nage in node_ages)
+            entry["tree_weights"].append(weight)
+            if tree.is_rooted is None:
+                entry["tree_rootings"].append(-1)
+            else:
+                entry["tree_rootings"].append(1 if tree.is_rooted else 0)
+        entry["taxon_labels"] = [taxon.label for taxon in tree_array.taxon_namespace]
+        entry["split_bitmasks"] = split_bitmasks
+        return entry
+
+    def _write_entry(self, entry_path, entry):
+        metadata = {
+            "format_version": self._FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "taxon_labels": entry["taxon_labels"],
+            "split_bitmasks": ["{:x}".format(b) for b in entry["split_bitmasks"]],
+            }
+        # written under a temporary name and then renamed, so that an
+        # interrupted write never leaves an incomplete entry
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            archive = zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED)
+            try:
+                archive.writestr("metadata.json", json.dumps(metadata))
+                for name, values in entry.items():
+                    if isinstance(values, array.array):
+                        archive.writestr(name, _array_to_bytes(values))
+            finally:
+                archive.close()
+            if os.path.exists(entry_path):
+                os.remove(entry_path)
+            os.rename(temp_path, entry_path)
+        except:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _read_entry(self, entry_path):
+        archive = zipfile.ZipFile(entry_path, "r")
+        try:
+            metadata = json.loads(textprocessing.bytes_to_text(archive.read("metadata.json")))
+            if metadata["format_version"] != self._FORMAT_VERSION:
+                raise ValueError("Unsupported TreeArrayCache entry format version: {}".format(metadata["format_version"]))
+            is_byteswap = metadata["byteorder"] != sys.byteorder
+            entry = {}
+            for name, typecode in (
+                    ("tree_split_bitmask_ids", "i"),
+                    ("tree_sizes", "i"),
+                    ("tree_leafset_bitmask_ids", "i"),
+                    ("tree_edge_lengths", "d"),
+                    ("tree_node_ages", "d"),
+                    ("tree_weights", "d"),
+                    ("tree_rootings", "b"),
+                    ):
+                entry[name] = _array_from_bytes(typecode, archive.read(name), is_byteswap)
+        finally:
+            archive.close()
+        entry["taxon_labels"] = metadata["taxon_labels"]
+        entry["split_bitmasks"] = [int(b, 16) for b in metadata["split_bitmasks"]]
+        return entry
+
+    def _add_entry_trees(self, tree_array, entry, tree_offset):
+        # taxa first encountered in the file are added in the same order as
+        # they would have been when parsing it
+        taxon_namespace = tree_array.taxon_namespace
+        for label in entry["taxon_labels"][len(taxon_namespace):]:
+            taxon_namespace.new_taxon(label)
+        decode_value = EdgeLengthTupleSequence()._decode
+        default_edge_length_value = tree_array.default_edge_length_value
+        def _decode_edge_length(value):
+            value = decode_value(value)
+            if value is None:
+                return default_edge_length_value
+            return value
+        split_bitmasks = entry["split_bitmasks"]
+        tree_split_bitmask_ids = entry["tree_split_bitmask_ids"]
+        tree_sizes = entry["tree_sizes"]
+        tree_edge_lengths = entry["tree_edge_lengths"]
+        tree_node_ages = entry["tree_node_ages"]
+        rootings = {-1: None, 0: False, 1: True}
+        start = sum(tree_sizes[:tree_offset])
+        for tree_idx in range(tree_offset, len(tree_sizes)):
+            end = start + tree_sizes[tree_idx]
+            splits = [split_bitmasks[split_id] for split_id in tree_split_bitmask_ids[start:end]]
+            if tree_array.ignore_edge_lengths:
+                edge_lengths = []
+            else:
+                edge_lengths = [_decode_edge_length(elen) for elen in tree_edge_lengths[start:end]]
+            if tree_array.ignore_node_ages:
+                node_ages = []
+            else:
+                node_ages = [decode_value(nage) for nage in tree_node_ages[start:end]]
+            start = end
+            tree_array._add_split_data(
+                    splits=splits,
+                    edge_lengths=edge_lengths,
+                    node_ages=node_ages,
+                    weight=entry["tree_weights"][tree_idx],
+                    is_rooted=rootings[entry["tree_rootings"][tree_idx]],
+                    tree_leafset_bitmask=split_bitmasks[entry["tree_leafset_bitmask_ids"][tree_idx]])
+
+    def _discard_least_recently_used(self, entry_path_to_keep=None):
+        if self.max_size is None:
+            return
+        entries = []
+        total_size = 0
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith(self._ENTRY_FILENAME_SUFFIX):
+                continue
+            entry_path = os.path.join(self.cache_dir, filename)
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, entry_path, stat.st_size))
+            total_size += stat.st_size
+        entries.sort()
+        for mtime, entry_path, size in entries:
+            if total_size <= self.max_size:
+                break
+            if entry_path == entry_path_to_keep:
+                continue
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            total_size -= size
+
+def _array_to_bytes(values):
+    try:
+        return values.tobytes()
+    except AttributeError:
+        # Python 2
+        return values.tostring()
+
+def _array_from_bytes(typecode, data, is_byteswap=False):
+    values = array.array(typecode)
+    try:
+        values.frombytes(data)
+    except AttributeError:
+        # Python 2
+        values.fromstring(data)
+    if is_byteswap:
+        values.byteswap()
+    return values
+
+def _log_split_support(split_support):
+    if split_support:
+        return math.log(split_support)
+    return 0.0
+
+def _read_tree_array_chunk(task):
+    # Runs in a worker process: parses the trees of a
+    # |TreeSourceChunk| into a new |TreeArray| with a |TaxonNamespace|
+    # that mirrors that of the parent, or returns |None| if the chunk
+    # references taxa not found in the parent's |TaxonNamespace|.
+    chunk, schema, taxon_labels, is_case_sensitive, tree_type, default_edge_length_value, tree_array_kwargs, reader_kwargs = task
+    taxon_namespace = taxonmodel.TaxonNamespace(taxon_labels,
+            is_case_sensitive=is_case_sensitive)
+    taxon_namespace.is_mutable = False
+    tree_array = TreeArray(taxon_namespace=taxon_namespace, **tree_array_kwargs)
+    tree_array.tree_type = tree_type
+    tree_array.default_edge_length_value = default_edge_length_value
+    try:
+        tree_array.read_from_files(
+                files=[chunk.open()],
+                schema=schema,
+                **reader_kwargs)
+    except error.ImmutableTaxonNamespaceError:
+        return None
+    return tree_array
@@ -26,6 +26,8 @@ import math
 from dendropy.utility.textprocessing import StringIO
 import copy
 import sys
+import array
+import weakref
 from dendropy.utility import GLOBAL_RNG
 from dendropy.utility import container
 from dendropy.utility import terminal
@@ -753,6 +755,8 @@ class Edge(
             raise TypeError("Unsupported keyword arguments: {}".format(kwargs))
 
         self._bipartition = None
+        self._is_bipartition_dirty = True
+        self._is_structure_dirty = True
         self.comments = []
 
     def __copy__(self, memo=None):
@@ -1073,7 +1077,7 @@ class Node(
             node = stack.pop()
             if filter_fn is None or filter_fn(node):
                 yield node
-            stack.extend(n for n in reversed(node._child_nodes))
+            stack.extend(reversed(node._child_nodes))
 
     def preorder_internal_node_iter(self, filter_fn=None, exclude_seed_node=False):
         """
@@ -1159,15 +1163,21 @@ class Node(
         ## Prefer `pop()` to `pop(0)`.
         ## Thanks to Mark T. Holder
         ## From peyotl commits: d1ffef2 + 19fdea1
-        stack = [(self, False)]
+        # A node followed by |None| on the stack has had its children pushed
+        # on to the stack above it, and is visited when the |None| is
+        # popped.
+        stack = [self]
         while stack:
-            node, state = stack.pop()
-            if state:
-                if filter_fn is None or filter_fn(node):
-                    yield node
-            else:
-                stack.append((node, True))
-                stack.extend([(n, False) for n in reversed(node._child_nodes)])
+            node = stack.pop()
+            if node is None:
+                node = stack.pop()
+            elif node._child_nodes:
+                stack.append(node)
+                stack.append(None)
+                stack.extend(reversed(node._child_nodes))
+                continue
+            if filter_fn is None or filter_fn(node):
+                yield node
 
     def postorder_internal_node_iter(self, filter_fn=None, exclude_seed_node=False):
         """
@@ -1615,6 +1625,7 @@ class Node(
         node._parent_node = self
         if node not in self._child_nodes:
             self._child_nodes.append(node)
+        self._flag_bipartitions_dirty()
         return node
 
     def insert_child(self, index, node):
@@ -1648,6 +1659,7 @@ class Node(
                 return
             self._child_nodes.remove(node)
         self._child_nodes.insert(index, node)
+        self._flag_bipartitions_dirty()
         return node
 
     def new_child(self, **kwargs):
@@ -1722,6 +1734,7 @@ class Node(
             raise ValueError("Tried to remove an non-existing or null node")
         children = self._child_nodes
         if node in children:
+            self._flag_bipartitions_dirty()
             node._parent_node = None
             node.edge.tail_node = None
             index = children.index(node)
@@ -1768,6 +1781,23 @@ class Node(
         Removes all child nodes.
         """
         del self._child_nodes[:] # list.clear() is not in Python 2.7
+        self._flag_bipartitions_dirty()
+
+    def _flag_bipartitions_dirty(self):
+        # Flags the bipartitions of the edges on the path from this node to
+        # the seed node as needing to be recalculated by
+        # ``Tree.update_bipartitions()``, and the cached traversal orders
+        # (and MRCA index) of the tree as needing to be rebuilt (see
+        # ``Tree._get_traversal_cache()``). All the ancestors of a flagged
+        # edge are themselves flagged, so we can stop at the first one found.
+        node = self
+        while node is not None:
+            edge = node._edge
+            if edge is None or (edge._is_bipartition_dirty and edge._is_structure_dirty):
+                break
+            edge._is_bipartition_dirty = True
+            edge._is_structure_dirty = True
+            node = node._parent_node
 
     def reversible_remove_child(self, node, suppress_unifurcations=False):
         """
@@ -1790,6 +1820,7 @@ class Node(
         except:
             raise ValueError("Tried to remove a node that is not listed as a child")
         removed = [(node, self, pos, [], None)]
+        self._flag_bipartitions_dirty()
         node._parent_node = None
         node.edge.tail_node = None
         children.remove(node)
@@ -1918,6 +1949,7 @@ class Node(
         if new_edge is self._edge:
             return
         if self._parent_node is not None:
+            self._parent_node._flag_bipartitions_dirty()
             try:
                 self._parent_node._child_nodes.remove(self)
             except ValueError:
@@ -1927,6 +1959,8 @@ class Node(
         self._edge = new_edge
         if self._edge:
             self._edge._head_node = self
+            self._edge._is_bipartition_dirty = True
+            self._edge._is_structure_dirty = True
 
     edge = property(_get_edge, _set_edge)
 
@@ -1988,6 +2022,7 @@ class Node(
     def _set_parent_node(self, parent):
         """Sets the parent node of this node."""
         if self._parent_node is not None:
+            self._parent_node._flag_bipartitions_dirty()
             try:
                 self._parent_node._child_nodes.remove(self)
             except ValueError:
@@ -1996,6 +2031,7 @@ class Node(
         if self._parent_node is not None:
             if self not in self._parent_node._child_nodes:
                 self._parent_node._child_nodes.append(self)
+            self._parent_node._flag_bipartitions_dirty()
     parent_node = property(_get_parent_node, _set_parent_node)
 
     ###########################################################################
@@ -3157,6 +3193,7 @@ class Tree(
             self._seed_node = None
             self.seed_node = None
             self.bipartition_encoding = None
+            self._bipartition_encoding_state = None
             self._split_bitmask_edge_map = None
             self._bipartition_edge_map = None
             seed_node = kwargs.pop("seed_node", None)
@@ -3171,6 +3208,17 @@ class Tree(
     ##############################################################################
     ## Bipartitions
 
+    def _get_bipartition_encoding(self):
+        if self._is_bipartition_encoding_stale:
+            # bipartitions have been updated incrementally: (re-)collect them
+            self._bipartition_encoding = [edge.bipartition for edge in self.postorder_edge_iter()]
+            self._is_bipartition_encoding_stale = False
+        return self._bipartition_encoding
+    def _set_bipartition_encoding(self, v):
+        self._bipartition_encoding = v
+        self._is_bipartition_encoding_stale = False
+    bipartition_encoding = property(_get_bipartition_encoding, _set_bipartition_encoding)
+
     def _get_split_edges(self):
         deprecate.dendropy_deprecation_warning(
                 message="Deprecated since DendroPy 4: 'Tree.split_edges' will no longer be supported in future releases; use 'Tree.bipartition_encoding' for a list of bipartitions on the tree, or dereference the edge through the 'Tree.bipartition_edge_map' attribute.",
@@ -3686,8 +3734,41 @@ class Tree(
         :py:class:`list` [|Node|]
             List of |Node| objects in the tree.
         """
-        nodes = [node for node in self.preorder_node_iter(filter_fn)]
-        return nodes
+        preorder_nodes = self._get_traversal_cache().preorder_nodes
+        if filter_fn is None:
+            return list(preorder_nodes)
+        return [node for node in preorder_nodes if filter_fn(node)]
+
+    def preorder_nodes(self):
+        """
+        Returns the nodes of the tree in pre-order.
+
+        The sequence is calculated on the first call, and returned by
+        subsequent calls until the structure of the tree is changed (e.g., by
+        adding, removing, moving or re-ordering nodes, or re-seeding the
+        tree). Use this (rather than :meth:`Tree.preorder_node_iter()`) when
+        traversing a tree repeatedly without changing its structure.
+
+        Returns
+        -------
+        :py:class:`tuple` [|Node|]
+            The |Node| objects in ``self`` in pre-order sequence.
+        """
+        return self._get_traversal_cache().preorder_nodes
+
+    def postorder_nodes(self):
+        """
+        Returns the nodes of the tree in post-order.
+
+        As with :meth:`Tree.preorder_nodes()`, the sequence is cached until
+        the structure of the tree is changed.
+
+        Returns
+        -------
+        :py:class:`tuple` [|Node|]
+            The |Node| objects in ``self`` in post-order sequence.
+        """
+        return self._get_traversal_cache().postorder_nodes
 
     def leaf_nodes(self):
         """
@@ -3698,7 +3779,7 @@ class Tree(
         :py:class:`list` [|Node|]
             List of leaf |Node| objects in ``self``.
         """
-        return [leaf for leaf in self.leaf_node_iter()]
+        return list(self._get_traversal_cache().leaf_nodes)
 
     def internal_nodes(self, exclude_seed_node=False):
         """
@@ -3717,7 +3798,8 @@ class Tree(
         :py:class:`list` [|Node|]
             List of internal |Node| objects in ``self``.
         """
-        return [nd for nd in self.preorder_internal_node_iter(exclude_seed_node=exclude_seed_node)]
+        return [nd for nd in self._get_traversal_cache().preorder_nodes
+                if nd._child_nodes and not (exclude_seed_node and nd._parent_node is None)]
 
     def edges(self, filter_fn=None):
         """
@@ -3736,8 +3818,10 @@ class Tree(
         :py:class:`list` [|Edge|]
             List of |Edge| objects in ``self``.
         """
-        edges = [edge for edge in self.preorder_edge_iter(filter_fn)]
-        return edges
+        edges = [node._edge for node in self._get_traversal_cache().preorder_nodes]
+        if filter_fn is None:
+            return edges
+        return [edge for edge in edges if filter_fn(edge)]
 
     def leaf_edges(self):
         """
@@ -3748,7 +3832,7 @@ class Tree(
         :py:class:`list` [|Edge|]
             List of leaf |Edge| objects in ``self``.
         """
-        return [leaf.edge for leaf in self.leaf_node_iter()]
+        return [leaf._edge for leaf in self._get_traversal_cache().leaf_nodes]
 
     def internal_edges(self, exclude_seed_edge=False):
         """
@@ -3765,7 +3849,7 @@ class Tree(
         :py:class:`list` [|Edge|]
             List of internal |Edge| objects in ``self``.
         """
-        return [nd.edge for nd in self.preorder_internal_node_iter(exclude_seed_node=exclude_seed_edge)]
+        return [nd._edge for nd in self.internal_nodes(exclude_seed_node=exclude_seed_edge)]
 
     ###########################################################################
     ### Node Finders
@@ -3959,12 +4043,28 @@ class Tree(
                     with the minimal set of Taxon objects that
                     collectively have all the labels specified in
                     ``taxon_labels`` will be returned.
+                ``nodes`` : collections.Iterable [|Node|]
+                    As for ``leafset_bitmask``, with the leafset bitmask
+                    being the union of the leafset bitmasks of the nodes.
 
             In addition, the following optional keywords are supported:
 
                 ``start_node`` : |Node|, optional
                     If given, specifies the node at which to start searching.
                     If not, defaults to the root or ``seed_node``.
+                ``is_use_mrca_index`` : bool, optional
+                    If |True|, then, unless ``start_node`` is given, the
+                    node is found in constant time (for a given number of
+                    taxa or nodes) using the MRCA index of the tree (see
+                    :meth:`Tree.mrca_index()`), which is built on first use
+                    and rebuilt whenever the structure of the tree changes,
+                    instead of searching bipartition bitmasks from the seed
+                    node. Bipartitions are then neither required nor
+                    (re-)encoded. The search falls back to the bipartition
+                    bitmasks if the leaves of the tree are not each
+                    associated with a distinct taxon, or if any of the taxa
+                    are not associated with a leaf of the tree. Use this
+                    when issuing many queries on the same tree.
 
         Returns
         -------
@@ -3974,8 +4074,14 @@ class Tree(
         """
         start_node = kwargs.get("start_node", self.seed_node)
         leafset_bitmask = None
+        nodes = None
+        taxa = None
         if "leafset_bitmask" in kwargs:
             leafset_bitmask = kwargs["leafset_bitmask"]
+        elif "nodes" in kwargs:
+            nodes = list(kwargs["nodes"])
+            if not nodes:
+                raise ValueError("Null leafset bitmask (0)")
         else:
             taxa = kwargs.get("taxa", None)
             if taxa is None:
@@ -3984,17 +4090,44 @@ class Tree(
                     if len(taxa) != len(kwargs["taxon_labels"]):
                         raise KeyError("Not all labels matched to taxa")
                 else:
-                    raise TypeError("Must specify one of: 'leafset_bitmask', 'taxa' or 'taxon_labels'")
+                    raise TypeError("Must specify one of: 'leafset_bitmask', 'taxa', 'taxon_labels' or 'nodes'")
             if taxa is None:
                 raise ValueError("No taxa matching criteria found")
-            leafset_bitmask = self.taxon_namespace.taxa_bitmask(taxa=taxa)
+            taxa = list(taxa)
+            if not taxa:
+                raise ValueError("Null leafset bitmask (0)")
 
-        if leafset_bitmask is None or leafset_bitmask == 0:
+        if nodes is None and taxa is None and (leafset_bitmask is None or leafset_bitmask == 0):
             raise ValueError("Null leafset bitmask (0)")
 
+        if kwargs.get("is_use_mrca_index", False) and start_node is self.seed_node:
+            mrca_index = self.mrca_index()
+            if nodes is None:
+                if taxa is None:
+                    try:
+                        taxa = self.taxon_namespace.bitmask_taxa_list(leafset_bitmask)
+                    except KeyError:
+                        # bits not corresponding to any taxon
+                        return None
+                nodes = mrca_index.taxon_leaf_nodes(taxa)
+            if nodes is not None:
+                mrca_node = mrca_index.leafset_mrca(nodes)
+                if mrca_node is not None:
+                    return mrca_node
+
         if start_node.edge.bipartition.leafset_bitmask == 0 or not kwargs.get("is_bipartitions_updated", True):
             self.encode_bipartitions(suppress_unifurcations=False)
 
+        if taxa is not None:
+            leafset_bitmask = self.taxon_namespace.taxa_bitmask(taxa=taxa)
+
+        if nodes is not None:
+            leafset_bitmask = 0
+            for nd in nodes:
+                leafset_bitmask |= nd.edge.bipartition.leafset_bitmask
+            if leafset_bitmask == 0:
+                raise ValueError("Null leafset bitmask (0)")
+
         if (start_node.edge.bipartition.leafset_bitmask & leafset_bitmask) != leafset_bitmask:
             return None
 
@@ -4025,6 +4158,40 @@ class Tree(
             #   leaves that have not been encoded with leafset_bitmasks.
             return last_match
 
+    def mrca_index(self):
+        """
+        Returns an index of the structure of the tree for constant-time
+        most-recent common ancestor queries (see |MrcaIndex|).
+
+        The index is built on the first call, and returned by subsequent calls
+        until the structure of the tree is changed (e.g., by adding, removing or
+        moving nodes, or re-seeding the tree), when a new index is built. Note
+        that changes to the taxa associated with the nodes of the tree are not
+        tracked.
+
+        Returns
+        -------
+        |MrcaIndex|
+            The index of the tree.
+        """
+        traversal_cache = self._get_traversal_cache()
+        if traversal_cache.mrca_index is None:
+            traversal_cache.mrca_index = MrcaIndex(self)
+        return traversal_cache.mrca_index
+
+    def _get_traversal_cache(self):
+        # Returns the traversal cache of the tree, (re-)building it if there
+        # is none, or if the tree has been re-seeded or changed since it was
+        # built.
+        traversal_cache = _TREE_TRAVERSAL_CACHES.get(self)
+        seed_node = self._seed_node
+        if (traversal_cache is None
+                or traversal_cache.seed_node is not seed_node
+                or seed_node._edge._is_structure_dirty):
+            traversal_cache = _TreeTraversalCache(seed_node)
+            _TREE_TRAVERSAL_CACHES[self] = traversal_cache
+        return traversal_cache
+
     ###########################################################################
     ### Node iterators
 
@@ -4397,7 +4564,7 @@ class Tree(
             edge = stack.pop()
             if filter_fn is None or filter_fn(edge):
                 yield edge
-            stack.extend(n._edge for n in reversed(edge._head_node._child_nodes))
+            stack.extend([n._edge for n in reversed(edge._head_node._child_nodes)])
 
     def preorder_internal_edge_iter(self, filter_fn=None, exclude_seed_edge=False):
         """
@@ -4480,15 +4647,19 @@ class Tree(
         ## Prefer `pop()` to `pop(0)`.
         ## Thanks to Mark T. Holder
         ## From peyotl commits: d1ffef2 + 19fdea1
-        stack = [(self.seed_node._edge, False)]
+        # As for `Node.postorder_iter()`
+        stack = [self.seed_node._edge]
         while stack:
-            edge, state = stack.pop()
-            if state:
-                if filter_fn is None or filter_fn(edge):
-                    yield edge
-            else:
-                stack.append((edge, True))
-                stack.extend([(n._edge, False) for n in reversed(edge._head_node._child_nodes)])
+            edge = stack.pop()
+            if edge is None:
+                edge = stack.pop()
+            elif edge._head_node._child_nodes:
+                stack.append(edge)
+                stack.append(None)
+                stack.extend([n._edge for n in reversed(edge._head_node._child_nodes)])
+                continue
+            if filter_fn is None or filter_fn(edge):
+                yield edge
 
     def postorder_internal_edge_iter(self, filter_fn=None, exclude_seed_edge=False):
         """
@@ -4633,6 +4804,7 @@ class Tree(
             taxon_mapping_memo=None):
         if taxon_mapping_memo is None:
             taxon_mapping_memo = {}
+        self._bipartition_encoding_state = None
         for node in self:
             if (node.taxon is not None
                     and (unify_taxa_by_label or node.taxon not in self.taxon_namespace)):
@@ -4707,6 +4879,7 @@ class Tree(
         deprecate.dendropy_deprecation_warning(
                 message="Deprecated since DendroPy 4: 'reindex_subcomponent_taxa()' will no longer be supported in future releases; use 'reconstruct_taxon_namespace()' instead",
                 stacklevel=3)
+        self._bipartition_encoding_state = None
         for node in self.postorder_node_iter():
             t = node.taxon
             if t:
@@ -4719,6 +4892,7 @@ class Tree(
         then taxa on internal nodes will be retained. The ``taxon_namespace`` is not
         affected by this operation.
         """
+        self._bipartition_encoding_state = None
         for nd in self.postorder_node_iter():
             if (len(nd._child_nodes) == 0) and not exclude_leaves:
                 nd.taxon = None
@@ -4740,6 +4914,7 @@ class Tree(
         """
         if rng is None:
             rng = GLOBAL_RNG
+        self._bipartition_encoding_state = None
         if len(self.taxon_namespace) == 0:
             for i, nd in enumerate(self.leaf_nodes()):
                 nd.taxon = self.taxon_namespace.require_taxon(label=("T%d" % (i+1)))
@@ -4811,6 +4986,8 @@ class Tree(
         self._seed_node = node
         if self._seed_node is not None:
             self._seed_node.parent_node = None
+            self._seed_node._edge._is_bipartition_dirty = True
+            self._seed_node._edge._is_structure_dirty = True
     seed_node = property(_get_seed_node, _set_seed_node)
 
     def deroot(self):
@@ -4900,7 +5077,7 @@ class Tree(
             self.seed_node = new_seed_node
 
         if update_bipartitions:
-            self.encode_bipartitions(
+            self.update_bipartitions(
                     suppress_unifurcations=suppress_unifurcations,
                     collapse_unrooted_basal_bifurcation=collapse_unrooted_basal_bifurcation)
         else:
@@ -5391,6 +5568,7 @@ class Tree(
         """
         if rng is None:
             rng = GLOBAL_RNG # use the global rng by default
+        self._bipartition_encoding_state = None
         if include_internal_nodes:
             nd_iterator = self.preorder_node_iter
         else:
@@ -5430,6 +5608,8 @@ class Tree(
                 total += len(nd._child_nodes)
                 node_desc_counts[nd] = total
                 nd._child_nodes.sort(key=lambda n: node_desc_counts[n], reverse=not ascending)
+        # the order of the nodes has changed, but not the bipartitions
+        self.seed_node._edge._is_structure_dirty = True
 
     def truncate_from_root(self, distance_from_root):
         self.calc_node_root_distances()
@@ -5562,53 +5742,70 @@ class Tree(
             Returns collection of node ages.
 
         """
-        ages = []
         if is_force_max_age and is_force_min_age:
             raise ValueError("Cannot specify both 'is_force_max_age' and 'is_force_min_age'")
-        for node in self.postorder_node_iter():
-            child_nodes = node.child_nodes()
-            if set_node_age_fn is not None:
+        is_check_ultrametricity = not (is_force_max_age
+                or is_force_min_age
+                or ultrametricity_precision is None
+                or ultrametricity_precision is False
+                or ultrametricity_precision < 0)
+        # Nodes are visited in post-order, with the age of each parent set
+        # from its first child and checked against (or, if forcing maximum or
+        # minimum ages, updated from) each of its other children in turn, so
+        # that a node whose age is still unset when visited is a leaf.
+        postorder_nodes = self._get_traversal_cache().postorder_nodes
+        seed_node = postorder_nodes[-1]
+        given_age_node_ids = set()
+        if set_node_age_fn is None:
+            for node in postorder_nodes:
+                node.age = None
+        else:
+            for node in postorder_nodes:
                 node.age = set_node_age_fn(node)
-                # print("Setting node age: {} = {}".format(node.taxon, node.age))
                 if node.age is not None:
-                    continue
-            if len(child_nodes) == 0:
-               node.age = 0.0
-               if not is_return_internal_node_ages_only:
-                   ages.append(node.age)
+                    given_age_node_ids.add(id(node))
+        ages = []
+        for node in postorder_nodes:
+            age = node.age
+            if given_age_node_ids and id(node) in given_age_node_ids:
+                pass
+            elif age is None:
+                age = 0.0
+                node.age = age
+                if not is_return_internal_node_ages_only:
+                    ages.append(age)
             else:
-                if is_force_max_age:
-                    age_to_set = max([ (child.age + child.edge.length) for child in child_nodes ])
-                elif is_force_min_age:
-                    age_to_set = min([ (child.age + child.edge.length) for child in child_nodes ])
+                ages.append(age)
+            if node is seed_node:
+                continue
+            parent_node = node._parent_node
+            if given_age_node_ids and id(parent_node) in given_age_node_ids:
+                continue
+            parent_age = parent_node.age
+            edge = node._edge
+            if is_force_max_age:
+                age += edge.length
+                if parent_age is None or age > parent_age:
+                    parent_node.age = age
+            elif is_force_min_age:
+                age += edge.length
+                if parent_age is None or age < parent_age:
+                    parent_node.age = age
+            elif parent_age is None:
+                if edge.length is None:
+                    edge.length = 0.0
+                    parent_node.age = age
                 else:
-                    first_child = child_nodes[0]
-                    if first_child.edge.length is not None and first_child.age is not None:
-                        age_to_set = first_child.age + first_child.edge.length
-                    elif first_child.edge.length is None:
-                        first_child.edge.length = 0.0
-                        age_to_set = first_child.age
-                    elif first_child.age is None:
-                        first_child.age = 0.0
-                        age_to_set = first_child.edge.length
-                    else:
-                        age_to_set = 0.0
-                node.age = age_to_set
-                if not (is_force_max_age or is_force_min_age or ultrametricity_precision is None or ultrametricity_precision is False or ultrametricity_precision < 0):
-                    for nnd in child_nodes[1:]:
-                        try:
-                            ocnd = nnd.age + nnd.edge.length
-                        except TypeError:
-                            nnd.edge.length = 0.0
-                            ocnd = nnd.age
-                        d = abs(node.age - ocnd)
-                        if  d > ultrametricity_precision:
-                            # raise ValueError("Tree is not ultrametric. Node '{}': expecting {}, but found {}".format(node.label, node.age, ocnd))
-                            raise error.UltrametricityError("Tree is not ultrametric within threshold of {threshold}: {deviance}".format(
-                                threshold=ultrametricity_precision,
-                                deviance=d,
-                                ))
-                ages.append(node.age)
+                    parent_node.age = age + edge.length
+            elif is_check_ultrametricity:
+                if edge.length is None:
+                    edge.length = 0.0
+                d = abs(parent_age - (age + edge.length))
+                if d > ultrametricity_precision:
+                    raise error.UltrametricityError("Tree is not ultrametric within threshold of {threshold}: {deviance}".format(
+                        threshold=ultrametricity_precision,
+                        deviance=d,
+                        ))
         return ages
 
     def calc_node_root_distances(self, return_leaf_distances_only=True):
@@ -5618,15 +5815,15 @@ class Tree(
         distances. If ``return_leaf_distances_only`` is True, then only
         leaf distances will be true.
         """
-        dists = []
-        for node in self.preorder_node_iter():
-            if node._parent_node is None:
-                node.root_distance = 0.0
-            else:
-                node.root_distance = node.edge.length + node._parent_node.root_distance
-            if (not return_leaf_distances_only or node.is_leaf()):
-                dists.append(node.root_distance)
-        return dists
+        traversal_cache = self._get_traversal_cache()
+        preorder_nodes = traversal_cache.preorder_nodes
+        preorder_nodes[0].root_distance = 0.0
+        for node in preorder_nodes[1:]:
+            node.root_distance = node._edge.length + node._parent_node.root_distance
+        if return_leaf_distances_only:
+            return [node.root_distance for node in traversal_cache.leaf_nodes]
+        else:
+            return [node.root_distance for node in preorder_nodes]
 
     def internal_node_ages(self,
             ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
@@ -5675,7 +5872,8 @@ class Tree(
         return value.
         """
         total = 0
-        for edge in self.postorder_edge_iter():
+        for node in self.postorder_nodes():
+            edge = node._edge
             if edge.length is not None:
                 total += edge.length
         return total
@@ -5830,10 +6028,18 @@ class Tree(
                 edge.bipartition = Bipartition(compile_bipartition=False, is_mutable=True)
                 edge.bipartition._leafset_bitmask = leafset_bitmask
                 edge.bipartition._is_rooted = self._is_rooted
+                edge._is_bipartition_dirty = False
         # Create normalized bitmasks, where the full (self) bipartition mask is *not*
         # all the taxa, but only those found on the self; this is to handle
         # cases where we are dealing with selfs with incomplete leaf-sets.
         tree_leafset_bitmask = self.seed_node.edge.bipartition._leafset_bitmask
+        self._bipartition_encoding_state = (
+                taxon_namespace,
+                tree_leafset_bitmask,
+                self._is_rooted,
+                is_bipartitions_mutable,
+                suppress_unifurcations,
+                collapse_unrooted_basal_bifurcation)
         if is_bipartitions_mutable:
             _compile_bipartition = self._compile_mutable_bipartition_for_edge
         else:
@@ -5847,11 +6053,140 @@ class Tree(
             self.bipartition_encoding = list(map(_compile_bipartition, tree_edges))
         return self.bipartition_encoding
 
-    def update_bipartitions(self, *args, **kwargs):
+    def update_bipartitions(self,
+            suppress_unifurcations=True,
+            collapse_unrooted_basal_bifurcation=True,
+            suppress_storage=False,
+            is_bipartitions_mutable=False):
         """
-        Recalculates bipartition hashes for tree.
+        Recalculates the bipartitions of this tree that have been affected by
+        changes to its structure since they were last calculated.
+
+        Adding, inserting or removing child nodes (through, e.g.,
+        :meth:`Node.add_child()`, :meth:`Node.insert_child()`,
+        :meth:`Node.remove_child()` or by setting :attr:`Node.parent_node`)
+        flags the edges on the path from the modified node to the seed node as
+        "dirty". Only the bipartitions of these edges are recalculated, so
+        that after a local rearrangement (e.g., pruning and regrafting a
+        subtree, swapping subtrees across an edge, or rerooting) the cost is
+        proportional to the length of the affected paths rather than to the
+        size of the whole tree. ``Tree.bipartition_encoding`` and
+        ``Tree.bipartition_edge_map`` are rebuilt on demand.
+
+        A full re-encoding (:meth:`Tree.encode_bipartitions()`) is carried
+        out instead if the bipartitions have not been encoded before, or if
+        the taxon namespace, the rooting state or the leaf set of the tree
+        (e.g., after pruning taxa), ``is_bipartitions_mutable``,
+        ``suppress_unifurcations`` or ``collapse_unrooted_basal_bifurcation``
+        have changed since, or if the bipartitions were last encoded without
+        suppressing unifurcations, as all bipartitions need to be recalculated
+        or renormalized (or unifurcations elsewhere in the tree suppressed) in
+        this case. Note that changing the |Taxon| objects
+        associated with individual nodes directly is not tracked: use
+        :meth:`Tree.encode_bipartitions()` after doing so.
+
+        Parameters
+        ----------
+        suppress_unifurcations : bool
+            If |True|, nodes of outdegree 1 will be deleted as they are
+            encountered.
+        collapse_unrooted_basal_bifurcation: bool
+            If |True|, then a basal bifurcation on an unrooted tree will be
+            collapsed to a trifurcation.
+        suppress_storage : bool
+            If |True|, then ``self.bipartition_encoding`` will not be
+            maintained.
+        is_bipartitions_mutable : bool
+            If |True|, then the |Bipartition| instances will not be locked or
+            frozen.
         """
-        self.encode_bipartitions(*args, **kwargs)
+        encoding_state = self._bipartition_encoding_state
+        seed_node = self.seed_node
+        if (encoding_state is None
+                or not seed_node
+                or encoding_state[0] is not self._taxon_namespace
+                or encoding_state[2] != self._is_rooted
+                or encoding_state[3] != is_bipartitions_mutable
+                or not encoding_state[4]
+                or encoding_state[4] != suppress_unifurcations
+                or encoding_state[5] != collapse_unrooted_basal_bifurcation):
+            self.encode_bipartitions(
+                    suppress_unifurcations=suppress_unifurcations,
+                    collapse_unrooted_basal_bifurcation=collapse_unrooted_basal_bifurcation,
+                    suppress_storage=suppress_storage,
+                    is_bipartitions_mutable=is_bipartitions_mutable)
+            return
+        if (collapse_unrooted_basal_bifurcation
+                and not self._is_rooted
+                and len(seed_node._child_nodes) == 2):
+            self.collapse_basal_bifurcation()
+            seed_node = self.seed_node
+        if seed_node._edge._is_bipartition_dirty:
+            # Collect the nodes subtending the dirty edges: as all ancestors
+            # of a dirty edge are dirty, these form a connected region
+            # including the seed node. Visiting them in reverse preorder
+            # visits every node after all of its children.
+            dirty_nodes = []
+            stack = [seed_node]
+            while stack:
+                node = stack.pop()
+                dirty_nodes.append(node)
+                for child in node._child_nodes:
+                    if child._edge._is_bipartition_dirty:
+                        stack.append(child)
+            taxon_namespace = self._taxon_namespace
+            updated_edges = []
+            for node in reversed(dirty_nodes):
+                edge = node._edge
+                child_nodes = node._child_nodes
+                if len(child_nodes) == 1 and suppress_unifurcations:
+                    # as in ``encode_bipartitions()``
+                    if edge.length is not None:
+                        if child_nodes[0].edge.length is None:
+                            child_nodes[0].edge.length = edge.length
+                        else:
+                            child_nodes[0].edge.length += edge.length
+                    if node._parent_node is not None:
+                        parent = node._parent_node
+                        pos = parent._child_nodes.index(node)
+                        parent.remove_child(node)
+                        parent.insert_child(index=pos, node=child_nodes[0])
+                        node._parent_node = None
+                    else:
+                        self.seed_node = child_nodes[0]
+                        self.seed_node._parent_node = None
+                    continue
+                leafset_bitmask = 0
+                if child_nodes:
+                    for child in child_nodes:
+                        leafset_bitmask |= child._edge.bipartition._leafset_bitmask
+                elif node.taxon:
+                    leafset_bitmask = taxon_namespace.taxon_bitmask(node.taxon)
+                edge.bipartition = Bipartition(compile_bipartition=False, is_mutable=True)
+                edge.bipartition._leafset_bitmask = leafset_bitmask
+                edge.bipartition._is_rooted = self._is_rooted
+                updated_edges.append(edge)
+            if self.seed_node._edge.bipartition._leafset_bitmask != encoding_state[1]:
+                # leaf set changed: all bipartitions need to be renormalized
+                self.encode_bipartitions(
+                        suppress_unifurcations=suppress_unifurcations,
+                        collapse_unrooted_basal_bifurcation=collapse_unrooted_basal_bifurcation,
+                        suppress_storage=suppress_storage,
+                        is_bipartitions_mutable=is_bipartitions_mutable)
+                return
+            if is_bipartitions_mutable:
+                _compile_bipartition = self._compile_mutable_bipartition_for_edge
+            else:
+                _compile_bipartition = self._compile_immutable_bipartition_for_edge
+            for edge in updated_edges:
+                _compile_bipartition(edge)
+                edge._is_bipartition_dirty = False
+            self._bipartition_edge_map = None
+            self._is_bipartition_encoding_stale = not suppress_storage
+        elif not suppress_storage and self._bipartition_encoding is None:
+            self._is_bipartition_encoding_stale = True
+        if suppress_storage:
+            self.bipartition_encoding = None
 
     def encode_splits(self, *args, **kwargs):
         """
@@ -6341,6 +6676,954 @@ class Tree(
                 width=width,
                 )
 
+###############################################################################
+### Traversal Caches
+
+# Traversal caches of trees, built by ``Tree._get_traversal_cache()``; held
+# outside of the trees so that they are neither copied nor pickled with them.
+_TREE_TRAVERSAL_CACHES = weakref.WeakKeyDictionary()
+
+class _TreeTraversalCache(object):
+    """
+    The nodes of a tree in pre-order and post-order, together with other
+    structures derived from them (e.g., the MRCA index of the tree), as of
+    the last time that the structure of the tree was changed. Building the
+    cache clears the ``_is_structure_dirty`` flags of the edges of the tree,
+    which are set again (up to the seed edge) when the tree is changed.
+    """
+
+    def __init__(self, seed_node):
+        self.seed_node = seed_node
+        preorder_nodes = []
+        stack = [seed_node]
+        while stack:
+            node = stack.pop()
+            node._edge._is_structure_dirty = False
+            preorder_nodes.append(node)
+            stack.extend(reversed(node._child_nodes))
+        self.preorder_nodes = tuple(preorder_nodes)
+        self._postorder_nodes = None
+        self._leaf_nodes = None
+        self.mrca_index = None
+
+    def _get_postorder_nodes(self):
+        if self._postorder_nodes is None:
+            # the reverse of a pre-order traversal that visits the children
+            # of each node from last to first
+            postorder_nodes = []
+            stack = [self.seed_node]
+            while stack:
+                node = stack.pop()
+                postorder_nodes.append(node)
+                stack.extend(node._child_nodes)
+            postorder_nodes.reverse()
+            self._postorder_nodes = tuple(postorder_nodes)
+        return self._postorder_nodes
+    postorder_nodes = property(_get_postorder_nodes)
+
+    def _get_leaf_nodes(self):
+        if self._leaf_nodes is None:
+            self._leaf_nodes = tuple(nd for nd in self.preorder_nodes if not nd._child_nodes)
+        return self._leaf_nodes
+    leaf_nodes = property(_get_leaf_nodes)
+
+###############################################################################
+### MrcaIndex
+
+class MrcaIndex(object):
+    """
+    An index of the structure of a tree for constant-time most-recent common
+    ancestor (MRCA, or lowest common ancestor) queries.
+
+    The index records the Euler tour of the tree, i.e., the sequence of nodes
+    visited in a depth-first traversal from the seed node, with each node
+    recorded when it is first reached and again on returning to it from each
+    of its children, together with the depths of these nodes. The MRCA of a
+    set of nodes is the shallowest node in the tour between the first visits
+    to these nodes, found in constant time from a sparse table of the
+    shallowest node in each range of the tour whose length is a power of two.
+    The index takes O(n log n) memory for a tree of n nodes.
+
+    The index reflects the structure of the tree at the time that it was
+    built. Use :meth:`Tree.mrca_index()` to get an index that is rebuilt as
+    needed when the tree is changed.
+    """
+
+    def __init__(self, tree):
+        """
+        Parameters
+        ----------
+        tree : |Tree|
+            The tree to index.
+        """
+        self.seed_node = tree.seed_node
+        self._euler_tour_nodes = []
+        self._node_first_positions = {}
+        self._node_last_positions = {}
+        self._node_num_leaves = {}
+        self._taxon_leaf_nodes = {}
+        self._is_leaf_taxa_unique = True
+        euler_tour_nodes = self._euler_tour_nodes
+        euler_tour_depths = []
+        node_first_positions = self._node_first_positions
+        node_last_positions = self._node_last_positions
+        node_num_leaves = self._node_num_leaves
+        seed_node = self.seed_node
+        euler_tour_nodes.append(seed_node)
+        euler_tour_depths.append(0)
+        node_first_positions[id(seed_node)] = 0
+        node_num_leaves[id(seed_node)] = 0
+        stack = [(seed_node, 0)]
+        while stack:
+            node, child_idx = stack[-1]
+            if child_idx < len(node._child_nodes):
+                stack[-1] = (node, child_idx + 1)
+                child = node._child_nodes[child_idx]
+                stack.append((child, 0))
+                node_first_positions[id(child)] = len(euler_tour_nodes)
+                node_num_leaves[id(child)] = 0
+                euler_tour_nodes.append(child)
+                euler_tour_depths.append(len(stack) - 1)
+            else:
+                stack.pop()
+                node_last_positions[id(node)] = len(euler_tour_nodes) - 1
+                if not node._child_nodes:
+                    node_num_leaves[id(node)] = 1
+                    self._index_leaf_taxon(node)
+                if stack:
+                    parent_node = stack[-1][0]
+                    node_num_leaves[id(parent_node)] += node_num_leaves[id(node)]
+                    euler_tour_nodes.append(parent_node)
+                    euler_tour_depths.append(len(stack) - 1)
+        self._euler_tour_depths = array.array("i", euler_tour_depths)
+        self._build_sparse_table()
+
+    def _index_leaf_taxon(self, node):
+        if node.taxon is None or id(node.taxon) in self._taxon_leaf_nodes:
+            self._is_leaf_taxa_unique = False
+        else:
+            self._taxon_leaf_nodes[id(node.taxon)] = node
+
+    def _build_sparse_table(self):
+        # Level ``k`` of the table gives, for each position ``i`` of the
+        # Euler tour, the position of the shallowest node in the ``2**k``
+        # positions starting at ``i``.
+        depths = self._euler_tour_depths
+        num_positions = len(depths)
+        sparse_table = [array.array("i", range(num_positions))]
+        span = 1
+        while 2 * span <= num_positions:
+            prev_level = sparse_table[-1]
+            level = array.array("i", prev_level[:num_positions - 2 * span + 1])
+            for idx in range(len(level)):
+                other = prev_level[idx + span]
+                if depths[other] < depths[level[idx]]:
+                    level[idx] = other
+            sparse_table.append(level)
+            span *= 2
+        self._sparse_table = sparse_table
+
+    def _shallowest_node(self, pos1, pos2):
+        # The shallowest node in positions ``pos1`` to ``pos2`` (inclusive)
+        # of the Euler tour.
+        level = (pos2 - pos1 + 1).bit_length() - 1
+        rpos1 = self._sparse_table[level][pos1]
+        rpos2 = self._sparse_table[level][pos2 - (1 << level) + 1]
+        if self._euler_tour_depths[rpos2] < self._euler_tour_depths[rpos1]:
+            rpos1 = rpos2
+        return self._euler_tour_nodes[rpos1]
+
+    def mrca(self, *nodes):
+        """
+        Returns the most-recent common ancestor of the given nodes, i.e., the
+        deepest node of which all of the nodes are descendants (with each node
+        considered a descendant of itself).
+
+        Parameters
+        ----------
+        \*nodes : |Node| objects
+            One or more nodes of the indexed tree.
+
+        Returns
+        -------
+        |Node|
+            The most-recent common ancestor of ``nodes``.
+        """
+        node_first_positions = self._node_first_positions
+        if len(nodes) == 2:
+            pos1 = node_first_positions[id(nodes[0])]
+            pos2 = node_first_positions[id(nodes[1])]
+            if pos1 > pos2:
+                pos1, pos2 = pos2, pos1
+        else:
+            if not nodes:
+                raise TypeError("At least one node must be specified")
+            positions = [node_first_positions[id(nd)] for nd in nodes]
+            pos1 = min(positions)
+            pos2 = max(positions)
+        return self._shallowest_node(pos1, pos2)
+
+    def is_ancestor(self, node1, node2):
+        """
+        Returns |True| if ``node1`` is an ancestor of (or is) ``node2``.
+        """
+        pos = self._node_first_positions[id(node2)]
+        return self._node_first_positions[id(node1)] <= pos <= self._node_last_positions[id(node1)]
+
+    def depth(self, node):
+        """
+        Returns the number of edges between ``node`` and the seed node.
+        """
+        return self._euler_tour_depths[self._node_first_positions[id(node)]]
+
+    def leafset_mrca(self, nodes):
+        """
+        Returns the node that :meth:`Tree.mrca()` would return for the union
+        of the leaf sets of ``nodes``: the most-recent common ancestor of the
+        leaves of the nodes, or, if its leaf set is exactly that union, the
+        most ancient node with the same leaf set (i.e., the first node with
+        that leaf set found on the way from the seed node). Returns |None| if
+        the leaves of the tree are not each associated with a distinct taxon,
+        as leaf sets are then not comparable to leafset bitmasks.
+        """
+        if not self._is_leaf_taxa_unique:
+            return None
+        node_first_positions = self._node_first_positions
+        node_last_positions = self._node_last_positions
+        node_num_leaves = self._node_num_leaves
+        # count the leaves in the union of the subtrees of the nodes,
+        # skipping nodes in the subtree of a node already counted
+        position_nodes = dict((node_first_positions[id(nd)], nd) for nd in nodes)
+        num_leaves = 0
+        last_position = -1
+        for position in sorted(position_nodes):
+            if position > last_position:
+                node = position_nodes[position]
+                num_leaves += node_num_leaves[id(node)]
+                last_position = node_last_positions[id(node)]
+        mrca_node = self.mrca(*nodes)
+        if node_num_leaves[id(mrca_node)] == num_leaves:
+            while (mrca_node._parent_node is not None
+                    and node_num_leaves[id(mrca_node._parent_node)] == num_leaves):
+                mrca_node = mrca_node._parent_node
+        return mrca_node
+
+    def taxon_leaf_nodes(self, taxa):
+        """
+        Returns the list of the leaf nodes associated with each of the taxa in
+        ``taxa``, or |None| if a taxon is not associated with exactly one leaf
+        of the tree as indexed.
+        """
+        if not self._is_leaf_taxa_unique:
+            return None
+        nodes = []
+        for taxon in taxa:
+            node = self._taxon_leaf_nodes.get(id(taxon))
+            if node is None or node.taxon is not taxon:
+                return None
+            nodes.append(node)
+        return nodes
+
+###############################################################################
+### TreeSkeleton
+
+class TreeSkeleton(taxonmodel.TaxonNamespaceAssociated):
+    """
+    A minimal, bitmask-only representation of a tree, for client code that
+    only requires the splits of a tree and the edge lengths or node ages
+    associated with them (e.g., |SplitDistribution| or |TreeArray|).
+
+    No |Node|, |Edge|, or |Bipartition| objects are created. Instead, the
+    nodes of the tree are stored in postorder as three parallel lists:
+
+        -   ``leafset_bitmasks``: the leafset bitmask of each node
+        -   ``edge_lengths``: the length of the edge subtending each node
+            (|None| if not specified)
+        -   ``num_child_nodes``: the number of children of each node
+
+    The last entry corresponds to the seed (root) node. Instances are built
+    by the tree parsers when ``bitmasks_only=True`` is passed; typically,
+    these will be obtained through :meth:`TreeSkeleton.yield_from_files()`.
+    Annotations, comments, and node labels are discarded.
+    """
+
+    def yield_from_files(cls,
+            files,
+            schema,
+            taxon_namespace=None,
+            **kwargs):
+        """
+        Iterates over trees from files, returning them one-by-one as
+        |TreeSkeleton| objects. Only the "newick" and "nexus" formats (and
+        the "nexus/newick" combination) are supported.
+
+        Parameters
+        ----------
+        files : iterable of file paths or file-like objects.
+            Iterable of sources, which can either be strings specifying file
+            paths or file-like objects open for reading.
+        schema : string
+            The name of the data format (e.g., "newick" or "nexus").
+        taxon_namespace : |TaxonNamespace| instance
+            The operational taxonomic unit concept namespace to use to manage
+            taxon definitions.
+        \*\*kwargs : keyword arguments
+            These will be passed directly to the schema-parser implementation.
+
+        Yields
+        ------
+        t : |TreeSkeleton|
+            Tree skeletons as read from the file.
+
+        Examples
+        --------
+
+        ::
+
+            taxon_namespace = dendropy.TaxonNamespace()
+            split_distribution = dendropy.SplitDistribution(
+                    taxon_namespace=taxon_namespace)
+            for tree_skeleton in dendropy.TreeSkeleton.yield_from_files(
+                    files=["path/to/trees1.nex", "path/to/trees2.nex"],
+                    schema="nexus",
+                    taxon_namespace=taxon_namespace):
+                split_distribution.count_splits_on_tree_skeleton(tree_skeleton)
+
+        """
+        if taxon_namespace is None:
+            taxon_namespace = taxonmodel.process_kwargs_dict_for_taxon_namespace(kwargs, None)
+            if taxon_namespace is None:
+                taxon_namespace = taxonmodel.TaxonNamespace()
+        else:
+            assert "taxon_set" not in kwargs
+        if "tree_offset" in kwargs:
+            raise TypeError("'tree_offset' is not supported: trees should be skipped/discarded on the client code side")
+        kwargs["bitmasks_only"] = True
+        tree_yielder = dataio.get_tree_yielder(
+                files,
+                schema,
+                taxon_namespace=taxon_namespace,
+                tree_type=cls,
+                **kwargs)
+        return tree_yielder
+    yield_from_files = classmethod(yield_from_files)
+
+    def __init__(self, taxon_namespace=None, is_rooted=None, label=None):
+        taxonmodel.TaxonNamespaceAssociated.__init__(self,
+                taxon_namespace=taxon_namespace)
+        self.label = label
+        self.is_rooted = is_rooted
+        self.weight = None
+        self.leafset_bitmasks = []
+        self.edge_lengths = []
+        self.num_child_nodes = []
+        self.node_ages = None
+
+    def __len__(self):
+        return len(self.leafset_bitmasks)
+
+    def add_node(self, leafset_bitmask, edge_length=None, num_child_nodes=0):
+        """
+        Appends a node to the skeleton. Nodes must be added in postorder,
+        i.e., after all their children.
+        """
+        self.leafset_bitmasks.append(leafset_bitmask)
+        self.edge_lengths.append(edge_length)
+        self.num_child_nodes.append(num_child_nodes)
+
+    def child_node_indexes(self):
+        """
+        Returns a list which, for each node (in postorder), gives a list of
+        the (postorder) indexes of its children.
+        """
+        children = []
+        stack = []
+        for nd_idx, num_children in enumerate(self.num_child_nodes):
+            if num_children:
+                children.append(stack[-num_children:])
+                del stack[-num_children:]
+            else:
+                children.append([])
+            stack.append(nd_idx)
+        return children
+
+    def calc_node_ages(self,
+            ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
+            is_force_max_age=False,
+            is_force_min_age=False,
+            taxon_label_age_map=None):
+        """
+        As :meth:`Tree.calc_node_ages()`, but stores the ages (in postorder)
+        in ``self.node_ages`` instead of setting them on nodes. Edge lengths
+        of |None| are set to 0.0 as they would be for a |Tree|. If
+        ``taxon_label_age_map`` is given, then the age of each leaf is looked
+        up in it by the label of its taxon (defaulting to 0.0).
+
+        Returns
+        -------
+        a : list[numeric]
+            The list of node ages.
+        """
+        if is_force_max_age and is_force_min_age:
+            raise ValueError("Cannot specify both 'is_force_max_age' and 'is_force_min_age'")
+        is_check_ultrametricity = not (is_force_max_age
+                or is_force_min_age
+                or ultrametricity_precision is None
+                or ultrametricity_precision is False
+                or ultrametricity_precision < 0)
+        edge_lengths = self.edge_lengths
+        ages = []
+        for nd_idx, child_indexes in enumerate(self.child_node_indexes()):
+            if not child_indexes:
+                age = 0.0
+                if taxon_label_age_map and self.leafset_bitmasks[nd_idx]:
+                    taxon = self.taxon_namespace.bitmask_taxa_list(self.leafset_bitmasks[nd_idx])[0]
+                    age = taxon_label_age_map.get(taxon.label, 0.0)
+                ages.append(age)
+                continue
+            if is_force_max_age:
+                age = max([ (ages[c] + edge_lengths[c]) for c in child_indexes ])
+            elif is_force_min_age:
+                age = min([ (ages[c] + edge_lengths[c]) for c in child_indexes ])
+            else:
+                first_child = child_indexes[0]
+                if edge_lengths[first_child] is None:
+                    edge_lengths[first_child] = 0.0
+                    age = ages[first_child]
+                else:
+                    age = ages[first_child] + edge_lengths[first_child]
+            if is_check_ultrametricity:
+                for c in child_indexes[1:]:
+                    if edge_lengths[c] is None:
+                        edge_lengths[c] = 0.0
+                    d = abs(age - (ages[c] + edge_lengths[c]))
+                    if d > ultrametricity_precision:
+                        raise error.UltrametricityError("Tree is not ultrametric within threshold of {threshold}: {deviance}".format(
+                            threshold=ultrametricity_precision,
+                            deviance=d,
+                            ))
+            ages.append(age)
+        self.node_ages = ages
+        return ages
+
+    def encode_bipartitions(self):
+        """
+        Calculates the split bitmasks of the tree, following the same
+        conventions as :meth:`Tree.encode_bipartitions()`: unifurcations are
+        suppressed (with their edge lengths added to those of their children)
+        and, if the tree is not rooted, a basal bifurcation is collapsed.
+
+        Returns
+        -------
+        s : list[integer]
+            The split bitmasks, in postorder of the (retained) nodes.
+        e : list[numeric]
+            The corresponding edge lengths.
+        i : list[integer]
+            The indexes of the corresponding nodes in ``self.leafset_bitmasks``
+            (and ``self.node_ages``, if calculated).
+        """
+        if not self.leafset_bitmasks:
+            return [], [], []
+        children = self.child_node_indexes()
+        edge_lengths = list(self.edge_lengths)
+        is_retained = [True] * len(children)
+        root_idx = len(children) - 1
+        if not self.is_rooted and len(children[root_idx]) == 2:
+            c0, c1 = children[root_idx]
+            to_keep_idx, to_del_idx = None, None
+            if len(children[c1]) >= 2:
+                to_keep_idx, to_del_idx = c0, c1
+            elif len(children[c0]) >= 2:
+                to_keep_idx, to_del_idx = c1, c0
+            if to_del_idx is not None:
+                try:
+                    edge_lengths[to_keep_idx] += edge_lengths[to_del_idx]
+                except TypeError:
+                    pass
+                is_retained[to_del_idx] = False
+        # index of node that takes the place of each node in the tree after
+        # unifurcations are suppressed
+        effective_idx = list(range(len(children)))
+        for nd_idx, child_indexes in enumerate(children):
+            if len(child_indexes) == 1 and is_retained[nd_idx]:
+                child_idx = effective_idx[child_indexes[0]]
+                if edge_lengths[nd_idx] is not None:
+                    if edge_lengths[child_idx] is None:
+                        edge_lengths[child_idx] = edge_lengths[nd_idx]
+                    else:
+                        edge_lengths[child_idx] += edge_lengths[nd_idx]
+                effective_idx[nd_idx] = child_idx
+                is_retained[nd_idx] = False
+        node_indexes = [nd_idx for nd_idx, r in enumerate(is_retained) if r]
+        tree_leafset_bitmask = self.leafset_bitmasks[root_idx]
+        leafset_bitmasks = [self.leafset_bitmasks[nd_idx] for nd_idx in node_indexes]
+        if not tree_leafset_bitmask:
+            splits = [None] * len(node_indexes)
+        elif self.is_rooted:
+            splits = leafset_bitmasks
+        else:
+            lowest_relevant_bit = bitprocessing.least_significant_set_bit(tree_leafset_bitmask)
+            splits = [
+                    ((~leafset_bitmask) & tree_leafset_bitmask) if (leafset_bitmask & lowest_relevant_bit) else (leafset_bitmask & tree_leafset_bitmask)
+                    for leafset_bitmask in leafset_bitmasks
+                    ]
+        return splits, [edge_lengths[nd_idx] for nd_idx in node_indexes], node_indexes
+
+###############################################################################
+### FlatTree
+
+class FlatTree(taxonmodel.TaxonNamespaceAssociated):
+    """
+    A compact, read-only representation of a tree, for large trees that are
+    traversed or queried rather than modified.
+
+    No |Node| or |Edge| objects are created. Instead, the nodes of the tree
+    are identified by their indexes in preorder (with the seed node at
+    index 0), and stored as parallel arrays:
+
+        -   ``parent_indexes``: the index of the parent of each node (-1 for
+            the seed node)
+        -   ``first_child_indexes``: the index of the first child of each
+            node (-1 for leaves)
+        -   ``next_sibling_indexes``: the index of the next child of the
+            parent of each node (-1 for the last child)
+        -   ``edge_lengths``: the length of the edge subtending each node,
+            as a floating-point value (NaN if not specified)
+        -   ``taxon_indexes``: the index in ``taxon_namespace`` of the taxon
+            associated with each node (-1 if none)
+        -   ``labels``: the label of each node (|None| if none)
+
+    Instances are created from a |Tree| using :meth:`FlatTree.from_tree()`,
+    and converted back using :meth:`FlatTree.to_tree()`. The structure,
+    taxa, node labels, and edge lengths of the tree, as well as its rooting
+    state, label, and weight, are preserved. Annotations, comments, edge
+    labels, and any other attributes of the nodes and edges are discarded.
+    The taxon indexes refer to the positions of the taxa in
+    ``taxon_namespace``, which should therefore not be re-ordered or have
+    taxa removed from it while the tree is in use.
+    """
+
+    def from_tree(cls, tree):
+        """
+        Creates and returns a |FlatTree| representing ``tree``.
+
+        Parameters
+        ----------
+        tree : |Tree|
+            The tree to represent.
+
+        Returns
+        -------
+        t : |FlatTree|
+            The new flat tree, sharing the taxon namespace of ``tree``.
+        """
+        flat_tree = cls(taxon_namespace=tree.taxon_namespace,
+                is_rooted=tree.is_rooted,
+                label=tree.label)
+        flat_tree.weight = tree.weight
+        taxon_indexes_map = dict((taxon, idx) for idx, taxon in enumerate(tree.taxon_namespace))
+        nodes = list(tree.preorder_node_iter())
+        num_nodes = len(nodes)
+        node_indexes = {}
+        parent_indexes = array.array("i", [-1]) * num_nodes
+        first_child_indexes = array.array("i", [-1]) * num_nodes
+        next_sibling_indexes = array.array("i", [-1]) * num_nodes
+        last_child_indexes = array.array("i", [-1]) * num_nodes
+        edge_lengths = array.array("d", [0.0]) * num_nodes
+        taxon_indexes = array.array("i", [-1]) * num_nodes
+        labels = [None] * num_nodes
+        nan = float("nan")
+        for nd_idx, node in enumerate(nodes):
+            node_indexes[id(node)] = nd_idx
+            if nd_idx > 0:
+                parent_idx = node_indexes[id(node._parent_node)]
+                parent_indexes[nd_idx] = parent_idx
+                if first_child_indexes[parent_idx] < 0:
+                    first_child_indexes[parent_idx] = nd_idx
+                else:
+                    next_sibling_indexes[last_child_indexes[parent_idx]] = nd_idx
+                last_child_indexes[parent_idx] = nd_idx
+            edge_length = node.edge.length
+            edge_lengths[nd_idx] = nan if edge_length is None else edge_length
+            if node.taxon is not None:
+                try:
+                    taxon_indexes[nd_idx] = taxon_indexes_map[node.taxon]
+                except KeyError:
+                    raise ValueError("Taxon {} is not in the taxon namespace of the tree".format(node.taxon))
+            labels[nd_idx] = node.label
+        flat_tree.parent_indexes = parent_indexes
+        flat_tree.first_child_indexes = first_child_indexes
+        flat_tree.next_sibling_indexes = next_sibling_indexes
+        flat_tree.edge_lengths = edge_lengths
+        flat_tree.taxon_indexes = taxon_indexes
+        flat_tree.labels = labels
+        return flat_tree
+    from_tree = classmethod(from_tree)
+
+    def __init__(self, taxon_namespace=None, is_rooted=None, label=None):
+        taxonmodel.TaxonNamespaceAssociated.__init__(self,
+                taxon_namespace=taxon_namespace)
+        self.label = label
+        self.is_rooted = is_rooted
+        self.weight = None
+        self.parent_indexes = array.array("i")
+        self.first_child_indexes = array.array("i")
+        self.next_sibling_indexes = array.array("i")
+        self.edge_lengths = array.array("d")
+        self.taxon_indexes = array.array("i")
+        self.labels = []
+        self.node_ages = None
+
+    def __len__(self):
+        return len(self.parent_indexes)
+
+    def to_tree(self):
+        """
+        Creates and returns a |Tree| with the structure, taxa, node labels,
+        and edge lengths of this tree.
+
+        Returns
+        -------
+        t : |Tree|
+            The new tree, sharing the taxon namespace of this tree.
+        """
+        tree = Tree(taxon_namespace=self.taxon_namespace, label=self.label)
+        tree.is_rooted = self.is_rooted
+        tree.weight = self.weight
+        nodes = []
+        for nd_idx in range(len(self)):
+            if nd_idx == 0:
+                node = tree.seed_node
+            else:
+                node = tree.node_factory()
+                nodes[self.parent_indexes[nd_idx]].add_child(node)
+            node.taxon = self.taxon(nd_idx)
+            node.label = self.labels[nd_idx]
+            node.edge.length = self.edge_length(nd_idx)
+            nodes.append(node)
+        return tree
+
+    def taxon(self, node_index):
+        """
+        Returns the |Taxon| associated with the node at ``node_index``, or
+        |None| if there is none.
+        """
+        taxon_index = self.taxon_indexes[node_index]
+        if taxon_index < 0:
+            return None
+        return self.taxon_namespace[taxon_index]
+
+    def edge_length(self, node_index):
+        """
+        Returns the length of the edge subtending the node at ``node_index``,
+        or |None| if it is not specified.
+        """
+        edge_length = self.edge_lengths[node_index]
+        if edge_length != edge_length:
+            return None
+        return edge_length
+
+    def is_leaf(self, node_index):
+        """
+        Returns |True| if the node at ``node_index`` has no children.
+        """
+        return self.first_child_indexes[node_index] < 0
+
+    def child_node_iter(self, node_index, filter_fn=None):
+        """
+        Iterates over the indexes of the children of the node at
+        ``node_index``.
+
+        Parameters
+        ----------
+        node_index : integer
+            The index of the node.
+        filter_fn : function object, optional
+            A function object that takes a node index as an argument and
+            returns |True| if the node should be visited.
+
+        Returns
+        -------
+        :py:class:`collections.Iterator` [integer]
+            An iterator yielding the indexes of the children of the node.
+        """
+        next_sibling_indexes = self.next_sibling_indexes
+        child_idx = self.first_child_indexes[node_index]
+        while child_idx >= 0:
+            if filter_fn is None or filter_fn(child_idx):
+                yield child_idx
+            child_idx = next_sibling_indexes[child_idx]
+
+    def preorder_node_iter(self, filter_fn=None):
+        """
+        Pre-order iterator over the node indexes of the tree, i.e., 0, 1,
+        ..., ``len(self) - 1``.
+
+        Parameters
+        ----------
+        filter_fn : function object, optional
+            A function object that takes a node index as an argument and
+            returns |True| if the node should be visited.
+
+        Returns
+        -------
+        :py:class:`collections.Iterator` [integer]
+            An iterator yielding node indexes in pre-order sequence.
+        """
+        for nd_idx in range(len(self)):
+            if filter_fn is None or filter_fn(nd_idx):
+                yield nd_idx
+
+    def postorder_node_iter(self, filter_fn=None):
+        """
+        Post-order iterator over the node indexes of the tree.
+
+        Parameters
+        ----------
+        filter_fn : function object, optional
+            A function object that takes a node index as an argument and
+            returns |True| if the node should be visited.
+
+        Returns
+        -------
+        :py:class:`collections.Iterator` [integer]
+            An iterator yielding node indexes in post-order sequence.
+        """
+        if not len(self):
+            return
+        parent_indexes = self.parent_indexes
+        first_child_indexes = self.first_child_indexes
+        next_sibling_indexes = self.next_sibling_indexes
+        nd_idx = 0
+        while True:
+            while first_child_indexes[nd_idx] >= 0:
+                nd_idx = first_child_indexes[nd_idx]
+            if filter_fn is None or filter_fn(nd_idx):
+                yield nd_idx
+            while next_sibling_indexes[nd_idx] < 0:
+                nd_idx = parent_indexes[nd_idx]
+                if nd_idx < 0:
+                    return
+                if filter_fn is None or filter_fn(nd_idx):
+                    yield nd_idx
+            nd_idx = next_sibling_indexes[nd_idx]
+
+    def leaf_node_iter(self, filter_fn=None):
+        """
+        Iterates over the indexes of the leaves of the tree, in pre-order.
+
+        Parameters
+        ----------
+        filter_fn : function object, optional
+            A function object that takes a node index as an argument and
+            returns |True| if the node should be visited.
+
+        Returns
+        -------
+        :py:class:`collections.Iterator` [integer]
+            An iterator yielding the indexes of the leaves of the tree.
+        """
+        first_child_indexes = self.first_child_indexes
+        for nd_idx in range(len(self)):
+            if first_child_indexes[nd_idx] < 0 and (filter_fn is None or filter_fn(nd_idx)):
+                yield nd_idx
+
+    def calc_node_ages(self,
+            ultrametricity_precision=constants.DEFAULT_ULTRAMETRICITY_PRECISION,
+            is_force_max_age=False,
+            is_force_min_age=False):
+        """
+        As :meth:`Tree.calc_node_ages()`, but stores the ages (by node index)
+        in ``self.node_ages`` instead of setting them on nodes. Edge lengths
+        that are not specified are taken to be 0.0.
+
+        Returns
+        -------
+        a : ``array.array``
+            The array of node ages.
+        """
+        if is_force_max_age and is_force_min_age:
+            raise ValueError("Cannot specify both 'is_force_max_age' and 'is_force_min_age'")
+        is_check_ultrametricity = not (is_force_max_age
+                or is_force_min_age
+                or ultrametricity_precision is None
+                or ultrametricity_precision is False
+                or ultrametricity_precision < 0)
+        first_child_indexes = self.first_child_indexes
+        next_sibling_indexes = self.next_sibling_indexes
+        edge_lengths = self.edge_lengths
+        ages = array.array("d", [0.0]) * len(self)
+        # children follow their parents in pre-order, so visiting the nodes
+        # in reverse order visits all children before their parents
+        for nd_idx in range(len(self) - 1, -1, -1):
+            child_idx = first_child_indexes[nd_idx]
+            if child_idx < 0:
+                continue
+            child_ages = []
+            while child_idx >= 0:
+                edge_length = edge_lengths[child_idx]
+                if edge_length != edge_length:
+                    edge_length = 0.0
+                child_ages.append(ages[child_idx] + edge_length)
+                child_idx = next_sibling_indexes[child_idx]
+            if is_force_max_age:
+                age = max(child_ages)
+            elif is_force_min_age:
+                age = min(child_ages)
+            else:
+                age = child_ages[0]
+            if is_check_ultrametricity:
+                for child_age in child_ages[1:]:
+                    d = abs(age - child_age)
+                    if d > ultrametricity_precision:
+                        raise error.UltrametricityError("Tree is not ultrametric within threshold of {threshold}: {deviance}".format(
+                            threshold=ultrametricity_precision,
+                            deviance=d,
+                            ))
+            ages[nd_idx] = age
+        self.node_ages = ages
+        return ages
+
+    def as_tree_skeleton(self):
+        """
+        Returns a |TreeSkeleton| of this tree (e.g., for
+        :meth:`SplitDistribution.count_splits_on_tree_skeleton()`).
+
+        Returns
+        -------
+        s : |TreeSkeleton|
+            The tree skeleton.
+        i : list[integer]
+            For each node of the skeleton (in postorder), the index of the
+            corresponding node of this tree.
+        """
+        tree_skeleton = TreeSkeleton(taxon_namespace=self.taxon_namespace,
+                is_rooted=self.is_rooted,
+                label=self.label)
+        tree_skeleton.weight = self.weight
+        taxon_namespace = self.taxon_namespace
+        taxon_indexes = self.taxon_indexes
+        parent_indexes = self.parent_indexes
+        leafset_bitmasks = [0] * len(self)
+        num_child_nodes = [0] * len(self)
+        node_indexes = []
+        for nd_idx in self.postorder_node_iter():
+            if num_child_nodes[nd_idx] == 0 and taxon_indexes[nd_idx] >= 0:
+                leafset_bitmasks[nd_idx] = taxon_namespace.taxon_bitmask(taxon_namespace[taxon_indexes[nd_idx]])
+            parent_idx = parent_indexes[nd_idx]
+            if parent_idx >= 0:
+                leafset_bitmasks[parent_idx] |= leafset_bitmasks[nd_idx]
+                num_child_nodes[parent_idx] += 1
+            tree_skeleton.add_node(leafset_bitmasks[nd_idx],
+                    self.edge_length(nd_idx),
+                    num_child_nodes[nd_idx])
+            node_indexes.append(nd_idx)
+        return tree_skeleton, node_indexes
+
+    def encode_bipartitions(self):
+        """
+        Calculates the split bitmasks of the tree, following the same
+        conventions as :meth:`Tree.encode_bipartitions()` (see
+        :meth:`TreeSkeleton.encode_bipartitions()`).
+
+        Returns
+        -------
+        s : list[integer]
+            The split bitmasks, in postorder of the (retained) nodes.
+        e : list[numeric]
+            The corresponding edge lengths.
+        i : list[integer]
+            The indexes of the corresponding nodes of this tree.
+        """
+        tree_skeleton, node_indexes = self.as_tree_skeleton()
+        splits, edge_lengths, skeleton_node_indexes = tree_skeleton.encode_bipartitions()
+        return splits, edge_lengths, [node_indexes[nd_idx] for nd_idx in skeleton_node_indexes]
+
+    def as_string(self, schema, **kwargs):
+        """
+        Composes and returns string representation of the tree. Only the
+        "newick" format is supported, with the output being identical to that
+        of :meth:`Tree.as_string()` for the tree returned by
+        :meth:`FlatTree.to_tree()`.
+
+        The following optional keyword arguments are supported, as described
+        for the "newick" format: ``suppress_leaf_taxon_labels``,
+        ``suppress_leaf_node_labels``, ``suppress_internal_taxon_labels``,
+        ``suppress_internal_node_labels``, ``suppress_rooting``,
+        ``suppress_edge_lengths``, ``unquoted_underscores``,
+        ``preserve_spaces``, ``store_tree_weights``,
+        ``node_label_element_separator``, and
+        ``real_value_format_specifier``.
+        """
+        if schema != "newick":
+            raise error.UnsupportedSchemaError("Format not supported for 'FlatTree': '{}'".format(schema))
+        suppress_leaf_taxon_labels = kwargs.pop("suppress_leaf_taxon_labels", False)
+        suppress_leaf_node_labels = kwargs.pop("suppress_leaf_node_labels", True)
+        suppress_internal_taxon_labels = kwargs.pop("suppress_internal_taxon_labels", False)
+        suppress_internal_node_labels = kwargs.pop("suppress_internal_node_labels", False)
+        suppress_rooting = kwargs.pop("suppress_rooting", False)
+        suppress_edge_lengths = kwargs.pop("suppress_edge_lengths", False)
+        quote_underscores = not kwargs.pop("unquoted_underscores", False)
+        preserve_spaces = kwargs.pop("preserve_spaces", False)
+        store_tree_weights = kwargs.pop("store_tree_weights", False)
+        node_label_element_separator = kwargs.pop("node_label_element_separator", " ")
+        real_value_format_specifier = kwargs.pop("real_value_format_specifier", None)
+        if kwargs:
+            raise TypeError("Unsupported keyword arguments: {}".format(kwargs))
+        from dendropy.dataio import nexusprocessing
+        real_value_formatter = ("{:" + (real_value_format_specifier or "") + "}").format
+        taxon_namespace = self.taxon_namespace
+        taxon_indexes = self.taxon_indexes
+        labels = self.labels
+        edge_lengths = self.edge_lengths
+        first_child_indexes = self.first_child_indexes
+        def _compose_node_body(nd_idx):
+            tag_parts = []
+            if first_child_indexes[nd_idx] < 0:
+                suppress_taxon_label = suppress_leaf_taxon_labels
+                suppress_node_label = suppress_leaf_node_labels
+            else:
+                suppress_taxon_label = suppress_internal_taxon_labels
+                suppress_node_label = suppress_internal_node_labels
+            if taxon_indexes[nd_idx] >= 0 and not suppress_taxon_label:
+                taxon = taxon_namespace[taxon_indexes[nd_idx]]
+                if taxon.label is not None:
+                    tag_parts.append(str(taxon.label))
+            if labels[nd_idx] and not suppress_node_label:
+                tag_parts.append(str(labels[nd_idx]))
+            tag = node_label_element_separator.join(tag_parts)
+            if tag:
+                tag = nexusprocessing.escape_nexus_token(tag,
+                        preserve_spaces=preserve_spaces,
+                        quote_underscores=quote_underscores)
+            edge_length = edge_lengths[nd_idx]
+            if edge_length == edge_length and not suppress_edge_lengths:
+                return "{}:{}".format(tag, real_value_formatter(edge_length))
+            return tag
+        parts = []
+        if self.is_rooted is not None and not suppress_rooting:
+            parts.append("[&R] " if self.is_rooted else "[&U] ")
+        if store_tree_weights and self.weight is not None:
+            parts.append("[&W {}] ".format(self.weight))
+        parent_indexes = self.parent_indexes
+        next_sibling_indexes = self.next_sibling_indexes
+        for nd_idx in range(len(self)):
+            parent_idx = parent_indexes[nd_idx]
+            if parent_idx >= 0 and first_child_indexes[parent_idx] != nd_idx:
+                parts.append(",")
+            if first_child_indexes[nd_idx] >= 0:
+                parts.append("(")
+                continue
+            parts.append(_compose_node_body(nd_idx))
+            # close the nodes of which this is the last descendant leaf
+            while next_sibling_indexes[nd_idx] < 0 and parent_indexes[nd_idx] >= 0:
+                nd_idx = parent_indexes[nd_idx]
+                parts.append(")")
+                parts.append(_compose_node_body(nd_idx))
+        parts.append(";\n")
+        return "".join(parts)
+
 ###############################################################################
 ### AsciiTreePlot
 
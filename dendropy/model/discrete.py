@@ -23,6 +23,7 @@ Models and modeling of discrete character evolution.
 import copy
 import math
 import itertools
+import bisect
 from dendropy.utility import GLOBAL_RNG
 from dendropy.calculate import probability
 import dendropy
@@ -43,6 +44,9 @@ class DiscreteCharacterEvolutionModel(object):
             self.rng = GLOBAL_RNG
         else:
             self.rng = rng
+        self.max_pmatrix_cache_size = 10000
+        self._pmatrix_cache = {}
+        self._pmatrix_cache_parameters = None
 
     def pmatrix(self, tlen, rate=1.0):
         """
@@ -51,6 +55,40 @@ class DiscreteCharacterEvolutionModel(object):
         """
         raise NotImplementedError
 
+    def pmatrix_parameters(self):
+        """
+        Returns the values of the parameters of the model that determine the
+        substitution probabilities, used to invalidate the cached matrices
+        of :meth:`cached_pmatrix()` if the parameters change.
+        """
+        return None
+
+    def cached_pmatrix(self, tlen, rate=1.0):
+        """
+        Returns the matrix of substitution probabilities for time ``tlen`` at
+        rate ``rate``, as given by :meth:`pmatrix()`, but from a cache of
+        matrices calculated previously for the same values if possible.
+        """
+        parameters = self.pmatrix_parameters()
+        if (parameters != self._pmatrix_cache_parameters
+                or len(self._pmatrix_cache) >= self.max_pmatrix_cache_size):
+            self._pmatrix_cache = {}
+            self._pmatrix_cache_parameters = parameters
+        key = (tlen, rate)
+        try:
+            return self._pmatrix_cache[key]
+        except KeyError:
+            pmat = self.pmatrix(tlen, rate)
+            self._pmatrix_cache[key] = pmat
+            return pmat
+
+    def stationary_sample_state_indexes(self, seq_len, rng=None):
+        """
+        Returns a ``bytearray`` of ``seq_len`` state indexes drawn from the
+        stationary distribution of this model.
+        """
+        return bytearray([state.index for state in self.stationary_sample(seq_len, rng=rng)])
+
     def simulate_descendant_states(self,
         ancestral_states,
         edge_length,
@@ -59,16 +97,129 @@ class DiscreteCharacterEvolutionModel(object):
         """
         Returns descendent sequence given ancestral sequence.
         """
+        desc_state_indexes = self.simulate_descendant_state_indexes(
+                bytearray([state.index for state in ancestral_states]),
+                edge_length=edge_length,
+                mutation_rate=mutation_rate,
+                rng=rng)
+        return self.states_from_indexes(desc_state_indexes)
+
+    def states_from_indexes(self, state_indexes):
+        """
+        Returns a list of the states of the state alphabet of this model
+        corresponding to the state indexes in ``state_indexes``.
+        """
+        if not state_indexes:
+            return []
+        index_states = [self.state_alphabet[idx] for idx in range(max(state_indexes) + 1)]
+        return [index_states[idx] for idx in state_indexes]
+
+    def simulate_descendant_state_indexes(self,
+        ancestral_state_indexes,
+        edge_length,
+        mutation_rate=1.0,
+        site_categories=None,
+        category_rates=None,
+        rng=None):
+        """
+        Returns a descendent sequence given an ancestral sequence, with the
+        sequences given as ``bytearray`` objects of state indexes.
+
+        Parameters
+        ----------
+        ancestral_state_indexes : ``bytearray``
+            The indexes of the states of the ancestral sequence.
+        edge_length : float
+            Length of the edge along which the sequence evolves.
+        mutation_rate : float
+            Mutation rate along the edge.
+        site_categories : ``bytearray`` or |None|
+            If given, the index of the rate category of each site, with the
+            rate multiplier of each category given by ``category_rates``.
+        category_rates : list of floats or |None|
+            The relative rates of the rate categories.
+        rng : random number generator
+            If not given, the random number generator of the model will be
+            used.
+
+        Returns
+        -------
+        s : ``bytearray``
+            The indexes of the states of the descendent sequence.
+
+        Notes
+        -----
+        Rather than sampling the state of every site, the sites at which
+        there is a substitution are found by skipping over the sequence in
+        geometrically-distributed steps, given the maximum probability of a
+        substitution over all states and rate categories, and accepting a
+        substitution at each site visited in proportion to its own
+        probability of a substitution. The time taken is thus proportional
+        to the expected number of substitutions rather than to the length
+        of the sequence.
+        """
         if rng is None:
             rng = self.rng
-        pmat = self.pmatrix(edge_length, mutation_rate)
-        multi = probability.sample_multinomial
-        desc_states = []
-        for state in ancestral_states:
-            anc_state_idx = state.index
-            desc_state_idx = multi(pmat[anc_state_idx], rng)
-            desc_states.append(self.state_alphabet[desc_state_idx])
-        return desc_states
+        if category_rates is None:
+            category_rates = [1.0]
+        desc_state_indexes = bytearray(ancestral_state_indexes)
+        num_sites = len(desc_state_indexes)
+        # For each rate category and ancestral state: the probability of a
+        # substitution, and the descendent states with their cumulative
+        # probabilities.
+        change_probs = []
+        change_targets = []
+        max_change_prob = 0.0
+        for rate in category_rates:
+            pmat = self.cached_pmatrix(edge_length, mutation_rate * rate)
+            category_change_probs = []
+            category_change_targets = []
+            for state_i, pvec in enumerate(pmat):
+                targets = []
+                cumulative_probs = []
+                change_prob = 0.0
+                for state_j, pij in enumerate(pvec):
+                    if state_j != state_i and pij > 0.0:
+                        change_prob += pij
+                        targets.append(state_j)
+                        cumulative_probs.append(change_prob)
+                category_change_probs.append(change_prob)
+                category_change_targets.append((targets, cumulative_probs))
+                if change_prob > max_change_prob:
+                    max_change_prob = change_prob
+            change_probs.append(category_change_probs)
+            change_targets.append(category_change_targets)
+        if max_change_prob <= 0.0:
+            return desc_state_indexes
+        if max_change_prob < 1.0:
+            log_skip_prob = math.log(1.0 - max_change_prob)
+        else:
+            log_skip_prob = None
+        random = rng.random
+        site_idx = -1
+        while True:
+            if log_skip_prob is None:
+                site_idx += 1
+            else:
+                site_idx += 1 + int(math.log(1.0 - random()) / log_skip_prob)
+            if site_idx >= num_sites:
+                break
+            state_i = desc_state_indexes[site_idx]
+            if site_categories is None:
+                category_idx = 0
+            else:
+                category_idx = site_categories[site_idx]
+            change_prob = change_probs[category_idx][state_i]
+            u = random() * max_change_prob
+            if u >= change_prob:
+                continue
+            # ``u`` is uniform in [0, change_prob) here
+            targets, cumulative_probs = change_targets[category_idx][state_i]
+            target_idx = bisect.bisect_right(cumulative_probs, u)
+            if target_idx >= len(targets):
+                target_idx = len(targets) - 1
+            desc_state_indexes[site_idx] = targets[target_idx]
+        return desc_state_indexes
 
 class DiscreteCharacterEvolver(object):
     "Evolves sequences on a tree."
@@ -80,8 +231,15 @@ class DiscreteCharacterEvolver(object):
      seq_model_attr="seq_model",
      edge_length_attr="length",
      edge_rate_attr="mutation_rate",
-     seq_label_attr='taxon'):
-        "__init__ sets up meta-data dealing with object nomenclature and semantics."
+     seq_label_attr='taxon',
+     gamma_shape=None,
+     num_gamma_categories=4):
+        """
+        __init__ sets up meta-data dealing with object nomenclature and semantics.
+        If ``gamma_shape`` is given, then rates vary across sites following
+        a discrete gamma distribution with ``num_gamma_categories``
+        categories (Yang 1994).
+        """
         self.seq_model = seq_model
         self.mutation_rate = mutation_rate
         self.seq_attr = seq_attr
@@ -89,6 +247,8 @@ class DiscreteCharacterEvolver(object):
         self.edge_length_attr = edge_length_attr
         self.edge_rate_attr = edge_rate_attr
         self.seq_label_attr = seq_label_attr
+        self.gamma_shape = gamma_shape
+        self.num_gamma_categories = num_gamma_categories
 
     def evolve_states(self,
             tree,
@@ -107,41 +267,97 @@ class DiscreteCharacterEvolver(object):
         If not, and if ``simulate_root_states`` is True, then the sequence for the
         root will be drawn from the stationary distribution of the character model.
         """
-        if rng is None:
-            rng = GLOBAL_RNG
         if not in_place:
             tree = tree.clone(1) # ==> taxon_namespace_scoped_copy()
+        root_seq_list = getattr(tree.seed_node, self.seq_attr, None)
+        if root_seq_list is None:
+            root_seq_list = []
+            setattr(tree.seed_node, self.seq_attr, root_seq_list)
+        n_prev_seq = len(root_seq_list)
+        if root_states is None and not simulate_root_states:
+            assert n_prev_seq > 0
+            n_prev_seq -= 1
+            root_states = root_seq_list[-1]
+        for nd, seq_model, state_indexes in self.iter_node_state_indexes(
+                tree=tree,
+                seq_len=seq_len,
+                root_states=root_states,
+                rng=rng):
+            seq_list = getattr(nd, self.seq_attr, None)
+            if seq_list is None:
+                seq_list = []
+                setattr(nd, self.seq_attr, seq_list)
+            if nd is tree.seed_node:
+                if len(seq_list) == n_prev_seq:
+                    seq_list.append(root_states if root_states is not None else seq_model.states_from_indexes(state_indexes))
+                continue
+            if len(seq_list) != n_prev_seq:
+                raise ValueError("'%s' length varies among nodes" % self.seq_attr)
+            seq_list.append(seq_model.states_from_indexes(state_indexes))
+        return tree
 
-        if self.seq_model is None:
-            seq_model = getattr(tree, self.seq_model_attr, None)
-
-        # loop through edges in preorder (root->tips)
-        for edge in tree.preorder_edge_iter():
-            node = edge.head_node
-            if not hasattr(node, self.seq_attr):
-                setattr(node, self.seq_attr, [])
-            seq_list = getattr(node, self.seq_attr)
-            if edge.tail_node:
-                par = edge.tail_node
-                if len(seq_list) != n_prev_seq:
-                    raise ValueError("'%s' length varies among nodes" % self.seq_attr)
-                par_seq = getattr(par, self.seq_attr)[-1]
-                seq_model  = getattr(edge, self.seq_model_attr, None) or self.seq_model
-                length = getattr(edge, self.edge_length_attr)
+    def iter_node_state_indexes(self,
+            tree,
+            seq_len,
+            root_states=None,
+            leaves_only=False,
+            rng=None):
+        """
+        Simulates a sequence of length ``seq_len`` for each node of ``tree``
+        (starting from ``root_states`` at the root, if given, or a sample
+        from the stationary distribution of the character model otherwise),
+        and iterates over the nodes in preorder, yielding a tuple of the
+        node, the character model, and a ``bytearray`` of the state indexes
+        of the sequence of the node. Sequences are not stored on the tree,
+        and the sequence of a node is discarded once the sequences of all its
+        children have been simulated. If ``leaves_only`` is |True|, then only
+        the leaves will be yielded.
+        """
+        root = tree.seed_node
+        root_seq_model = self._get_seq_model(tree, root.edge)
+        if root_states is not None:
+            root_state_indexes = bytearray([state.index for state in root_states])
+        else:
+            root_state_indexes = root_seq_model.stationary_sample_state_indexes(seq_len, rng=rng)
+        site_categories, category_rates = self._sample_site_rate_categories(
+                len(root_state_indexes),
+                rng=rng if rng is not None else root_seq_model.rng)
+        to_visit = [(root, root_seq_model, root_state_indexes)]
+        while to_visit:
+            nd, seq_model, state_indexes = to_visit.pop()
+            if not leaves_only or not nd._child_nodes:
+                yield nd, seq_model, state_indexes
+            for ch in reversed(nd._child_nodes):
+                edge = ch.edge
+                ch_seq_model = self._get_seq_model(tree, edge)
                 mutation_rate = getattr(edge, self.edge_rate_attr, None) or self.mutation_rate
-                seq_list.append(seq_model.simulate_descendant_states(par_seq, length, mutation_rate))
-            else:
-                # no tail node: root
-                n_prev_seq = len(seq_list)
-                if root_states is not None:
-                    seq_list.append(root_states)
-                elif simulate_root_states:
-                    seq_model  = getattr(node.edge, self.seq_model_attr, None) or self.seq_model
-                    seq_list.append(seq_model.stationary_sample(seq_len, rng=rng))
-                else:
-                    assert n_prev_seq > 0
-                    n_prev_seq -= 1
-        return tree
+                if mutation_rate is None:
+                    mutation_rate = 1.0
+                ch_state_indexes = ch_seq_model.simulate_descendant_state_indexes(
+                        state_indexes,
+                        edge_length=getattr(edge, self.edge_length_attr) or 0.0,
+                        mutation_rate=mutation_rate,
+                        site_categories=site_categories,
+                        category_rates=category_rates,
+                        rng=rng)
+                to_visit.append((ch, ch_seq_model, ch_state_indexes))
+
+    def _get_seq_model(self, tree, edge):
+        seq_model = getattr(edge, self.seq_model_attr, None) or self.seq_model
+        if seq_model is None:
+            seq_model = getattr(tree, self.seq_model_attr, None)
+        return seq_model
+
+    def _sample_site_rate_categories(self, seq_len, rng):
+        if self.gamma_shape is None:
+            return None, None
+        category_rates = discrete_gamma_rates(
+                shape=self.gamma_shape,
+                num_categories=self.num_gamma_categories)
+        randrange = rng.randrange
+        num_categories = len(category_rates)
+        site_categories = bytearray([randrange(num_categories) for site_idx in range(seq_len)])
+        return site_categories, category_rates
 
     def extend_char_matrix_with_characters_on_tree(self,
             char_matrix,
@@ -164,8 +380,7 @@ class DiscreteCharacterEvolver(object):
             for seq_idx, seq in enumerate(seq_list):
                 if ((include is None) or (seq_idx in include))  \
                     and ((exclude is None) or (seq_idx not in exclude)):
-                    for state in seq:
-                        cvec.append(state)
+                    cvec.extend(seq)
         return char_matrix
 
     def clean_tree(self, tree):
@@ -198,9 +413,23 @@ class NucleotideCharacterEvolutionModel(DiscreteCharacterEvolutionModel):
         representing a sample of characters drawn from this model's
         stationary distribution.
         """
-        probs = self.base_freqs
-        char_state_indices = [probability.sample_multinomial(probs, rng) for i in range(seq_len)]
-        return [self.state_alphabet[idx] for idx in char_state_indices]
+        return self.states_from_indexes(self.stationary_sample_state_indexes(seq_len, rng=rng))
+
+    def stationary_sample_state_indexes(self, seq_len, rng=None):
+        """
+        Returns a ``bytearray`` of ``seq_len`` state indexes drawn from this
+        model's stationary distribution.
+        """
+        if rng is None:
+            rng = self.rng
+        cumulative_probs = []
+        total = 0.0
+        for freq in self.base_freqs:
+            total += freq
+            cumulative_probs.append(total)
+        random = rng.random
+        last_idx = len(cumulative_probs) - 1
+        return bytearray([min(bisect.bisect_right(cumulative_probs, random() * total), last_idx) for i in range(seq_len)])
 
     def is_purine(self, state_index):
         """
@@ -273,6 +502,9 @@ class Hky85(NucleotideCharacterEvolutionModel):
         rep = "kappa=%f bases=%s" % (self.kappa, str(self.base_freqs))
         return rep
 
+    def pmatrix_parameters(self):
+        return (self.kappa, tuple(self.base_freqs), self.correct_rate)
+
     def corrected_substitution_rate(self, rate):
         """Returns the factor that we have to multiply to the branch length
         to make branch lengths proportional to # of substitutions per site."""
@@ -357,9 +589,37 @@ class Hky85(NucleotideCharacterEvolutionModel):
         al., 1996. (tlen * rate = nu, expected number of
         substitutions)
         """
+        # Same as calling :meth:`pij()` for each cell, but calculating the
+        # exponentials only once.
+        nu = self.corrected_substitution_rate(rate) * tlen
+        exp_nu = math.exp(-1.0 * nu)
+        sumfreqs = []
+        exp_nu_factorA = []
+        for state_j in range(4):
+            if self.is_purine(state_j):
+                sf = self.base_freqs[0] + self.base_freqs[2]
+            else:
+                sf = self.base_freqs[1] + self.base_freqs[3]
+            sumfreqs.append(sf)
+            factorA = 1 + (sf * (self.kappa - 1.0))
+            exp_nu_factorA.append(math.exp(-1.0 * nu * factorA))
         pmatrix = []
         for state_i in range(4):
-            pmatrix.append(self.pvector(state_i, tlen=tlen, rate=rate))
+            pvec = []
+            for state_j in range(4):
+                bf = self.base_freqs[state_j]
+                if state_i == state_j:
+                    pij = bf \
+                          + bf * (1.0/sumfreqs[state_j] - 1) * exp_nu \
+                          + ((sumfreqs[state_j] - bf)/sumfreqs[state_j]) * exp_nu_factorA[state_j]
+                elif self.is_transition(state_i, state_j):
+                    pij = bf \
+                          + bf * (1.0/sumfreqs[state_j] - 1) * exp_nu \
+                          - (bf / sumfreqs[state_j]) * exp_nu_factorA[state_j]
+                else:
+                    pij = bf * (1.0 - exp_nu)
+                pvec.append(pij)
+            pmatrix.append(pvec)
         return pmatrix
 
 class Jc69(Hky85):
@@ -378,6 +638,52 @@ class Jc69(Hky85):
 
 
 
+##############################################################################
+## Rate Heterogeneity Across Sites
+
+def discrete_gamma_rates(shape, num_categories=4, use_median=False):
+    """
+    Returns the relative rates of ``num_categories`` equally-probable
+    categories approximating a gamma distribution of rates across sites
+    with shape parameter ``shape`` and a mean of 1, following Yang (1994).
+
+    Parameters
+    ----------
+    shape : float
+        Shape parameter (alpha) of the gamma distribution.
+    num_categories : int
+        Number of rate categories.
+    use_median : bool
+        If |True|, the rate of each category is the median of the
+        distribution in the category (rescaled so that the mean of the rates
+        is 1); otherwise it is the mean of the distribution in the category.
+
+    Returns
+    -------
+    r : list of floats
+        The rates of the categories.
+    """
+    if shape <= 0:
+        raise ValueError("Shape parameter must be positive: {}".format(shape))
+    if num_categories < 1:
+        raise ValueError("Number of categories must be positive: {}".format(num_categories))
+    if num_categories == 1:
+        return [1.0]
+    scale = 1.0 / shape
+    if use_median:
+        rates = [probability.gamma_quantile((2.0 * k + 1) / (2.0 * num_categories), shape, scale)
+                for k in range(num_categories)]
+        mean_rate = float(sum(rates)) / num_categories
+        return [r / mean_rate for r in rates]
+    cutpoints = [probability.gamma_quantile(float(k) / num_categories, shape, scale)
+            for k in range(1, num_categories)]
+    # Proportion of the mean of the distribution falling below each cutpoint
+    mean_props = [0.0]
+    mean_props.extend(probability.regularized_lower_incomplete_gamma(shape + 1, b * shape)
+            for b in cutpoints)
+    mean_props.append(1.0)
+    return [num_categories * (mean_props[k+1] - mean_props[k]) for k in range(num_categories)]
+
 ##############################################################################
 ## Wrappers for Convenience
 
@@ -387,6 +693,8 @@ def simulate_discrete_char_dataset(seq_len,
         mutation_rate=1.0,
         root_states=None,
         dataset=None,
+        gamma_shape=None,
+        num_gamma_categories=4,
         rng=None):
     """
     Wrapper to conveniently generate a DataSet simulated under
@@ -412,6 +720,12 @@ def simulate_discrete_char_dataset(seq_len,
         added to this (along with a new taxon_namespace if
         required). Otherwise, a new dendropy.DataSet
         object will be created.
+    gamma_shape   : float
+        If given, rates vary across sites following a discrete gamma
+        distribution with this shape parameter.
+    num_gamma_categories : int
+        Number of categories of the discrete gamma distribution of rates
+        across sites.
     rng           : random number generator
         If not given, 'GLOBAL_RNG' will be used.
 
@@ -434,7 +748,9 @@ def simulate_discrete_char_dataset(seq_len,
         mutation_rate=mutation_rate,
         root_states=root_states,
         char_matrix=None,
-        rng=None)
+        gamma_shape=gamma_shape,
+        num_gamma_categories=num_gamma_categories,
+        rng=rng)
     dataset.add_char_matrix(char_matrix=char_matrix)
     return dataset
 
@@ -446,6 +762,8 @@ def simulate_discrete_chars(
         root_states=None,
         char_matrix=None,
         retain_sequences_on_tree=False,
+        gamma_shape=None,
+        num_gamma_categories=4,
         rng=None):
     """
     Wrapper to conveniently generate a characters simulated under
@@ -479,6 +797,12 @@ def simulate_discrete_chars(
         If |False|, sequence annotations will be cleared from tree after
         simulation. Set to |True| if you want to, e.g., evolve and accumulate
         different sequences on tree, or retain information for other purposes.
+    gamma_shape   : float
+        If given, rates vary across sites following a discrete gamma
+        distribution with this shape parameter.
+    num_gamma_categories : int
+        Number of categories of the discrete gamma distribution of rates
+        across sites.
     rng           : random number generator
         If not given, 'GLOBAL_RNG' will be used.
 
@@ -488,22 +812,33 @@ def simulate_discrete_chars(
 
     """
     seq_evolver = DiscreteCharacterEvolver(seq_model=seq_model,
-                               mutation_rate=mutation_rate)
-    tree = seq_evolver.evolve_states(
-        tree=tree_model,
-        seq_len=seq_len,
-        root_states=None,
-        rng=rng)
+                               mutation_rate=mutation_rate,
+                               gamma_shape=gamma_shape,
+                               num_gamma_categories=num_gamma_categories)
     if char_matrix is None:
         char_matrix = dendropy.DnaCharacterMatrix(taxon_namespace=tree_model.taxon_namespace)
         char_matrix.taxon_namespace = tree_model.taxon_namespace
     else:
         assert char_matrix.taxon_namespace is tree_model.taxon_namespace, "conflicting taxon sets"
-    seq_evolver.extend_char_matrix_with_characters_on_tree(
-            char_matrix=char_matrix,
-            tree=tree)
-    if not retain_sequences_on_tree:
-        seq_evolver.clean_tree(tree)
+    if retain_sequences_on_tree:
+        tree = seq_evolver.evolve_states(
+            tree=tree_model,
+            seq_len=seq_len,
+            root_states=root_states,
+            rng=rng)
+        seq_evolver.extend_char_matrix_with_characters_on_tree(
+                char_matrix=char_matrix,
+                tree=tree)
+    else:
+        # Only the leaf sequences are needed, so these are added directly
+        # to the character matrix without storing sequences on the tree.
+        for leaf, leaf_seq_model, state_indexes in seq_evolver.iter_node_state_indexes(
+                tree=tree_model,
+                seq_len=seq_len,
+                root_states=root_states,
+                leaves_only=True,
+                rng=rng):
+            char_matrix[leaf.taxon].extend(leaf_seq_model.states_from_indexes(state_indexes))
     return char_matrix
 
 def hky85_chars(
@@ -515,6 +850,8 @@ def hky85_chars(
         root_states=None,
         char_matrix=None,
         retain_sequences_on_tree=False,
+        gamma_shape=None,
+        num_gamma_categories=4,
         rng=None):
     """
     Convenience class to wrap generation of characters (as a CharacterBlock
@@ -540,6 +877,12 @@ def hky85_chars(
         If |False|, sequence annotations will be cleared from tree after
         simulation. Set to |True| if you want to, e.g., evolve and accumulate
         different sequences on tree, or retain information for other purposes.
+    gamma_shape   : float
+        If given, rates vary across sites following a discrete gamma
+        distribution with this shape parameter.
+    num_gamma_categories : int
+        Number of categories of the discrete gamma distribution of rates
+        across sites.
     rng           : random number generator
         If not given, 'GLOBAL_RNG' will be used.
 
@@ -568,5 +911,8 @@ def hky85_chars(
                                mutation_rate=mutation_rate,
                                root_states=root_states,
                                char_matrix=char_matrix,
+                               retain_sequences_on_tree=retain_sequences_on_tree,
+                               gamma_shape=gamma_shape,
+                               num_gamma_categories=num_gamma_categories,
                                rng=rng)
 
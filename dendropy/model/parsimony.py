@@ -23,6 +23,7 @@ Models, modeling and model-fitting of parsimony.
 from functools import reduce
 import operator
 import dendropy
+from dendropy.utility import bitprocessing
 from dendropy.utility.error import TaxonNamespaceIdentityError
 
 class _NodeStateSetMap(dict):
@@ -311,6 +312,7 @@ def parsimony_score(
         gaps_as_missing=True,
         weights=None,
         score_by_character_list=None,
+        state_sets_attr_name="state_sets",
         ):
     """
     Calculates the score of a tree, ``tree``, given some character data,
@@ -333,6 +335,13 @@ def parsimony_score(
         If not |None|, should be a reference to a list object.
         This list will be populated by the scores on a character-by-character
         basis.
+    state_sets_attr_name : None or str
+        If not |None|, then the tree is scored by :func:`fitch_down_pass()`,
+        which also sets the (downpass) state sets of each node as the
+        attribute of this name ("``state_sets``" by default), for use by
+        :func:`fitch_up_pass()`. If |None|, then the tree is scored
+        (much faster) by a |FitchParsimonyScorer|, and the nodes are not
+        modified.
 
     Returns
     -------
@@ -389,19 +398,250 @@ def parsimony_score(
     Notes
     -----
 
-    If the same data is going to be used to score multiple trees or multiple times,
-    it is probably better to generate the 'taxon_state_sets_map' once and call
-    "fitch_down_pass" directly yourself, as this function generates a new map
-    each time.
+    If the state sets of the nodes are not needed, pass
+    ``state_sets_attr_name=None`` to score the tree with a
+    |FitchParsimonyScorer| instead. If the same data is going to be used to
+    score multiple trees or multiple times, it is better still to create a
+    |FitchParsimonyScorer| once and call its
+    :meth:`FitchParsimonyScorer.parsimony_score()` method for each tree
+    yourself, as this function packs the data anew each time.
 
     """
     if tree.taxon_namespace is not chars.taxon_namespace:
-        raise TaxonNamespaceIdentityError(tree, data)
-    taxon_state_sets_map = chars.taxon_state_sets_map(gaps_as_missing=gaps_as_missing)
-    nodes = tree.postorder_node_iter()
-    pscore = fitch_down_pass(nodes,
-            taxon_state_sets_map=taxon_state_sets_map,
-            weights=weights,
+        raise TaxonNamespaceIdentityError(tree, chars)
+    if state_sets_attr_name is not None:
+        taxon_state_sets_map = chars.taxon_state_sets_map(gaps_as_missing=gaps_as_missing)
+        return fitch_down_pass(tree.postorder_node_iter(),
+                state_sets_attr_name=state_sets_attr_name,
+                taxon_state_sets_map=taxon_state_sets_map,
+                weights=weights,
+                score_by_character_list=score_by_character_list)
+    scorer = FitchParsimonyScorer.from_char_matrix(
+            chars,
+            gaps_as_missing=gaps_as_missing,
+            weights=weights)
+    return scorer.parsimony_score(tree,
             score_by_character_list=score_by_character_list)
-    return pscore
+
+class FitchParsimonyScorer(object):
+    """
+    Scores trees under Fitch's (1971) unordered parsimony algorithm, with the
+    data packed for fast scoring of many trees.
+
+    Characters with identical site patterns (i.e., the same state set for
+    each taxon) are compressed into a single pattern, weighted by the
+    (summed) weights of the characters. The state sets of each taxon are
+    then stored as a bit vector for each (fundamental) state, with the bit
+    for a pattern set if the state is in the state set of the taxon for the
+    pattern. A Fitch step at a node thus takes a few bitwise operations on
+    these vectors for *all* patterns at once, rather than set operations for
+    each character.
+
+    Examples
+    --------
+
+    ::
+
+        import dendropy
+        from dendropy.model.parsimony import FitchParsimonyScorer
+
+        taxa = dendropy.TaxonNamespace()
+        chars = dendropy.StandardCharacterMatrix.get(
+                path="apternodus.chars.nexus",
+                schema="nexus",
+                taxon_namespace=taxa)
+        trees = dendropy.TreeList.get(
+                path="apternodus.tre",
+                schema="nexus",
+                taxon_namespace=taxa)
+        scorer = FitchParsimonyScorer.from_char_matrix(chars, gaps_as_missing=True)
+        for tree in trees:
+            score_by_character_list = []
+            score = scorer.parsimony_score(tree,
+                    score_by_character_list=score_by_character_list)
+            print(score)
+
+    """
+
+    @classmethod
+    def from_char_matrix(cls, chars, gaps_as_missing=True, weights=None):
+        """
+        Creates and returns a |FitchParsimonyScorer| for the data in the
+        |CharacterMatrix| ``chars``.
+
+        Parameters
+        ----------
+        chars : a |CharacterMatrix| instance
+            A |CharacterMatrix|-derived object with data to be scored.
+        gap_as_missing : bool
+            If |True| [default], then gaps will be treated as missing data.
+            If |False|, then gaps will be treated as a new/additional state.
+        weights : iterable
+            A list of weights for each column in the matrix.
+
+        Returns
+        -------
+        s : |FitchParsimonyScorer|
+        """
+        return cls(
+                taxon_state_sets_map=chars.taxon_state_sets_map(gaps_as_missing=gaps_as_missing),
+                weights=weights)
+
+    def __init__(self, taxon_state_sets_map, weights=None):
+        """
+        Parameters
+        ----------
+        taxon_state_sets_map : dict[taxon] = state sets
+            A dictionary that takes a taxon object as a key and returns a
+            list of sets of (fundamental) state indexes, one for each
+            character, as a value. See
+            :meth:`CharacterMatrix.taxon_state_sets_map()`.
+        weights : iterable
+            A list of weights for each character. If not given, then each
+            character has a weight of 1.
+        """
+        self.taxa = list(taxon_state_sets_map.keys())
+        if self.taxa:
+            self.num_characters = len(taxon_state_sets_map[self.taxa[0]])
+        else:
+            self.num_characters = 0
+        if weights is None:
+            self.weights = None
+        else:
+            self.weights = list(weights)
+            if len(self.weights) != self.num_characters:
+                raise ValueError("Expecting {} weights but found {}".format(self.num_characters, len(self.weights)))
+        self.num_states = 0
+        self._compile_patterns(taxon_state_sets_map)
+
+    def _compile_patterns(self, taxon_state_sets_map):
+        taxon_state_sets = [taxon_state_sets_map[taxon] for taxon in self.taxa]
+        for state_sets in taxon_state_sets:
+            if len(state_sets) != self.num_characters:
+                raise ValueError("Expecting {} characters but found {}".format(self.num_characters, len(state_sets)))
+        pattern_index_map = {}
+        patterns = []
+        pattern_weights = []
+        self.character_pattern_indexes = []
+        for char_idx in range(self.num_characters):
+            pattern = tuple(frozenset(state_sets[char_idx]) for state_sets in taxon_state_sets)
+            try:
+                pattern_idx = pattern_index_map[pattern]
+            except KeyError:
+                pattern_idx = len(patterns)
+                pattern_index_map[pattern] = pattern_idx
+                patterns.append(pattern)
+                pattern_weights.append(0)
+            if self.weights is None:
+                pattern_weights[pattern_idx] += 1
+            else:
+                pattern_weights[pattern_idx] += self.weights[char_idx]
+            self.character_pattern_indexes.append(pattern_idx)
+        self.num_patterns = len(patterns)
+        self.pattern_weights = pattern_weights
+        for pattern in patterns:
+            for state_set in pattern:
+                for state in state_set:
+                    if state >= self.num_states:
+                        self.num_states = state + 1
+        self._pattern_mask = (1 << self.num_patterns) - 1
+        # The bit vector (of patterns) for each state of each taxon, built as
+        # strings of binary digits, with the bit of the first pattern last.
+        self._taxon_state_bits = {}
+        for taxon_idx, taxon in enumerate(self.taxa):
+            state_digits = [["0"] * self.num_patterns for state in range(self.num_states)]
+            for pattern_idx, pattern in enumerate(patterns):
+                for state in pattern[taxon_idx]:
+                    state_digits[state][self.num_patterns - pattern_idx - 1] = "1"
+            self._taxon_state_bits[taxon] = tuple(int("".join(digits), 2) if digits else 0 for digits in state_digits)
+        # For the weighted count of the patterns with a change: the patterns
+        # grouped by weight.
+        weight_pattern_masks = {}
+        for pattern_idx, weight in enumerate(pattern_weights):
+            weight_pattern_masks[weight] = weight_pattern_masks.get(weight, 0) | (1 << pattern_idx)
+        self._weight_pattern_masks = sorted(weight_pattern_masks.items())
+
+    def parsimony_score(self, tree, score_by_character_list=None):
+        """
+        Returns the parsimony score of ``tree``.
+
+        Parameters
+        ----------
+        tree : a |Tree| instance
+            A |Tree| to be scored. The taxa of its leaves must be in the
+            data.
+        score_by_character_list : None or list
+            If not |None|, should be a reference to a list object.
+            This list will be populated by the scores on a character-by-character
+            basis.
+
+        Returns
+        -------
+        s : int
+            Parsimony score of tree.
+        """
+        if score_by_character_list is not None:
+            assert len(score_by_character_list) == 0
+        changed_pattern_masks = []
+        node_state_bits = {}
+        for nd in tree.postorder_nodes():
+            children = nd._child_nodes
+            if not children:
+                node_state_bits[nd] = self._taxon_state_bits[nd.taxon]
+                continue
+            left_bits = node_state_bits.pop(children[0])
+            for ch in children[1:]:
+                right_bits = node_state_bits.pop(ch)
+                intersection_bits = [left & right for left, right in zip(left_bits, right_bits)]
+                changed_patterns = self._pattern_mask ^ reduce(operator.or_, intersection_bits, 0)
+                if changed_patterns:
+                    changed_pattern_masks.append(changed_patterns)
+                    left_bits = [intersection | (changed_patterns & (left | right))
+                            for intersection, left, right in zip(intersection_bits, left_bits, right_bits)]
+                else:
+                    left_bits = intersection_bits
+            node_state_bits[nd] = left_bits
+        score = 0
+        for changed_patterns in changed_pattern_masks:
+            for weight, pattern_mask in self._weight_pattern_masks:
+                score += weight * bitprocessing.num_set_bits(changed_patterns & pattern_mask)
+        if score_by_character_list is not None:
+            score_by_character_list.extend(self._calculate_character_scores(changed_pattern_masks))
+        return score
+
+    def score_by_character(self, tree):
+        """
+        Returns a list of the parsimony scores of ``tree`` for each
+        character.
+        """
+        score_by_character_list = []
+        self.parsimony_score(tree, score_by_character_list=score_by_character_list)
+        return score_by_character_list
+
+    def _calculate_character_scores(self, changed_pattern_masks):
+        # Counts, for each pattern, the number of masks in
+        # ``changed_pattern_masks`` with its bit set, using a vertical
+        # (bit-sliced) counter: bit ``i`` of ``counter_bits[k]`` is bit
+        # ``k`` of the count for pattern ``i``.
+        counter_bits = []
+        for changed_patterns in changed_pattern_masks:
+            carry = changed_patterns
+            for k in range(len(counter_bits)):
+                if not carry:
+                    break
+                counter_bits[k], carry = counter_bits[k] ^ carry, counter_bits[k] & carry
+            if carry:
+                counter_bits.append(carry)
+        pattern_counts = [0] * self.num_patterns
+        for k, bits in enumerate(counter_bits):
+            digits = bin(bits)[2:]
+            num_digits = len(digits)
+            for pattern_idx in range(num_digits):
+                if digits[num_digits - pattern_idx - 1] == "1":
+                    pattern_counts[pattern_idx] += 1 << k
+        if self.weights is None:
+            return [pattern_counts[pattern_idx] for pattern_idx in self.character_pattern_indexes]
+        else:
+            return [pattern_counts[pattern_idx] * self.weights[char_idx]
+                    for char_idx, pattern_idx in enumerate(self.character_pattern_indexes)]
 
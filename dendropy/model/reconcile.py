@@ -499,19 +499,22 @@ def reconciliation_discordance(gene_tree, species_tree):
     taxa_mask = species_tree.taxon_namespace.all_taxa_bitmask()
     species_node_gene_nodes = {}
     gene_node_species_nodes = {}
+    species_taxon_nodes = {}
+    for snd in species_tree.preorder_node_iter():
+        if snd.taxon is not None and snd.taxon not in species_taxon_nodes:
+            species_taxon_nodes[snd.taxon] = snd
     for gnd in gene_tree.postorder_node_iter():
         gn_children = gnd.child_nodes()
         if len(gn_children) > 0:
-            ssplit = 0
-            for gn_child in gn_children:
-                ssplit = ssplit | gene_node_species_nodes[gn_child].edge.leafset_bitmask
-            sanc = species_tree.mrca(start_node=species_tree.seed_node, leafset_bitmask=ssplit)
+            sanc = species_tree.mrca(
+                    nodes=[gene_node_species_nodes[gn_child] for gn_child in gn_children],
+                    is_use_mrca_index=True)
             gene_node_species_nodes[gnd] = sanc
             if sanc not in species_node_gene_nodes:
                 species_node_gene_nodes[sanc] = []
             species_node_gene_nodes[sanc].append(gnd)
         else:
-            gene_node_species_nodes[gnd] = species_tree.find_node(lambda x : x.taxon == gnd.taxon)
+            gene_node_species_nodes[gnd] = species_taxon_nodes.get(gnd.taxon)
     contained_gene_lineages = {}
     for snd in species_tree.postorder_node_iter():
         if snd in species_node_gene_nodes:
@@ -0,0 +1,90 @@
+#! /usr/bin/env python
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Benchmarking start-up (wall-clock) time of short-lived processes: importing
+the library and running SumTrees to print its help message.
+"""
+
+import os
+import sys
+import subprocess
+import timeit
+import argparse
+
+import dendropy
+from dendropy.utility import messaging
+
+def command_fn_factory(cmd, env):
+    devnull = open(os.devnull, "w")
+    def f():
+        subprocess.check_call(cmd, stdout=devnull, stderr=devnull, env=env)
+    return f
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--repeat",
+            type=int,
+            default=10,
+            help="Repeat each operation this number of times (default=%(default)s).")
+    parser.add_argument("--python",
+            default=sys.executable,
+            help="Python interpreter to benchmark (default=%(default)s).")
+    parser.add_argument("--delimited-output",
+            action="store_true",
+            default=False,
+            help="Output in tab-delimited instead of aligned format")
+    args = parser.parse_args()
+
+    messenger = messaging.ConsoleMessenger(name="-benchmark")
+    src_root = os.path.dirname(dendropy.homedir())
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([src_root] + [p for p in [env.get("PYTHONPATH")] if p])
+    sumtrees_path = os.path.join(src_root, "applications", "sumtrees", "sumtrees.py")
+    operations = [
+        ("python -c 'pass'", [args.python, "-c", "pass"]),
+        ("python -c 'import dendropy'", [args.python, "-c", "import dendropy"]),
+        ("sumtrees.py --help", [args.python, sumtrees_path, "--help"]),
+            ]
+
+    results = []
+    for op_desc, cmd in operations:
+        messenger.info("Processing: '{}'".format(op_desc))
+        fn = command_fn_factory(cmd, env)
+        fn() # warm up: populate bytecode and file system caches
+        t = timeit.Timer(fn)
+        result = min(t.repeat(args.repeat, 1))
+        messenger.info("Best time (of {} repetions): {:.10f} seconds".format(args.repeat, result))
+        results.append( (op_desc, result) )
+
+    messenger.info("Benchmarking complete")
+
+    if args.delimited_output:
+        result_template = "{}\t{:.10f}\n"
+        header_template = "{}\t{}\n"
+    else:
+        max_len = max(len(r[0]) for r in results)
+        col1 = "{{:{}}}".format(max_len)
+        result_template = col1 + "  {:>14.10f}\n"
+        header_template = col1 + "  {:>14}\n"
+    sys.stdout.write(header_template.format("Operation", "Time"))
+    for result in results:
+        sys.stdout.write(result_template.format(*result))
+
+if __name__ == "__main__":
+    main()
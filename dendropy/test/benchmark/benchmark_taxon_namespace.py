@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Benchmarking |TaxonNamespace| label look-up performance on large namespaces.
+"""
+
+import sys
+import timeit
+import argparse
+
+import dendropy
+from dendropy.utility import messaging
+
+def require_taxa_fn_factory(labels, is_case_sensitive):
+    def f():
+        tns = dendropy.TaxonNamespace(is_case_sensitive=is_case_sensitive)
+        for label in labels:
+            tns.require_taxon(label)
+    return f
+
+def get_taxa_fn_factory(labels, is_case_sensitive):
+    tns = dendropy.TaxonNamespace(labels, is_case_sensitive=is_case_sensitive)
+    def f():
+        for label in labels:
+            tns.get_taxon(label)
+    return f
+
+def read_fasta_fn_factory(num_taxa):
+    src = "".join(">T{}\nACGT\n".format(idx) for idx in range(num_taxa))
+    def f():
+        dendropy.DnaCharacterMatrix.get(data=src, schema="fasta")
+    return f
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--num-taxa",
+            type=int,
+            dest="num_taxa",
+            default=[],
+            action="append",
+            help="Number of taxa in namespace (default: 1000, 10000 and 100000); option may be specified multiple times.")
+    parser.add_argument("-r", "--repeat",
+            type=int,
+            default=3,
+            help="Repeat each operation this number of times (default=%(default)s).")
+    parser.add_argument("--delimited-output",
+            action="store_true",
+            default=False,
+            help="Output in tab-delimited instead of aligned format")
+    args = parser.parse_args()
+
+    messenger = messaging.ConsoleMessenger(name="-benchmark")
+    if not args.num_taxa:
+        args.num_taxa = [1000, 10000, 100000]
+    operations = [
+        ("require_taxon", lambda labels: require_taxa_fn_factory(labels, is_case_sensitive=False)),
+        ("require_taxon (case-sensitive)", lambda labels: require_taxa_fn_factory(labels, is_case_sensitive=True)),
+        ("get_taxon", lambda labels: get_taxa_fn_factory(labels, is_case_sensitive=False)),
+        ("get_taxon (case-sensitive)", lambda labels: get_taxa_fn_factory(labels, is_case_sensitive=True)),
+        ("read FASTA", lambda labels: read_fasta_fn_factory(len(labels))),
+            ]
+
+    results = []
+    for num_taxa in args.num_taxa:
+        labels = ["T{}".format(idx) for idx in range(num_taxa)]
+        for op_desc, fn_factory in operations:
+            messenger.info("Processing: '{}' with {} taxa".format(op_desc, num_taxa))
+            t = timeit.Timer(fn_factory(labels))
+            result = min(t.repeat(args.repeat, 1))
+            messenger.info("Best time (of {} repetions): {:.10f} seconds".format(args.repeat, result))
+            results.append( (op_desc, num_taxa, result) )
+
+    messenger.info("Benchmarking complete")
+
+    if args.delimited_output:
+        result_template = "{}\t{}\t{:.10f}\n"
+        header_template = "{}\t{}\t{}\n"
+    else:
+        max_len = max(len(r[0]) for r in results)
+        col1 = "{{:{}}}".format(max_len)
+        result_template = col1 + "  {:>10}  {:>14.10f}\n"
+        header_template = col1 + "  {:>10}  {:>14}\n"
+    sys.stdout.write(header_template.format("Operation", "Taxa", "Time"))
+    for result in results:
+        sys.stdout.write(result_template.format(*result))
+
+if __name__ == "__main__":
+    main()
@@ -49,13 +49,13 @@ CHAR_FILENAMES = [
     "angiosperms.chars.nexus",
         ]
 
-def tokenizing_fn_factory(src_paths, verbose=False):
+def tokenizing_fn_factory(src_paths, buffered=False, verbose=False):
     def f():
         for src_path in src_paths:
             if verbose:
                 sys.stderr.write("  .. {}\n".format(src_path))
             src = open(src_path, "rU")
-            nt = nexusprocessing.NexusTokenizer(src)
+            nt = nexusprocessing.NexusTokenizer(src, buffered=buffered)
             for token in nt:
                 pass
     return f
@@ -79,6 +79,13 @@ def main():
             type=int,
             default=10,
             help="Repeat each tokenization this number of times (default=%(default)s).")
+    parser.add_argument("-m", "--tokenizer-mode",
+            type=str,
+            dest="tokenizer_modes",
+            default=[],
+            choices=["unbuffered", "buffered"],
+            action="append",
+            help="Tokenizer mode(s) to benchmark (default: both modes, with the speed-up of buffered over unbuffered mode also reported); option may be specified multiple times.")
     parser.add_argument("--delimited-output",
             action="store_true",
             default=False,
@@ -90,6 +97,8 @@ def main():
     src_descs = []
     src_paths = []
     results = []
+    if not args.tokenizer_modes:
+        args.tokenizer_modes = ["unbuffered", "buffered"]
 
     if args.target_files:
         for f in args.target_files:
@@ -115,30 +124,35 @@ def main():
 
     for src_path, src_desc in zip(src_paths, src_descs):
         messenger.info("Processing: '{}'".format(src_desc[1]))
-        t = timeit.Timer(tokenizing_fn_factory([src_path]))
-        result = min(t.repeat(args.repeat, 1))
-        messenger.info("Best time (of {} repetions): {:.10f} seconds".format(args.repeat, result))
+        result = []
+        for tokenizer_mode in args.tokenizer_modes:
+            t = timeit.Timer(tokenizing_fn_factory([src_path], buffered=(tokenizer_mode == "buffered")))
+            mode_result = min(t.repeat(args.repeat, 1))
+            messenger.info("Best time (of {} repetions, {} tokenizer): {:.10f} seconds".format(args.repeat, tokenizer_mode, mode_result))
+            result.append(mode_result)
         results.append(result)
 
     messenger.info("Benchmarking complete: all files processed")
 
+    report_speedup = len(args.tokenizer_modes) == 2 and args.tokenizer_modes[0] != args.tokenizer_modes[1]
+    fields = [mode.capitalize() for mode in args.tokenizer_modes]
+    if report_speedup:
+        fields.append("Speed-up")
     if args.delimited_output:
-        result_template = "{}\t{}\t{:.10f}\n"
-        header_template = "{}\t{}\t{}\n"
+        result_template = "{}\t{}\t" + "\t".join("{:.10f}" for f in fields) + "\n"
+        header_template = "{}\t{}\t" + "\t".join("{}" for f in fields) + "\n"
     else:
         max_len1 = max(len(r[0]) for r in src_descs)
         max_len2 = max(len(r[1]) for r in src_descs)
         col1 = "{{:{}}}".format(max_len1)
         col2 = "{{:{}}}".format(max_len2)
-        result_template = "[" + col1 + "]  " + col2 + "  {:.10f}\n"
-        header_template = col1 + "    " + col2 + "  {}\n"
-    sys.stdout.write(header_template.format("Type", "File", "Seconds"))
+        result_template = "[" + col1 + "]  " + col2 + "  " + "  ".join("{:>14.10f}" for f in fields) + "\n"
+        header_template = col1 + "    " + col2 + "  " + "  ".join("{:>14}" for f in fields) + "\n"
+    sys.stdout.write(header_template.format("Type", "File", *fields))
     for result, src_desc in zip(results, src_descs):
-        sys.stdout.write(result_template.format(src_desc[0], src_desc[1], result))
+        if report_speedup:
+            result = result + [result[0] / result[1]]
+        sys.stdout.write(result_template.format(src_desc[0], src_desc[1], *result))
 
 if __name__ == "__main__":
     main()
-
-
-
-
@@ -22,6 +22,9 @@ Tests for general FASTA reading.
 
 import unittest
 import dendropy
+from dendropy.utility.error import DataParseError
+from dendropy.utility.textprocessing import StringIO
+from dendropy.dataio import fastareader
 from dendropy.test.support import dendropytest
 from dendropy.test.support import pathmap
 from dendropy.test.support import standard_file_test_chars
@@ -89,5 +92,60 @@ class FastaProteinReaderTestCase(
                 check_column_annotations=False,
                 check_cell_annotations=False)
 
+class FastaChunkedReadingTestCase(dendropytest.ExtendedTestCase):
+
+    def setUp(self):
+        self.src = "\n  \n>s1 x\nACGT\n  ac gt\n\n >s2\nNN-?\r\nRY\n>s3\nA"
+        self.expected = [("s1 x", "ACGTACGT"), ("s2", "NN-?RY"), ("s3", "A")]
+        self.original_chunk_size = fastareader.FastaReader.chunk_size
+
+    def tearDown(self):
+        fastareader.FastaReader.chunk_size = self.original_chunk_size
+
+    def test_chunk_boundaries(self):
+        for chunk_size in (1, 2, 7, 1000):
+            fastareader.FastaReader.chunk_size = chunk_size
+            for is_state_index_coded in (False, True):
+                m = dendropy.DnaCharacterMatrix.get(data=self.src,
+                        schema="fasta",
+                        is_state_index_coded=is_state_index_coded)
+                self.assertEqual([(t.label, m[t].symbols_as_string()) for t in m], self.expected)
+                self.assertEqual(m[0].is_state_index_coded, is_state_index_coded)
+
+    def test_non_ascii_whitespace_before_names(self):
+        src = u"\u00a0>s1\nACGT\n\x1c >s2\nNN\n\u2003\t>s3\nA"
+        for chunk_size in (3, 1000):
+            fastareader.FastaReader.chunk_size = chunk_size
+            m = dendropy.DnaCharacterMatrix.get(data=src, schema="fasta")
+            self.assertEqual([(t.label, m[t].symbols_as_string()) for t in m],
+                    [("s1", "ACGT"), ("s2", "NN"), ("s3", "A")])
+
+    def test_errors(self):
+        for src, message, line_num, col_num in (
+                ("AC\n>x\nA", "Expecting a lines starting with >", 1, None),
+                (">a\nAC\n>b\n\n>c\nA", "Expected sequence", 5, None),
+                (">a\nAC\n>a\nAA", "Repeated sequence name", 3, None),
+                (">a\n>a\nAC", "Repeated sequence name", 2, None),
+                (">a\nACG\n  AZC\n", "Unrecognized sequence symbol 'Z'", 3, 2),
+                (">a\n\tA C Z\n", "Unrecognized sequence symbol 'Z'", 2, 5),
+                ):
+            for chunk_size in (3, 1000):
+                fastareader.FastaReader.chunk_size = chunk_size
+                with self.assertRaises(DataParseError) as cm:
+                    dendropy.DnaCharacterMatrix.get(data=src, schema="fasta")
+                self.assertIn(message, cm.exception.message)
+                self.assertEqual(cm.exception.line_num, line_num)
+                self.assertEqual(cm.exception.col_num, col_num)
+
+    def test_yield_state_indexes(self):
+        sa = dendropy.DnaCharacterMatrix.datatype_alphabet
+        records = list(dendropy.DnaCharacterMatrix.yield_state_indexes_from_files(
+            files=[StringIO(self.src), StringIO(">s4\nTT\n")],
+            schema="fasta"))
+        self.assertEqual([(name, "".join(str(sa[idx]) for idx in state_indexes)) for name, state_indexes in records],
+                self.expected + [("s4", "TT")])
+        self.assertRaises(NotImplementedError, dendropy.DnaCharacterMatrix.yield_state_indexes_from_files,
+                files=[], schema="nexus")
+
 if __name__ == "__main__":
     unittest.main()
@@ -23,18 +23,24 @@ Tests for tokenizers classes.
 import unittest
 from dendropy.dataio import nexusprocessing
 from dendropy.utility.textprocessing import StringIO
+from dendropy.test.support import pathmap
 
 class NexusTokenizerTestCase(unittest.TestCase):
     """
     Unit tests for NexusTokenizer.
     """
 
+    buffered = False
+
+    def get_tokenizer(self, src):
+        return nexusprocessing.NexusTokenizer(src=src, buffered=self.buffered)
+
     def check_tokenization(self,
             input_str,
             expected_tokens):
         src = StringIO(input_str)
         observed = []
-        for token in nexusprocessing.NexusTokenizer(src=src):
+        for token in self.get_tokenizer(src=src):
             observed.append(token)
         self.assertEqual(observed, expected_tokens)
 
@@ -145,7 +151,7 @@ class NexusTokenizerTestCase(unittest.TestCase):
                 ]
         src = StringIO(input_str)
         observed_tokens = []
-        tk = nexusprocessing.NexusTokenizer(src=src)
+        tk = self.get_tokenizer(src=src)
         for token in tk:
             if token in expected_comments:
                 expected_comment = expected_comments[token]
@@ -156,5 +162,85 @@ class NexusTokenizerTestCase(unittest.TestCase):
         self.assertEqual(expected_comments, {})
         self.assertEqual(observed_tokens, expected_tokens)
 
+class BufferedNexusTokenizerTestCase(NexusTokenizerTestCase):
+    """
+    Unit tests for NexusTokenizer in buffered mode.
+    """
+
+    buffered = True
+
+class SmallBufferNexusTokenizerTestCase(NexusTokenizerTestCase):
+    """
+    Unit tests for NexusTokenizer in buffered mode, with tokens and comments
+    spanning buffer boundaries.
+    """
+
+    buffered = True
+
+    def get_tokenizer(self, src):
+        tk = nexusprocessing.NexusTokenizer(src=src, buffered=True)
+        tk.buffer_size = 3
+        return tk
+
+class BufferedNexusTokenizerEquivalenceTestCase(unittest.TestCase):
+    """
+    Checks that buffered and unbuffered modes yield identical token streams.
+    """
+
+    def get_token_stream(self, src_str, buffered, buffer_size=None, capture_eol=False):
+        tk = nexusprocessing.NexusTokenizer(src=StringIO(src_str), buffered=buffered)
+        if buffer_size is not None:
+            tk.buffer_size = buffer_size
+        tk.set_capture_eol(capture_eol)
+        tokens = []
+        while True:
+            token = tk.next_token()
+            tokens.append( (
+                token,
+                tk.is_token_quoted,
+                tk.token_line_num,
+                tk.token_column_num,
+                tk.current_line_num,
+                tk.current_column_num,
+                tk.is_eof(),
+                tk.pull_captured_comments(),
+                ) )
+            if token is None:
+                break
+        return tokens
+
+    def check_equivalence(self, src_str, capture_eol=False, buffer_sizes=(None, 1, 7)):
+        expected = self.get_token_stream(src_str, buffered=False, capture_eol=capture_eol)
+        for buffer_size in buffer_sizes:
+            observed = self.get_token_stream(src_str,
+                    buffered=True,
+                    buffer_size=buffer_size,
+                    capture_eol=capture_eol)
+            self.assertEqual(observed, expected)
+
+    def test_edge_cases(self):
+        for src_str in (
+                "",
+                "   \n\n x\n",
+                "a_b 'c''d' [x[y]z]q_r ('x_y':1)[&R]",
+                "1:[&rate=1]3.8,(2:[&rate=2]0.1[&c]) [a] [b]x;",
+                "x[c1][c2]y;z",
+                "[c]'q' [c] 'q' a'b'c d'",
+                "[unterminated comment",
+                ):
+            self.check_equivalence(src_str)
+            self.check_equivalence(src_str, capture_eol=True)
+
+    def test_data_files(self):
+        for filename in (
+                "pythonidae.beast.summary.tre",
+                "bird_orders.nex",
+                "dendropy-test-trees-multifurcating-rooted-annotated.newick",
+                ):
+            with open(pathmap.tree_source_path(filename), "r") as src:
+                self.check_equivalence(src.read(), buffer_sizes=(None, 61))
+        with open(pathmap.char_source_path("apternodus.chars.interleaved.nexus"), "r") as src:
+            self.check_equivalence(src.read(), capture_eol=True, buffer_sizes=(None, 61))
+
 if __name__ == "__main__":
     unittest.main()
@@ -22,6 +22,7 @@ Testing of calculation of and operations with bipartitions.
 
 import warnings
 import unittest
+import random
 import re
 import sys
 import json
@@ -96,6 +97,128 @@ class BipartitionEncodingTestCase(ExtendedTestCase):
                                 expected_split_bitmask = int(tree_bipartitions_ref[label]["split_bitmask"])
                                 self.assertEqual(bipartition.split_bitmask, expected_split_bitmask)
 
+class IncrementalBipartitionUpdateTestCase(ExtendedTestCase):
+
+    def get_tree(self, rooting):
+        tree = dendropy.Tree.get(
+                path=pathmap.tree_source_path("pythonidae.mle.nex"),
+                schema="nexus",
+                rooting=rooting)
+        tree.encode_bipartitions()
+        return tree
+
+    def verify_bipartitions(self, tree):
+        tree.update_bipartitions()
+        for edge in tree.postorder_edge_iter():
+            self.assertFalse(edge._is_bipartition_dirty)
+        expected_tree = tree.clone(depth=1)
+        expected_tree.encode_bipartitions()
+        expected = [edge.bipartition for edge in expected_tree.postorder_edge_iter()]
+        observed = [edge.bipartition for edge in tree.postorder_edge_iter()]
+        self.assertEqual(
+                [(b.leafset_bitmask, b.split_bitmask) for b in observed],
+                [(b.leafset_bitmask, b.split_bitmask) for b in expected])
+        self.assertEqual(tree.bipartition_encoding, expected_tree.bipartition_encoding)
+        self.assertEqual(set(tree.bipartition_edge_map), set(expected))
+        for bipartition, edge in tree.bipartition_edge_map.items():
+            self.assertIs(edge.bipartition, bipartition)
+
+    def test_only_dirty_edges_updated(self):
+        tree = self.get_tree("force-rooted")
+        node = tree.find_node_with_taxon_label("Python regius")
+        parent = node.parent_node
+        sister = [nd for nd in parent.child_nodes() if nd is not node][0]
+        ancestor_edges = set(nd.edge for nd in parent.ancestor_iter(inclusive=True))
+        old_bipartitions = dict((edge, edge.bipartition) for edge in tree.postorder_edge_iter())
+        parent.remove_child(sister)
+        parent.add_child(sister)
+        for edge in tree.postorder_edge_iter():
+            self.assertEqual(edge._is_bipartition_dirty, edge in ancestor_edges)
+        tree.update_bipartitions()
+        for edge in tree.postorder_edge_iter():
+            if edge in ancestor_edges:
+                self.assertIsNot(edge.bipartition, old_bipartitions[edge])
+            else:
+                self.assertIs(edge.bipartition, old_bipartitions[edge])
+            self.assertEqual(edge.bipartition, old_bipartitions[edge])
+        self.verify_bipartitions(tree)
+
+    def test_subtree_swaps(self):
+        rng = random.Random(1)
+        for rooting in ("force-rooted", "force-unrooted"):
+            tree = self.get_tree(rooting)
+            for idx in range(50):
+                nodes = [nd for nd in tree.preorder_node_iter() if nd.parent_node is not None]
+                node1 = rng.choice(nodes)
+                candidates = [nd for nd in nodes
+                        if nd is not node1.parent_node
+                        and nd not in set(node1.preorder_iter())
+                        and node1 not in set(nd.preorder_iter())]
+                node2 = rng.choice(candidates)
+                parent1 = node1.parent_node
+                parent2 = node2.parent_node
+                pos1 = parent1.child_nodes().index(node1)
+                pos2 = parent2.child_nodes().index(node2)
+                parent1.remove_child(node1)
+                parent2.remove_child(node2)
+                parent1.insert_child(pos1, node2)
+                parent2.insert_child(pos2, node1)
+                self.verify_bipartitions(tree)
+
+    def test_prune_and_regraft(self):
+        rng = random.Random(1)
+        for rooting in ("force-rooted", "force-unrooted"):
+            tree = self.get_tree(rooting)
+            for idx in range(50):
+                nodes = [nd for nd in tree.preorder_node_iter()
+                        if nd.parent_node is not None and nd.parent_node.parent_node is not None]
+                node = rng.choice(nodes)
+                subtree_nodes = set(node.preorder_iter())
+                parent = node.parent_node
+                parent.remove_child(node, suppress_unifurcations=True)
+                targets = [nd for nd in tree.preorder_node_iter()
+                        if nd.parent_node is not None and nd not in subtree_nodes]
+                target = rng.choice(targets)
+                target_parent = target.parent_node
+                pos = target_parent.child_nodes().index(target)
+                target_parent.remove_child(target)
+                new_node = target_parent.insert_new_child(pos)
+                new_node.add_child(target)
+                new_node.add_child(node)
+                self.verify_bipartitions(tree)
+
+    def test_rerooting(self):
+        rng = random.Random(1)
+        tree = self.get_tree("force-rooted")
+        for idx in range(20):
+            edge = rng.choice([nd.edge for nd in tree.preorder_node_iter() if nd.parent_node is not None])
+            tree.reroot_at_edge(edge, update_bipartitions=True)
+            self.verify_bipartitions(tree)
+        tree = self.get_tree("force-unrooted")
+        for idx in range(20):
+            node = rng.choice(tree.internal_nodes())
+            tree.reroot_at_node(node, update_bipartitions=True)
+            self.verify_bipartitions(tree)
+
+    def test_leaf_set_change(self):
+        for rooting in ("force-rooted", "force-unrooted"):
+            tree = self.get_tree(rooting)
+            tree.prune_taxa_with_labels(["Python regius", "Liasis fuscus"], update_bipartitions=True)
+            self.verify_bipartitions(tree)
+            self.assertEqual(tree.seed_node.edge.bipartition.leafset_bitmask,
+                    tree.seed_node.edge.bipartition.tree_leafset_bitmask)
+
+    def test_unifurcations_left_by_earlier_encoding(self):
+        tree = dendropy.Tree.get(data="[&R] ((A,B),((C,D),E));", schema="newick")
+        node = tree.find_node_with_taxon_label("E")
+        node.parent_node.remove_child(node)
+        tree.encode_bipartitions(suppress_unifurcations=False)
+        self.assertEqual(len(tree.bipartition_encoding), 8)
+        tree.update_bipartitions()
+        self.assertEqual(tree.as_string("newick"), "[&R] ((A,B),(C,D));\n")
+        self.assertEqual(len(tree.bipartition_encoding), 7)
+        self.verify_bipartitions(tree)
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -21,6 +21,7 @@ Tests character sequence map.
 """
 
 import copy
+import pickle
 import collections
 import random
 import unittest
@@ -878,6 +879,8 @@ class MatrixCreatingAndCloningTester(
         cls.rng = random.Random()
         if not hasattr(cls, "nseqs"):
             cls.nseqs = 1000
+        if not hasattr(cls, "matrix_kwargs"):
+            cls.matrix_kwargs = {}
 
     def add_annotations(self, char_matrix):
         tns = char_matrix.taxon_namespace
@@ -897,7 +900,8 @@ class MatrixCreatingAndCloningTester(
             ae3 = ae1.annotations.add_bouseq_attribute("name")
 
     def get_char_matrix(self, taxon_namespace=None):
-        char_matrix = self.__class__.matrix_type(taxon_namespace=taxon_namespace)
+        char_matrix = self.__class__.matrix_type(taxon_namespace=taxon_namespace,
+                **self.__class__.matrix_kwargs)
         labels = [str(i) for i in range(self.__class__.nseqs)]
         self.__class__.rng.shuffle(labels)
         seq_iter = itertools.cycle(self.__class__.sequence_source)
@@ -1018,6 +1022,19 @@ class DnaCharacterMatrixCreatingAndCloningTestCase(
         cls.nseqs = 100
         cls.build()
 
+class StateIndexCodedDnaCharacterMatrixCreatingAndCloningTestCase(
+        MatrixCreatingAndCloningTester,
+        dendropytest.ExtendedTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.matrix_type = dendropy.DnaCharacterMatrix
+        cls.matrix_kwargs = {"is_state_index_coded": True}
+        cls.sequence_type = dendropy.DnaCharacterDataSequence
+        cls.sequence_source = list(cls.matrix_type.datatype_alphabet)
+        cls.nseqs = 100
+        cls.build()
+
 class RnaCharacterMatrixCreatingAndCloningTestCase(
         MatrixCreatingAndCloningTester,
         dendropytest.ExtendedTestCase):
@@ -1126,5 +1143,162 @@ class TestCharacterMatrixTaxa(dendropytest.ExtendedTestCase):
         self.char_matrix.purge_taxon_namespace()
         self.assertEqual(set(self.char_matrix.taxon_namespace), self.expected_taxa)
 
+class FixedAlphabetCharacterMatrixStateIndexCodingTestCase(dendropytest.ExtendedTestCase):
+
+    def setUp(self):
+        self.rng = random.Random(1)
+        self.source_dict = collections.OrderedDict()
+        symbols = "ACGT-NRY?"
+        for idx, nchar in enumerate((12, 20, 7, 0, 20)):
+            self.source_dict["T{}".format(idx)] = "".join(self.rng.choice(symbols) for i in range(nchar))
+
+    def get_matrices(self, matrix_type=dendropy.DnaCharacterMatrix):
+        tns = dendropy.TaxonNamespace()
+        m1 = matrix_type.from_dict(self.source_dict, taxon_namespace=tns)
+        m2 = matrix_type.from_dict(self.source_dict,
+                char_matrix=matrix_type(taxon_namespace=tns, is_state_index_coded=True))
+        return m1, m2
+
+    def assert_equal_matrices(self, m1, m2):
+        self.assertEqual(list(m1), list(m2))
+        for t in m1:
+            self.assertIs(type(m1[t]), type(m2[t]))
+            self.assertEqual(m1[t].values(), m2[t].values())
+            self.assertEqual(list(m1[t]), list(m2[t]))
+
+    def test_storage(self):
+        m1, m2 = self.get_matrices()
+        self.assertFalse(m1.is_state_index_coded)
+        self.assertTrue(m2.is_state_index_coded)
+        self.assert_equal_matrices(m1, m2)
+        for t in m2:
+            seq = m2[t]
+            self.assertTrue(seq.is_state_index_coded)
+            self.assertEqual(list(seq.state_indexes), [state.index for state in m1[t]])
+            self.assertEqual(seq.symbols_as_string(), self.source_dict[t.label])
+            self.assertEqual(seq[2:5], m1[t][2:5])
+            self.assertIsNone(m1[t].state_indexes)
+
+    def test_sequence_mutation(self):
+        m1, m2 = self.get_matrices()
+        sa = m1.default_state_alphabet
+        ct = m1.new_character_type()
+        for s1, s2 in zip(m1.values(), m2.values()):
+            for seq in (s1, s2):
+                seq.append(sa["A"])
+                seq.insert(0, sa["C"], character_type=ct)
+                seq.set_at(len(seq) + 2, sa["G"])
+                seq[1] = sa["T"]
+                del seq[2]
+                seq.set_character_type_at(len(seq) - 1, ct)
+            self.assertEqual(s1.values(), s2.values())
+            self.assertEqual(list(s1.cell_iter()), list(s2.cell_iter()))
+        self.assertRaises(ValueError, m2[0].append, dendropy.RNA_STATE_ALPHABET["U"])
+
+    def test_sequence_slice_mutation(self):
+        m1, m2 = self.get_matrices()
+        sa = m1.default_state_alphabet
+        ct = m1.new_character_type()
+        for s1, s2 in zip(m1.values(), m2.values()):
+            for seq in (s1, s2):
+                seq.append(sa["A"], character_type=ct)
+                seq.insert(0, sa["C"], character_type=ct)
+                seq[:2] = [sa["G"], sa["T"]]
+                seq[-1:] = [sa["T"]]
+                del seq[1:3]
+                del seq[::3]
+                del seq[-2:]
+            self.assertEqual(s1.values(), s2.values())
+            self.assertEqual(list(s1.cell_iter()), list(s2.cell_iter()))
+            self.assertEqual(s2[1:], s1[1:])
+
+    def test_fill_and_pack(self):
+        m1, m2 = self.get_matrices()
+        for m in (m1, m2):
+            m.taxon_namespace.require_taxon("T99")
+            m.pack()
+            m.fill(m.default_state_alphabet["N"], size=25, append=False)
+        self.assert_equal_matrices(m1, m2)
+        self.assertTrue(m2["T99"].is_state_index_coded)
+        self.assertEqual(set(len(seq) for seq in m2.values()), set([25]))
+
+    def test_export_character_indices(self):
+        m1, m2 = self.get_matrices()
+        for indices in ([0, 3, 4, 100, -1], range(2, 9), [5, 1, 5], []):
+            e1 = m1.export_character_indices(indices)
+            e2 = m2.export_character_indices(indices)
+            self.assertTrue(e2.is_state_index_coded)
+            self.assert_equal_matrices(e1, e2)
+
+    def test_concatenate(self):
+        m1, m2 = self.get_matrices()
+        for m in (m1, m2):
+            m.pack()
+        c1 = dendropy.DnaCharacterMatrix.concatenate([m1, m1.export_character_indices([1, 2])])
+        c2 = dendropy.DnaCharacterMatrix.concatenate([m2, m2.export_character_indices([1, 2])])
+        self.assertTrue(c2.is_state_index_coded)
+        self.assert_equal_matrices(c1, c2)
+        self.assertEqual(list(c1.character_subsets.keys()), list(c2.character_subsets.keys()))
+
+    def test_taxon_state_sets_map(self):
+        m1, m2 = self.get_matrices()
+        for kwargs in ({}, {"gaps_as_missing": False}, {"char_indices": [0, 4, 6]}):
+            if "char_indices" in kwargs:
+                for m in (m1, m2):
+                    m.discard_sequences([m.taxon_namespace.get_taxon("T3")])
+            self.assertEqual(m1.taxon_state_sets_map(**kwargs), m2.taxon_state_sets_map(**kwargs))
+
+    def test_conversion(self):
+        m1, m2 = self.get_matrices()
+        seq = m1[0]
+        m1.is_state_index_coded = True
+        self.assertIs(m1[0], seq)
+        self.assertTrue(seq.is_state_index_coded)
+        self.assert_equal_matrices(m1, m2)
+        m2.is_state_index_coded = False
+        self.assertIsNone(m2[0].state_indexes)
+        self.assert_equal_matrices(m1, m2)
+
+    def test_assign_sequence(self):
+        m1, m2 = self.get_matrices()
+        seq = dendropy.DnaCharacterDataSequence(m1[0].values())
+        m2[1] = seq
+        self.assertIs(m2[1], seq)
+        self.assertTrue(seq.is_state_index_coded)
+        self.assertEqual(seq.values(), m1[0].values())
+        m2[2] = m1[0].values()
+        self.assertTrue(m2[2].is_state_index_coded)
+        self.assertEqual(m2[2].values(), m1[0].values())
+        m1[1] = dendropy.DnaCharacterDataSequence(m1[0].values())
+        self.assertFalse(m1[1].is_state_index_coded)
+
+    def test_pickle(self):
+        m1, m2 = self.get_matrices()
+        ct = m1.new_character_type()
+        for s1, s2 in zip(m1.values(), m2.values()):
+            for seq in (s1, s2):
+                seq.append(m1.default_state_alphabet["A"], character_type=ct)
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                seq = pickle.loads(pickle.dumps(s2, protocol))
+                self.assertIs(type(seq), type(s2))
+                self.assertTrue(seq.is_state_index_coded)
+                self.assertIs(seq.state_alphabet, dendropy.DNA_STATE_ALPHABET)
+                self.assertEqual(seq.values(), s1.values())
+                self.assertEqual(list(seq.state_indexes), list(s2.state_indexes))
+                self.assertEqual(
+                        [seq.character_type_at(idx) is None for idx in range(len(seq))],
+                        [s2.character_type_at(idx) is None for idx in range(len(s2))])
+                seq.append(m1.default_state_alphabet["C"])
+                self.assertEqual(len(seq), len(s2) + 1)
+
+    def test_read(self):
+        s = "".join(">{}\n{}\n".format(label, seq) for label, seq in self.source_dict.items() if seq)
+        m1 = dendropy.DnaCharacterMatrix.get(data=s, schema="fasta")
+        m2 = dendropy.DnaCharacterMatrix.get(data=s, schema="fasta", is_state_index_coded=True)
+        self.assertTrue(m2.is_state_index_coded)
+        self.assertEqual(m1.as_string("nexus"), m2.as_string("nexus"))
+        self.assertEqual([seq.symbols_as_string() for seq in m1.values()],
+                [seq.symbols_as_string() for seq in m2.values()])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,158 @@
+#! /usr/bin/env python
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests FlatTree.
+"""
+
+import random
+import unittest
+import dendropy
+from dendropy.utility import error
+from dendropy.test.support import curated_test_tree
+
+class FlatTreeTest(curated_test_tree.CuratedTestTree, unittest.TestCase):
+
+    def get_trees(self):
+        trees = []
+        tree, all_nodes, leaf_nodes, internal_nodes = self.get_tree(
+                suppress_internal_node_taxa=False,
+                suppress_leaf_node_taxa=False)
+        trees.append(tree)
+        rng = random.Random(3)
+        taxon_namespace = dendropy.TaxonNamespace(["T_{}".format(i) for i in range(20)])
+        for is_rooted in (True, False, None):
+            tree = dendropy.simulate.treesim.birth_death_tree(
+                    birth_rate=1.0,
+                    death_rate=0.0,
+                    taxon_namespace=taxon_namespace,
+                    num_extant_tips=len(taxon_namespace),
+                    rng=rng)
+            tree.is_rooted = is_rooted
+            tree.label = "tree {}".format(is_rooted)
+            tree.weight = 0.5
+            for idx, nd in enumerate(tree.postorder_internal_node_iter()):
+                if idx % 3 == 0:
+                    nd.label = str(idx)
+                if idx % 4 == 0:
+                    nd.edge.length = None
+            # add a unifurcation
+            nd = tree.leaf_nodes()[0]
+            new_node = nd.parent_node.new_child(edge_length=0.5)
+            nd.parent_node.remove_child(nd)
+            new_node.add_child(nd)
+            trees.append(tree)
+        return trees
+
+    def test_round_trip(self):
+        for tree in self.get_trees():
+            flat_tree = dendropy.FlatTree.from_tree(tree)
+            self.assertEqual(len(flat_tree), len(tree.nodes()))
+            self.assertIs(flat_tree.taxon_namespace, tree.taxon_namespace)
+            for kwargs in (
+                    {},
+                    {"suppress_edge_lengths": True, "suppress_rooting": True},
+                    {"suppress_leaf_node_labels": False, "suppress_internal_taxon_labels": True},
+                    {"unquoted_underscores": True, "real_value_format_specifier": ".3f", "store_tree_weights": True},
+                    ):
+                self.assertEqual(flat_tree.as_string("newick", **kwargs), tree.as_string("newick", **kwargs))
+            tree2 = flat_tree.to_tree()
+            self.assertIs(tree2.taxon_namespace, tree.taxon_namespace)
+            self.assertEqual(tree2.is_rooted, tree.is_rooted)
+            self.assertEqual(tree2.label, tree.label)
+            self.assertEqual(tree2.weight, tree.weight)
+            for nd1, nd2 in zip(tree.preorder_node_iter(), tree2.preorder_node_iter()):
+                self.assertIs(nd1.taxon, nd2.taxon)
+                self.assertEqual(nd1.label, nd2.label)
+                self.assertEqual(nd1.edge.length, nd2.edge.length)
+                self.assertEqual(len(nd1.child_nodes()), len(nd2.child_nodes()))
+            self.assertEqual(tree2.as_string("newick"), tree.as_string("newick"))
+
+    def test_iterators(self):
+        for tree in self.get_trees():
+            flat_tree = dendropy.FlatTree.from_tree(tree)
+            node_indexes = dict((nd, idx) for idx, nd in enumerate(tree.preorder_node_iter()))
+            self.assertEqual(list(flat_tree.preorder_node_iter()),
+                    [node_indexes[nd] for nd in tree.preorder_node_iter()])
+            self.assertEqual(list(flat_tree.postorder_node_iter()),
+                    [node_indexes[nd] for nd in tree.postorder_node_iter()])
+            self.assertEqual(list(flat_tree.leaf_node_iter()),
+                    [node_indexes[nd] for nd in tree.leaf_node_iter()])
+            filter_fn = lambda idx: idx % 2 == 0
+            self.assertEqual(list(flat_tree.postorder_node_iter(filter_fn=filter_fn)),
+                    [node_indexes[nd] for nd in tree.postorder_node_iter() if node_indexes[nd] % 2 == 0])
+            for nd, nd_idx in node_indexes.items():
+                self.assertEqual(list(flat_tree.child_node_iter(nd_idx)),
+                        [node_indexes[ch] for ch in nd.child_node_iter()])
+                self.assertEqual(flat_tree.is_leaf(nd_idx), nd.is_leaf())
+                self.assertIs(flat_tree.taxon(nd_idx), nd.taxon)
+                self.assertEqual(flat_tree.edge_length(nd_idx), nd.edge.length)
+
+    def test_calc_node_ages(self):
+        for tree in self.get_trees():
+            for nd in tree:
+                if nd.edge.length is None:
+                    nd.edge.length = 0.0
+            flat_tree = dendropy.FlatTree.from_tree(tree)
+            for kwargs in ({"is_force_max_age": True}, {"is_force_min_age": True}):
+                ages = flat_tree.calc_node_ages(**kwargs)
+                self.assertIs(flat_tree.node_ages, ages)
+                tree.calc_node_ages(**kwargs)
+                for nd_idx, nd in enumerate(tree.preorder_node_iter()):
+                    self.assertAlmostEqual(ages[nd_idx], nd.age)
+        tree = dendropy.simulate.treesim.birth_death_tree(
+                birth_rate=1.0,
+                death_rate=0.0,
+                taxon_namespace=dendropy.TaxonNamespace(["T{}".format(i) for i in range(20)]),
+                num_extant_tips=20,
+                rng=random.Random(5))
+        flat_tree = dendropy.FlatTree.from_tree(tree)
+        ages = flat_tree.calc_node_ages(ultrametricity_precision=1e-5)
+        tree.calc_node_ages(ultrametricity_precision=1e-5)
+        for nd_idx, nd in enumerate(tree.preorder_node_iter()):
+            self.assertAlmostEqual(ages[nd_idx], nd.age)
+        tree.leaf_nodes()[0].edge.length += 1.0
+        flat_tree = dendropy.FlatTree.from_tree(tree)
+        with self.assertRaises(error.UltrametricityError):
+            flat_tree.calc_node_ages()
+
+    def test_encode_bipartitions(self):
+        for tree in self.get_trees():
+            flat_tree = dendropy.FlatTree.from_tree(tree)
+            splits, edge_lengths, node_indexes = flat_tree.encode_bipartitions()
+            self.assertEqual(len(splits), len(edge_lengths))
+            self.assertEqual(len(splits), len(node_indexes))
+            tree.encode_bipartitions()
+            expected = dict((b.split_bitmask, edge.length) for b, edge in tree.bipartition_edge_map.items())
+            self.assertEqual(dict(zip(splits, edge_lengths)), expected)
+
+    def test_unsupported_schema(self):
+        flat_tree = dendropy.FlatTree.from_tree(self.get_trees()[0])
+        with self.assertRaises(error.UnsupportedSchemaError):
+            flat_tree.as_string("nexus")
+        with self.assertRaises(TypeError):
+            flat_tree.as_string("newick", suppress_annotations=False)
+
+    def test_foreign_taxon(self):
+        tree = dendropy.Tree.get(data="((a,b),c);", schema="newick")
+        tree.leaf_nodes()[0].taxon = dendropy.Taxon("x")
+        with self.assertRaises(ValueError):
+            dendropy.FlatTree.from_tree(tree)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -689,6 +689,83 @@ class TaxonNamespaceTaxonManagement(unittest.TestCase):
         for t in tns:
             x.append(t)
         self.assertEqual(len(x), 0)
+        self.assertIs(tns.get_taxon("a"), None)
+        t = tns.require_taxon("a")
+        self.assertIs(tns.get_taxon("A"), t)
+
+    ### label look-up index ###
+
+    def test_label_lookup_after_relabeling(self):
+        tns = TaxonNamespace(self.str_labels)
+        t1 = tns.get_taxon("b")
+        t1.label = "Q"
+        self.assertIs(tns.get_taxon("b"), None)
+        self.assertIs(tns.get_taxon("q"), t1)
+        self.assertIs(tns.get_taxon("Q", is_case_sensitive=True), t1)
+        self.assertIs(tns.get_taxon("q", is_case_sensitive=True), None)
+        t2 = Taxon("x")
+        tns.add_taxon(t2)
+        t2.label = "b"
+        self.assertIs(tns.get_taxon("B"), t2)
+        self.assertEqual(tns.findall("z"), [t for t in tns if t.label == "z"])
+
+    def test_label_lookup_with_taxon_in_multiple_namespaces(self):
+        tns1 = TaxonNamespace(["a", "b"])
+        tns2 = TaxonNamespace()
+        t = tns1.get_taxon("a")
+        tns2.add_taxon(t)
+        t.label = "c"
+        for tns in (tns1, tns2):
+            self.assertIs(tns.get_taxon("a"), None)
+            self.assertIs(tns.get_taxon("c"), t)
+
+    def test_label_lookup_after_removal(self):
+        tns = TaxonNamespace(self.str_labels)
+        a1, a2 = tns.findall("a")
+        tns.remove_taxon(a1)
+        self.assertEqual(tns.findall("A"), [a2])
+        self.assertEqual(tns.findall("a", is_case_sensitive=True), [a2])
+        tns.remove_taxon(a2)
+        self.assertFalse(tns.has_taxon_label("a"))
+        self.assertIs(tns.get_taxon("a", is_case_sensitive=True), None)
+
+    def test_label_lookup_order_after_sort(self):
+        tns = TaxonNamespace()
+        taxa = [tns.new_taxon(label) for label in ["z", "Z", "a"]]
+        self.assertEqual(tns.findall("z"), taxa[:2])
+        tns.sort()
+        self.assertEqual(tns.findall("z"), [taxa[1], taxa[0]])
+        self.assertIs(tns.get_taxon("z"), taxa[1])
+        tns.reverse()
+        self.assertEqual(tns.findall("z"), taxa[:2])
+
+    def test_label_lookup_case_sensitivity_toggle(self):
+        tns = TaxonNamespace(["a", "A"])
+        self.assertEqual(len(tns.findall("a")), 2)
+        tns.is_case_sensitive = True
+        self.assertEqual(len(tns.findall("a")), 1)
+        self.assertIs(tns.findall("A")[0].label, "A")
+        tns.is_case_sensitive = False
+        self.assertEqual(len(tns.findall("A")), 2)
+
+    def test_label_lookup_in_copies(self):
+        tns1 = TaxonNamespace(self.str_labels)
+        tns2 = copy.deepcopy(tns1)
+        t = tns2.get_taxon("c")
+        self.assertIn(t, tns2)
+        self.assertNotIn(t, tns1)
+        t.label = "y"
+        self.assertIs(tns2.get_taxon("y"), t)
+        self.assertIs(tns1.get_taxon("y"), None)
+        self.assertIsNot(tns1.get_taxon("c"), None)
+        # shares the |Taxon| objects
+        tns3 = TaxonNamespace(tns1)
+        t = tns3.get_taxon("d")
+        t.label = "w"
+        self.assertIs(tns3.get_taxon("w"), t)
+        self.assertIs(tns1.get_taxon("w"), t)
+        tns3.new_taxon("v")
+        self.assertIs(tns1.get_taxon("v"), None)
 
 class TaxonNamespaceIdentity(unittest.TestCase):
 
@@ -20,6 +20,7 @@
 Tests basic Tree structure and iteration.
 """
 
+import random
 import unittest
 import dendropy
 from dendropy.test.support import curated_test_tree
@@ -593,5 +594,275 @@ class TestTreeApply(curated_test_tree.CuratedTestTree, unittest.TestCase):
                 ]
         self.assertEqual(observed, expected)
 
+class TestTreeTraversalCache(unittest.TestCase):
+
+    def get_tree(self):
+        tree = dendropy.Tree.get(
+                data="((a:1,b:2)i1:1,(c:1,(d:2,e:1)i2:1)i3:2,(f:1,g:1)i4:3)root;",
+                schema="newick")
+        return tree
+
+    def assert_consistent(self, tree):
+        self.assertEqual(tree.preorder_nodes(), tuple(tree.preorder_node_iter()))
+        self.assertEqual(tree.postorder_nodes(), tuple(tree.postorder_node_iter()))
+        self.assertEqual(tree.nodes(), list(tree.preorder_node_iter()))
+        self.assertEqual(tree.leaf_nodes(), list(tree.leaf_node_iter()))
+        self.assertEqual(tree.internal_nodes(), list(tree.preorder_internal_node_iter()))
+        self.assertEqual(tree.internal_nodes(exclude_seed_node=True),
+                list(tree.preorder_internal_node_iter(exclude_seed_node=True)))
+        self.assertEqual(tree.edges(), list(tree.preorder_edge_iter()))
+        self.assertEqual(tree.leaf_edges(), [nd.edge for nd in tree.leaf_node_iter()])
+        self.assertEqual(tree.internal_edges(exclude_seed_edge=True),
+                list(tree.preorder_internal_edge_iter(exclude_seed_edge=True)))
+        self.assertEqual(list(tree.postorder_edge_iter()),
+                [nd.edge for nd in tree.postorder_node_iter()])
+
+    def test_orders(self):
+        tree = self.get_tree()
+        self.assertEqual([nd.label or nd.taxon.label for nd in tree.postorder_nodes()],
+                ["a", "b", "i1", "c", "d", "e", "i2", "i3", "f", "g", "i4", "root"])
+        self.assertEqual([nd.label or nd.taxon.label for nd in tree.preorder_nodes()],
+                ["root", "i1", "a", "b", "i3", "c", "i2", "d", "e", "i4", "f", "g"])
+        self.assert_consistent(tree)
+        is_even = lambda x: len(x.child_nodes()) % 2 == 0
+        self.assertEqual(tree.nodes(filter_fn=is_even),
+                [nd for nd in tree.preorder_node_iter() if is_even(nd)])
+
+    def test_reused(self):
+        tree = self.get_tree()
+        preorder_nodes = tree.preorder_nodes()
+        postorder_nodes = tree.postorder_nodes()
+        tree.calc_node_ages(is_force_max_age=True)
+        tree.find_node_with_label("i1").label = "x"
+        tree.leaf_nodes()[0].edge.length = 3.0
+        self.assertIs(tree.preorder_nodes(), preorder_nodes)
+        self.assertIs(tree.postorder_nodes(), postorder_nodes)
+
+    def check_invalidation(self, mutate_fn):
+        tree = self.get_tree()
+        preorder_nodes = tree.preorder_nodes()
+        tree.postorder_nodes()
+        tree.mrca_index()
+        mutate_fn(tree)
+        self.assertIsNot(tree.preorder_nodes(), preorder_nodes)
+        self.assert_consistent(tree)
+
+    def test_invalidation_on_add_child(self):
+        self.check_invalidation(lambda tree: tree.find_node_with_label("i2").new_child(label="x"))
+
+    def test_invalidation_on_remove_child(self):
+        def f(tree):
+            nd = tree.find_node_with_label("i2")
+            nd.remove_child(nd.child_nodes()[0])
+        self.check_invalidation(f)
+
+    def test_invalidation_on_insert_child(self):
+        def f(tree):
+            nd = tree.find_node_with_label("i3")
+            nd.insert_child(0, nd.child_nodes()[1])
+        self.check_invalidation(f)
+
+    def test_invalidation_on_reroot(self):
+        self.check_invalidation(lambda tree: tree.reroot_at_node(tree.find_node_with_label("i2")))
+
+    def test_invalidation_on_prune(self):
+        self.check_invalidation(lambda tree: tree.prune_taxa_with_labels(["c"]))
+
+    def test_invalidation_on_ladderize(self):
+        self.check_invalidation(lambda tree: tree.ladderize())
+
+    def test_invalidation_on_new_seed_node(self):
+        def f(tree):
+            tree.seed_node = tree.find_node_with_label("i3")
+        self.check_invalidation(f)
+
+    def test_live_iteration(self):
+        tree = self.get_tree()
+        tree.preorder_nodes()
+        # changes made during iteration are seen by the iterators as before
+        visited = []
+        for nd in tree.preorder_node_iter():
+            visited.append(nd)
+            if nd.label == "i1":
+                nd.new_child(label="x")
+        self.assertEqual(len(visited), 13)
+        self.assert_consistent(tree)
+
+class TestTreeNodeAgesAndRootDistances(unittest.TestCase):
+
+    def get_tree(self, src="((a:1,b:1)i1:2,(c:2,(d:1,e:1)i2:1)i3:1)root;"):
+        return dendropy.Tree.get(data=src, schema="newick")
+
+    def node_values(self, tree, attr_name):
+        return dict((nd.label or nd.taxon.label, getattr(nd, attr_name)) for nd in tree)
+
+    def test_node_ages(self):
+        tree = self.get_tree()
+        ages = tree.calc_node_ages()
+        self.assertEqual(ages, [0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(self.node_values(tree, "age"),
+                {"a": 0.0, "b": 0.0, "c": 0.0, "d": 0.0, "e": 0.0, "i1": 1.0, "i2": 1.0, "i3": 2.0, "root": 3.0})
+        self.assertEqual(tree.calc_node_ages(is_return_internal_node_ages_only=True), [1.0, 1.0, 2.0, 3.0])
+        self.assertEqual(tree.internal_node_ages(), [1.0, 1.0, 2.0, 3.0])
+
+    def test_non_ultrametric_node_ages(self):
+        tree = self.get_tree("((a:1,b:2)i1:1,(c:4,(d:1,e:1)i2:1)i3:1)root;")
+        with self.assertRaises(dendropy.UltrametricityError):
+            tree.calc_node_ages()
+        self.assertEqual(tree.calc_node_ages(ultrametricity_precision=False),
+                [0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 4.0, 2.0])
+        self.assertEqual(tree.calc_node_ages(is_force_max_age=True),
+                [0.0, 0.0, 2.0, 0.0, 0.0, 0.0, 1.0, 4.0, 5.0])
+        self.assertEqual(tree.calc_node_ages(is_force_min_age=True),
+                [0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 2.0, 2.0])
+        with self.assertRaises(ValueError):
+            tree.calc_node_ages(is_force_max_age=True, is_force_min_age=True)
+
+    def test_node_ages_with_given_ages(self):
+        tree = self.get_tree("((a:1,b:2)i1:1,(c:1,(d:1,e:1)i2:1)i3:1)root;")
+        tip_ages = {"a": 1.0, "c": 1.0}
+        f = lambda nd: tip_ages.get(nd.taxon.label, 0.0) if nd.is_leaf() else None
+        ages = tree.calc_node_ages(set_node_age_fn=f)
+        self.assertEqual(ages, [2.0, 1.0, 2.0, 3.0])
+        self.assertEqual(self.node_values(tree, "age"),
+                {"a": 1.0, "b": 0.0, "c": 1.0, "d": 0.0, "e": 0.0, "i1": 2.0, "i2": 1.0, "i3": 2.0, "root": 3.0})
+        f = lambda nd: 10.0 if nd.label == "i3" else None
+        ages = tree.calc_node_ages(set_node_age_fn=f, ultrametricity_precision=False)
+        self.assertEqual(tree.find_node_with_label("i3").age, 10.0)
+        self.assertEqual(tree.seed_node.age, 2.0)
+        self.assertEqual(len(ages), 8)
+
+    def test_node_ages_with_missing_edge_lengths(self):
+        tree = self.get_tree("((a,b)i1:1,(c:1,(d,e:0)i2:1)i3)root;")
+        self.assertEqual(tree.calc_node_ages(), [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 1.0])
+        self.assertEqual(self.node_values(tree, "age")["i3"], 1.0)
+        for nd in tree:
+            if nd is not tree.seed_node and nd.label != "i3":
+                self.assertIsNotNone(nd.edge.length)
+
+    def test_node_ages_after_changes(self):
+        tree = self.get_tree()
+        tree.calc_node_ages()
+        tree.find_node_with_taxon_label("a").edge.length = 2.0
+        tree.find_node_with_taxon_label("b").edge.length = 2.0
+        self.assertEqual(tree.calc_node_ages(ultrametricity_precision=False)[-1], 4.0)
+        i2 = tree.find_node_with_label("i2")
+        i2.new_child(label="x", edge_length=1.0)
+        i2.parent_node.remove_child(i2)
+        i2.parent_node = None
+        self.assertEqual(tree.calc_node_ages(ultrametricity_precision=False), [0.0, 0.0, 2.0, 0.0, 2.0, 4.0])
+
+    def test_root_distances(self):
+        tree = self.get_tree()
+        self.assertEqual(tree.calc_node_root_distances(), [3.0, 3.0, 3.0, 3.0, 3.0])
+        self.assertEqual(tree.calc_node_root_distances(return_leaf_distances_only=False),
+                [0.0, 2.0, 3.0, 3.0, 1.0, 3.0, 2.0, 3.0, 3.0])
+        self.assertEqual(self.node_values(tree, "root_distance"),
+                {"a": 3.0, "b": 3.0, "c": 3.0, "d": 3.0, "e": 3.0, "i1": 2.0, "i2": 2.0, "i3": 1.0, "root": 0.0})
+        tree.find_node_with_label("i3").edge.length = 2.0
+        tree.find_node_with_taxon_label("a").new_child(label="x", edge_length=1.0)
+        self.assertEqual(tree.calc_node_root_distances(), [4.0, 3.0, 4.0, 4.0, 4.0])
+
+class TestTreeMrcaIndex(unittest.TestCase):
+
+    def get_tree(self):
+        rng = random.Random(7)
+        taxon_namespace = dendropy.TaxonNamespace(["T{}".format(i) for i in range(30)])
+        tree = dendropy.simulate.treesim.birth_death_tree(
+                birth_rate=1.0,
+                death_rate=0.0,
+                taxon_namespace=taxon_namespace,
+                num_extant_tips=len(taxon_namespace),
+                rng=rng)
+        # add some unifurcations
+        for nd in list(tree.preorder_node_iter())[1::5]:
+            new_node = dendropy.Node()
+            parent_node = nd.parent_node
+            parent_node.insert_child(parent_node.child_nodes().index(nd), new_node)
+            parent_node.remove_child(nd)
+            new_node.add_child(nd)
+        return tree, rng
+
+    def check_against_bitmasks(self, tree, rng, num_queries=200):
+        nodes = list(tree.preorder_node_iter())
+        leaves = tree.leaf_nodes()
+        tree.encode_bipartitions(suppress_unifurcations=False)
+        for idx in range(num_queries):
+            query_nodes = rng.sample(nodes, rng.randint(1, 4))
+            self.assertIs(
+                    tree.mrca(nodes=query_nodes, is_use_mrca_index=True),
+                    tree.mrca(nodes=query_nodes))
+            taxa = [nd.taxon for nd in rng.sample(leaves, rng.randint(1, 4))]
+            self.assertIs(
+                    tree.mrca(taxa=taxa, is_use_mrca_index=True),
+                    tree.mrca(taxa=taxa))
+            nd1, nd2 = rng.sample(nodes, 2)
+            expected = nd1
+            nd2_ancestors = set(nd2.ancestor_iter(inclusive=True))
+            while expected not in nd2_ancestors:
+                expected = expected.parent_node
+            self.assertIs(tree.mrca_index().mrca(nd1, nd2), expected)
+
+    def test_mrca_against_bitmasks(self):
+        tree, rng = self.get_tree()
+        self.check_against_bitmasks(tree, rng)
+
+    def test_index_reused(self):
+        tree, rng = self.get_tree()
+        mrca_index = tree.mrca_index()
+        tree.mrca(taxa=list(tree.taxon_namespace)[:3], is_use_mrca_index=True)
+        self.assertIs(tree.mrca_index(), mrca_index)
+        tree.leaf_nodes()[0].label = "x"
+        self.assertIs(tree.mrca_index(), mrca_index)
+
+    def test_invalidation_on_add_child(self):
+        tree, rng = self.get_tree()
+        mrca_index = tree.mrca_index()
+        leaf = tree.leaf_nodes()[3]
+        leaf.new_child(taxon=tree.taxon_namespace.new_taxon("X1"))
+        leaf.new_child(taxon=tree.taxon_namespace.new_taxon("X2"))
+        self.assertIsNot(tree.mrca_index(), mrca_index)
+        self.check_against_bitmasks(tree, rng)
+
+    def test_invalidation_on_prune(self):
+        tree, rng = self.get_tree()
+        mrca_index = tree.mrca_index()
+        tree.prune_taxa(list(tree.taxon_namespace)[:5])
+        self.assertIsNot(tree.mrca_index(), mrca_index)
+        self.check_against_bitmasks(tree, rng)
+
+    def test_invalidation_on_reroot(self):
+        tree, rng = self.get_tree()
+        mrca_index = tree.mrca_index()
+        tree.reroot_at_node(tree.internal_nodes()[4], suppress_unifurcations=False)
+        self.assertIsNot(tree.mrca_index(), mrca_index)
+        self.check_against_bitmasks(tree, rng)
+
+    def test_copy_not_sharing_index(self):
+        tree, rng = self.get_tree()
+        mrca_index = tree.mrca_index()
+        tree2 = tree.clone(depth=2)
+        mrca_index2 = tree2.mrca_index()
+        self.assertIsNot(mrca_index2, mrca_index)
+        self.assertIs(mrca_index2.seed_node, tree2.seed_node)
+        self.check_against_bitmasks(tree2, rng)
+
+    def test_duplicate_leaf_taxa(self):
+        tree = dendropy.Tree.get(data="((a,b),(c,(d,e)));", schema="newick")
+        d = tree.find_node_with_taxon_label("d")
+        d.taxon = tree.find_node_with_taxon_label("a").taxon
+        tree.encode_bipartitions()
+        taxa = [d.taxon, tree.find_node_with_taxon_label("c").taxon]
+        self.assertIs(
+                tree.mrca(taxa=taxa, is_use_mrca_index=True),
+                tree.mrca(taxa=taxa))
+
+    def test_start_node(self):
+        tree = dendropy.Tree.get(data="((a,b),(c,(d,e)));", schema="newick")
+        start_node = tree.find_node_with_taxon_label("a").parent_node
+        taxa = tree.taxon_namespace.get_taxa(labels=["c", "d"])
+        self.assertIsNone(tree.mrca(taxa=taxa, start_node=start_node, is_use_mrca_index=True))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -16,8 +16,13 @@
 ##
 ##############################################################################
 
+import os
+import shutil
+import tempfile
 import unittest
 from dendropy.test.support import pathmap
+from dendropy.utility import error
+from dendropy.utility.textprocessing import StringIO
 import dendropy
 
 class TreeArrayBasicTreeAccession(unittest.TestCase):
@@ -54,6 +59,535 @@ class TreeArrayBasicTreeAccession(unittest.TestCase):
             tree_array.add_tree(tree)
         self.verify_tree_array(tree_array, trees)
 
+class TreeArrayParallelReading(unittest.TestCase):
+
+    def read_tree_array(self, paths, schema, ignore_node_ages, **kwargs):
+        tree_array = dendropy.TreeArray(ignore_node_ages=ignore_node_ages)
+        tree_array.read_from_files(
+                files=paths,
+                schema=schema,
+                **kwargs)
+        return tree_array
+
+    def verify_parallel_reading(self, paths, schema, ignore_node_ages=True, **kwargs):
+        expected = self.read_tree_array(paths, schema, ignore_node_ages, **kwargs)
+        for num_processes in (2, 3):
+            observed = self.read_tree_array(paths, schema, ignore_node_ages,
+                    num_processes=num_processes,
+                    **kwargs)
+            self.assertEqual(
+                    [t.label for t in observed.taxon_namespace],
+                    [t.label for t in expected.taxon_namespace])
+            self.assertEqual(len(observed), len(expected))
+            self.assertEqual(observed._tree_split_bitmasks, expected._tree_split_bitmasks)
+            self.assertEqual(observed._tree_edge_lengths, expected._tree_edge_lengths)
+            self.assertEqual(observed._tree_leafset_bitmasks, expected._tree_leafset_bitmasks)
+            self.assertEqual(observed._tree_weights, expected._tree_weights)
+            observed_splits = observed.split_distribution
+            expected_splits = expected.split_distribution
+            self.assertEqual(observed_splits.total_trees_counted, expected_splits.total_trees_counted)
+            self.assertEqual(dict(observed_splits.split_counts), dict(expected_splits.split_counts))
+            self.assertEqual(dict(observed_splits.split_edge_lengths), dict(expected_splits.split_edge_lengths))
+            self.assertEqual(dict(observed_splits.split_node_ages), dict(expected_splits.split_node_ages))
+
+    def test_nexus_with_translate_block(self):
+        self.verify_parallel_reading(
+                [pathmap.tree_source_path("pythonidae.mb.run1.t")],
+                "nexus",
+                tree_offset=20)
+
+    def test_nexus_with_node_ages(self):
+        self.verify_parallel_reading(
+                [pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")],
+                "nexus",
+                ignore_node_ages=False,
+                tree_offset=150)
+
+    def test_multiple_newick_sources(self):
+        self.verify_parallel_reading(
+                [pathmap.tree_source_path("cetaceans.raxml.bootstraps.trees"),
+                 pathmap.tree_source_path("cetaceans.mb.no-clock.mcmc.trees")],
+                "nexus/newick",
+                rooting="force-unrooted",
+                tree_offset=150)
+
+class TreeArraySkeletonReading(unittest.TestCase):
+
+    def read_tree_array(self, sources, schema, bitmasks_only, tree_array_kwargs=None, **kwargs):
+        # ``sources`` are paths or (to be read as a data source) tree statements
+        if tree_array_kwargs is None:
+            tree_array_kwargs = {}
+        tree_array = dendropy.TreeArray(**tree_array_kwargs)
+        if sources[0].endswith(";"):
+            sources = [StringIO("\n".join(sources))]
+        tree_array.read_from_files(
+                files=sources,
+                schema=schema,
+                bitmasks_only=bitmasks_only,
+                **kwargs)
+        return tree_array
+
+    def verify_skeleton_reading(self, sources, schema, tree_array_kwargs=None, **kwargs):
+        expected = self.read_tree_array(sources, schema, False, tree_array_kwargs, **kwargs)
+        observed = self.read_tree_array(sources, schema, True, tree_array_kwargs, **kwargs)
+        self.assertEqual(
+                [t.label for t in observed.taxon_namespace],
+                [t.label for t in expected.taxon_namespace])
+        self.assertEqual(len(observed), len(expected))
+        self.assertEqual(observed._tree_split_bitmasks, expected._tree_split_bitmasks)
+        self.assertEqual(observed._tree_edge_lengths, expected._tree_edge_lengths)
+        self.assertEqual(observed._tree_leafset_bitmasks, expected._tree_leafset_bitmasks)
+        self.assertEqual(observed._tree_weights, expected._tree_weights)
+        observed_splits = observed.split_distribution
+        expected_splits = expected.split_distribution
+        self.assertEqual(observed_splits.total_trees_counted, expected_splits.total_trees_counted)
+        self.assertEqual(observed_splits.sum_of_tree_weights, expected_splits.sum_of_tree_weights)
+        self.assertEqual(observed_splits.tree_rooting_types_counted, expected_splits.tree_rooting_types_counted)
+        self.assertEqual(dict(observed_splits.split_counts), dict(expected_splits.split_counts))
+        self.assertEqual(dict(observed_splits.split_edge_lengths), dict(expected_splits.split_edge_lengths))
+        self.assertEqual(dict(observed_splits.split_node_ages), dict(expected_splits.split_node_ages))
+
+    def test_nexus_with_translate_block(self):
+        self.verify_skeleton_reading(
+                [pathmap.tree_source_path("pythonidae.mb.run1.t")],
+                "nexus",
+                tree_offset=20)
+
+    def test_nexus_with_node_ages(self):
+        self.verify_skeleton_reading(
+                [pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")],
+                "nexus",
+                tree_array_kwargs={"ignore_node_ages": False})
+
+    def test_annotated_nexus(self):
+        self.verify_skeleton_reading(
+                [pathmap.tree_source_path("dendropy-test-trees-multifurcating-rooted-annotated.nexus")],
+                "nexus",
+                store_tree_weights=True)
+
+    def test_multiple_newick_sources_in_parallel(self):
+        self.verify_skeleton_reading(
+                [pathmap.tree_source_path("cetaceans.raxml.bootstraps.trees"),
+                 pathmap.tree_source_path("cetaceans.mb.no-clock.mcmc.trees")],
+                "nexus/newick",
+                rooting="force-unrooted",
+                num_processes=2)
+
+    def test_unifurcations_and_basal_bifurcations(self):
+        trees = [
+                "((A:1,B:1):1,(C:1,D:1):1);",
+                "((A:1,B:1):1,C:1,D:2);",
+                "((A:1,B:1):1.5,C:1);",
+                "(C:1,(A:1,B:1):1.5);",
+                "(((A:1):2,B:3):1,((C:1)),D:2);",
+                "(((A:1):2,B:3):1,((C:1)):0.5,D:2);",
+                "((A:1,B:1,(C:1,D:1)):2):3;",
+                "(((A,B),C),D);",
+                "(A,,(B,C):2,D:1);",
+                ]
+        for rooting in ("force-unrooted", "force-rooted"):
+            self.verify_skeleton_reading(
+                    trees,
+                    "newick",
+                    rooting=rooting)
+
+    def test_node_ages_with_tip_ages(self):
+        trees = [
+                "[&R] ((A:1,B:3):2,C:5);",
+                "[&R] ((A:1,(B:1,C:1):2):2,D:5);",
+                ]
+        self.verify_skeleton_reading(
+                trees,
+                "newick",
+                tree_array_kwargs={
+                    "ignore_node_ages": False,
+                    "taxon_label_age_map": {"A": 2.0},
+                    })
+
+    def test_non_ultrametric_tree(self):
+        for bitmasks_only in (False, True):
+            self.assertRaises(error.UltrametricityError,
+                    self.read_tree_array,
+                    ["[&R] ((A:1,B:3):2,C:5);"],
+                    "newick",
+                    bitmasks_only,
+                    {"ignore_node_ages": False})
+class TreeArrayColumnarStorage(unittest.TestCase):
+
+    def read_tree_array(self, use_columnar_storage, taxon_namespace=None):
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=taxon_namespace,
+                use_columnar_storage=use_columnar_storage)
+        tree_array.read_from_files(
+                files=[pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")],
+                schema="nexus",
+                tree_offset=150)
+        return tree_array
+
+    def verify_tree_arrays(self, observed, expected):
+        self.assertEqual(
+                [t.label for t in observed.taxon_namespace],
+                [t.label for t in expected.taxon_namespace])
+        self.assertEqual(observed.is_rooted_trees, expected.is_rooted_trees)
+        self.assertEqual(len(observed), len(expected))
+        self.assertEqual(list(observed._tree_split_bitmasks), list(expected._tree_split_bitmasks))
+        self.assertEqual(list(observed._tree_edge_lengths), list(expected._tree_edge_lengths))
+        self.assertEqual(list(observed._tree_leafset_bitmasks), list(expected._tree_leafset_bitmasks))
+        self.assertEqual(list(observed._tree_weights), list(expected._tree_weights))
+        observed_splits = observed.split_distribution
+        expected_splits = expected.split_distribution
+        self.assertEqual(observed_splits.total_trees_counted, expected_splits.total_trees_counted)
+        self.assertEqual(observed_splits.sum_of_tree_weights, expected_splits.sum_of_tree_weights)
+        self.assertEqual(observed_splits.tree_rooting_types_counted, expected_splits.tree_rooting_types_counted)
+        self.assertEqual(dict(observed_splits.split_counts), dict(expected_splits.split_counts))
+        self.assertEqual(dict(observed_splits.split_edge_lengths), dict(expected_splits.split_edge_lengths))
+        self.assertEqual(dict(observed_splits.split_node_ages), dict(expected_splits.split_node_ages))
+
+    def test_storage(self):
+        expected = self.read_tree_array(False)
+        observed = self.read_tree_array(True)
+        self.verify_tree_arrays(observed, expected)
+        for idx in (0, 7, len(expected)-1, -1):
+            self.assertEqual(
+                    observed.get_split_bitmask_and_edge_tuple(idx),
+                    expected.get_split_bitmask_and_edge_tuple(idx))
+        self.assertIn(expected.get_split_bitmask_and_edge_tuple(3)[0], observed)
+
+    def test_insert_and_update(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        expected = self.read_tree_array(False, taxon_namespace)
+        observed = self.read_tree_array(True, taxon_namespace)
+        tree = dendropy.Tree.get(
+                path=pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees"),
+                schema="nexus",
+                taxon_namespace=taxon_namespace)
+        for tree_array in (expected, observed):
+            tree_array.add_tree(tree, index=5)
+            tree_array.add_tree(tree, index=0)
+            tree_array.update(self.read_tree_array(False, taxon_namespace))
+            tree_array.update(self.read_tree_array(True, taxon_namespace))
+        self.assertEqual(len(observed), 3 * len(self.read_tree_array(False, taxon_namespace)) + 2)
+        self.verify_tree_arrays(observed, expected)
+
+    def test_split_support_calculations(self):
+        expected = self.read_tree_array(False)
+        observed = self.read_tree_array(True)
+        for include_external_splits in (False, True):
+            self.assertEqual(
+                    observed.calculate_log_product_of_split_supports(include_external_splits=include_external_splits),
+                    expected.calculate_log_product_of_split_supports(include_external_splits=include_external_splits))
+            self.assertEqual(
+                    observed.calculate_sum_of_split_supports(include_external_splits=include_external_splits),
+                    expected.calculate_sum_of_split_supports(include_external_splits=include_external_splits))
+        self.assertEqual(
+                observed.split_bitmask_set_frequencies(),
+                expected.split_bitmask_set_frequencies())
+        self.assertEqual(
+                [t.frequency for t in observed.topologies(sort_descending=True)],
+                [t.frequency for t in expected.topologies(sort_descending=True)])
+        self.assertEqual(
+                observed.maximum_product_of_split_support_tree().as_string("newick"),
+                expected.maximum_product_of_split_support_tree().as_string("newick"))
+
+    def test_bipartition_encoding_frequencies(self):
+        taxon_namespace = dendropy.TaxonNamespace(["A", "B", "C", "D", "E"])
+        trees = dendropy.TreeList.get(
+                data="[&R] ((A,B),(C,D)); [&R] ((A,B),(C,D)); [&R] (A,(B,(C,D))); [&R] ((A,B),(C,(D,E)));",
+                schema="newick",
+                taxon_namespace=taxon_namespace)
+        expected = {}
+        for tree in trees:
+            bipartition_encoding = frozenset(tree.encode_bipartitions())
+            expected[bipartition_encoding] = expected.get(bipartition_encoding, 0.0) + 1.0/len(trees)
+        for use_columnar_storage in (False, True):
+            tree_array = dendropy.TreeArray(
+                    taxon_namespace=taxon_namespace,
+                    is_rooted_trees=True,
+                    use_columnar_storage=use_columnar_storage)
+            tree_array.add_trees(trees)
+            observed = tree_array.bipartition_encoding_frequencies()
+            self.assertEqual(set(observed), set(expected))
+            for bipartition_encoding in expected:
+                self.assertAlmostEqual(observed[bipartition_encoding], expected[bipartition_encoding])
+
+    def test_save_and_load(self):
+        for use_columnar_storage in (False, True):
+            expected = self.read_tree_array(use_columnar_storage)
+            with pathmap.SandboxedFile("wb") as tempf:
+                tempf.close()
+                expected.save(tempf.name)
+                for load_as_columnar_storage in (False, True):
+                    observed = dendropy.TreeArray.load(tempf.name,
+                            use_columnar_storage=load_as_columnar_storage)
+                    self.assertIs(observed.use_columnar_storage, load_as_columnar_storage)
+                    self.verify_tree_arrays(observed, expected)
+                observed = dendropy.TreeArray.load(tempf.name,
+                        taxon_namespace=expected.taxon_namespace)
+                self.assertIs(observed.taxon_namespace, expected.taxon_namespace)
+                self.verify_tree_arrays(observed, expected)
+                self.assertRaises(ValueError,
+                        dendropy.TreeArray.load,
+                        tempf.name,
+                        taxon_namespace=dendropy.TaxonNamespace(["A", "B"]))
+
+class TreeArrayStreamingSummaries(unittest.TestCase):
+
+    def read_tree_array(self, summary_reservoir_size, taxon_namespace=None, tree_offset=150):
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=taxon_namespace,
+                ignore_node_ages=False,
+                summary_reservoir_size=summary_reservoir_size)
+        tree_array.read_from_files(
+                files=[pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")],
+                schema="nexus",
+                tree_offset=tree_offset)
+        return tree_array
+
+    def test_summaries(self):
+        expected = self.read_tree_array(None).split_distribution
+        observed = self.read_tree_array(10000).split_distribution
+        self.assertEqual(dict(observed.split_counts), dict(expected.split_counts))
+        self.assertEqual(observed.split_edge_length_summaries, expected.split_edge_length_summaries)
+        self.assertEqual(observed.split_node_age_summaries, expected.split_node_age_summaries)
+
+    def test_summaries_with_sampled_values(self):
+        expected = self.read_tree_array(None).split_distribution
+        observed = self.read_tree_array(5).split_distribution
+        for observed_summaries, expected_summaries, values in (
+                (observed.split_edge_length_summaries, expected.split_edge_length_summaries, observed.split_edge_lengths),
+                (observed.split_node_age_summaries, expected.split_node_age_summaries, observed.split_node_ages)):
+            self.assertEqual(set(observed_summaries), set(expected_summaries))
+            for split in expected_summaries:
+                self.assertTrue(len(values[split].reservoir) <= 5)
+                self.assertEqual(set(observed_summaries[split]), set(expected_summaries[split]))
+                self.assertAlmostEqual(observed_summaries[split]["mean"], expected_summaries[split]["mean"])
+                self.assertEqual(observed_summaries[split]["range"], expected_summaries[split]["range"])
+
+    def test_update(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        expected = self.read_tree_array(None, taxon_namespace)
+        expected.update(self.read_tree_array(None, taxon_namespace, tree_offset=100))
+        observed = self.read_tree_array(10000, taxon_namespace)
+        observed.update(self.read_tree_array(10000, taxon_namespace, tree_offset=100))
+        expected = expected.split_distribution
+        observed = observed.split_distribution
+        self.assertEqual(dict(observed.split_counts), dict(expected.split_counts))
+        for observed_summaries, expected_summaries in (
+                (observed.split_edge_length_summaries, expected.split_edge_length_summaries),
+                (observed.split_node_age_summaries, expected.split_node_age_summaries)):
+            self.assertEqual(set(observed_summaries), set(expected_summaries))
+            for split in expected_summaries:
+                self.assertEqual(observed_summaries[split]["median"], expected_summaries[split]["median"])
+                self.assertEqual(observed_summaries[split]["hpd95"], expected_summaries[split]["hpd95"])
+                self.assertAlmostEqual(observed_summaries[split]["mean"], expected_summaries[split]["mean"])
+
+    def test_update_mixed_storage(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        expected = self.read_tree_array(10000, taxon_namespace)
+        expected.update(self.read_tree_array(10000, taxon_namespace, tree_offset=100))
+        observed = self.read_tree_array(10000, taxon_namespace)
+        observed.update(self.read_tree_array(None, taxon_namespace, tree_offset=100))
+        self.assertEqual(len(observed), len(expected))
+        expected = expected.split_distribution
+        observed = observed.split_distribution
+        for observed_values, expected_values in (
+                (observed.split_edge_lengths, expected.split_edge_lengths),
+                (observed.split_node_ages, expected.split_node_ages)):
+            self.assertEqual(set(observed_values), set(expected_values))
+            for split in expected_values:
+                self.assertEqual(observed_values[split].count, expected_values[split].count)
+                self.assertAlmostEqual(observed_values[split].mean, expected_values[split].mean)
+                self.assertAlmostEqual(observed_values[split].sum_of_squared_deviations, expected_values[split].sum_of_squared_deviations)
+        tree_array = self.read_tree_array(None, taxon_namespace)
+        self.assertRaises(dendropy.TreeArray.IncompatibleTreeArrayUpdate,
+                tree_array.update,
+                self.read_tree_array(10000, taxon_namespace, tree_offset=100))
+        self.assertRaises(ValueError,
+                tree_array.split_distribution.update,
+                self.read_tree_array(10000, taxon_namespace, tree_offset=100).split_distribution)
+        self.assertEqual(len(tree_array), len(self.read_tree_array(None, taxon_namespace)))
+
+class TreeArrayColumnsTest(unittest.TestCase):
+
+    def read_tree_array(self, taxon_namespace, tree_offset, **kwargs):
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=taxon_namespace,
+                ignore_node_ages=False,
+                **kwargs)
+        if tree_offset is not None:
+            tree_array.read_from_files(
+                    files=[pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")],
+                    schema="nexus",
+                    tree_offset=tree_offset)
+        return tree_array
+
+    def merge_columns(self, tree_arrays):
+        # writes and reads back the columns of each tree array, and merges
+        # them pairwise: ((1, 2), 3)
+        columns = []
+        with pathmap.SandboxedFile("wb") as tempf:
+            tempf.close()
+            for tree_array in tree_arrays:
+                dendropy.TreeArrayColumns.from_tree_array(tree_array).write(tempf.name)
+                columns.append(dendropy.TreeArrayColumns.read(tempf.name,
+                        share_split_bitmasks_with=(columns[0] if columns else None)))
+        columns[0].update(columns[1])
+        columns[0].update(columns[2])
+        return columns[0]
+
+    def test_update(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        tree_arrays = [self.read_tree_array(taxon_namespace, tree_offset) for tree_offset in (150, 100, 180)]
+        expected = self.read_tree_array(taxon_namespace, None)
+        for tree_array in tree_arrays:
+            expected.update(tree_array)
+        columns = self.merge_columns(tree_arrays)
+        self.assertEqual(len(columns), len(expected))
+        for use_columnar_storage in (False, True):
+            observed = columns.to_tree_array(
+                    taxon_namespace=taxon_namespace,
+                    use_columnar_storage=use_columnar_storage)
+            self.assertIs(observed.use_columnar_storage, use_columnar_storage)
+            self.assertEqual(list(observed._tree_split_bitmasks), list(expected._tree_split_bitmasks))
+            self.assertEqual(list(observed._tree_edge_lengths), list(expected._tree_edge_lengths))
+            self.assertEqual(list(observed._tree_leafset_bitmasks), list(expected._tree_leafset_bitmasks))
+            self.assertEqual(list(observed._tree_weights), list(expected._tree_weights))
+            observed_splits = observed.split_distribution
+            expected_splits = expected.split_distribution
+            self.assertEqual(observed_splits.total_trees_counted, expected_splits.total_trees_counted)
+            self.assertEqual(observed_splits.sum_of_tree_weights, expected_splits.sum_of_tree_weights)
+            self.assertEqual(observed_splits.tree_rooting_types_counted, expected_splits.tree_rooting_types_counted)
+            self.assertEqual(list(observed_splits.split_counts.items()), list(expected_splits.split_counts.items()))
+            for observed_values, expected_values in (
+                    (observed_splits.split_edge_lengths, expected_splits.split_edge_lengths),
+                    (observed_splits.split_node_ages, expected_splits.split_node_ages)):
+                self.assertEqual(list(observed_values.items()), list(expected_values.items()))
+                for split in expected_values:
+                    self.assertEqual(
+                            [type(v) for v in observed_values[split]],
+                            [type(v) for v in expected_values[split]])
+
+    def test_update_summaries(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        tree_arrays = [self.read_tree_array(taxon_namespace, tree_offset, summary_reservoir_size=10000) for tree_offset in (150, 100, 180)]
+        expected = self.read_tree_array(taxon_namespace, None, summary_reservoir_size=10000)
+        for tree_array in tree_arrays:
+            expected.update(tree_array)
+        observed = self.merge_columns(tree_arrays).to_tree_array(taxon_namespace=taxon_namespace)
+        expected = expected.split_distribution
+        observed = observed.split_distribution
+        self.assertEqual(dict(observed.split_counts), dict(expected.split_counts))
+        for observed_summaries, expected_summaries in (
+                (observed.split_edge_length_summaries, expected.split_edge_length_summaries),
+                (observed.split_node_age_summaries, expected.split_node_age_summaries)):
+            self.assertEqual(set(observed_summaries), set(expected_summaries))
+            for split in expected_summaries:
+                self.assertEqual(observed_summaries[split]["median"], expected_summaries[split]["median"])
+                self.assertEqual(observed_summaries[split]["range"], expected_summaries[split]["range"])
+                self.assertAlmostEqual(observed_summaries[split]["mean"], expected_summaries[split]["mean"])
+                self.assertAlmostEqual(observed_summaries[split]["var"], expected_summaries[split]["var"])
+
+    def test_incompatible_update(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        columns = dendropy.TreeArrayColumns.from_tree_array(self.read_tree_array(taxon_namespace, 180))
+        other = dendropy.TreeArrayColumns.from_tree_array(self.read_tree_array(taxon_namespace, 180, summary_reservoir_size=10))
+        self.assertRaises(dendropy.TreeArray.IncompatibleTreeArrayUpdate, columns.update, other)
+        other = dendropy.TreeArrayColumns.from_tree_array(self.read_tree_array(taxon_namespace, 180, ignore_edge_lengths=True))
+        self.assertRaises(dendropy.TreeArray.IncompatibleEdgeLengthsTreeArrayUpdate, columns.update, other)
+
+class TreeArrayCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.source_path = pathmap.tree_source_path("cetaceans.mb.strict-clock.mcmc.trees")
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def read_tree_array(self, tree_cache, tree_offset, **kwargs):
+        tree_array = dendropy.TreeArray(ignore_node_ages=False)
+        if tree_cache is None:
+            tree_array.read_from_files(
+                    files=[self.source_path],
+                    schema="nexus",
+                    tree_offset=tree_offset,
+                    **kwargs)
+            is_cached = None
+        else:
+            is_cached = tree_cache.read_into(tree_array,
+                    path=self.source_path,
+                    schema="nexus",
+                    tree_offset=tree_offset,
+                    **kwargs)
+        return tree_array, is_cached
+
+    def verify_tree_arrays(self, observed, expected):
+        self.assertEqual(
+                [t.label for t in observed.taxon_namespace],
+                [t.label for t in expected.taxon_namespace])
+        self.assertEqual(observed.is_rooted_trees, expected.is_rooted_trees)
+        self.assertEqual(observed._tree_split_bitmasks, expected._tree_split_bitmasks)
+        self.assertEqual(observed._tree_edge_lengths, expected._tree_edge_lengths)
+        self.assertEqual(observed._tree_leafset_bitmasks, expected._tree_leafset_bitmasks)
+        self.assertEqual(observed._tree_weights, expected._tree_weights)
+        observed_splits = observed.split_distribution
+        expected_splits = expected.split_distribution
+        self.assertEqual(observed_splits.total_trees_counted, expected_splits.total_trees_counted)
+        self.assertEqual(observed_splits.tree_rooting_types_counted, expected_splits.tree_rooting_types_counted)
+        self.assertEqual(dict(observed_splits.split_counts), dict(expected_splits.split_counts))
+        for observed_values, expected_values in (
+                (observed_splits.split_edge_lengths, expected_splits.split_edge_lengths),
+                (observed_splits.split_node_ages, expected_splits.split_node_ages)):
+            self.assertEqual(dict(observed_values), dict(expected_values))
+            for split in expected_values:
+                self.assertEqual(
+                        [type(v) for v in observed_values[split]],
+                        [type(v) for v in expected_values[split]])
+
+    def test_read_into(self):
+        tree_cache = dendropy.TreeArrayCache(self.cache_dir)
+        for bitmasks_only in (False, True):
+            for tree_offset, expected_is_cached in ((150, False), (150, True), (200, True)):
+                expected, is_cached = self.read_tree_array(None, tree_offset, bitmasks_only=bitmasks_only)
+                observed, is_cached = self.read_tree_array(tree_cache, tree_offset, bitmasks_only=bitmasks_only)
+                self.assertIs(is_cached, expected_is_cached)
+                self.verify_tree_arrays(observed, expected)
+
+    def test_options_in_key(self):
+        tree_cache = dendropy.TreeArrayCache(self.cache_dir)
+        observed, is_cached = self.read_tree_array(tree_cache, 0)
+        self.assertFalse(is_cached)
+        observed, is_cached = self.read_tree_array(tree_cache, 0, rooting="force-unrooted")
+        self.assertFalse(is_cached)
+        self.assertFalse(observed.is_rooted_trees)
+        observed, is_cached = self.read_tree_array(tree_cache, 0, rooting="force-unrooted")
+        self.assertTrue(is_cached)
+        self.assertFalse(observed.is_rooted_trees)
+
+    def test_corrupt_entry(self):
+        tree_cache = dendropy.TreeArrayCache(self.cache_dir)
+        self.read_tree_array(tree_cache, 0)
+        for filename in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, filename), "wb") as dest:
+                dest.write(b"x")
+        expected, is_cached = self.read_tree_array(None, 10)
+        observed, is_cached = self.read_tree_array(tree_cache, 10)
+        self.assertFalse(is_cached)
+        self.verify_tree_arrays(observed, expected)
+        observed, is_cached = self.read_tree_array(tree_cache, 10)
+        self.assertTrue(is_cached)
+
+    def test_least_recently_used_discarded(self):
+        tree_cache = dendropy.TreeArrayCache(self.cache_dir)
+        self.read_tree_array(tree_cache, 0)
+        entry_size = sum(os.path.getsize(os.path.join(self.cache_dir, f)) for f in os.listdir(self.cache_dir))
+        tree_cache = dendropy.TreeArrayCache(self.cache_dir, max_size=int(entry_size * 1.5))
+        self.read_tree_array(tree_cache, 0, rooting="force-unrooted")
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        observed, is_cached = self.read_tree_array(tree_cache, 0, rooting="force-unrooted")
+        self.assertTrue(is_cached)
+        observed, is_cached = self.read_tree_array(tree_cache, 0)
+        self.assertFalse(is_cached)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,202 @@
+#! /usr/bin/env python
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests of discrete character evolution models and simulation.
+"""
+
+import random
+import unittest
+import dendropy
+from dendropy.calculate import probability
+from dendropy.model import discrete
+
+class GammaDistributionTests(unittest.TestCase):
+
+    def test_gamma_cdf(self):
+        # exponential distribution
+        for x in (0.1, 1.0, 3.5):
+            self.assertAlmostEqual(probability.gamma_cdf(x, 1.0, 2.0), 1.0 - probability.math.exp(-x / 2.0))
+        # chi-square with 2 degrees of freedom has median 2 ln(2)
+        self.assertAlmostEqual(probability.gamma_cdf(1.3862943611198906, 1.0, 2.0), 0.5)
+        self.assertEqual(probability.gamma_cdf(0.0, 2.0), 0.0)
+
+    def test_gamma_quantile(self):
+        for shape in (0.2, 0.5, 1.0, 2.0, 10.0):
+            for p in (0.01, 0.25, 0.5, 0.75, 0.99):
+                x = probability.gamma_quantile(p, shape, 1.0 / shape)
+                self.assertAlmostEqual(probability.gamma_cdf(x, shape, 1.0 / shape), p)
+
+    def test_discrete_gamma_rates(self):
+        # Yang (1994); values as given by PAML
+        expected = [0.03338775, 0.25191592, 0.82026848, 2.89442785]
+        rates = discrete.discrete_gamma_rates(0.5, 4)
+        for r1, r2 in zip(rates, expected):
+            self.assertAlmostEqual(r1, r2, 6)
+        expected = [0.02907775, 0.28071454, 0.92477307, 2.76543464]
+        rates = discrete.discrete_gamma_rates(0.5, 4, use_median=True)
+        for r1, r2 in zip(rates, expected):
+            self.assertAlmostEqual(r1, r2, 6)
+        for shape in (0.1, 1.0, 5.0):
+            for num_categories in (1, 2, 4, 8):
+                rates = discrete.discrete_gamma_rates(shape, num_categories)
+                self.assertEqual(len(rates), num_categories)
+                self.assertAlmostEqual(sum(rates) / num_categories, 1.0)
+                self.assertEqual(rates, sorted(rates))
+
+class Hky85ModelTests(unittest.TestCase):
+
+    def setUp(self):
+        self.model = discrete.Hky85(kappa=3.0, base_freqs=[0.1, 0.2, 0.3, 0.4])
+
+    def test_pmatrix(self):
+        for tlen, rate in ((0.0, 1.0), (0.01, 1.0), (0.3, 1.5), (5.0, 2.0)):
+            pmatrix = self.model.pmatrix(tlen, rate)
+            for i in range(4):
+                self.assertAlmostEqual(sum(pmatrix[i]), 1.0)
+                for j in range(4):
+                    self.assertEqual(pmatrix[i][j], self.model.pij(i, j, tlen, rate))
+
+    def test_cached_pmatrix(self):
+        pmatrix = self.model.cached_pmatrix(0.3, 1.5)
+        self.assertIs(self.model.cached_pmatrix(0.3, 1.5), pmatrix)
+        self.assertEqual(pmatrix, self.model.pmatrix(0.3, 1.5))
+        self.assertIsNot(self.model.cached_pmatrix(0.3, 1.0), pmatrix)
+        self.model.kappa = 2.0
+        pmatrix2 = self.model.cached_pmatrix(0.3, 1.5)
+        self.assertIsNot(pmatrix2, pmatrix)
+        self.assertEqual(pmatrix2, self.model.pmatrix(0.3, 1.5))
+        self.model.max_pmatrix_cache_size = 2
+        for tlen in (0.1, 0.2, 0.4, 0.5):
+            self.model.cached_pmatrix(tlen)
+        self.assertTrue(len(self.model._pmatrix_cache) <= 2)
+
+    def test_substitution_frequencies(self):
+        rng = random.Random(1)
+        seq_len = 20000
+        tlen = 0.4
+        pmatrix = self.model.pmatrix(tlen)
+        for state_i in range(4):
+            ancestral = bytearray([state_i] * seq_len)
+            desc = self.model.simulate_descendant_state_indexes(ancestral, tlen, rng=rng)
+            for state_j in range(4):
+                freq = float(list(desc).count(state_j)) / seq_len
+                # about five standard errors
+                self.assertAlmostEqual(freq, pmatrix[state_i][state_j], delta=0.02)
+
+    def test_substitution_frequencies_with_rate_categories(self):
+        rng = random.Random(1)
+        seq_len = 20000
+        tlen = 0.4
+        category_rates = [0.2, 3.0]
+        site_categories = bytearray([site_idx % 2 for site_idx in range(seq_len)])
+        ancestral = bytearray([0] * seq_len)
+        desc = self.model.simulate_descendant_state_indexes(
+                ancestral,
+                tlen,
+                site_categories=site_categories,
+                category_rates=category_rates,
+                rng=rng)
+        for category_idx, rate in enumerate(category_rates):
+            pmatrix = self.model.pmatrix(tlen, rate)
+            desc_category = desc[category_idx::2]
+            for state_j in range(4):
+                freq = float(list(desc_category).count(state_j)) / len(desc_category)
+                self.assertAlmostEqual(freq, pmatrix[0][state_j], delta=0.03)
+
+    def test_stationary_sample(self):
+        rng = random.Random(1)
+        seq_len = 20000
+        states = self.model.stationary_sample(seq_len, rng=rng)
+        self.assertEqual(len(states), seq_len)
+        for state_idx, freq in enumerate(self.model.base_freqs):
+            state = self.model.state_alphabet[state_idx]
+            self.assertAlmostEqual(float(states.count(state)) / seq_len, freq, delta=0.02)
+
+class CharacterSimulationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = dendropy.Tree.get(
+                data="((a:0.1,b:0.2):0.05,(c:0.3,(d:0.05,e:0.5):0.1):0.2);",
+                schema="newick")
+
+    def test_hky85_chars(self):
+        for gamma_shape in (None, 0.5):
+            char_matrix1 = discrete.hky85_chars(
+                    500,
+                    self.tree,
+                    kappa=2.0,
+                    gamma_shape=gamma_shape,
+                    rng=random.Random(1))
+            self.assertEqual(len(char_matrix1), 5)
+            for taxon in self.tree.taxon_namespace:
+                self.assertEqual(len(char_matrix1[taxon]), 500)
+            char_matrix2 = discrete.hky85_chars(
+                    500,
+                    self.tree,
+                    kappa=2.0,
+                    gamma_shape=gamma_shape,
+                    rng=random.Random(1))
+            for taxon in self.tree.taxon_namespace:
+                self.assertEqual(char_matrix1[taxon].symbols_as_string(),
+                        char_matrix2[taxon].symbols_as_string())
+            for nd in self.tree:
+                self.assertFalse(hasattr(nd, "sequences"))
+
+    def test_retain_sequences_on_tree(self):
+        char_matrix = discrete.hky85_chars(
+                100,
+                self.tree,
+                retain_sequences_on_tree=True,
+                rng=random.Random(1))
+        for leaf in self.tree.leaf_node_iter():
+            self.assertEqual(list(char_matrix[leaf.taxon]), leaf.sequences[0])
+        discrete.hky85_chars(
+                50,
+                self.tree,
+                retain_sequences_on_tree=True,
+                rng=random.Random(1))
+        for nd in self.tree:
+            self.assertEqual([len(seq) for seq in nd.sequences], [100, 50])
+
+    def test_root_states(self):
+        for nd in self.tree:
+            nd.edge.length = 0.0
+        root_states = list(dendropy.DNA_STATE_ALPHABET.get_states_for_symbols("ACGTTGCA"))
+        char_matrix = discrete.hky85_chars(
+                8,
+                self.tree,
+                root_states=root_states,
+                rng=random.Random(1))
+        for taxon in self.tree.taxon_namespace:
+            self.assertEqual(char_matrix[taxon].symbols_as_string(), "ACGTTGCA")
+
+    def test_simulate_discrete_char_dataset(self):
+        dataset = discrete.simulate_discrete_char_dataset(
+                200,
+                self.tree,
+                discrete.Jc69(),
+                rng=random.Random(1))
+        self.assertEqual(len(dataset.char_matrices), 1)
+        char_matrix = dataset.char_matrices[0]
+        self.assertIs(char_matrix.taxon_namespace, self.tree.taxon_namespace)
+        for taxon in self.tree.taxon_namespace:
+            self.assertEqual(len(char_matrix[taxon]), 200)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+#! /usr/bin/env python
+
+##############################################################################
+##  DendroPy Phylogenetic Computing Library.
+##
+##  Copyright 2010-2015 Jeet Sukumaran and Mark T. Holder.
+##  All rights reserved.
+##
+##  See "LICENSE.rst" for terms and conditions of usage.
+##
+##  If you use this work or any portion thereof in published work,
+##  please cite it as:
+##
+##     Sukumaran, J. and M. T. Holder. 2010. DendroPy: a Python library
+##     for phylogenetic computing. Bioinformatics 26: 1569-1571.
+##
+##############################################################################
+
+"""
+Tests on-demand importing of the 'dendropy' namespace and the schema-specific
+reader/writer services.
+"""
+
+import os
+import sys
+import json
+import importlib
+import subprocess
+import unittest
+import dendropy
+from dendropy import dataio
+
+# Names exported by ``from dendropy import *`` before the names of the
+# ``dendropy`` namespace were imported on demand (other than the ``sys`` and
+# ``collections`` modules, which were only exported by accident).
+PREVIOUSLY_EXPORTED_NAMES = frozenset([
+    "BINARY_STATE_ALPHABET", "Bipartition", "CharacterDataSequence",
+    "CharacterMatrix", "ContinuousCharacterDataSequence",
+    "ContinuousCharacterMatrix", "DNA_STATE_ALPHABET", "DataParseError",
+    "DataSet", "DnaCharacterDataSequence", "DnaCharacterMatrix", "Edge",
+    "INFINITE_SITES_STATE_ALPHABET", "ImmutableTaxonNamespaceError",
+    "InfiniteSitesCharacterDataSequence", "InfiniteSitesCharacterMatrix",
+    "InvalidArgumentValueError", "MultipleInitializationSourceError",
+    "NUCLEOTIDE_STATE_ALPHABET", "Node", "NucleotideCharacterDataSequence",
+    "NucleotideCharacterMatrix", "PACKAGE_VERSION", "PROTEIN_STATE_ALPHABET",
+    "PhylogeneticDistanceMatrix", "ProteinCharacterDataSequence",
+    "ProteinCharacterMatrix", "RESTRICTION_SITES_STATE_ALPHABET",
+    "RNA_STATE_ALPHABET", "RestrictionSitesCharacterDataSequence",
+    "RestrictionSitesCharacterMatrix", "RnaCharacterDataSequence",
+    "RnaCharacterMatrix", "SeedNodeDeletionException", "SplitDistribution",
+    "StandardCharacterDataSequence", "StandardCharacterMatrix",
+    "StateAlphabet", "Taxon", "TaxonNamespace", "TaxonNamespaceIdentityError",
+    "TaxonNamespaceMapping", "TaxonNamespacePartition",
+    "TaxonNamespaceReconstructionError", "TaxonSet", "TooManyArgumentsError",
+    "Tree", "TreeArray", "TreeList", "TreeSimTotalExtinctionException",
+    "UltrametricityError", "UnspecifiedSchemaError", "UnspecifiedSourceError",
+    "UnsupportedSchemaError", "calculate", "citation_info", "coalescent",
+    "continuous", "dataio", "datamodel", "deprecate", "description",
+    "description_text", "get_rooting_argument", "homedir", "interop",
+    "legacy", "model", "multi_tree_source_iter", "name",
+    "new_standard_state_alphabet", "popgensim", "popgenstat", "reconcile",
+    "revision_description", "seqmodel", "seqsim", "simulate", "treecalc",
+    "treemanip", "treesim", "treesplit", "treesum", "utility", "version_info",
+])
+
+class PackageNamespaceTestCase(unittest.TestCase):
+
+    def test_names_resolve(self):
+        for name, (module_name, attr_name) in dendropy._LAZY_ATTRIBUTES.items():
+            expected = importlib.import_module(module_name)
+            if attr_name is not None:
+                expected = getattr(expected, attr_name)
+            self.assertIs(getattr(dendropy, name), expected, name)
+
+    def test_from_import(self):
+        from dendropy import Tree, TreeList, DnaCharacterMatrix, treesim
+        from dendropy.datamodel import treemodel
+        self.assertIs(Tree, treemodel.Tree)
+        self.assertIs(treesim, sys.modules["dendropy.legacy.treesim"])
+
+    def test_star_import(self):
+        namespace = {}
+        exec("from dendropy import *", namespace)
+        for name in ("Tree", "TreeList", "DnaCharacterMatrix", "treesim", "calculate", "version_info", "citation_info"):
+            self.assertIs(namespace[name], getattr(dendropy, name))
+        self.assertEqual(set(namespace) - set(["__builtins__"]), set(dendropy.__all__))
+        self.assertTrue(set(dendropy._LAZY_ATTRIBUTES) <= set(dendropy.__all__))
+        self.assertTrue(dendropy._SUBPACKAGES <= set(dendropy.__all__))
+        missing = PREVIOUSLY_EXPORTED_NAMES - set(namespace)
+        self.assertFalse(missing, "no longer exported by 'from dendropy import *': {}".format(", ".join(sorted(missing))))
+
+    def test_dir(self):
+        names = dir(dendropy)
+        for name in dendropy._LAZY_ATTRIBUTES:
+            self.assertIn(name, names)
+        self.assertIn("__version__", names)
+
+    def test_unknown_name(self):
+        with self.assertRaises(AttributeError):
+            dendropy.NoSuchName
+
+@unittest.skipIf(sys.version_info < (3, 5), "names are imported up front on Python 2")
+class OnDemandImportTestCase(unittest.TestCase):
+
+    def get_imported_modules(self, statements):
+        script = "\n".join(statements + [
+            "import sys, json",
+            "json.dump(sorted(m for m in sys.modules if m.startswith('dendropy')), sys.stdout)",
+            ])
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join([os.path.dirname(os.path.dirname(dendropy.__file__))]
+                + [p for p in [env.get("PYTHONPATH")] if p])
+        output = subprocess.check_output([sys.executable, "-c", script], env=env)
+        return set(json.loads(output.decode("utf-8")))
+
+    def test_import_package(self):
+        modules = self.get_imported_modules(["import dendropy"])
+        self.assertEqual(modules, set(["dendropy"]))
+
+    def test_schema_services(self):
+        modules = self.get_imported_modules([
+            "import dendropy",
+            "dendropy.Tree.get(data='(a,b);', schema='newick')",
+            ])
+        self.assertIn("dendropy.datamodel.treemodel", modules)
+        self.assertIn("dendropy.dataio.newickreader", modules)
+        for name in ("nexmlreader", "nexmlwriter", "fastareader", "phylipreader", "nexusreader", "nexuswriter"):
+            self.assertNotIn("dendropy.dataio." + name, modules)
+        self.assertNotIn("dendropy.legacy.treesim", modules)
+
+class ServiceRegistryTestCase(unittest.TestCase):
+
+    def test_builtin_services(self):
+        for schema in ("newick", "nexus", "nexml", "fasta", "dnafasta", "phylip"):
+            reader = dataio.get_reader(schema)
+            writer = dataio.get_writer(schema)
+            self.assertEqual(type(reader).__module__, "dendropy.dataio.{}reader".format(schema.replace("dna", "")))
+            self.assertEqual(type(writer).__module__, "dendropy.dataio.{}writer".format(schema.replace("dna", "")))
+
+    def test_unsupported_service(self):
+        with self.assertRaises(NotImplementedError):
+            dataio.get_reader("no_such_schema")
+        with self.assertRaises(NotImplementedError):
+            dataio.get_reader("nexus/newick")
+        with self.assertRaises(NotImplementedError):
+            dataio.get_tree_yielder(files=[], schema="fasta", taxon_namespace=None, tree_type=None)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,9 +20,11 @@
 Tests of parsimony scoring.
 """
 
+import random
 import unittest
 import dendropy
 from dendropy.calculate import treescore
+from dendropy.model import parsimony
 from dendropy.test.support import pathmap
 
 class ParsimonyScoringTest(unittest.TestCase):
@@ -488,6 +490,106 @@ class ParsimonyScoringTest(unittest.TestCase):
                     gaps_as_missing=gaps_as_missing)
             self.assertEqual(pscore, expected_scores[tree_idx])
 
+            # without setting the state sets of the nodes
+            score_by_character_list = []
+            pscore = treescore.parsimony_score(
+                    tree,
+                    chars,
+                    gaps_as_missing=gaps_as_missing,
+                    score_by_character_list=score_by_character_list,
+                    state_sets_attr_name=None)
+            self.assertEqual(pscore, expected_scores[tree_idx])
+            self.assertEqual(score_by_character_list, expected_per_site_scores[tree_idx])
+
+        # same scorer for all trees
+        scorer = treescore.FitchParsimonyScorer.from_char_matrix(
+                chars,
+                gaps_as_missing=gaps_as_missing)
+        for tree_idx, tree in enumerate(trees):
+            self.assertEqual(scorer.parsimony_score(tree), expected_scores[tree_idx])
+            self.assertEqual(scorer.score_by_character(tree), expected_per_site_scores[tree_idx])
+
+class FitchParsimonyScorerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.taxon_namespace = dendropy.TaxonNamespace()
+        self.chars = dendropy.StandardCharacterMatrix.get(
+                path=pathmap.char_source_path("apternodus.chars.nexus"),
+                schema="nexus",
+                taxon_namespace=self.taxon_namespace)
+        self.trees = dendropy.TreeList.get(
+                path=pathmap.tree_source_path("apternodus.tre"),
+                schema="nexus",
+                taxon_namespace=self.taxon_namespace)
+        self.taxon_state_sets_map = self.chars.taxon_state_sets_map(gaps_as_missing=False)
+
+    def verify_against_fitch_down_pass(self, tree, weights):
+        expected_score_by_character_list = []
+        expected_score = parsimony.fitch_down_pass(
+                tree.postorder_node_iter(),
+                state_sets_attr_name=None,
+                taxon_state_sets_map=self.taxon_state_sets_map,
+                weights=weights,
+                score_by_character_list=expected_score_by_character_list)
+        scorer = parsimony.FitchParsimonyScorer(
+                taxon_state_sets_map=self.taxon_state_sets_map,
+                weights=weights)
+        score_by_character_list = []
+        score = scorer.parsimony_score(tree, score_by_character_list=score_by_character_list)
+        self.assertEqual(score, expected_score)
+        self.assertEqual(score_by_character_list, expected_score_by_character_list)
+
+    def test_weights(self):
+        rng = random.Random(1)
+        weights = [rng.choice([0, 1, 2, 5, 0.5]) for idx in range(self.chars.max_sequence_size)]
+        for tree in self.trees[-3:]:
+            self.verify_against_fitch_down_pass(tree, weights)
+
+    def test_multifurcations(self):
+        rng = random.Random(1)
+        for tree in self.trees[-3:]:
+            for nd in list(tree.postorder_internal_node_iter(exclude_seed_node=True)):
+                if rng.uniform(0, 1) < 0.3:
+                    nd.edge.collapse()
+            self.assertTrue(any(len(nd._child_nodes) > 2 for nd in tree))
+            self.verify_against_fitch_down_pass(tree, None)
+
+    def test_pattern_compression(self):
+        # each character repeated
+        taxon_state_sets_map = {}
+        for taxon in self.taxon_state_sets_map:
+            taxon_state_sets_map[taxon] = self.taxon_state_sets_map[taxon] * 3
+        scorer = parsimony.FitchParsimonyScorer(taxon_state_sets_map=taxon_state_sets_map)
+        self.assertEqual(scorer.num_characters, 3 * self.chars.max_sequence_size)
+        self.assertEqual(scorer.num_patterns, self.chars.max_sequence_size)
+        for tree in self.trees[-3:]:
+            expected_score_by_character_list = []
+            expected_score = parsimony.fitch_down_pass(
+                    tree.postorder_node_iter(),
+                    state_sets_attr_name=None,
+                    taxon_state_sets_map=self.taxon_state_sets_map,
+                    score_by_character_list=expected_score_by_character_list)
+            self.assertEqual(scorer.parsimony_score(tree), 3 * expected_score)
+            self.assertEqual(scorer.score_by_character(tree), expected_score_by_character_list * 3)
+
+    def test_parsimony_score_state_sets(self):
+        tree = self.trees[-1]
+        expected_score = treescore.parsimony_score(tree, self.chars,
+                gaps_as_missing=False,
+                state_sets_attr_name=None)
+        self.assertFalse(any(hasattr(nd, "state_sets") for nd in tree))
+        score = treescore.parsimony_score(tree, self.chars, gaps_as_missing=False)
+        self.assertEqual(score, expected_score)
+        for nd in tree:
+            self.assertEqual(len(nd.state_sets), self.chars.max_sequence_size)
+        parsimony.fitch_up_pass(tree.preorder_node_iter())
+
+    def test_weights_validation(self):
+        with self.assertRaises(ValueError):
+            parsimony.FitchParsimonyScorer(
+                    taxon_state_sets_map=self.taxon_state_sets_map,
+                    weights=[1, 2])
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -17,6 +17,7 @@
 ##############################################################################
 
 import unittest
+import random
 import dendropy
 import csv
 from dendropy.utility import container
@@ -507,6 +508,22 @@ class PhylogeneticEcologyStatsTests(unittest.TestCase):
                     expected_results_data_table[expected_result_row_name, "mntd.obs.p"],
                     ))
 
+    def test_ses_reproducible_across_processes(self):
+        for method_name in (
+                "standardized_effect_size_mean_pairwise_distance",
+                "standardized_effect_size_mean_nearest_taxon_distance"):
+            for is_weighted_edge_distances in (True, False):
+                results = []
+                for num_processes in (1, 1, 2, 3):
+                    results.append(getattr(self.pdm, method_name)(
+                            assemblage_memberships=self.assemblage_memberships,
+                            num_randomization_replicates=20,
+                            is_weighted_edge_distances=is_weighted_edge_distances,
+                            rng=random.Random(42),
+                            num_processes=num_processes))
+                for r in results[1:]:
+                    self.assertEqual(r, results[0])
+
 class PhylogeneticDistanceMatrixReader(unittest.TestCase):
 
     def setUp(self):
@@ -792,6 +809,128 @@ class PdmUpgmaTree(PdmTreeChecker, unittest.TestCase):
             self.check_tree(obs_tree=obs_tree,
                     expected_tree=expected_tree)
 
+class ArrayPhylogeneticDistanceMatrixTest(unittest.TestCase):
+
+    def setUp(self):
+        with open(pathmap.other_source_path("pythonidae.mle.weighted.pdm.csv")) as src:
+            self.reference_pdm_weighted_table = container.DataTable.from_csv(src, default_data_type=float, delimiter=",")
+        with open(pathmap.other_source_path("pythonidae.mle.unweighted.pdm.csv")) as src:
+            self.reference_pdm_unweighted_table = container.DataTable.from_csv(src, default_data_type=float, delimiter=",")
+        self.tree = dendropy.Tree.get(path=pathmap.tree_source_path(
+            "pythonidae.mle.nex"),
+            schema="nexus",
+            preserve_underscores=True)
+        self.expected_pdm = dendropy.PhylogeneticDistanceMatrix.from_tree(self.tree)
+
+    def check_pdm(self, pdm, places=None):
+        self.assertIs(pdm.taxon_namespace, self.tree.taxon_namespace)
+        self.assertEqual(set(pdm.taxon_iter()), set(self.tree.taxon_namespace))
+        self.assertEqual(pdm._tree_length, self.expected_pdm._tree_length)
+        self.assertEqual(pdm._num_edges, self.expected_pdm._num_edges)
+        for taxon1 in self.tree.taxon_namespace:
+            for taxon2 in self.tree.taxon_namespace:
+                self.assertAlmostEqual(
+                        pdm.patristic_distance(taxon1, taxon2),
+                        self.reference_pdm_weighted_table[taxon1.label, taxon2.label],
+                        6)
+                self.assertEqual(
+                        pdm.path_edge_count(taxon1, taxon2),
+                        self.reference_pdm_unweighted_table[taxon1.label, taxon2.label])
+                if places is None:
+                    self.assertEqual(
+                            pdm.patristic_distance(taxon1, taxon2),
+                            self.expected_pdm.patristic_distance(taxon1, taxon2))
+                else:
+                    self.assertAlmostEqual(
+                            pdm.patristic_distance(taxon1, taxon2),
+                            self.expected_pdm.patristic_distance(taxon1, taxon2),
+                            places)
+                self.assertEqual(
+                        pdm._taxon_phylogenetic_distances[taxon1][taxon2],
+                        pdm.patristic_distance(taxon1, taxon2))
+                self.assertIs(pdm.mrca(taxon1, taxon2), self.expected_pdm.mrca(taxon1, taxon2))
+        for is_weighted_edge_distances in (True, False):
+            for is_normalize_by_tree_size in (True, False):
+                kwargs = {
+                    "is_weighted_edge_distances": is_weighted_edge_distances,
+                    "is_normalize_by_tree_size": is_normalize_by_tree_size,
+                }
+                obs = sorted(pdm.distances(**kwargs))
+                exp = sorted(self.expected_pdm.distances(**kwargs))
+                self.assertEqual(len(obs), len(exp))
+                for d1, d2 in zip(obs, exp):
+                    self.assertAlmostEqual(d1, d2, places or 12)
+                self.assertAlmostEqual(
+                        pdm.mean_pairwise_distance(**kwargs),
+                        self.expected_pdm.mean_pairwise_distance(**kwargs),
+                        places or 12)
+                self.assertAlmostEqual(
+                        pdm.mean_nearest_taxon_distance(**kwargs),
+                        self.expected_pdm.mean_nearest_taxon_distance(**kwargs),
+                        places or 12)
+        self.assertEqual(
+                set(pdm.max_pairwise_distance_taxa()),
+                set(self.expected_pdm.max_pairwise_distance_taxa()))
+        filter_fn = lambda taxon: taxon.label.startswith("Morelia")
+        self.assertAlmostEqual(
+                pdm.mean_pairwise_distance(filter_fn=filter_fn),
+                self.expected_pdm.mean_pairwise_distance(filter_fn=filter_fn),
+                places or 12)
+        self.assertEqual(
+                set(frozenset(p) for p in pdm.distinct_taxon_pair_iter(filter_fn=filter_fn)),
+                set(frozenset(p) for p in self.expected_pdm.distinct_taxon_pair_iter(filter_fn=filter_fn)))
+
+    def test_compile_from_tree(self):
+        pdm = dendropy.ArrayPhylogeneticDistanceMatrix.from_tree(self.tree)
+        self.check_pdm(pdm)
+
+    def test_single_precision(self):
+        pdm = dendropy.ArrayPhylogeneticDistanceMatrix.from_tree(self.tree, is_single_precision=True)
+        self.check_pdm(pdm, places=6)
+
+    def test_memory_mapped(self):
+        pdm = dendropy.ArrayPhylogeneticDistanceMatrix.from_tree(self.tree, is_memory_mapped=True)
+        self.check_pdm(pdm)
+        pdm = dendropy.ArrayPhylogeneticDistanceMatrix.from_tree(self.tree, is_memory_mapped=True, is_single_precision=True)
+        self.check_pdm(pdm, places=6)
+
+    def test_clone_and_shuffle(self):
+        pdm0 = dendropy.ArrayPhylogeneticDistanceMatrix.from_tree(self.tree)
+        pdm1 = pdm0.clone()
+        self.assertEqual(pdm0, pdm1)
+        taxon_map = pdm1.shuffle_taxa(is_shuffle_mrca=False, rng=random.Random(1))
+        self.assertNotEqual(pdm0, pdm1)
+        self.check_pdm(pdm0)
+        for taxon1 in pdm0.taxon_iter():
+            for taxon2 in pdm0.taxon_iter():
+                self.assertEqual(
+                        pdm0.patristic_distance(taxon1, taxon2),
+                        pdm1.patristic_distance(taxon_map[taxon1], taxon_map[taxon2]))
+                self.assertEqual(
+                        pdm0.path_edge_count(taxon1, taxon2),
+                        pdm1.path_edge_count(taxon_map[taxon1], taxon_map[taxon2]))
+                self.assertIs(pdm0.mrca(taxon1, taxon2), pdm1.mrca(taxon1, taxon2))
+        self.assertEqual(sorted(pdm0.distances()), sorted(pdm1.distances()))
+
+    def test_standardized_effect_size(self):
+        pdm = dendropy.ArrayPhylogeneticDistanceMatrix.from_tree(self.tree)
+        taxa = sorted(self.tree.taxon_namespace, key=lambda t: t.label)
+        assemblage_memberships = [set(taxa[:8]), set(taxa[8:20])]
+        for method_name in (
+                "standardized_effect_size_mean_pairwise_distance",
+                "standardized_effect_size_mean_nearest_taxon_distance"):
+            obs_results = getattr(pdm, method_name)(
+                    assemblage_memberships=assemblage_memberships,
+                    num_randomization_replicates=50,
+                    rng=random.Random(1))
+            exp_results = getattr(self.expected_pdm, method_name)(
+                    assemblage_memberships=assemblage_memberships,
+                    num_randomization_replicates=50,
+                    rng=random.Random(1))
+            for obs, exp in zip(obs_results, exp_results):
+                self.assertAlmostEqual(obs.obs, exp.obs, 12)
+                self.assertGreater(obs.null_model_sd, 0)
+
 class NodeToNodeDistancesTest(unittest.TestCase):
 
     def test_distances(self):
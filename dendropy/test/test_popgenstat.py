@@ -124,5 +124,68 @@ class PopulationPairSummaryStatisticsTests(dendropytest.ExtendedTestCase):
         self.assertAlmostEqual(pp.tajimas_d, 1.65318627677, 4)
         self.assertAlmostEqual(pp.wakeleys_psi, 0.8034976, 2)
 
+class UncertainStatesTests(dendropytest.ExtendedTestCase):
+
+    def setUp(self):
+        self.matrix = dendropy.DnaCharacterMatrix.get_from_string("""\
+            >s1
+            ACGT-N
+            >s2
+            ACGA?N
+            >s3
+            RCGT-A
+            """, "fasta")
+
+    def test_num_segregating_sites(self):
+        self.assertEqual(popgenstat.num_segregating_sites(self.matrix, ignore_uncertain=True), 2)
+        self.assertEqual(popgenstat.num_segregating_sites(self.matrix, ignore_uncertain=False), 4)
+
+    def test_average_number_of_pairwise_differences(self):
+        self.assertAlmostEqual(popgenstat.average_number_of_pairwise_differences(self.matrix, ignore_uncertain=True), 4.0/3)
+        self.assertAlmostEqual(popgenstat.average_number_of_pairwise_differences(self.matrix, ignore_uncertain=False), 8.0/3)
+
+class UnfoldedSiteFrequencySpectrumTests(dendropytest.ExtendedTestCase):
+
+    def setUp(self):
+        self.matrix = dendropy.DnaCharacterMatrix.get_from_string("""\
+            >s1
+            AAAA
+            >s2
+            ACAA
+            >s3
+            ACGA
+            >s4
+            ?CGT
+            """, "fasta")
+
+    def test_ignore_uncertain(self):
+        sfs = popgenstat.unfolded_site_frequency_spectrum(self.matrix, ignore_uncertain=True)
+        self.assertEqual(sfs, {0: 1, 1: 1, 2: 1, 3: 1, 4: 0})
+
+    def test_uncertain_as_derived(self):
+        sfs = popgenstat.unfolded_site_frequency_spectrum(self.matrix, ignore_uncertain=False)
+        self.assertEqual(sfs, {0: 0, 1: 2, 2: 1, 3: 1, 4: 0})
+        sfs = popgenstat.unfolded_site_frequency_spectrum(self.matrix, ignore_uncertain=False, pad=False)
+        self.assertEqual(sfs, {1: 2, 2: 1, 3: 1})
+
+    def test_ancestral_sequence(self):
+        ancestral_sequence = self.matrix.sequences()[3]
+        sfs = popgenstat.unfolded_site_frequency_spectrum(self.matrix,
+                ancestral_sequence=ancestral_sequence,
+                ignore_uncertain=True,
+                pad=False)
+        self.assertEqual(sfs, {0: 1, 1: 1, 2: 1, 3: 1})
+
+    def test_derived_state_matrix(self):
+        data = dendropy.DnaCharacterMatrix.get_from_path(pathmap.char_source_path('COII_Apes.nex'), schema="nexus")
+        for ignore_uncertain in (True, False):
+            dsm = popgenstat.derived_state_matrix(data, ignore_uncertain=ignore_uncertain)
+            expected = {}
+            for i in range(len(data)+1):
+                expected[i] = 0
+            for site in zip(*dsm.sequences()):
+                expected[sum(1 for c in site if c.symbol == "1")] += 1
+            self.assertEqual(popgenstat.unfolded_site_frequency_spectrum(data, ignore_uncertain=ignore_uncertain), expected)
+
 if __name__ == "__main__":
     unittest.main()
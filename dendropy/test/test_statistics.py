@@ -20,6 +20,7 @@
 Tests statistical routines.
 """
 
+import random
 import unittest
 from dendropy.test.support import dendropytest
 from dendropy.calculate import statistics
@@ -165,6 +166,82 @@ class HpdCalculationTests(dendropytest.ExtendedTestCase):
         self.assertAlmostEqual(c1, 0.02099306)
         self.assertAlmostEqual(c2, 0.09889312)
 
+class StreamingSummaryTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1)
+        self.values = [rng.gammavariate(2.0, 1.5) for i in range(2000)]
+
+    def test_all_values_in_reservoir(self):
+        ss = statistics.StreamingSummary(reservoir_size=len(self.values))
+        ss.extend(self.values)
+        self.assertEqual(ss.count, len(self.values))
+        self.assertEqual(len(ss), len(self.values))
+        self.assertEqual(ss.summarize(), statistics.summarize(self.values))
+
+    def test_ignore_none(self):
+        ss = statistics.StreamingSummary()
+        self.assertRaises(ValueError, ss.summarize)
+        ss.extend([None, 1.0, None, 3.0])
+        self.assertEqual(ss.count, 2)
+        self.assertEqual(len(ss), 2)
+        self.assertEqual(ss.summarize()["range"], (1.0, 3.0))
+
+    def test_reservoir_sampling(self):
+        ss = statistics.StreamingSummary(reservoir_size=500, rng=random.Random(1))
+        ss.extend(self.values)
+        self.assertEqual(ss.count, len(self.values))
+        self.assertEqual(len(ss.reservoir), 500)
+        expected = statistics.summarize(self.values)
+        observed = ss.summarize()
+        self.assertEqual(set(observed.keys()), set(expected.keys()))
+        self.assertAlmostEqual(observed["mean"], expected["mean"], 10)
+        self.assertAlmostEqual(observed["var"], expected["var"], 10)
+        self.assertAlmostEqual(observed["sd"], expected["sd"], 10)
+        self.assertEqual(observed["range"], expected["range"])
+        self.assertAlmostEqual(observed["median"], expected["median"], delta=0.3)
+        for f in ("hpd95", "quant_5_95"):
+            for v1, v2 in zip(observed[f], expected[f]):
+                self.assertAlmostEqual(v1, v2, delta=1.0)
+
+    def test_values_beyond_reservoir(self):
+        ss = statistics.StreamingSummary(reservoir_size=10, rng=random.Random(1))
+        ss.extend([1.0] * 100)
+        self.assertEqual(ss.count, 100)
+        self.assertEqual(len(ss), 10)
+        self.assertEqual(len(list(ss)), len(ss))
+        self.assertEqual(sum(ss) / len(ss), 1.0)
+        self.assertEqual(statistics.mean_and_sample_variance(ss), (1.0, 0.0))
+        ss = statistics.StreamingSummary(reservoir_size=10, rng=random.Random(1))
+        ss.extend(self.values)
+        expected = statistics.mean_and_sample_variance(self.values)
+        for v1, v2 in zip(statistics.mean_and_sample_variance(ss), expected):
+            self.assertAlmostEqual(v1, v2, 10)
+
+    def test_update(self):
+        for reservoir_size in (len(self.values), 500):
+            ss1 = statistics.StreamingSummary(reservoir_size=reservoir_size, rng=random.Random(1))
+            ss1.extend(self.values[:300])
+            ss2 = statistics.StreamingSummary(reservoir_size=reservoir_size, rng=random.Random(1))
+            ss2.extend(self.values[300:])
+            ss1.update(ss2)
+            ss1.update(statistics.StreamingSummary())
+            self.assertEqual(ss1.count, len(self.values))
+            self.assertTrue(len(ss1.reservoir) <= reservoir_size)
+            expected = statistics.summarize(self.values)
+            observed = ss1.summarize()
+            self.assertAlmostEqual(observed["mean"], expected["mean"], 10)
+            self.assertAlmostEqual(observed["var"], expected["var"], 10)
+            self.assertEqual(observed["range"], expected["range"])
+            if reservoir_size == len(self.values):
+                self.assertEqual(sorted(ss1.reservoir), sorted(self.values))
+                self.assertEqual(observed["median"], expected["median"])
+            else:
+                # the merged reservoir should represent the two parts in
+                # proportion to their sizes
+                num_from_first = len(set(ss1.reservoir) & set(self.values[:300]))
+                self.assertAlmostEqual(num_from_first, 75, delta=25)
+
 class TestMedian(unittest.TestCase):
     """
     Test from: http://wiki.python.org/moin/SimplePrograms.
@@ -1005,6 +1005,13 @@ class TreeCompareTests(dendropytest.ExtendedTestCase):
     #     self.assertIs(self.tree_list2.taxon_namespace, tl2_ts)
 
     def testSymmetricDifferences(self):
+        for algorithm in ("bipartitions", "day"):
+            self.verify_symmetric_differences(algorithm)
+
+    def verify_symmetric_differences(self, algorithm):
+        tns = dendropy.TaxonNamespace()
+        tree_list1 = _get_reference_tree_list(taxon_namespace=tns)
+        tree_list2 = _get_reference_tree_list(taxon_namespace=tns)
         expected = {
             (0,1):60, (0,2):60, (0,3):60, (0,4):60, (0,5):60, (0,6):60, (0,7):60, (0,8):60,
             (0,9):60, (0,10):60, (1,2):14, (1,3):24, (1,4):22, (1,5):20, (1,6):24, (1,7):22, (1,8):24,
@@ -1013,14 +1020,47 @@ class TreeCompareTests(dendropytest.ExtendedTestCase):
             (4,9):2, (4,10):4, (5,6):4, (5,7):2, (5,8):4, (5,9):2, (5,10):4, (6,7):4, (6,8):0, (6,9):2, (6,10):4,
             (7,8):4, (7,9):2, (7,10):4, (8,9):2, (8,10):4, (9,10):2,
         }
-        for i, t1 in enumerate(self.tree_list1[:-1]):
-            for j, t2 in enumerate(self.tree_list2[i+1:]):
-                v = treecompare.symmetric_difference(t1, t2)
+        for i, t1 in enumerate(tree_list1[:-1]):
+            for j, t2 in enumerate(tree_list2[i+1:]):
+                v = treecompare.symmetric_difference(t1, t2, algorithm=algorithm)
                 self.assertEqual(expected[(i, i+j+1)], v)
 #                print "(%d,%d):%d," % (i, i+j+1, v),
 #                if (i * i+j+1) % 6 == 0:
 #                    print
 
+    def testDayAlgorithmMatchesBipartitions(self):
+        for is_rooted in (True, False):
+            for t1 in self.tree_list1:
+                t1.is_rooted = is_rooted
+                for t2 in self.tree_list2:
+                    t2.is_rooted = is_rooted
+                    d = treecompare.false_positives_and_negatives(t1, t2, algorithm="day")
+                    self.assertIs(t1.bipartition_encoding, None)
+                    self.assertIs(t2.bipartition_encoding, None)
+                    c1 = t1.clone(depth=1)
+                    c2 = t2.clone(depth=1)
+                    self.assertEqual(d, treecompare.false_positives_and_negatives(c1, c2))
+
+    def testDayAlgorithmWithUnifurcations(self):
+        tns = dendropy.TaxonNamespace()
+        t1 = dendropy.Tree.get(data="[&U] ((((a,b)),c),(d,(e,f)));", schema="newick", taxon_namespace=tns)
+        t2 = dendropy.Tree.get(data="[&U] (((a,c),b),((d,e),f));", schema="newick", taxon_namespace=tns)
+        self.assertEqual(treecompare.false_positives_and_negatives(t1, t2, algorithm="day"), (2, 2))
+        self.assertEqual(len(t1.internal_nodes()), 6)
+        self.assertEqual(treecompare.false_positives_and_negatives(t1, t2), (2, 2))
+
+    def testDayAlgorithmWithDifferentLeafSets(self):
+        tns = dendropy.TaxonNamespace()
+        t1 = dendropy.Tree.get(data="((a,b),(c,(d,e)));", schema="newick", taxon_namespace=tns)
+        t2 = dendropy.Tree.get(data="((a,b),(c,d));", schema="newick", taxon_namespace=tns)
+        self.assertEqual(
+                treecompare.symmetric_difference(t1, t2, algorithm="day"),
+                treecompare.symmetric_difference(t1, t2))
+
+    def testInvalidAlgorithm(self):
+        with self.assertRaises(ValueError):
+            treecompare.symmetric_difference(self.tree_list1[0], self.tree_list2[0], algorithm="dayhoff")
+
     def testEuclideanDistances(self):
         expected = {
             (0,1):442.518379997, (0,2):458.269219125, (0,3):492.707662859, (0,4):457.731995932, (0,5):463.419798784, (0,6):462.181969494,
@@ -1061,6 +1101,85 @@ class TreeCompareTests(dendropytest.ExtendedTestCase):
 #                if (i * i+j+1) % 6 == 0:
 #                    print
 
+class TreeDistanceMatrixTests(unittest.TestCase):
+
+    def setUp(self):
+        self.trees = _get_reference_tree_list(taxon_namespace=dendropy.TaxonNamespace())
+        self.metric_fns = {
+            "symmetric_difference": treecompare.symmetric_difference,
+            "unweighted_robinson_foulds": treecompare.unweighted_robinson_foulds_distance,
+            "weighted_robinson_foulds": treecompare.weighted_robinson_foulds_distance,
+            "euclidean": treecompare.euclidean_distance,
+            }
+
+    def verify_matrix(self, observed, metric_fn):
+        self.assertEqual(len(observed), len(self.trees))
+        for i, t1 in enumerate(self.trees):
+            self.assertEqual(len(observed[i]), len(self.trees))
+            for j, t2 in enumerate(self.trees):
+                self.assertAlmostEqual(observed[i][j], metric_fn(t1, t2))
+
+    def test_distance_matrix(self):
+        for metric, metric_fn in self.metric_fns.items():
+            for num_processes, block_size in ((1, None), (1, 4), (2, None), (3, 2)):
+                observed = treecompare.distance_matrix(self.trees,
+                        metric=metric,
+                        num_processes=num_processes,
+                        block_size=block_size)
+                self.verify_matrix(observed, metric_fn)
+
+    def test_unweighted_distances_are_integers(self):
+        observed = treecompare.distance_matrix(self.trees)
+        for row in observed:
+            for value in row:
+                self.assertIsInstance(value, int)
+
+    def test_iter_distance_matrix_rows(self):
+        for metric, metric_fn in self.metric_fns.items():
+            observed = list(treecompare.iter_distance_matrix_rows(self.trees,
+                    metric=metric,
+                    num_processes=2,
+                    block_size=3))
+            self.verify_matrix(observed, metric_fn)
+
+    def test_write_distance_matrix(self):
+        for metric, metric_fn in self.metric_fns.items():
+            dest = StringIO()
+            result = treecompare.distance_matrix(self.trees,
+                    metric=metric,
+                    block_size=5,
+                    dest=dest,
+                    delimiter="\t")
+            self.assertIs(result, None)
+            observed = [[float(v) for v in line.split("\t")] for line in dest.getvalue().splitlines()]
+            self.verify_matrix(observed, metric_fn)
+
+    def test_tree_array_distance_matrix(self):
+        tree_array = dendropy.TreeArray(taxon_namespace=self.trees.taxon_namespace)
+        tree_array.add_trees(self.trees)
+        for metric, metric_fn in self.metric_fns.items():
+            observed = tree_array.distance_matrix(metric=metric, num_processes=2)
+            self.verify_matrix(observed, metric_fn)
+        tree_array = dendropy.TreeArray(
+                taxon_namespace=self.trees.taxon_namespace,
+                ignore_edge_lengths=True)
+        tree_array.add_trees(self.trees)
+        self.verify_matrix(tree_array.distance_matrix(), treecompare.symmetric_difference)
+        self.assertRaises(ValueError, tree_array.distance_matrix, metric="euclidean")
+
+    def test_invalid_metric(self):
+        self.assertRaises(ValueError, treecompare.distance_matrix, self.trees, metric="rf")
+
+    def test_missing_edge_lengths(self):
+        self.trees[1].seed_node.edge.length = None
+        for metric in ("weighted_robinson_foulds", "euclidean"):
+            self.verify_matrix(treecompare.distance_matrix(self.trees, metric=metric), self.metric_fns[metric])
+        self.trees[1].leaf_nodes()[0].edge.length = None
+        for metric in ("weighted_robinson_foulds", "euclidean"):
+            self.assertRaises(ValueError, treecompare.distance_matrix, self.trees, metric=metric)
+            self.assertRaises(ValueError, self.metric_fns[metric], self.trees[0], self.trees[1])
+        self.verify_matrix(treecompare.distance_matrix(self.trees), treecompare.symmetric_difference)
+
 class FrequencyOfBipartitionsTests(unittest.TestCase):
 
     def testCount1(self):
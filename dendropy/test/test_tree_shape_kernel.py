@@ -166,6 +166,36 @@ class TreeShapeKernelBasicCalculationTest(unittest.TestCase):
             for idx2, t2 in enumerate(trees):
                 self.assertAlmostEqual(tree_shape_kernel(t1, t2), expected[idx1][idx2])
                 # print("{}, {} = {}".format(idx1+1, idx2+1, tree_shape_kernel(t1, t2)))
+        for num_processes in (1, 2):
+            gram_matrix = tree_shape_kernel.gram_matrix(trees, num_processes=num_processes)
+            self.assertEqual(len(gram_matrix), len(trees))
+            for idx1, row in enumerate(gram_matrix):
+                self.assertEqual(len(row), len(trees))
+                for idx2, v in enumerate(row):
+                    self.assertAlmostEqual(v, expected[idx1][idx2])
+                    # symmetrized, with the upper triangle calculated as by
+                    # calling the kernel
+                    self.assertEqual(v, gram_matrix[idx2][idx1])
+                    if idx1 <= idx2:
+                        self.assertEqual(v, tree_shape_kernel(trees[idx1], trees[idx2], True, True))
+
+    def test_cache_size(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        trees = [dendropy.Tree.get_from_string(s, "newick", taxon_namespace=taxon_namespace) for s in (
+            "[&R] ((A:0.5,B:0.25):0.5,(C:0.25,D:0.25):0.5);",
+            "[&R] (((A:0.25,B:0.25):0.5,C:0.25):0.5,D:0.25);",
+            "[&R] (((A:0.25,C:0.25):0.5,B:0.25):0.5,D:0.25);",
+            )]
+        tree_shape_kernel = TreeShapeKernel(max_cache_size=2)
+        tree_shape_kernel(trees[0], trees[1])
+        self.assertEqual(list(tree_shape_kernel._tree_cache), trees[:2])
+        tree_shape_kernel(trees[0], trees[2], is_tree1_cache_updated=True)
+        self.assertEqual(list(tree_shape_kernel._tree_cache), [trees[0], trees[2]])
+        expected = tree_shape_kernel(trees[0], trees[1])
+        tree_shape_kernel.max_cache_size = None
+        tree_shape_kernel.gram_matrix(trees)
+        self.assertEqual(list(tree_shape_kernel._tree_cache), trees)
+        self.assertEqual(tree_shape_kernel(trees[0], trees[1], True, True), expected)
 
 class AssemblageInducedTreeManagerTestBase(unittest.TestCase):
 
@@ -286,6 +316,57 @@ class AssemblageInducedTreeShapeKernelTests(AssemblageInducedTreeManagerTestBase
                 test_target=test_target,
                 trees=trees)
 
+    def test_cache_size(self):
+        trees = [self.get_random_tree() for idx in range(3)]
+        for max_cache_size in (1, 2):
+            test_target = AssemblageInducedTreeShapeKernel(
+                    is_exchangeable_assemblage_classifications=False,
+                    max_cache_size=max_cache_size)
+            self.assertEqual(test_target.max_cache_size, max_cache_size)
+            for tree1, tree2 in ((trees[0], trees[1]), (trees[2], trees[0]), (trees[1], trees[1])):
+                score_vector = test_target(
+                        tree1=tree1,
+                        tree2=tree2,
+                        tree1_assemblage_leaf_sets=tree1.assemblage_leaf_sets,
+                        tree2_assemblage_leaf_sets=tree2.assemblage_leaf_sets,
+                        is_tree1_cache_updated=True,
+                        is_tree2_cache_updated=True)
+                self.assertEqual(len(score_vector), len(AssemblageInducedTreeManagerTests.GROUP_IDS) + 1)
+                self.assertIn(tree2, test_target._tree_assemblage_induced_trees_map)
+                self.assertTrue(len(test_target._tree_assemblage_induced_trees_map) <= max_cache_size)
+            test_target.gram_matrix(
+                    trees=trees,
+                    assemblage_leaf_sets=[tree.assemblage_leaf_sets for tree in trees],
+                    is_cache_updated=True)
+            self.assertEqual(list(test_target._tree_assemblage_induced_trees_map), trees[-max_cache_size:])
+
+    def test_gram_matrix(self):
+        trees = [self.get_random_tree() for idx in range(4)]
+        for is_exchangeable_assemblage_classifications in (True, False):
+            test_target = AssemblageInducedTreeShapeKernel(
+                    is_exchangeable_assemblage_classifications=is_exchangeable_assemblage_classifications)
+            gram_matrix = test_target.gram_matrix(
+                    trees=trees,
+                    assemblage_leaf_sets=[tree.assemblage_leaf_sets for tree in trees])
+            self.validate_managed_trees(
+                    test_target=test_target,
+                    trees=trees)
+            for idx1, tree1 in enumerate(trees):
+                for idx2, tree2 in enumerate(trees):
+                    expected = test_target(
+                            tree1=tree1,
+                            tree2=tree2,
+                            tree1_assemblage_leaf_sets=tree1.assemblage_leaf_sets,
+                            tree2_assemblage_leaf_sets=tree2.assemblage_leaf_sets,
+                            )
+                    if is_exchangeable_assemblage_classifications:
+                        self.assertEqual(len(expected), 1)
+                    else:
+                        self.assertEqual(len(expected), len(AssemblageInducedTreeManagerTests.GROUP_IDS) + 1)
+                    self.assertEqual(len(gram_matrix[idx1][idx2]), len(expected))
+                    for v1, v2 in zip(gram_matrix[idx1][idx2], expected):
+                        self.assertAlmostEqual(v1, v2)
+
 if __name__ == "__main__":
     unittest.main()
 
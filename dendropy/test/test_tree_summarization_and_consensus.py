@@ -26,6 +26,7 @@ import dendropy
 import random
 import itertools
 from dendropy.calculate import treecompare
+from dendropy.calculate import treesum
 from dendropy.test.support import pathmap
 from dendropy.calculate import statistics
 from dendropy.test.support import dendropytest
@@ -214,6 +215,141 @@ class TestTreeEdgeSummarization(unittest.TestCase):
             obs_edge = target_tree.bipartition_edge_map[exp_bipartition]
             self.assertAlmostEqual(obs_edge.head_node.age, exp_edge.head_node.age)
 
+class TestTreeSummarizerWithStreamingSummaries(unittest.TestCase):
+
+    def test_means_beyond_reservoir(self):
+        taxon_namespace = dendropy.TaxonNamespace()
+        trees = dendropy.TreeList.get(
+                data="".join("[&R] ((A:{0},B:{0}):1,C:{1}):0;".format(i, i + 1) for i in range(1, 6)),
+                schema="newick",
+                taxon_namespace=taxon_namespace)
+        split_distribution = dendropy.SplitDistribution(
+                taxon_namespace=taxon_namespace,
+                ignore_node_ages=False,
+                summary_reservoir_size=2)
+        for tree in trees:
+            split_distribution.count_splits_on_tree(tree)
+        target_tree = dendropy.Tree.get(
+                data="[&R] ((A,B),C);",
+                schema="newick",
+                taxon_namespace=taxon_namespace)
+        tree_summarizer = treesum.TreeSummarizer()
+        tree_summarizer.summarize_edge_lengths_on_tree(target_tree, split_distribution)
+        self.assertEqual(target_tree.find_node_with_taxon_label("A").edge.length, 3.0)
+        self.assertEqual(target_tree.find_node_with_taxon_label("C").edge.length, 4.0)
+        tree_summarizer.summarize_node_ages_on_tree(target_tree, split_distribution, set_edge_lengths=False)
+        self.assertEqual(target_tree.seed_node.age, 4.0)
+        self.assertEqual(target_tree.mrca(taxon_labels=["A", "B"]).age, 3.0)
+
+class TestSplitSummaryDecoration(unittest.TestCase):
+
+    def setUp(self):
+        trees = dendropy.TreeList.get(
+                data="""
+                [&R] ((A:1,B:1):2,(C:2,D:2):1):0;
+                [&R] ((A:1.5,B:1.5):1.5,(C:2,D:2):1):0;
+                [&R] ((A:1,C:1):2,(B:2,D:2):1):0;
+                """,
+                schema="newick")
+        self.split_distribution = dendropy.SplitDistribution(
+                taxon_namespace=trees.taxon_namespace,
+                ignore_node_ages=False)
+        for tree in trees:
+            self.split_distribution.count_splits_on_tree(tree)
+        self.summary_stats_fieldnames = self.split_distribution.SUMMARY_STATS_FIELDNAMES
+
+    def get_target_tree(self):
+        tree = dendropy.Tree.get(
+                data="[&R] ((A,B),(C,D));",
+                schema="newick",
+                taxon_namespace=self.split_distribution.taxon_namespace)
+        tree.encode_bipartitions()
+        return tree
+
+    def get_split_node(self, tree, labels):
+        return tree.mrca(taxon_labels=labels)
+
+    def test_attributes_and_bound_annotations(self):
+        tree = self.get_target_tree()
+        self.split_distribution.summarize_splits_on_tree(tree, is_bipartitions_updated=True)
+        node_annotation_names = ["support"] + ["age_{}".format(f) for f in self.summary_stats_fieldnames]
+        edge_annotation_names = ["length_{}".format(f) for f in self.summary_stats_fieldnames]
+        for node in tree:
+            self.assertEqual([a.name for a in node.annotations], node_annotation_names)
+            self.assertEqual([a.name for a in node.edge.annotations], edge_annotation_names)
+            for a in node.annotations:
+                self.assertTrue(a.is_attribute)
+                self.assertIs(a._value[0], node)
+                self.assertEqual(a.prefixed_name, "dendropy:{}".format(a.name))
+            for a in node.edge.annotations:
+                self.assertIs(a._value[0], node.edge)
+        node = self.get_split_node(tree, ["A", "B"])
+        self.assertAlmostEqual(node.support, 2.0/3)
+        self.assertAlmostEqual(node.age_mean, 1.25)
+        self.assertEqual(node.age_range, (1.0, 1.5))
+        self.assertAlmostEqual(node.edge.length_mean, 1.75)
+        node.support = 0.5
+        self.assertEqual(node.annotations.get_value("support"), 0.5)
+
+    def test_static_annotations(self):
+        tree = self.get_target_tree()
+        self.split_distribution.summarize_splits_on_tree(tree,
+                is_bipartitions_updated=True,
+                add_support_as_node_attribute=False,
+                add_edge_length_summaries_as_edge_attributes=False,
+                is_age_mean_annotation_dynamic=False)
+        node = self.get_split_node(tree, ["C", "D"])
+        self.assertFalse(hasattr(node, "support"))
+        self.assertFalse(hasattr(node.edge, "length_mean"))
+        self.assertAlmostEqual(node.annotations.get_value("support"), 2.0/3)
+        self.assertEqual(node.edge.annotations.get_value("length_mean"), 1.0)
+        age_mean = node.annotations.find(name="age_mean")
+        self.assertFalse(age_mean.is_attribute)
+        self.assertEqual(age_mean.value, 2.0)
+        node.age_mean = 10.0
+        self.assertEqual(age_mean.value, 2.0)
+
+    def test_existing_annotations_replaced(self):
+        tree = self.get_target_tree()
+        node = self.get_split_node(tree, ["A", "B"])
+        node.annotations.add_new("color", "red")
+        node.annotations.add_new("support", 0.0)
+        for i in range(2):
+            self.split_distribution.summarize_splits_on_tree(tree, is_bipartitions_updated=True)
+        names = [a.name for a in node.annotations]
+        self.assertEqual(names[0], "color")
+        self.assertEqual(names.count("support"), 1)
+        self.assertEqual(len(names), len(set(names)))
+        self.assertAlmostEqual(node.annotations.get_value("support"), 2.0/3)
+
+    def test_shared_annotation_name(self):
+        tree = self.get_target_tree()
+        self.split_distribution.summarize_splits_on_tree(tree,
+                is_bipartitions_updated=True,
+                age_median_annotation_name="age_mean")
+        for node in tree:
+            names = [a.name for a in node.annotations]
+            self.assertEqual(names.count("age_mean"), 1)
+            self.assertEqual(node.annotations.find(name="age_mean")._value[1], "age_median")
+
+    def test_set_edge_lengths(self):
+        tree = self.get_target_tree()
+        self.split_distribution.summarize_splits_on_tree(tree,
+                is_bipartitions_updated=True,
+                set_edge_lengths="mean-age")
+        self.assertAlmostEqual(self.get_split_node(tree, ["A", "B"]).edge.length, 1.75)
+        self.split_distribution.summarize_splits_on_tree(tree,
+                is_bipartitions_updated=True,
+                set_edge_lengths="mean-length",
+                minimum_edge_length=1.2)
+        self.assertAlmostEqual(self.get_split_node(tree, ["A", "B"]).edge.length, 1.75)
+        self.assertAlmostEqual(tree.find_node_with_taxon_label("A").edge.length, 1.2)
+        self.split_distribution.summarize_splits_on_tree(tree,
+                is_bipartitions_updated=True,
+                set_edge_lengths="clear")
+        for node in tree:
+            self.assertIs(node.edge.length, None)
+
 class TestTopologyCounter(dendropytest.ExtendedTestCase):
 
     def get_regime(self,
@@ -23,8 +23,6 @@ Errors, exceptions, warnings, etc.
 import sys
 import re
 import warnings
-import inspect
-import subprocess
 
 class ImmutableTaxonNamespaceError(TypeError):
     def __init__(self, message):
@@ -231,6 +231,9 @@ rst_prolog = """
 .. |Node| replace:: :class:`~dendropy.datamodel.treemodel.Node`
 .. |Edge| replace:: :class:`~dendropy.datamodel.treemodel.Edge`
 .. |Bipartition| replace:: :class:`~dendropy.datamodel.treemodel.Bipartition`
+.. |TreeSkeleton| replace:: :class:`~dendropy.datamodel.treemodel.TreeSkeleton`
+.. |MrcaIndex| replace:: :class:`~dendropy.datamodel.treemodel.MrcaIndex`
+.. |FlatTree| replace:: :class:`~dendropy.datamodel.treemodel.FlatTree`
 .. |TreeList| replace:: :class:`~dendropy.datamodel.treecollectionmodel.TreeList`
 .. |TreeArray| replace:: :class:`~dendropy.datamodel.treecollectionmodel.TreeArray`
 .. |SplitDistribution| replace:: :class:`~dendropy.datamodel.treecollectionmodel.SplitDistribution`
@@ -254,6 +257,8 @@ rst_prolog = """
 .. |AnnotationSet| replace:: :class:`~dendropy.datamodel.basemodel.AnnotationSet`
 .. |Annotable| replace:: :class:`~dendropy.datamodel.basemodel.Annotable`
 .. |PhylogeneticDistanceMatrix| replace:: :class:`~dendropy.calculate.phylogeneticdistance.PhylogeneticDistanceMatrix`
+.. |ArrayPhylogeneticDistanceMatrix| replace:: :class:`~dendropy.calculate.phylogeneticdistance.ArrayPhylogeneticDistanceMatrix`
+.. |FitchParsimonyScorer| replace:: :class:`~dendropy.model.parsimony.FitchParsimonyScorer`
 
 .. |get| replace::  :py:meth:`get`
 .. |put| replace::  :py:meth:`put`
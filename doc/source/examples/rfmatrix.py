@@ -0,0 +1,18 @@
+import dendropy
+from dendropy.calculate import treecompare
+
+trees = dendropy.TreeList.get(
+        path="pythonidae.mb.run1.t",
+        schema="nexus")
+
+# unweighted Robinson-Foulds distances between all pairs of trees
+rf_matrix = treecompare.distance_matrix(trees)
+print(rf_matrix[0][1])
+
+# weighted Robinson-Foulds distances, calculated in 4 processes and
+# written to a file
+with open("wrf.csv", "w") as dest:
+    treecompare.distance_matrix(trees,
+            metric="weighted_robinson_foulds",
+            num_processes=4,
+            dest=dest)